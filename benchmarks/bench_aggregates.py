@@ -0,0 +1,95 @@
+"""分析ダッシュボード集計ベンチマーク: pandas経路 vs SQLite集計関数経路
+
+    python -m benchmarks.bench_aggregates --rows 20000
+
+pandas経路は従来の価格分析ページと同じく最大5000行を取得してDataFrameで集計する。
+SQLite経路は median/percentile/histogram 集計関数で集計済みの行のみ取得する。
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.database.models import init_db
+from src.database.repository import PropertyRepository
+
+MUNICIPALITIES = [
+    "那覇市", "浦添市", "宜野湾市", "沖縄市", "うるま市", "名護市", "豊見城市", "糸満市",
+]
+FLOOR_PLANS = ["1R", "1K", "1DK", "1LDK", "2DK", "2LDK", "3LDK"]
+
+
+def _populate(repo: PropertyRepository, rows: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    items = [
+        {
+            "source": "bench",
+            "source_id": f"b{i}",
+            "rent": rng.randint(30, 150) * 1000,
+            "area_sqm": round(rng.uniform(18, 90), 1),
+            "municipality": rng.choice(MUNICIPALITIES),
+            "floor_plan": rng.choice(FLOOR_PLANS),
+            "affordability_score": round(rng.uniform(0.6, 1.4), 3),
+        }
+        for i in range(rows)
+    ]
+    repo.upsert_many(items)
+
+
+def _pandas_path(repo: PropertyRepository) -> int:
+    df = pd.DataFrame(repo.search(limit=5000, sort_by="rent", sort_order="ASC"))
+    df["rent"].median()
+    df.groupby("municipality").agg(
+        avg_rent=("rent", "mean"), median_rent=("rent", "median"),
+        count=("rent", "count"), avg_area=("area_sqm", "mean"),
+    )
+    df.groupby("floor_plan")["rent"].quantile([0.25, 0.5, 0.75])
+    pd.cut(df["rent"], 50).value_counts()
+    return len(df)
+
+
+def _sqlite_path(repo: PropertyRepository) -> int:
+    repo.get_rent_summary()
+    muni = repo.get_rent_stats_by("municipality")
+    plans = repo.get_rent_stats_by("floor_plan")
+    repo.get_histogram("rent", bins=50)
+    return len(muni) + len(plans) + 1
+
+
+def _time(fn, repo, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn(repo)
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = init_db(Path(tmp) / "bench.db")
+        repo = PropertyRepository(conn)
+        _populate(repo, args.rows)
+
+        pandas_sec, pandas_rows = _time(_pandas_path, repo, args.repeat)
+        sqlite_sec, sqlite_rows = _time(_sqlite_path, repo, args.repeat)
+        conn.close()
+
+    print(f"物件数: {args.rows:,}")
+    print(f"pandas経路: {pandas_sec * 1000:8.1f} ms (Pythonへ転送 {pandas_rows:,}行 ※最大5000行)")
+    print(f"SQLite経路: {sqlite_sec * 1000:8.1f} ms (Pythonへ転送 {sqlite_rows:,}行)")
+    print(f"速度比: {pandas_sec / sqlite_sec:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""クレンジング関数のマイクロベンチマーク
+
+各パーサ (_parse_price, _parse_months, ...) を代表的な入力で繰り返し呼び出し、
+1呼び出しあたりの時間を計測する。比較用に書き換え前の実装 (文字列パターンの re.match と
+.replace の連鎖) を _legacy_* として残している。
+あわせて合成ページから抽出したアイテムで process_item / process_batch のスループットを計測する。
+
+    python -m benchmarks.bench_cleansing --number 20000
+"""
+
+import argparse
+import copy
+import re
+import time
+
+import scrapy
+
+from benchmarks.fixtures import synthetic_pages
+from src.scraper.incremental import SeenFilter
+from src.scraper.pipelines import DataCleansingPipeline
+from src.scraper.spiders.goohome import GoohomeSpider
+from src.scraper.spiders.homes import HomesSpider
+from src.scraper.spiders.suumo import SuumoSpider
+from src.scraper.spiders.uchina import UchinaSpider
+
+INPUTS = {
+    "_parse_price": ["5.5万円", "50,000円", "管理費等:4,000円", "12.8万", "-", "¥62000", None],
+    "_parse_months": ["1ヶ月", "0.5ヵ月", "なし", "-", "2カ月", "", None],
+    "_parse_float": ["25.5㎡", "約50㎡", "38.16m²", "71.03m2", "1,000", "abc"],
+    "_parse_int": ["10分", "3", "15min", None, "x"],
+    "_extract_room_count": ["1LDK", "2DK", "ワンルーム", "3LDK"],
+    "_extract_municipality": ["沖縄県那覇市首里", "中頭郡北谷町美浜", "うるま市字石川"],
+}
+
+
+def _legacy_parse_price(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    s = str(value).replace(",", "").replace("円", "").replace("¥", "").strip()
+    m = re.match(r"([\d.]+)\s*万", s)
+    if m:
+        return int(float(m.group(1)) * 10000)
+    m = re.match(r"(\d+)", s)
+    if m:
+        return int(m.group(1))
+    return None
+
+
+def _legacy_parse_months(value):
+    if value is None or value == "" or value == "-":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    s = str(value).replace("ヶ月", "").replace("ヵ月", "").replace("カ月", "").strip()
+    if s in ("なし", "無", "-", "0"):
+        return 0.0
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+
+def _legacy_parse_float(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    s = (
+        str(value).replace("㎡", "").replace("m²", "").replace("m2", "")
+        .replace(",", "").replace("約", "").strip()
+    )
+    try:
+        v = float(s)
+        if v < 5 or v > 300:
+            return None
+        return v
+    except ValueError:
+        return None
+
+
+def _legacy_parse_int(value):
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    s = str(value).replace("分", "").replace("min", "").strip()
+    try:
+        return int(s)
+    except ValueError:
+        return None
+
+
+def _legacy_extract_room_count(floor_plan):
+    m = re.match(r"(\d+)", floor_plan)
+    return int(m.group(1)) if m else 1
+
+
+def _legacy_extract_municipality(address):
+    m = re.search(r"(?:沖縄県)?(\S+?[市町村])", address)
+    return m.group(1) if m else None
+
+
+LEGACY = {
+    "_parse_price": _legacy_parse_price,
+    "_parse_months": _legacy_parse_months,
+    "_parse_float": _legacy_parse_float,
+    "_parse_int": _legacy_parse_int,
+    "_extract_room_count": _legacy_extract_room_count,
+    "_extract_municipality": _legacy_extract_municipality,
+}
+
+
+def _ns_per_call(fn, inputs: list, number: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            for value in inputs:
+                fn(value)
+        best = min(best, time.perf_counter() - start)
+    return best / (number * len(inputs)) * 1e9
+
+
+def _sample_items(pages: int) -> list:
+    items = []
+    for spidercls in (GoohomeSpider, UchinaSpider, SuumoSpider, HomesSpider):
+        spider = spidercls(crawl_mode="full")
+        spider._known_filter = SeenFilter()
+        for response, callback, cb_kwargs in synthetic_pages(spidercls.name, pages):
+            items.extend(
+                r for r in getattr(spider, callback)(response, **cb_kwargs)
+                if not isinstance(r, scrapy.Request)
+            )
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="各パーサの繰り返し回数")
+    parser.add_argument(
+        "--pages", type=int, default=5, help="パイプライン計測用の合成ページ数 (サイトごと)"
+    )
+    args = parser.parse_args()
+
+    print(f"{'パーサ':24s} {'旧実装':>10s} {'現実装':>10s}  速度比")
+    for name, inputs in INPUTS.items():
+        current = getattr(DataCleansingPipeline, name)
+        for value in inputs:
+            assert current(value) == LEGACY[name](value), (name, value)
+        legacy_ns = _ns_per_call(LEGACY[name], inputs, args.number)
+        current_ns = _ns_per_call(current, inputs, args.number)
+        print(f"{name:24s} {legacy_ns:8.0f}ns {current_ns:8.0f}ns  {legacy_ns / current_ns:.2f}x")
+
+    items = _sample_items(args.pages)
+    pipeline = DataCleansingPipeline()
+    pipeline.open_spider(None)
+
+    batch = copy.deepcopy(items)
+    start = time.perf_counter()
+    for item in batch:
+        pipeline.process_item(item, None)
+    item_sec = time.perf_counter() - start
+
+    batch = copy.deepcopy(items)
+    start = time.perf_counter()
+    pipeline.process_batch(batch)
+    batch_sec = time.perf_counter() - start
+
+    print(f"\nアイテム {len(items):,}件")
+    print(f"process_item : {len(items) / item_sec:10,.0f} items/s")
+    print(f"process_batch: {len(items) / batch_sec:10,.0f} items/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""スタンドインサーバーに対するクロール全体のベンチマーク (負荷試験)
+
+benchmarks.standin のサーバーを立て (または --url で起動済みのものを使い)、一覧スパイダーを
+プロジェクトの設定のまま (ミドルウェア・パイプライン・SQLite書き込み・実行記録を含む)
+全件モードで1つずつクロールし、所要時間・リクエスト数・保存件数を計測する。
+DB・生ページアーカイブは一時ディレクトリに作る。
+
+    python -m benchmarks.bench_crawl --listings 2000 --latency 0.05
+    python -m benchmarks.bench_crawl --spider suumo --error-rate 0.05 \\
+        --set PARSE_POOL_ENABLED=True
+    # python -m benchmarks.standin で起動済みのサーバーを使う
+    python -m benchmarks.bench_crawl --url http://127.0.0.1:8800
+
+リクエスト間隔は --delay (既定 0) にそろえ、AdaptiveRateMiddleware は無効にする
+(scraping_targets.yaml の rate 上限で律速されないように)。
+--set KEY=VALUE で任意の設定を上書きできる。
+"""
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.settings import Settings
+from scrapy.spiderloader import SpiderLoader
+
+from benchmarks.standin import (
+    SITE_AREAS,
+    StandInDownloadHandler,
+    add_arguments,
+    config_from_args,
+    start_server,
+)
+from src.scraper.planner import requests_per_1000
+
+_HANDLER = f"{StandInDownloadHandler.__module__}.{StandInDownloadHandler.__name__}"
+
+
+def _settings(standin_url: str, workdir: Path, delay: float, overrides: list[str]) -> Settings:
+    settings = Settings()
+    settings.setmodule("src.scraper.settings")
+    settings.setdict({
+        "STANDIN_URL": standin_url,
+        "DOWNLOAD_HANDLERS": {"http": _HANDLER, "https": _HANDLER},
+        "DATABASE_PATH": str(workdir / "bench.db"),
+        "RAW_ARCHIVE_DIR": str(workdir / "raw_archive"),
+        "ADAPTIVE_RATE_ENABLED": False,
+        "RANDOMIZE_DOWNLOAD_DELAY": False,
+        "LOG_LEVEL": "WARNING",
+    })
+    # スパイダーの custom_settings (DOWNLOAD_DELAY) より優先させる
+    settings.set("DOWNLOAD_DELAY", delay, priority="cmdline")
+    for spec in overrides:
+        key, _, value = spec.partition("=")
+        settings.set(key, value, priority="cmdline")
+    return settings
+
+
+def _stored(db_path: Path, source: str) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT COUNT(*) FROM properties WHERE source = ?", (source,)
+        ).fetchone()
+        return row[0]
+    finally:
+        conn.close()
+
+
+def bench_crawl(settings: Settings, spiders: list[str]) -> dict:
+    """スパイダーを順に同じプロセスでクロール"""
+    process = CrawlerProcess(settings)
+    loader = SpiderLoader.from_settings(settings)
+    db_path = Path(settings.get("DATABASE_PATH"))
+    results = {}
+
+    def crawl(_, name: str):
+        crawler = process.create_crawler(loader.load(name))
+        started = time.perf_counter()
+
+        def finished(_):
+            seconds = time.perf_counter() - started
+            stats = crawler.stats.get_stats()
+            items = stats.get("item_scraped_count", 0)
+            requests = stats.get("downloader/request_count", 0)
+            results[name] = {
+                "seconds": round(seconds, 2),
+                "requests": requests,
+                "errors": sum(
+                    v for k, v in stats.items()
+                    if k.startswith("downloader/response_status_count/")
+                    and not k.endswith("/200")
+                ),
+                "retries": stats.get("retry/count", 0),
+                "items": items,
+                "stored": _stored(db_path, name),
+                "items_per_sec": round(items / seconds, 1),
+                "requests_per_1000": requests_per_1000(requests, items),
+                "parse_seconds": round(stats.get("telemetry/parse_seconds", 0.0), 2),
+                "finish_reason": stats.get("finish_reason"),
+            }
+
+        return process.crawl(crawler, crawl_mode="full").addCallback(finished)
+
+    d = crawl(None, spiders[0])
+    for name in spiders[1:]:
+        d.addCallback(crawl, name)
+    process.start()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spider", choices=list(SITE_AREAS), action="append",
+                        help="対象スパイダー (複数指定可、既定は全て)")
+    parser.add_argument("--url", help="起動済みのスタンドインサーバー (既定: このプロセス内で起動)")
+    parser.add_argument("--delay", type=float, default=0.0, help="DOWNLOAD_DELAY [秒]")
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="KEY=VALUE", help="Scrapy設定の上書き"
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+    spiders = args.spider or list(SITE_AREAS)
+
+    config = server = None
+    if args.url:
+        url = args.url
+    else:
+        config = config_from_args(args)
+        server, url = start_server(config)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = bench_crawl(_settings(url, Path(tmp), args.delay, args.set), spiders)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    if config is not None:
+        print(
+            f"スタンドイン: 応答 {args.latency}秒 (+0〜{args.jitter}秒), "
+            f"エラー率 {args.error_rate:.0%} (HTTP {args.error_status}), "
+            f"DOWNLOAD_DELAY {args.delay}秒"
+        )
+    print(
+        f"{'':8s} {'掲載':>7s} {'取得':>7s} {'保存':>7s} {'リクエスト':>9s} "
+        f"{'エラー':>6s} {'リトライ':>7s} {'/1000件':>8s} {'パース秒':>8s} "
+        f"{'所要秒':>8s} {'件/秒':>8s}"
+    )
+    for name, r in results.items():
+        listings = f"{config.listings[name]:,}" if config is not None else "-"
+        print(
+            f"{name:8s} {listings:>7s} {r['items']:7,d} {r['stored']:7,d} "
+            f"{r['requests']:9,d} {r['errors']:6,d} {r['retries']:7,d} "
+            f"{r['requests_per_1000'] or '-':>8} {r['parse_seconds']:8.2f} "
+            f"{r['seconds']:8.2f} {r['items_per_sec']:8,.1f}"
+            + (f"  ({r['finish_reason']})" if r["finish_reason"] != "finished" else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""アイテム型の比較ベンチマーク (slots付きdataclass と scrapy.Item)
+
+合成ページ (benchmarks.fixtures) を全スパイダーでパースし、生成したアイテムを
+重複除外 → クレンジング → SQLite保存 に通す。スパイダーが使うアイテム型を
+従来の scrapy.Item (同じフィールドを動的に定義) に差し替えた場合と比較する。
+
+    python -m benchmarks.bench_items --pages 200
+
+計測項目:
+- bytes/item: パース後に保持しているアイテム1件あたりのPythonヒープ (tracemalloc)
+- パース / パイプライン (DB書き込みなし) / パイプライン込み保存 の1件あたり時間 [µs]
+"""
+
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import fields
+from pathlib import Path
+
+import scrapy
+from scrapy.exceptions import DropItem
+
+from benchmarks.bench_parsers import _make_spider
+from benchmarks.fixtures import FIXTURES, synthetic_pages
+from src.scraper import fast_parsers
+from src.scraper.incremental import SeenFilter
+from src.scraper.items import RentalPropertyItem
+from src.scraper.pipelines import DataCleansingPipeline, DuplicateFilterPipeline, SQLitePipeline
+from src.scraper.spiders import goohome, homes, suumo, uchina
+
+# 従来の定義と同じ scrapy.Item
+LegacyRentalPropertyItem = type(
+    "LegacyRentalPropertyItem",
+    (scrapy.Item,),
+    {f.name: scrapy.Field() for f in fields(RentalPropertyItem)},
+)
+
+_ITEM_MODULES = (goohome, uchina, suumo, homes, fast_parsers)
+
+
+@contextmanager
+def _item_class(cls):
+    """スパイダー・高速パーサが生成するアイテム型を差し替える"""
+    originals = [m.RentalPropertyItem for m in _ITEM_MODULES]
+    for module in _ITEM_MODULES:
+        module.RentalPropertyItem = cls
+    try:
+        yield
+    finally:
+        for module, original in zip(_ITEM_MODULES, originals):
+            module.RentalPropertyItem = original
+
+
+def _parse(spiders: dict, pages: dict) -> list:
+    items = []
+    for name, spider in spiders.items():
+        for response, callback, cb_kwargs in pages[name]:
+            items.extend(
+                r for r in getattr(spider, callback)(response.replace(), **cb_kwargs)
+                if not isinstance(r, scrapy.Request)
+            )
+    return items
+
+
+def _run_pipelines(items: list, spider, db_path: Path | None) -> int:
+    pipelines = [DuplicateFilterPipeline(), DataCleansingPipeline()]
+    sqlite = SQLitePipeline()
+    if db_path is not None:
+        pipelines.append(sqlite)
+    for pipeline in pipelines:
+        if hasattr(pipeline, "open_spider"):
+            pipeline.open_spider(spider)
+    count = 0
+    try:
+        for item in items:
+            try:
+                for pipeline in pipelines:
+                    item = pipeline.process_item(item, spider)
+            except DropItem:
+                continue
+            if db_path is None:
+                # DB書き込みなし: upsert パラメータの作成まで
+                sqlite._prepare(item, spider)
+            count += 1
+    finally:
+        for pipeline in pipelines:
+            if hasattr(pipeline, "close_spider"):
+                pipeline.close_spider(spider)
+    return count
+
+
+def bench(item_cls, pages_per_spider: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp, _item_class(item_cls):
+        db_path = Path(tmp) / "bench.db"
+        spiders = {name: _make_spider(name, db_path) for name in FIXTURES}
+        for spider in spiders.values():
+            spider._known_filter = SeenFilter()
+        pages = {name: synthetic_pages(name, pages_per_spider) for name in FIXTURES}
+        any_spider = next(iter(spiders.values()))
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        items = _parse(spiders, pages)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        n = len(items)
+        del items
+
+        parse_best = prepare_best = store_best = float("inf")
+        for i in range(repeat):
+            started = time.perf_counter()
+            _parse(spiders, pages)
+            parse_best = min(parse_best, time.perf_counter() - started)
+
+            batch = _parse(spiders, pages)
+            started = time.perf_counter()
+            _run_pipelines(batch, any_spider, None)
+            prepare_best = min(prepare_best, time.perf_counter() - started)
+
+            batch = _parse(spiders, pages)
+            started = time.perf_counter()
+            _run_pipelines(batch, any_spider, Path(tmp) / f"store_{i}.db")
+            store_best = min(store_best, time.perf_counter() - started)
+
+        return {
+            "items": n,
+            "bytes_per_item": round(retained / n),
+            "parse_us": round(parse_best / n * 1e6, 2),
+            "pipeline_us": round(prepare_best / n * 1e6, 2),
+            "store_us": round(store_best / n * 1e6, 2),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100, help="スパイダーごとの合成ページ数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {
+        "scrapy.Item": bench(LegacyRentalPropertyItem, args.pages, args.repeat),
+        "dataclass(slots)": bench(RentalPropertyItem, args.pages, args.repeat),
+    }
+    print(f"{'':18s} {'件数':>8s} {'B/件':>8s} {'パース µs':>10s} "
+          f"{'パイプライン µs':>14s} {'保存込み µs':>12s}")
+    for label, r in results.items():
+        print(f"{label:18s} {r['items']:8,d} {r['bytes_per_item']:8,d} {r['parse_us']:10.2f} "
+              f"{r['pipeline_us']:14.2f} {r['store_us']:12.2f}")
+    old, new = results["scrapy.Item"], results["dataclass(slots)"]
+    print(f"メモリ {new['bytes_per_item'] / old['bytes_per_item']:.2f}x, "
+          f"パイプライン {old['pipeline_us'] / new['pipeline_us']:.2f}x 高速, "
+          f"保存込み {old['store_us'] / new['store_us']:.2f}x 高速")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""一覧パースのプロセスプールとインライン (リアクタースレッド) の比較ベンチマーク
+
+アーカイブ済みの実ページ (--archive-dir) または合成ページを、スパイダーのインライン実装
+(_parse_list_inline) とプロセスプール (ParsePool) でパースする。プールは全ページを投入して
+結果をすべて受け取るまでを計測する (ワーカー起動は含まない)。
+
+    python -m benchmarks.bench_parse_pool --pages 200
+    python -m benchmarks.bench_parse_pool --archive-dir data/raw_archive --workers 1 --workers 2
+
+計測項目:
+- pages/s: 全ページのパースにかかった経過時間あたりのページ数
+- 呼び出し側 CPU ms/page: 呼び出したスレッド (クロール時のリアクタースレッド) が使ったCPU時間。
+  プールではページの受け渡しとアイテムの組み立てのみ
+"""
+
+import argparse
+import time
+from concurrent.futures import wait
+
+from benchmarks.bench_parsers import _fresh
+from benchmarks.fixtures import archived_pages, synthetic_pages
+from src.scraper.items import RentalPropertyItem
+from src.scraper.parse_pool import PARSERS, ParsePool
+from src.scraper.spiders.homes import HomesSpider
+from src.scraper.spiders.suumo import SuumoSpider
+
+SPIDERS = {"suumo": SuumoSpider, "homes": HomesSpider}
+
+
+def _result(pages: int, items: int, wall: float, cpu: float) -> dict:
+    return {
+        "items": items,
+        "pages_per_sec": round(pages / wall, 1),
+        "caller_cpu_ms_per_page": round(cpu / pages * 1000, 3),
+    }
+
+
+def bench_inline(spider_name: str, responses: list, repeat: int) -> dict:
+    spider = SPIDERS[spider_name](crawl_mode="full")
+    best = None
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        items = sum(
+            1 for response in responses for r in spider._parse_list_inline(_fresh(response))
+            if isinstance(r, RentalPropertyItem)
+        )
+        elapsed = time.perf_counter() - wall
+        result = _result(len(responses), items, elapsed, time.thread_time() - cpu)
+        if best is None or result["pages_per_sec"] > best["pages_per_sec"]:
+            best = result
+    return best
+
+
+def bench_pool(spider_name: str, responses: list, repeat: int, workers: int) -> dict:
+    pool = ParsePool(workers)
+    try:
+        # ワーカーの起動とモジュール読み込みを済ませておく
+        wait([pool.submit_future(spider_name, r) for r in responses[:workers]])
+        best = None
+        for _ in range(repeat):
+            wall, cpu = time.perf_counter(), time.thread_time()
+            futures = [pool.submit_future(spider_name, r) for r in responses]
+            items = 0
+            for future in futures:
+                rows, _, _ = future.result()
+                items += len([RentalPropertyItem(**row) for row in rows])
+            elapsed = time.perf_counter() - wall
+            result = _result(len(responses), items, elapsed, time.thread_time() - cpu)
+            if best is None or result["pages_per_sec"] > best["pages_per_sec"]:
+                best = result
+        return best
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spider", choices=list(PARSERS), action="append",
+                        help="対象スパイダー (複数指定可、既定は全て)")
+    parser.add_argument("--pages", type=int, default=100, help="ページ数 (アーカイブは上限)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workers", type=int, action="append", help="プールのプロセス数 (複数指定可、既定は1)"
+    )
+    parser.add_argument("--archive-dir", help="アーカイブ済みの実ページを使う")
+    args = parser.parse_args()
+
+    print(f"{'':8s} {'方式':10s} {'件数':>8s} {'pages/s':>9s} {'呼び出し側 CPU ms/page':>22s}")
+    for name in args.spider or list(PARSERS):
+        if args.archive_dir:
+            pages = archived_pages(name, args.archive_dir, limit=args.pages)
+        else:
+            pages = synthetic_pages(name, args.pages)
+        responses = [response for response, callback, _ in pages if callback == "parse_list"]
+        if not responses:
+            print(f"{name}: ページがありません (スキップ)")
+            continue
+        results = {"inline": bench_inline(name, responses, args.repeat)}
+        for workers in args.workers or [1]:
+            results[f"pool x{workers}"] = bench_pool(name, responses, args.repeat, workers)
+        for label, r in results.items():
+            print(f"{name:8s} {label:10s} {r['items']:8,d} {r['pages_per_sec']:9,.1f} "
+                  f"{r['caller_cpu_ms_per_page']:22.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""スパイダーのパース性能ベンチマーク (ネットワークなし)
+
+合成ページ (benchmarks.fixtures) またはアーカイブ済みの実ページを各スパイダーの
+コールバックに通し、パース単体とアイテムパイプライン全体 (重複除外→クレンジング→SQLite保存)
+のスループットを計測する。結果は benchmarks/results/ にJSONで保存する。
+
+    python -m benchmarks.bench_parsers --pages 50
+    python -m benchmarks.bench_parsers --spider suumo --archive-dir data/raw_archive
+    python -m benchmarks.bench_parsers --compare benchmarks/results/parsers_20261019_120000.json
+    python -m benchmarks.bench_parsers --no-fast-parsers   # 高速パーサなしの基準値
+
+計測項目:
+- pages/s, items/s (best of --repeat)
+- alloc_bytes_per_item: tracemalloc で計測したパース1回分のPythonヒープのピーク / 件数
+- peak_mem_mib: 同ピーク (lxml内部のCヒープは含まない), max_rss_mib: プロセス最大RSS
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import scrapy
+from scrapy.exceptions import DropItem
+from scrapy.settings import Settings
+from scrapy.spiderloader import SpiderLoader
+
+from benchmarks.fixtures import FIXTURES, archived_pages, synthetic_pages
+from src.scraper.incremental import SeenFilter
+from src.scraper.pipelines import DataCleansingPipeline, DuplicateFilterPipeline, SQLitePipeline
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _make_spider(spider_name: str, db_path: Path, overrides: dict | None = None):
+    settings = Settings()
+    settings.setmodule("src.scraper.settings")
+    settings.set("DATABASE_PATH", str(db_path))
+    for key, value in (overrides or {}).items():
+        settings.set(key, value)
+    spider = SpiderLoader.from_settings(settings).load(spider_name)(crawl_mode="full")
+    spider.settings = settings
+    spider.is_replay = True  # 掲載終了検出を行わない
+    return spider
+
+
+def _fresh(response):
+    """セレクタ (lxmlツリー) のキャッシュを持たない新しいレスポンスを返す"""
+    return response.replace()
+
+
+def _parse_only(spider, pages) -> int:
+    count = 0
+    for response, callback, cb_kwargs in pages:
+        for result in getattr(spider, callback)(_fresh(response), **cb_kwargs):
+            if not isinstance(result, scrapy.Request):
+                count += 1
+    return count
+
+
+def _parse_with_pipelines(spider, pages) -> int:
+    pipelines = [DuplicateFilterPipeline(), DataCleansingPipeline(), SQLitePipeline()]
+    for pipeline in pipelines:
+        if hasattr(pipeline, "open_spider"):
+            pipeline.open_spider(spider)
+    count = 0
+    try:
+        for response, callback, cb_kwargs in pages:
+            for result in getattr(spider, callback)(_fresh(response), **cb_kwargs):
+                if isinstance(result, scrapy.Request):
+                    continue
+                try:
+                    for pipeline in pipelines:
+                        result = pipeline.process_item(result, spider)
+                    count += 1
+                except DropItem:
+                    pass
+    finally:
+        for pipeline in pipelines:
+            if hasattr(pipeline, "close_spider"):
+                pipeline.close_spider(spider)
+    return count
+
+
+def _best_of(fn, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, items
+
+
+def bench_spider(spider_name: str, pages: list, repeat: int, overrides: dict | None = None) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        spider = _make_spider(spider_name, Path(tmp) / "bench.db", overrides)
+        spider._known_filter = SeenFilter()
+
+        parse_sec, items = _best_of(lambda: _parse_only(spider, pages), repeat)
+
+        tracemalloc.start()
+        _parse_only(spider, pages)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # DBへの書き込みは毎回新しいファイルで計測
+        def _pipeline_run():
+            db_path = Path(tmp) / f"bench_{time.perf_counter_ns()}.db"
+            spider.settings.set("DATABASE_PATH", str(db_path))
+            return _parse_with_pipelines(spider, pages)
+
+        pipeline_sec, stored = _best_of(_pipeline_run, repeat)
+
+    n_pages = len(pages)
+    return {
+        "pages": n_pages,
+        "items": items,
+        "stored_items": stored,
+        "page_bytes_avg": sum(len(r.body) for r, _, _ in pages) // max(n_pages, 1),
+        "parse": {
+            "seconds": round(parse_sec, 4),
+            "pages_per_sec": round(n_pages / parse_sec, 1),
+            "items_per_sec": round(items / parse_sec, 1),
+        },
+        "pipeline": {
+            "seconds": round(pipeline_sec, 4),
+            "pages_per_sec": round(n_pages / pipeline_sec, 1),
+            "items_per_sec": round(stored / pipeline_sec, 1),
+        },
+        "alloc_bytes_per_item": peak // max(items, 1),
+        "peak_mem_mib": round(peak / 1024 / 1024, 2),
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_comparison(current: dict, baseline_path: Path):
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\n比較: {baseline_path.name} ({baseline.get('git_revision')}) → 今回")
+    for name, result in current["spiders"].items():
+        base = baseline.get("spiders", {}).get(name)
+        if not base:
+            continue
+        for stage in ("parse", "pipeline"):
+            ratio = result[stage]["items_per_sec"] / base[stage]["items_per_sec"]
+            print(f"  {name:8s} {stage:8s} items/s {base[stage]['items_per_sec']:>10,.1f} → "
+                  f"{result[stage]['items_per_sec']:>10,.1f} ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spider", choices=list(FIXTURES), action="append",
+                        help="対象スパイダー (複数指定可、既定は全て)")
+    parser.add_argument("--pages", type=int, default=30, help="合成ページ数")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--archive-dir", help="アーカイブ済みの実ページを使う")
+    parser.add_argument("--output", help="結果JSONの保存先 (既定: benchmarks/results/)")
+    parser.add_argument("--compare", help="比較対象の結果JSON")
+    parser.add_argument("--no-fast-parsers", action="store_true",
+                        help="SUUMO/HOME'S の高速パーサを無効化 (parsel セレクタ実装で計測)")
+    args = parser.parse_args()
+    overrides = {"FAST_PARSERS_ENABLED": False} if args.no_fast_parsers else {}
+
+    results = {
+        "benchmark": "parsers",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "scrapy": scrapy.__version__,
+        "source": "archive" if args.archive_dir else "synthetic",
+        "settings": overrides,
+        "spiders": {},
+    }
+    for name in args.spider or list(FIXTURES):
+        if args.archive_dir:
+            pages = archived_pages(name, args.archive_dir, limit=args.pages)
+        else:
+            pages = synthetic_pages(name, args.pages)
+        if not pages:
+            print(f"{name}: ページがありません (スキップ)")
+            continue
+        r = bench_spider(name, pages, args.repeat, overrides)
+        results["spiders"][name] = r
+        print(
+            f"{name:8s} {r['pages']:4d}ページ {r['items']:6,d}件 | "
+            f"パース {r['parse']['pages_per_sec']:8,.1f} pages/s "
+            f"{r['parse']['items_per_sec']:9,.1f} items/s | "
+            f"パイプライン込み {r['pipeline']['items_per_sec']:9,.1f} items/s | "
+            f"{r['alloc_bytes_per_item']:,d} B/件, ピーク {r['peak_mem_mib']} MiB"
+        )
+
+    results["max_rss_mib"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"parsers_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"結果を保存: {output}")
+
+    if args.compare:
+        _print_comparison(results, Path(args.compare))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
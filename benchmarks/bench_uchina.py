@@ -0,0 +1,190 @@
+"""うちなーらいふ API スパイダーのクロール全体ベンチマーク (ローカルの模擬API)
+
+Laravel Paginator 形式を返す模擬検索APIをローカルに立て、従来の取得方法
+(perPage=50・同時接続1) と現在の UchinaSpider (件数の決定・少ない市町村のまとめ・
+市町村とページの一括投入・同時接続2) でクロールし、リクエスト数と所要時間を比較する。
+あわせて1ページ分の JSON デコード (response.text 経由の json.loads と loads_json) を比較する。
+
+    python -m benchmarks.bench_uchina
+    python -m benchmarks.bench_uchina --latency 0.5 --delay 0.2 --max-per-page 100
+
+模擬APIは --max-per-page を超える perPage を上限に切り詰めて返す (per_page に反映)。
+--reject-above を指定するとその件数を超える perPage には 422 を返す。
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.http import TextResponse
+from scrapy.settings import Settings
+
+from benchmarks.fixtures import uchina_records
+from benchmarks.standin import uchina_search
+from src.scraper.planner import requests_per_1000
+from src.scraper.spiders.uchina import (
+    DEFAULT_PER_PAGE,
+    OKINAWA_CITY_CODES,
+    UchinaSpider,
+    loads_json,
+)
+
+
+def _city_totals(seed: int) -> dict[str, int]:
+    """市町村ごとの掲載件数 (那覇市などの大きな市は数百件、離島は数件)"""
+    rng = random.Random(seed)
+    return {
+        code: rng.randint(150, 900) if code < "47300" else rng.randint(0, 60)
+        for code, _ in OKINAWA_CITY_CODES
+    }
+
+
+def _make_handler(
+    totals: dict[str, int], latency: float, max_per_page: int, reject_above: int | None
+):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            time.sleep(latency)
+            api_url = f"http://{self.headers['Host']}/api/search"
+            self._send(*uchina_search(query, totals, max_per_page, reject_above, api_url=api_url))
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class _BenchSpider(UchinaSpider):
+    name = "uchina_bench"
+    allowed_domains = []
+
+
+class _LegacySpider(_BenchSpider):
+    """従来の取得方法: 全市町村を perPage=50 で投入し、同時接続1"""
+
+    name = "uchina_legacy"
+    custom_settings = {**UchinaSpider.custom_settings, "CONCURRENT_REQUESTS": 1,
+                       "CONCURRENT_REQUESTS_PER_DOMAIN": 1}
+
+    def start_requests(self):
+        for city_code, city_name in OKINAWA_CITY_CODES:
+            yield self._api_request(city_code, city_name, 1, DEFAULT_PER_PAGE)
+
+
+def _settings(delay: float) -> Settings:
+    settings = Settings()
+    settings.setmodule("src.scraper.settings")
+    settings.setdict({
+        "ROBOTSTXT_OBEY": False,
+        "ITEM_PIPELINES": {},
+        "SPIDER_MIDDLEWARES": {},
+        "EXTENSIONS": {},
+        "ADAPTIVE_RATE_ENABLED": False,
+        "RAW_ARCHIVE_ENABLED": False,
+        "RANDOMIZE_DOWNLOAD_DELAY": False,
+        "LOG_LEVEL": "WARNING",
+    })
+    # スパイダーの custom_settings (DOWNLOAD_DELAY) より優先させる
+    settings.set("DOWNLOAD_DELAY", delay, priority="cmdline")
+    return settings
+
+
+def bench_crawl(api_url: str, delay: float) -> dict:
+    """従来の取得方法 → 現在のスパイダーの順に同じプロセスでクロール"""
+    process = CrawlerProcess(_settings(delay))
+    results = {}
+
+    def crawl(_, label: str, spider_cls):
+        spider_cls.api_url = api_url
+        crawler = process.create_crawler(spider_cls)
+        started = time.perf_counter()
+
+        def finished(_):
+            stats = crawler.stats.get_stats()
+            results[label] = {
+                "requests": stats.get("downloader/request_count", 0),
+                "items": stats.get("item_scraped_count", 0),
+                "per_page": stats.get("uchina/per_page", DEFAULT_PER_PAGE),
+                "seconds": round(time.perf_counter() - started, 2),
+            }
+
+        return process.crawl(crawler, crawl_mode="full").addCallback(finished)
+
+    d = crawl(None, "legacy", _LegacySpider)
+    d.addCallback(crawl, "current", _BenchSpider)
+    process.start()
+    return results
+
+
+def bench_decode(records: int, number: int) -> dict:
+    """1ページ (records件) のデコード時間 [ms]"""
+    payload = {"data": {"bukkens": {"data": uchina_records(random.Random(0), 1, records)}}}
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    response = TextResponse("https://www.e-uchina.net/api/search", body=body, encoding="utf-8")
+    timings = {}
+    for label, decode in (
+        ("json.loads(text)", lambda: json.loads(response.replace().text)),
+        ("loads_json(body)", lambda: loads_json(response.body)),
+    ):
+        started = time.perf_counter()
+        for _ in range(number):
+            decode()
+        timings[label] = round((time.perf_counter() - started) / number * 1000, 3)
+    return {"bytes": len(body), "ms": timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3, help="模擬APIの応答時間 [秒]")
+    parser.add_argument("--delay", type=float, default=0.1, help="DOWNLOAD_DELAY [秒]")
+    parser.add_argument("--max-per-page", type=int, default=200, help="模擬APIの perPage 上限")
+    parser.add_argument("--reject-above", type=int, help="この件数を超える perPage に 422 を返す")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--number", type=int, default=50, help="デコードの繰り返し回数")
+    args = parser.parse_args()
+
+    totals = _city_totals(args.seed)
+    # 前回の掲載数 (市町村のまとめ方の計画に使う)
+    _BenchSpider._area_counts = totals
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), _make_handler(totals, args.latency, args.max_per_page, args.reject_above)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_address[1]}/api/search"
+    try:
+        crawl = bench_crawl(api_url, args.delay)
+    finally:
+        server.shutdown()
+
+    print(f"模擬API: {len(totals)}市町村 {sum(totals.values()):,}件, 応答 {args.latency}秒, "
+          f"DOWNLOAD_DELAY {args.delay}秒, perPage 上限 {args.max_per_page}")
+    for label, r in crawl.items():
+        per_1000 = requests_per_1000(r["requests"], r["items"])
+        print(f"  {label:8s} perPage={r['per_page']:<4} {r['requests']:4d}リクエスト "
+              f"{r['items']:6,d}件 ({per_1000}/1000件) {r['seconds']:7.2f}秒")
+    legacy, current = crawl["legacy"], crawl["current"]
+    print(f"  削減: {legacy['requests'] - current['requests']}リクエスト, "
+          f"所要時間 {legacy['seconds'] / current['seconds']:.2f}x 短縮")
+
+    for records in (DEFAULT_PER_PAGE, args.max_per_page):
+        r = bench_decode(records, args.number)
+        timings = ", ".join(f"{k} {v}ms" for k, v in r["ms"].items())
+        print(f"デコード {records}件/ページ ({r['bytes'] / 1024:.0f} KiB): {timings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""パーサベンチマーク用の合成ページ
+
+各サイトの実ページと同じ構造・同程度のサイズ (ナビゲーション等の周辺要素を含む) の
+一覧ページを乱数シード固定で生成する。アーカイブ (src.scraper.archive) に
+実ページがあればそちらを使うこともできる。
+"""
+
+import json
+import random
+
+from scrapy import Request
+from scrapy.http import HtmlResponse, TextResponse
+
+from src.scraper.archive import RawPageArchive, response_from_archive
+
+MUNICIPALITIES = [
+    "那覇市", "浦添市", "宜野湾市", "沖縄市", "うるま市", "名護市", "豊見城市", "糸満市",
+]
+FLOOR_PLANS = ["1R", "1K", "1DK", "1LDK", "2DK", "2LDK", "3LDK"]
+STATIONS = ["安里", "おもろまち", "古島", "市立病院前", "儀保", "首里", "美栄橋", "県庁前"]
+STRUCTURES = ["鉄筋(RC造)", "鉄骨(S造)", "鉄筋(SRC造)", "木造"]
+EQUIPMENT = [
+    "エアコン", "オートロック", "宅配ボックス", "浴室乾燥機", "追焚機能", "独立洗面台",
+    "室内洗濯機置場", "インターネット", "光ファイバー", "バス・トイレ別", "フローリング",
+    "ペット相談",
+]
+
+
+UCHINA_API = "https://www.e-uchina.net/api/search?searchType=jukyo&city[0]=47201&perPage=50"
+
+
+def _html(url: str, html: str) -> HtmlResponse:
+    return HtmlResponse(url, body=html.encode("utf-8"), encoding="utf-8", request=Request(url))
+
+
+def chrome(rng: random.Random, body: str) -> str:
+    """ヘッダ・ナビ・フッタを付けて実ページ相当のサイズにする"""
+    nav = "".join(
+        f'<li><a href="/area/{i}/">{rng.choice(MUNICIPALITIES)}の賃貸 '
+        f"({rng.randint(10, 999)})</a></li>"
+        for i in range(250)
+    )
+    scripts = "".join(f"<script>var d{i} = {{k: {rng.random()}}};</script>" for i in range(40))
+    return (
+        '<!DOCTYPE html><html lang="ja"><head><meta charset="utf-8"><title>賃貸</title>'
+        f"{scripts}</head><body><header><ul class=\"nav\">{nav}</ul></header>"
+        f"<main>{body}</main><footer><ul>{nav}</ul></footer></body></html>"
+    )
+
+
+def suumo_listings(
+    rng: random.Random, page: int, buildings: int = 30, rooms: int = 3, id_prefix: str = ""
+) -> str:
+    """物件ブロック (div.cassetteitem) の並び。部屋は建物ごとに1〜rooms件"""
+    cassettes = []
+    for b in range(buildings):
+        rows = []
+        for r in range(rng.randint(1, rooms)):
+            rid = f"{id_prefix}{page:03d}{b:03d}{r:02d}{rng.randint(0, 9999):04d}"
+            rows.append(
+                '<tr class="js-cassette_link"><td><input type="checkbox"></td><td><img></td>'
+                f"<td>{rng.randint(1, 10)}階</td>"
+                f'<td><ul><li><span class="cassetteitem_price cassetteitem_price--rent">'
+                '<span class="cassetteitem_other-emphasis ui-text--bold">'
+                f"{rng.randint(35, 150) / 10}万円</span></span></li>"
+                '<li><span class="cassetteitem_price cassetteitem_price--administration">'
+                f"{rng.randint(0, 8) * 1000}円</span></li></ul></td>"
+                '<td><ul><li><span class="cassetteitem_price cassetteitem_price--deposit">'
+                f'{rng.choice(["-", "1万円", "6.5万円"])}</span></li>'
+                '<li><span class="cassetteitem_price cassetteitem_price--gratuity">'
+                f'{rng.choice(["-", "6.5万円"])}</span></li></ul></td>'
+                '<td><ul><li><span class="cassetteitem_madori">'
+                f"{rng.choice(FLOOR_PLANS)}</span></li>"
+                '<li><span class="cassetteitem_menseki">'
+                f"{rng.uniform(18, 90):.2f}m<sup>2</sup></span></li></ul></td>"
+                "<td></td><td></td>"
+                '<td><a class="js-cassette_link_href cassetteitem_other-linktext" '
+                f'href="/chintai/jnc_{rid}/?bc={rid}">詳細を見る</a></td></tr>'
+            )
+        cassettes.append(
+            '<div class="cassetteitem"><div class="cassetteitem-detail">'
+            '<div class="cassetteitem_content-label">'
+            '<span class="ui-pct ui-pct--util1">賃貸マンション</span></div>'
+            f'<div class="cassetteitem_content-title">{rng.choice(STATIONS)}ハイツ{b}</div>'
+            '<ul class="cassetteitem_detail">'
+            '<li class="cassetteitem_detail-col1">'
+            f"沖縄県{rng.choice(MUNICIPALITIES)}安里{rng.randint(1, 3)}</li>"
+            '<li class="cassetteitem_detail-col2"><div class="cassetteitem_detail-text">'
+            f"沖縄都市モノレール/{rng.choice(STATIONS)}駅 歩{rng.randint(1, 20)}分</div>"
+            '<div class="cassetteitem_detail-text">'
+            f"沖縄都市モノレール/{rng.choice(STATIONS)}駅 歩{rng.randint(1, 30)}分</div></li>"
+            '<li class="cassetteitem_detail-col3">'
+            f"<div>築{rng.randint(0, 40)}年</div><div>{rng.randint(2, 12)}階建</div></li>"
+            '</ul></div><div class="cassetteitem-item"><table class="cassetteitem_other">'
+            "<thead><tr><th>階</th></tr></thead>"
+            f"<tbody>{''.join(rows)}</tbody></table></div></div>"
+        )
+    return "".join(cassettes)
+
+
+def suumo_page(rng: random.Random, page: int, buildings: int = 30, rooms: int = 3) -> HtmlResponse:
+    body = (
+        f"{suumo_listings(rng, page, buildings, rooms)}"
+        '<div class="pagination_set"><p class="pagination-parts">'
+        f'<a href="/chintai/okinawa/sc_naha/?page={page + 1}">次へ</a></p></div>'
+    )
+    url = f"https://suumo.jp/chintai/okinawa/sc_naha/?page={page}"
+    return _html(url, chrome(rng, body))
+
+
+def homes_listings(
+    rng: random.Random, page: int, buildings: int = 20, rooms: int = 3, id_prefix: str = ""
+) -> str:
+    """建物カード (div.mod-mergeBuilding--rent--photo) の並び。部屋は建物ごとに1〜rooms件"""
+    cards = []
+    for b in range(buildings):
+        rows = []
+        for r in range(rng.randint(1, rooms)):
+            rid = f"{id_prefix}{page:03d}{b:03d}{r:02d}{rng.randint(0, 9999):04d}"
+            keywords = "".join(
+                f'<li class="relatedKeyword"><span>{kw}</span></li>'
+                for kw in rng.sample(EQUIPMENT, 5)
+            )
+            rows.append(
+                f'<tr class="prg-room prg-roomInfo" data-href="/chintai/room/{rid}/">'
+                f'<td class="floar"><ul><li class="roomKaisuu">{rng.randint(1, 10)}階</li>'
+                f'<li class="roomNumber">{r + 1}01</li></ul></td>'
+                f'<td class="price"><span id="label-{rid}">'
+                f'<span class="num">{rng.randint(35, 150) / 10}</span>万円'
+                f" / {rng.randint(1, 8) * 1000:,}円</span><br>"
+                f"{rng.choice(['無', '1ヶ月'])}/{rng.choice(['無', '1ヶ月'])}/-/-</td>"
+                f'<td class="layout">{rng.choice(FLOOR_PLANS)}<br>{rng.uniform(18, 90):.2f}m²</td>'
+                '<td class="detail">'
+                f'<a class="prg-detailAnchor" href="/chintai/room/{rid}/">詳細</a></td></tr>'
+                f'<tr class="prg-relatedKeywordsRow"><td colspan="4"><ul>{keywords}</ul></td></tr>'
+            )
+        cards.append(
+            '<div class="mod-mergeBuilding--rent--photo rMansion">'
+            '<span class="bType">賃貸マンション</span>'
+            f'<span class="bukkenName">{rng.choice(STATIONS)}レジデンス{b}</span>'
+            '<div class="bukkenSpec"><table>'
+            f"<tr><th>所在地</th><td>沖縄県{rng.choice(MUNICIPALITIES)}"
+            f"泉崎{rng.randint(1, 3)}</td></tr>"
+            '<tr><th>交通</th><td><span class="prg-stationText">'
+            f"沖縄都市モノレール/{rng.choice(STATIONS)} 徒歩{rng.randint(1, 20)}分</span></td></tr>"
+            f"<tr><th>築年数/階数</th><td>{rng.randint(0, 40)}年 / "
+            f"{rng.randint(2, 12)}階建</td></tr>"
+            "</table></div>"
+            '<table class="unitSummary"><tbody class="prg-roomList">'
+            f'{"".join(rows)}</tbody></table></div>'
+        )
+    return "".join(cards)
+
+
+def homes_page(rng: random.Random, page: int, buildings: int = 20, rooms: int = 3) -> HtmlResponse:
+    body = (
+        f"{homes_listings(rng, page, buildings, rooms)}"
+        '<div class="mod-listPaging"><ul><li class="nextPage">'
+        f'<a href="/chintai/okinawa/list/?page={page + 1}">次へ</a></li></ul></div>'
+    )
+    url = f"https://www.homes.co.jp/chintai/okinawa/list/?page={page}"
+    return _html(url, chrome(rng, body))
+
+
+def goohome_listings(rng: random.Random, page: int, cards: int = 20, id_prefix: str = "") -> str:
+    """物件カード (section.insp_caset) の並び"""
+    sections = []
+    for c in range(cards):
+        pno = f"{id_prefix}{page:03d}-{c:02d}{rng.randint(0, 9999):04d}"
+        sections.append(
+            '<section class="insp_caset">'
+            f'<div class="inside_box" pno="{pno}">'
+            '<div class="prop-label-box"><span class="prop-label">賃貸マンション</span>'
+            '<span class="prop-label">新着</span></div>'
+            f'<div class="imgbox"><a href="/chintai/mansion/detail/{pno}/">'
+            f'<img src="/img/{pno}.jpg"></a></div>'
+            f'<p><span class="price">{rng.randint(35, 150) / 10}</span>'
+            '<span class="price_name">万円</span></p>'
+            f'<span class="price_kanri">管理費等:{rng.randint(0, 8) * 1000:,}円</span>'
+            f'<span class="price_sikirei">敷{rng.randint(0, 2)}ヶ月/'
+            f"礼{rng.randint(0, 1)}ヶ月</span>"
+            '<span class="price_hosyou">保証金:-</span>'
+            f'<span class="floor_plan">{rng.choice(FLOOR_PLANS)}</span>'
+            f'<span class="floor_plan_area">約{rng.randint(18, 90)}㎡</span>'
+            '<p class="address"><span class="text">'
+            f"{rng.choice(MUNICIPALITIES)}<br>壺川{rng.randint(1, 3)}丁目</span></p>"
+            f'<p class="parking"><span class="text">1台/{rng.randint(3, 12) * 1000:,}円</span></p>'
+            f'<div class="other_info"><ul><li>{rng.choice(STRUCTURES)}</li>'
+            f"<li>築{rng.randint(1985, 2026)}年(-)</li>"
+            f"<li>{rng.randint(1, 5)}階/{rng.randint(5, 10)}階建</li></ul></div>"
+            '<div class="comment web_pr">'
+            f"<p>{rng.choice(STATIONS)}駅徒歩圏内、日当たり良好の{rng.choice(FLOOR_PLANS)}です。</p></div>"
+            "</div></section>"
+        )
+    return "".join(sections)
+
+
+def goohome_page(rng: random.Random, page: int, cards: int = 20) -> HtmlResponse:
+    body = (
+        f"{goohome_listings(rng, page, cards)}"
+        f'<div class="insp_page-n"><ul><li><a href="?page={page + 1}-20">{page + 1}</a></li>'
+        "</ul></div>"
+    )
+    url = f"https://goohome.jp/chintai/mansion/naha/?page={page}-20"
+    return _html(url, chrome(rng, body))
+
+
+def uchina_records(rng: random.Random, page: int, records: int = 50) -> list[dict]:
+    """検索APIの物件レコード (data.bukkens.data[])"""
+    data = []
+    for r in range(records):
+        hid = f"U{page:03d}{r:03d}{rng.randint(0, 9999):04d}"
+        data.append({
+            "id": page * 1000 + r,
+            "bukken_hid": hid,
+            "permalink": f"https://www.e-uchina.net/bukken/jukyo/{hid}",
+            "disp_name": f"{rng.choice(STATIONS)}アパート{r}",
+            "address_disp": f"沖縄県{rng.choice(MUNICIPALITIES)}字{rng.randint(1, 999)}",
+            "price_disp": f"{rng.randint(35, 150) / 10}万円",
+            "price_kyoeki_disp": f"{rng.randint(0, 8) * 1000:,}円",
+            "price_shiki_disp": rng.choice(["ナシ", "1ヶ月"]),
+            "price_rei_disp": rng.choice(["ナシ", "1ヶ月"]),
+            "price_hosho_disp": "ナシ",
+            "madori_space_all_disp": rng.choice(FLOOR_PLANS),
+            "man_senyu_metr": f"{rng.uniform(18, 90):.2f}",
+            "kozo_type_disp": "RC造",
+            "bukken_type_disp": "アパート",
+            "kenchiku_date": f"{rng.randint(1985, 2026)}-0{rng.randint(1, 9)}-01",
+            "floor_number": str(rng.randint(1, 10)),
+            "building_house_kaisu_chijo": str(rng.randint(2, 12)),
+            "transport_info": f"{rng.choice(STATIONS)}バス停 徒歩{rng.randint(1, 15)}分",
+            "short_parking_disp": "有",
+            "parking_price": str(rng.randint(3, 12) * 1000),
+            "map_ido": f"26.{rng.randint(100000, 999999)}",
+            "map_keido": f"127.{rng.randint(600000, 799999)}",
+            "options": ",".join(rng.sample(EQUIPMENT, 6)),
+            "description": "閑静な住宅街。" * 20,
+        })
+    return data
+
+
+def uchina_page(rng: random.Random, page: int, records: int = 50) -> TextResponse:
+    data = uchina_records(rng, page, records)
+    payload = {
+        "data": {
+            "bukkens": {
+                "current_page": page,
+                "data": data,
+                "next_page_url": f"{UCHINA_API}&page={page + 1}",
+            }
+        }
+    }
+    url = f"{UCHINA_API}&page={page}"
+    return TextResponse(
+        url, body=json.dumps(payload, ensure_ascii=False).encode("utf-8"), encoding="utf-8",
+        headers={"Content-Type": "application/json"}, request=Request(url),
+    )
+
+
+# スパイダー名 → (ページ生成関数, コールバック名, cb_kwargs)
+FIXTURES = {
+    "goohome": (goohome_page, "parse_list", {}),
+    "uchina": (uchina_page, "parse_api", {"city_code": "47201", "city_name": "那覇市"}),
+    "suumo": (suumo_page, "parse_list", {}),
+    "homes": (homes_page, "parse_list", {}),
+}
+
+
+def synthetic_pages(spider_name: str, pages: int, seed: int = 42) -> list[tuple]:
+    """[(response, callback名, cb_kwargs), ...] を返す"""
+    build, callback, cb_kwargs = FIXTURES[spider_name]
+    rng = random.Random(seed)
+    return [(build(rng, page), callback, cb_kwargs) for page in range(1, pages + 1)]
+
+
+def archived_pages(spider_name: str, archive_dir, limit: int | None = None) -> list[tuple]:
+    """アーカイブ済みの実ページを返す"""
+    archive = RawPageArchive(archive_dir)
+    try:
+        result = []
+        for entry in archive.iter_pages(spider_name, limit=limit):
+            body = archive.get_body(entry["body_sha256"], entry["codec"])
+            result.append((
+                response_from_archive(entry, body, request=Request(entry["url"])),
+                entry["callback"] or "parse",
+                json.loads(entry["cb_kwargs"] or "{}"),
+            ))
+        return result
+    finally:
+        archive.close()
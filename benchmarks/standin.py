@@ -0,0 +1,427 @@
+"""負荷試験用のスタンドインサーバー (実サイトの代わりにローカルで一覧ページを返す)
+
+グーホーム・SUUMO・HOME'S の一覧HTML (benchmarks.fixtures と同じ構造) と
+うちなーらいふの検索API (Laravel Paginator 形式のJSON) を、サイトごとの掲載件数・
+応答時間・エラー率を指定して返す。件数は建物・物件ブロック単位 (SUUMO / HOME'S は
+1ブロックに1〜3部屋) で、エリア (市町村) ごとに偏りをつけて配分する。
+
+リクエストは /{実サイトのホスト名}{パス}?{クエリ} で受ける。スパイダーからは
+StandInDownloadHandler が実サイトのURLをこの形に書き換えて送るため、スパイダー・
+ミドルウェア・パイプラインはそのまま (レスポンスのURLも実サイトのまま) 動く。
+
+    python -m benchmarks.standin --port 8800 --listings 3000 --latency 0.1 \\
+        --error-rate 0.02
+    python -m scrapy crawl suumo -s STANDIN_URL=http://127.0.0.1:8800 \\
+        -s 'DOWNLOAD_HANDLERS={"http": "benchmarks.standin.StandInDownloadHandler",
+                               "https": "benchmarks.standin.StandInDownloadHandler"}'
+
+クロール全体の計測は benchmarks.bench_crawl を使う。スパイダー・サイト構造を変えたら
+python -m benchmarks.standin --check でページ送りが掲載件数どおりに終わるかを確かめる。
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+from w3lib.url import add_or_replace_parameter
+
+from benchmarks.fixtures import (
+    chrome,
+    goohome_listings,
+    homes_listings,
+    suumo_listings,
+    uchina_records,
+)
+from src.scraper.spiders.goohome import GOOHOME_AREAS
+from src.scraper.spiders.suumo import OKINAWA_AREA_CODES
+from src.scraper.spiders.uchina import API_URL, DEFAULT_PER_PAGE, OKINAWA_CITY_CODES
+
+# 実サイトのホスト名 → サイト名
+HOSTS = {
+    "goohome.jp": "goohome",
+    "suumo.jp": "suumo",
+    "www.homes.co.jp": "homes",
+    "www.e-uchina.net": "uchina",
+}
+# サイト名 → エリア (goohome / SUUMO はURLのエリア、HOME'S は県全体、uchina は市町村コード)
+SITE_AREAS = {
+    "goohome": list(GOOHOME_AREAS),
+    "suumo": list(OKINAWA_AREA_CODES),
+    "homes": ["okinawa"],
+    "uchina": [code for code, _ in OKINAWA_CITY_CODES],
+}
+HOMES_PAGE_SIZE = 20
+ROBOTS_TXT = b"User-agent: *\nDisallow:\n"
+
+
+def area_totals(listings: int, areas: list[str], seed: int) -> dict[str, int]:
+    """listings 件をエリアに配分 (並びの先頭の大きな市ほど多く、離島は少ない)"""
+    rng = random.Random(seed)
+    weights = [rng.uniform(0.5, 1.5) / (i + 1) ** 0.7 for i in range(len(areas))]
+    scale = listings / sum(weights)
+    totals = {area: int(w * scale) for area, w in zip(areas, weights)}
+    totals[areas[0]] += listings - sum(totals.values())
+    return totals
+
+
+@dataclass
+class StandInConfig:
+    """サイトごとの掲載件数と、応答時間・エラーの注入"""
+
+    listings: dict[str, int]
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    # uchina: perPage の上限 (超えた分は切り詰め)、これを超える perPage には 422
+    max_per_page: int = 200
+    reject_above: int | None = None
+    seed: int = 42
+    totals: dict[str, dict[str, int]] = field(init=False)
+    # サーバー側の集計 (サイト名 → 件数)
+    requests: Counter = field(default_factory=Counter, init=False)
+    errors: Counter = field(default_factory=Counter, init=False)
+
+    def __post_init__(self):
+        self.totals = {
+            site: area_totals(self.listings.get(site, 0), areas, self.seed)
+            for site, areas in SITE_AREAS.items()
+        }
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> tuple[float, bool]:
+        """(応答までの秒数, エラーを返すか)"""
+        with self._lock:
+            delay = self.latency
+            if self.jitter:
+                delay += self._rng.uniform(0, self.jitter)
+            return delay, self._rng.random() < self.error_rate
+
+    def page_rng(self, *key) -> random.Random:
+        return random.Random("-".join(str(k) for k in (self.seed, *key)))
+
+
+def _page_count(total: int, size: int) -> int:
+    return max(1, math.ceil(total / size))
+
+
+def _on_page(total: int, size: int, page: int) -> int:
+    return max(0, min(size, total - (page - 1) * size))
+
+
+def _html(rng: random.Random, body: str) -> tuple[int, str, bytes]:
+    return 200, "text/html; charset=utf-8", chrome(rng, body).encode("utf-8")
+
+
+def render_suumo(config: StandInConfig, path: str, query: dict) -> tuple[int, str, bytes]:
+    """/chintai/okinawa/sc_{エリア}/?pc={件数}&page={N}"""
+    m = re.search(r"/sc_(\w+)/", path)
+    area = m.group(1) if m else ""
+    size = int(query.get("pc", [30])[0])
+    page = int(query.get("page", [1])[0])
+    total = config.totals["suumo"].get(area, 0)
+    rng = config.page_rng("suumo", area, page)
+    body = suumo_listings(rng, page, _on_page(total, size, page), id_prefix=area)
+    if page < _page_count(total, size):
+        href = add_or_replace_parameter(f"{path}?{_query_string(query)}", "page", str(page + 1))
+        body += (
+            '<div class="pagination_set"><p class="pagination-parts">'
+            f'<a href="{href}">次へ</a></p></div>'
+        )
+    return _html(rng, body)
+
+
+def render_homes(config: StandInConfig, path: str, query: dict) -> tuple[int, str, bytes]:
+    """/chintai/okinawa/list/?page={N} (ページ番号リンクは前後数ページと最終ページ)"""
+    page = int(query.get("page", [1])[0])
+    total = config.totals["homes"]["okinawa"]
+    last_page = _page_count(total, HOMES_PAGE_SIZE)
+    rng = config.page_rng("homes", page)
+    body = homes_listings(rng, page, _on_page(total, HOMES_PAGE_SIZE, page), id_prefix="h")
+    around = range(max(1, page - 2), min(last_page, page + 4) + 1)
+    numbers = sorted(set(around) | {last_page})
+    links = "".join(f'<li><a href="{path}?page={n}">{n}</a></li>' for n in numbers if n != page)
+    if page < last_page:
+        links += f'<li class="nextPage"><a href="{path}?page={page + 1}">次へ</a></li>'
+    body += f'<div class="mod-listPaging"><ul>{links}</ul></div>'
+    return _html(rng, body)
+
+
+def render_goohome(config: StandInConfig, path: str, query: dict) -> tuple[int, str, bytes]:
+    """/chintai/mansion/{エリア}/?page={N}-{件数}"""
+    m = re.search(r"/chintai/\w+/(\w+)/", path)
+    area = m.group(1) if m else ""
+    page, size = 1, 20
+    if m_page := re.match(r"(\d+)-(\d+)", query.get("page", [""])[0]):
+        page, size = int(m_page.group(1)), int(m_page.group(2))
+    total = config.totals["goohome"].get(area, 0)
+    last_page = _page_count(total, size)
+    rng = config.page_rng("goohome", area, page)
+    body = f'<div class="insp_result-num">該当物件 <span>{total:,}</span>件</div>'
+    body += goohome_listings(rng, page, _on_page(total, size, page), id_prefix=area)
+    links = "".join(
+        f'<li><a href="{path}?page={n}-{size}">{n}</a></li>'
+        for n in range(max(1, page - 2), min(last_page, page + 4) + 1) if n != page
+    )
+    body += f'<div class="insp_page-n"><ul>{links}</ul></div>'
+    return _html(rng, body)
+
+
+def uchina_search(
+    query: dict,
+    totals: dict[str, int],
+    max_per_page: int,
+    reject_above: int | None = None,
+    api_url: str = API_URL,
+    rng_key: str = "",
+) -> tuple[int, dict]:
+    """うちなーらいふ検索APIの応答 (ステータス, JSON)。city[0], city[1], ... の合計件数を返す"""
+    per_page = int(query.get("perPage", [DEFAULT_PER_PAGE])[0])
+    page = int(query.get("page", [1])[0])
+    city = ",".join(v[0] for k, v in sorted(query.items()) if k.startswith("city["))
+    if reject_above and per_page > reject_above:
+        return 422, {"message": "perPage is invalid"}
+    per_page = min(per_page, max_per_page)
+    total = sum(totals.get(code, 0) for code in city.split(","))
+    last_page = _page_count(total, per_page)
+    rng = random.Random(f"{rng_key}{city}-{page}")
+    records = uchina_records(rng, page, _on_page(total, per_page, page))
+    for i, rec in enumerate(records):
+        rec["bukken_hid"] = f"{city}-{(page - 1) * per_page + i}"
+    cities = "&".join(f"city[{i}]={code}" for i, code in enumerate(city.split(",")))
+    base = f"{api_url}?searchType=jukyo&{cities}&perPage={per_page}"
+    return 200, {"data": {"bukkens": {
+        "current_page": page,
+        "per_page": per_page,
+        "last_page": last_page,
+        "total": total,
+        "data": records,
+        "next_page_url": f"{base}&page={page + 1}" if page < last_page else None,
+    }}}
+
+
+def render_uchina(config: StandInConfig, path: str, query: dict) -> tuple[int, str, bytes]:
+    status, payload = uchina_search(
+        query,
+        config.totals["uchina"],
+        config.max_per_page,
+        config.reject_above,
+        rng_key=f"{config.seed}-",
+    )
+    return status, "application/json", json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+RENDERERS = {
+    "goohome": render_goohome,
+    "suumo": render_suumo,
+    "homes": render_homes,
+    "uchina": render_uchina,
+}
+
+
+def _query_string(query: dict) -> str:
+    return "&".join(f"{k}={v}" for k, values in query.items() for v in values)
+
+
+def make_handler(config: StandInConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            host, _, rest = self.path.lstrip("/").partition("/")
+            url = urlparse(f"/{rest}")
+            site = HOSTS.get(host)
+            if url.path == "/robots.txt":
+                self._send(200, "text/plain", ROBOTS_TXT)
+                return
+            if site is None:
+                self._send(404, "text/plain", b"unknown host")
+                return
+            delay, fail = config.draw()
+            time.sleep(delay)
+            config.requests[site] += 1
+            if fail:
+                config.errors[site] += 1
+                self._send(config.error_status, "text/plain", b"injected error")
+                return
+            self._send(*RENDERERS[site](config, url.path, parse_qs(url.query)))
+
+        def _send(self, status: int, content_type: str, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_server(
+    config: StandInConfig, host: str = "127.0.0.1", port: int = 0
+) -> tuple[ThreadingHTTPServer, str]:
+    """バックグラウンドのスレッドで起動し (サーバー, ベースURL) を返す"""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+class StandInDownloadHandler(HTTP11DownloadHandler):
+    """http / https のリクエストを STANDIN_URL のスタンドインサーバーへ送る
+
+    レスポンスのURLは元のまま。
+    """
+
+    def __init__(self, crawler):
+        super().__init__(crawler)
+        self.base_url = crawler.settings.get("STANDIN_URL").rstrip("/")
+
+    async def download_request(self, request):
+        url = urlparse(request.url)
+        target = f"{self.base_url}/{url.netloc}{url.path or '/'}"
+        if url.query:
+            target += f"?{url.query}"
+        response = await super().download_request(request.replace(url=target))
+        return response.replace(url=request.url)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """サーバーの設定 (bench_crawl と共通)"""
+    parser.add_argument(
+        "--listings", type=int, default=2000, help="サイトごとの掲載件数 (建物・物件ブロック数)"
+    )
+    parser.add_argument("--site-listings", action="append", default=[], metavar="SITE=N",
+                        help="サイト別の掲載件数 (例: suumo=5000)")
+    parser.add_argument("--latency", type=float, default=0.05, help="応答時間 [秒]")
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="応答時間に加える 0〜jitter 秒のばらつき"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="エラーを返す割合 (0〜1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--max-per-page", type=int, default=200, help="uchina API の perPage 上限")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def config_from_args(args) -> StandInConfig:
+    listings = {site: args.listings for site in SITE_AREAS}
+    for spec in args.site_listings:
+        site, _, n = spec.partition("=")
+        if site not in SITE_AREAS:
+            raise SystemExit(f"不明なサイト: {site} ({', '.join(SITE_AREAS)})")
+        listings[site] = int(n)
+    return StandInConfig(
+        listings=listings, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        error_status=args.error_status, max_per_page=args.max_per_page, seed=args.seed,
+    )
+
+
+def _crawl_area(spider, render, config: StandInConfig, url: str) -> tuple[int, int]:
+    """1エリアの一覧をスパイダーのページ送りに従って最後まで取得する
+
+    (物件ブロック数, ページ数) を返す。
+    """
+    from scrapy import Request
+    from scrapy.http import HtmlResponse
+
+    blocks, seen, queue = 0, set(), [Request(url)]
+    while queue:
+        request = queue.pop(0)
+        if request.url in seen:
+            continue
+        seen.add(request.url)
+        parsed = urlparse(request.url)
+        _, _, body = render(config, parsed.path, parse_qs(parsed.query))
+        response = HtmlResponse(request.url, body=body, encoding="utf-8", request=request)
+        blocks += len(response.css("div.cassetteitem, section.insp_caset"))
+        queue += [r for r in spider.parse_list(response) if isinstance(r, Request)]
+    return blocks, len(seen)
+
+
+def self_check() -> list[str]:
+    """スパイダーが設定どおりの件数・ページ数までページ送りできるかを確かめ、不一致を返す"""
+    from src.scraper.spiders.goohome import GoohomeSpider
+    from src.scraper.spiders.suumo import SuumoSpider
+
+    problems = []
+    totals = area_totals(1000, ["naha", "urasoe", "ishigaki"], seed=1)
+    if sum(totals.values()) != 1000 or totals["naha"] <= totals["ishigaki"]:
+        problems.append(f"エリア配分: {totals}")
+
+    config = StandInConfig(listings={"suumo": 500, "goohome": 500})
+    for spider, render, url, size in (
+        (SuumoSpider(crawl_mode="full"), render_suumo,
+         "https://suumo.jp/chintai/okinawa/sc_naha/?pc=50", 50),
+        (GoohomeSpider(crawl_mode="full"), render_goohome,
+         "https://goohome.jp/chintai/mansion/naha/?page=1-20", 20),
+    ):
+        total = config.totals[spider.name]["naha"]
+        blocks, pages = _crawl_area(spider, render, config, url)
+        if (blocks, pages) != (total, -(-total // size)):
+            problems.append(f"{spider.name}: {blocks}件/{pages}ページ (期待 {total}件)")
+
+    config = StandInConfig(listings={"suumo": 10}, error_rate=1.0)
+    server, url = start_server(config)
+    try:
+        statuses = []
+        for path in ("/suumo.jp/chintai/okinawa/sc_naha/", "/suumo.jp/robots.txt"):
+            try:
+                with urllib.request.urlopen(f"{url}{path}", timeout=5) as r:
+                    statuses.append(r.status)
+            except urllib.error.HTTPError as e:
+                statuses.append(e.code)
+    finally:
+        server.shutdown()
+    if statuses != [503, 200] or config.errors["suumo"] != 1:
+        problems.append(f"エラー注入: {statuses} (エラー {config.errors['suumo']}件)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--check", action="store_true",
+                        help="スパイダーのページ送り・エラー注入を確かめて終了")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.check:
+        problems = self_check()
+        for problem in problems:
+            print(f"NG {problem}")
+        if problems:
+            raise SystemExit(1)
+        print("OK")
+        return
+
+    config = config_from_args(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    print(f"http://{args.host}:{args.port} で待ち受け中: "
+          + ", ".join(f"{site} {n:,}件" for site, n in config.listings.items()))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("リクエスト: " + ", ".join(f"{site} {n} (エラー {config.errors[site]})"
+                                     for site, n in config.requests.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+#!/bin/bash
+# DBオンラインバックアップスクリプト
+set -euo pipefail
+
+APP_DIR="$(cd "$(dirname "$0")/.." && pwd)"
+cd "$APP_DIR"
+
+source .venv/bin/activate 2>/dev/null || true
+
+echo "[$(date)] Starting database backup..."
+python -m src.database.backup
+echo "[$(date)] Backup complete."
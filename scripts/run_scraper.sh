@@ -12,25 +12,46 @@ LOG_DIR="$APP_DIR/logs"
 mkdir -p "$LOG_DIR"
 DATE=$(date +%Y%m%d_%H%M%S)
 
+# クロールモード (未指定なら scraping_targets.yaml の曜日設定に従う)
+MODE="${2:-}"
+RUNNER_ARGS=(--summary-json "$LOG_DIR/scrape_summary_${DATE}.json")
+if [ -n "$MODE" ]; then
+    RUNNER_ARGS+=(--mode "$MODE")
+fi
+if [ "$SPIDER" != "all" ]; then
+    RUNNER_ARGS+=(--spider "$SPIDER")
+fi
+
+# 有効な全サイトを1プロセスで並行クロール (サイトごとの delay は維持)
+echo "[$(date)] Starting crawl: $SPIDER"
+python -m src.scraper.runner "${RUNNER_ARGS[@]}" 2>&1 | tee "$LOG_DIR/scrape_${SPIDER}_${DATE}.log" \
+    || echo "[$(date)] WARNING: 正常終了しなかったスパイダーがあります (サマリ参照)"
+echo "[$(date)] Finished crawl: $SPIDER"
+
+# 新規・変更物件の詳細ページ補完 (件数上限は scraping_targets.yaml の detail_enrichment)
 if [ "$SPIDER" = "all" ]; then
-    for name in goohome uchina suumo homes; do
-        echo "[$(date)] Starting spider: $name"
-        python -m scrapy crawl "$name" 2>&1 | tee "$LOG_DIR/scrape_${name}_${DATE}.log"
-        echo "[$(date)] Finished spider: $name"
-        sleep 60  # サイト間のインターバル
-    done
-else
-    echo "[$(date)] Starting spider: $SPIDER"
-    python -m scrapy crawl "$SPIDER" 2>&1 | tee "$LOG_DIR/scrape_${SPIDER}_${DATE}.log"
-    echo "[$(date)] Finished spider: $SPIDER"
+    echo "[$(date)] Starting detail enrichment..."
+    python -m scrapy crawl detail 2>&1 | tee "$LOG_DIR/scrape_detail_${DATE}.log" \
+        || echo "[$(date)] WARNING: 詳細ページ補完が正常終了しませんでした"
 fi
 
-# スクレイピング後にモデル再学習
-echo "[$(date)] Starting model training..."
-python -m src.pricing.training 2>&1 | tee "$LOG_DIR/training_${DATE}.log"
+# 推定賃料の更新: 全件クロールの日はモデル再学習 + 全件再推定、それ以外は
+# 変更ログ (property_changes) から前回以降に追加・変更された物件のみ既存モデルで再推定
+TRAIN_MODE="${MODE:-$(python -c 'from src.scraper.incremental import resolve_crawl_mode; print(resolve_crawl_mode())')}"
+if [ "$TRAIN_MODE" = "full" ]; then
+    echo "[$(date)] Starting model training..."
+    python -m src.pricing.training 2>&1 | tee "$LOG_DIR/training_${DATE}.log"
+else
+    echo "[$(date)] Updating estimations of changed properties..."
+    python -m src.pricing.training --incremental 2>&1 | tee "$LOG_DIR/training_${DATE}.log"
+fi
 
 # 通知チェック
 echo "[$(date)] Checking notifications..."
 python -m src.notification.line_notify 2>&1 | tee "$LOG_DIR/notify_${DATE}.log"
 
+# DBバックアップ
+echo "[$(date)] Backing up database..."
+python -m src.database.backup 2>&1 | tee "$LOG_DIR/backup_${DATE}.log"
+
 echo "[$(date)] All done."
@@ -0,0 +1,180 @@
+"""SQLite オンラインバックアップ
+
+sqlite3.Connection.backup で少数ページずつコピーし、ステップ間にスリープを挟むことで
+Web UI やスクレイパーの書き込みを止めずにスナップショットを取得する。
+取得したスナップショットは integrity_check で検証後、gzip圧縮して世代管理する。
+"""
+
+import gzip
+import hashlib
+import logging
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGES_PER_STEP = 256
+DEFAULT_STEP_SLEEP = 0.05
+DEFAULT_KEEP = 7
+SNAPSHOT_SUFFIX = ".db.gz"
+
+
+def backup_database(
+    db_path: str | Path,
+    backup_dir: str | Path,
+    pages_per_step: int = DEFAULT_PAGES_PER_STEP,
+    step_sleep: float = DEFAULT_STEP_SLEEP,
+    keep: int = DEFAULT_KEEP,
+) -> dict:
+    """稼働中DBのスナップショットを取得し、検証・圧縮・ローテーションする"""
+    db_path = Path(db_path)
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+
+    if not db_path.exists():
+        raise FileNotFoundError(f"バックアップ対象DBが見つかりません: {db_path}")
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    partial_path = backup_dir / f"{db_path.stem}_{timestamp}.db.partial"
+    snapshot_path = backup_dir / f"{db_path.stem}_{timestamp}{SNAPSHOT_SUFFIX}"
+
+    progress = {"steps": 0, "restarts": 0, "last_remaining": None}
+
+    def _on_progress(status, remaining, total):
+        progress["steps"] += 1
+        # 他接続の書き込みでコピーが先頭からやり直しになった場合を検出
+        if progress["last_remaining"] is not None and remaining > progress["last_remaining"]:
+            progress["restarts"] += 1
+        progress["last_remaining"] = remaining
+        # ステップ間はロックを保持しないため、ここで待つと書き込み側が進める
+        if remaining and step_sleep > 0:
+            time.sleep(step_sleep)
+
+    started = time.monotonic()
+    try:
+        src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        dst = sqlite3.connect(str(partial_path))
+        try:
+            src.execute("PRAGMA busy_timeout=5000")
+            src.backup(dst, pages=pages_per_step, progress=_on_progress)
+            page_count = dst.execute("PRAGMA page_count").fetchone()[0]
+            page_size = dst.execute("PRAGMA page_size").fetchone()[0]
+            # スナップショットは単体ファイルで扱えるようジャーナルモードを戻す
+            dst.execute("PRAGMA journal_mode=DELETE")
+            integrity = dst.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            dst.close()
+            src.close()
+        copy_seconds = time.monotonic() - started
+
+        if integrity != "ok":
+            raise RuntimeError(f"スナップショットの整合性チェックに失敗: {integrity}")
+
+        db_bytes = partial_path.stat().st_size
+        sha256 = _compress(partial_path, snapshot_path)
+    except BaseException:
+        # コピー・整合性チェック・圧縮のどこで失敗しても途中のファイルを残さない
+        snapshot_path.unlink(missing_ok=True)
+        raise
+    finally:
+        partial_path.unlink(missing_ok=True)
+    duration = time.monotonic() - started
+
+    removed = rotate_snapshots(backup_dir, db_path.stem, keep)
+
+    result = {
+        "snapshot": str(snapshot_path),
+        "pages": page_count,
+        "page_size": page_size,
+        "db_bytes": db_bytes,
+        "compressed_bytes": snapshot_path.stat().st_size,
+        "sha256": sha256,
+        "steps": progress["steps"],
+        "restarts": progress["restarts"],
+        "copy_seconds": round(copy_seconds, 3),
+        "duration_seconds": round(duration, 3),
+        "throughput_mb_per_sec": round(db_bytes / 1024 / 1024 / duration, 2) if duration else None,
+        "integrity": integrity,
+        "rotated_out": removed,
+    }
+    logger.info(
+        f"バックアップ完了: {snapshot_path.name} "
+        f"({db_bytes / 1024 / 1024:.1f}MB → {result['compressed_bytes'] / 1024 / 1024:.1f}MB, "
+        f"{duration:.1f}秒, {result['throughput_mb_per_sec']}MB/s, "
+        f"ステップ{progress['steps']}回, 再開{progress['restarts']}回)"
+    )
+    return result
+
+
+def verify_snapshot(snapshot_path: str | Path) -> bool:
+    """圧縮スナップショットを展開して integrity_check を実行"""
+    snapshot_path = Path(snapshot_path)
+    restored = snapshot_path.with_name(snapshot_path.name.removesuffix(".gz") + ".verify")
+    try:
+        with gzip.open(snapshot_path, "rb") as src, open(restored, "wb") as dst:
+            shutil.copyfileobj(src, dst, length=1024 * 1024)
+        conn = sqlite3.connect(f"file:{restored}?mode=ro", uri=True)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            conn.close()
+        return result == "ok"
+    except (OSError, EOFError, sqlite3.DatabaseError) as e:
+        logger.error(f"スナップショット検証失敗: {snapshot_path.name}: {e}")
+        return False
+    finally:
+        restored.unlink(missing_ok=True)
+
+
+def rotate_snapshots(backup_dir: str | Path, stem: str, keep: int) -> list[str]:
+    """古いスナップショットを削除し、最新 keep 世代のみ残す"""
+    snapshots = sorted(Path(backup_dir).glob(f"{stem}_*{SNAPSHOT_SUFFIX}"))
+    if keep <= 0 or len(snapshots) <= keep:
+        return []
+    removed = []
+    for path in snapshots[:-keep]:
+        path.unlink(missing_ok=True)
+        removed.append(path.name)
+    return removed
+
+
+def _compress(src_path: Path, dst_path: Path) -> str:
+    """gzip圧縮しつつ元データのSHA-256を返す"""
+    digest = hashlib.sha256()
+    tmp_path = dst_path.with_name(dst_path.name + ".tmp")
+    with open(src_path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=6) as dst:
+        while chunk := src.read(1024 * 1024):
+            digest.update(chunk)
+            dst.write(chunk)
+    tmp_path.replace(dst_path)
+    return digest.hexdigest()
+
+
+def run_backup(config_path: str = "./config/settings.yaml") -> dict:
+    """settings.yaml の設定に従ってバックアップを実行"""
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    backup_cfg = config.get("backup", {})
+    return backup_database(
+        config["database"]["path"],
+        backup_cfg.get("dir", "./data/backups"),
+        pages_per_step=backup_cfg.get("pages_per_step", DEFAULT_PAGES_PER_STEP),
+        step_sleep=backup_cfg.get("step_sleep", DEFAULT_STEP_SLEEP),
+        keep=backup_cfg.get("keep", DEFAULT_KEEP),
+    )
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 2 and sys.argv[1] == "--verify":
+        ok = verify_snapshot(sys.argv[2])
+        print("OK" if ok else "NG")
+        sys.exit(0 if ok else 1)
+    run_backup()
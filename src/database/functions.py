@@ -0,0 +1,95 @@
+"""SQLite カスタム集計関数
+
+接続時に登録し、GROUP BY クエリで中央値・パーセンタイル・ヒストグラムを集計する。
+集計はSQLite側で完結するため、Pythonへは集計済みの行のみが返る。
+
+    SELECT municipality, median(rent), percentile(rent, 25) FROM properties GROUP BY municipality
+    SELECT histogram(rent, 0, 300000, 30) FROM properties
+"""
+
+import json
+import math
+import sqlite3
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    """線形補間によるパーセンタイル (pandas/numpy の既定と同じ方式)"""
+    if not sorted_values:
+        return None
+    pct = min(max(pct, 0.0), 100.0)
+    pos = (len(sorted_values) - 1) * pct / 100.0
+    lower = math.floor(pos)
+    upper = math.ceil(pos)
+    if lower == upper:
+        return float(sorted_values[lower])
+    frac = pos - lower
+    return sorted_values[lower] * (1 - frac) + sorted_values[upper] * frac
+
+
+class MedianAggregate:
+    """median(value)"""
+
+    def __init__(self):
+        self.values: list[float] = []
+
+    def step(self, value):
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        self.values.sort()
+        return _percentile(self.values, 50.0)
+
+
+class PercentileAggregate:
+    """percentile(value, pct) — pct は 0〜100"""
+
+    def __init__(self):
+        self.values: list[float] = []
+        self.pct = 50.0
+
+    def step(self, value, pct):
+        if pct is not None:
+            self.pct = float(pct)
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        self.values.sort()
+        return _percentile(self.values, self.pct)
+
+
+class HistogramAggregate:
+    """histogram(value, lo, hi, bins) — 等幅ビンの件数をJSON配列で返す
+
+    範囲外の値は数えない。hi ちょうどの値は最後のビンに含める。
+    """
+
+    def __init__(self):
+        self.counts: list[int] | None = None
+        self.lo = 0.0
+        self.width = 1.0
+
+    def step(self, value, lo, hi, bins):
+        if self.counts is None:
+            bins = max(int(bins), 1)
+            self.counts = [0] * bins
+            self.lo = float(lo)
+            self.width = (float(hi) - self.lo) / bins or 1.0
+        if value is None:
+            return
+        idx = int((value - self.lo) // self.width)
+        if idx == len(self.counts) and value == self.lo + self.width * len(self.counts):
+            idx -= 1
+        if 0 <= idx < len(self.counts):
+            self.counts[idx] += 1
+
+    def finalize(self):
+        return json.dumps(self.counts or [])
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """接続にカスタム集計関数を登録"""
+    conn.create_aggregate("median", 1, MedianAggregate)
+    conn.create_aggregate("percentile", 2, PercentileAggregate)
+    conn.create_aggregate("histogram", 4, HistogramAggregate)
@@ -3,6 +3,8 @@
 import sqlite3
 from pathlib import Path
 
+from src.database.functions import register_functions
+
 SCHEMA_SQL = """
 -- 物件テーブル (メイン)
 CREATE TABLE IF NOT EXISTS properties (
@@ -76,6 +78,16 @@ CREATE TABLE IF NOT EXISTS properties (
     is_active INTEGER DEFAULT 1,       -- 掲載中フラグ
     notified INTEGER DEFAULT 0,        -- LINE通知済みフラグ
 
+    -- 掲載ライフサイクル
+    first_seen_at TEXT,                -- 掲載期間の開始日時 (再掲載時は再検出日時)
+    last_seen_at TEXT,                 -- 最終検出日時 (クロールで確認された日時)
+    delisted_at TEXT,                  -- 掲載終了検出日時
+    content_hash TEXT,                 -- 一覧ページ抽出内容のハッシュ (差分クロール判定用)
+    detail_fetched_at TEXT,            -- 詳細ページ取得日時
+    detail_content_hash TEXT,          -- 詳細ページ取得時点の content_hash (変更検出用)
+    detail_failed_at TEXT,             -- 詳細ページの最終取得失敗日時 (取得成功でクリア)
+    detail_fail_count INTEGER DEFAULT 0, -- 詳細ページの連続取得失敗回数
+
     UNIQUE(source, source_id)
 );
 
@@ -156,6 +168,87 @@ CREATE TABLE IF NOT EXISTS model_metadata (
     is_active INTEGER DEFAULT 0         -- 現在使用中のモデル
 );
 
+-- 物件変更ログ (CDC: トリガーで追記される追記専用ログ)
+CREATE TABLE IF NOT EXISTS property_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,  -- 単調増加シーケンス番号 (再利用されない)
+    property_id INTEGER NOT NULL,
+    change_type TEXT NOT NULL,              -- insert/update/inactivate/reactivate
+    changed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+-- 賃料履歴 (賃料・管理費が実際に変わった時のみ1行追加)
+CREATE TABLE IF NOT EXISTS rent_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    property_id INTEGER NOT NULL,
+    rent INTEGER NOT NULL,                  -- 変更後賃料
+    management_fee INTEGER,                 -- 変更後管理費
+    prev_rent INTEGER,                      -- 変更前賃料 (初回掲載時はNULL)
+    prev_management_fee INTEGER,            -- 変更前管理費
+    changed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (property_id) REFERENCES properties(id)
+);
+
+-- クロール実行履歴
+CREATE TABLE IF NOT EXISTS crawl_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    spider TEXT NOT NULL,                   -- goohome/uchina/suumo/homes
+    status TEXT NOT NULL DEFAULT 'running', -- running/completed/interrupted
+    finish_reason TEXT,                     -- Scrapyの終了理由 (finished/shutdown等)
+    item_count INTEGER DEFAULT 0,
+    started_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    finished_at TEXT,
+    crawl_mode TEXT,                        -- full/incremental
+    resumed_from INTEGER,                   -- 中断した実行から再開した場合、最初の実行のid
+    request_count INTEGER,                  -- ダウンロードしたリクエスト数
+    response_bytes INTEGER,                 -- 受信バイト数
+    elapsed_seconds REAL,                   -- 実行時間
+    items_per_sec REAL                      -- 保存アイテム数/秒
+);
+
+-- 実行ごとの詳細メトリクス (応答時間のパーセンタイル、パイプライン別の除外件数など)
+CREATE TABLE IF NOT EXISTS crawl_metrics (
+    run_id INTEGER NOT NULL,
+    name TEXT NOT NULL,                     -- latency_p50 / dropped/DuplicateFilterPipeline 等
+    value REAL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+
+-- クロール再開用のフロンティア (実行ごとの一覧リクエストと処理済みフラグ)
+-- run_id は再開の起点となった最初の実行 (crawl_runs.id)
+CREATE TABLE IF NOT EXISTS crawl_frontier (
+    run_id INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,              -- リクエストのフィンガープリント
+    request BLOB NOT NULL,                  -- pickle 化した Request.to_dict()
+    done INTEGER NOT NULL DEFAULT 0,        -- コールバック処理済み
+    PRIMARY KEY (run_id, fingerprint)
+) WITHOUT ROWID;
+
+-- 実行中に一覧で確認した物件 (再開をまたいだ掲載終了検出用)
+CREATE TABLE IF NOT EXISTS crawl_seen (
+    run_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    PRIMARY KEY (run_id, source, source_id)
+) WITHOUT ROWID;
+
+-- 掲載期間ロールアップ (掲載終了ごとに差分加算、再集計しない)
+CREATE TABLE IF NOT EXISTS listing_duration_stats (
+    municipality TEXT NOT NULL,             -- 市町村名 (不明は空文字)
+    floor_plan TEXT NOT NULL,               -- 間取り (不明は空文字)
+    delisted_count INTEGER NOT NULL DEFAULT 0,
+    total_days REAL NOT NULL DEFAULT 0,     -- 掲載日数の合計
+    max_days REAL NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (municipality, floor_plan)
+);
+
+-- 変更ログ購読者ごとの処理済み位置 (ハイウォーターマーク)
+CREATE TABLE IF NOT EXISTS change_consumers (
+    name TEXT PRIMARY KEY,                  -- notification/estimation 等
+    last_seq INTEGER NOT NULL DEFAULT 0,    -- 処理済みの最大seq
+    updated_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
 -- インデックス
 CREATE INDEX IF NOT EXISTS idx_properties_municipality ON properties(municipality_code);
 CREATE INDEX IF NOT EXISTS idx_properties_rent ON properties(rent);
@@ -167,9 +260,144 @@ CREATE INDEX IF NOT EXISTS idx_properties_score ON properties(affordability_scor
 CREATE INDEX IF NOT EXISTS idx_land_prices_municipality ON land_prices(municipality_code, year);
 CREATE INDEX IF NOT EXISTS idx_land_prices_location ON land_prices(latitude, longitude);
 CREATE INDEX IF NOT EXISTS idx_transaction_municipality ON transaction_prices(municipality_code, year);
+CREATE INDEX IF NOT EXISTS idx_property_changes_property ON property_changes(property_id, seq);
+CREATE INDEX IF NOT EXISTS idx_rent_history_property ON rent_history(property_id, changed_at);
+CREATE INDEX IF NOT EXISTS idx_rent_history_changed ON rent_history(changed_at);
+CREATE INDEX IF NOT EXISTS idx_crawl_runs_spider ON crawl_runs(spider, started_at);
+"""
+
+# 既存DBに後から追加したカラム (ALTER TABLE で補完し、必要なら既存行を埋める)
+MIGRATION_COLUMNS = {
+    "properties": [
+        ("first_seen_at", "TEXT", "UPDATE properties SET first_seen_at = scraped_at"),
+        ("last_seen_at", "TEXT", "UPDATE properties SET last_seen_at = updated_at"),
+        (
+            "delisted_at", "TEXT",
+            "UPDATE properties SET delisted_at = updated_at WHERE is_active = 0",
+        ),
+        ("content_hash", "TEXT", None),
+        ("detail_fetched_at", "TEXT", None),
+        ("detail_content_hash", "TEXT", None),
+        ("detail_failed_at", "TEXT", None),
+        ("detail_fail_count", "INTEGER DEFAULT 0", None),
+    ],
+    "crawl_runs": [
+        ("crawl_mode", "TEXT", None),
+        ("resumed_from", "INTEGER", None),
+        ("request_count", "INTEGER", None),
+        ("response_bytes", "INTEGER", None),
+        ("elapsed_seconds", "REAL", None),
+        ("items_per_sec", "REAL", None),
+    ],
+}
+
+# 変更ログの通知購読者 (src.notification.line_notify)
+NOTIFICATION_CONSUMER = "notification"
+
+# 通知が変更ログ購読に移る前からある未通知物件に 'insert' を補う (通知購読者の初回実行前のみ)
+NOTIFICATION_BACKFILL_SQL = """
+INSERT INTO property_changes (property_id, change_type)
+SELECT p.id, 'insert' FROM properties p
+WHERE p.is_active = 1 AND p.notified = 0
+  AND NOT EXISTS (SELECT 1 FROM change_consumers WHERE name = ?)
+  AND NOT EXISTS (
+      SELECT 1 FROM property_changes c
+      WHERE c.property_id = p.id AND c.change_type = 'insert'
+  )
+ORDER BY p.id
+"""
+
+# マイグレーション後のカラムを参照するインデックス
+MIGRATED_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_properties_last_seen ON properties(source, last_seen_at);
+CREATE INDEX IF NOT EXISTS idx_properties_detail ON properties(source, detail_fetched_at);
+"""
+
+# 変更ログに記録する更新対象カラム (推定結果・通知フラグ・タイムスタンプは対象外)
+CHANGE_TRACKED_COLUMNS = (
+    "rent", "management_fee", "deposit_months", "key_money_months", "security_deposit",
+    "name", "address", "municipality_code", "property_type", "structure",
+    "floor_plan", "area_sqm", "building_year", "floor_number", "total_floors",
+    "nearest_station", "station_walk_minutes", "parking_available", "parking_fee",
+    "has_aircon", "has_auto_lock", "has_delivery_box", "has_bath_dryer",
+    "has_reheating", "has_washstand", "has_indoor_laundry", "has_internet",
+    "has_fiber", "has_bath_toilet_separate", "has_flooring", "has_pet_ok",
+    "lease_type",
+)
+
+
+def _build_change_triggers_sql() -> str:
+    """property_changes へ追記するトリガー定義を生成"""
+    tracked = ", ".join(CHANGE_TRACKED_COLUMNS)
+    changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in CHANGE_TRACKED_COLUMNS)
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_properties_cdc_insert
+AFTER INSERT ON properties
+BEGIN
+    INSERT INTO property_changes (property_id, change_type) VALUES (NEW.id, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_properties_cdc_update
+AFTER UPDATE OF {tracked} ON properties
+WHEN OLD.is_active = 1 AND NEW.is_active = 1 AND ({changed})
+BEGIN
+    INSERT INTO property_changes (property_id, change_type) VALUES (NEW.id, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_properties_cdc_inactivate
+AFTER UPDATE OF is_active ON properties
+WHEN OLD.is_active = 1 AND NEW.is_active = 0
+BEGIN
+    INSERT INTO property_changes (property_id, change_type) VALUES (NEW.id, 'inactivate');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_properties_cdc_reactivate
+AFTER UPDATE OF is_active ON properties
+WHEN OLD.is_active = 0 AND NEW.is_active = 1
+BEGIN
+    INSERT INTO property_changes (property_id, change_type) VALUES (NEW.id, 'reactivate');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_properties_lifecycle_delist
+AFTER UPDATE OF is_active ON properties
+WHEN OLD.is_active = 1 AND NEW.is_active = 0 AND NEW.first_seen_at IS NOT NULL
+BEGIN
+    INSERT INTO listing_duration_stats
+        (municipality, floor_plan, delisted_count, total_days, max_days)
+    VALUES (
+        COALESCE(NEW.municipality, ''), COALESCE(NEW.floor_plan, ''), 1,
+        julianday(COALESCE(NEW.delisted_at, datetime('now', 'localtime')))
+            - julianday(NEW.first_seen_at),
+        julianday(COALESCE(NEW.delisted_at, datetime('now', 'localtime')))
+            - julianday(NEW.first_seen_at)
+    )
+    ON CONFLICT(municipality, floor_plan) DO UPDATE SET
+        delisted_count = delisted_count + 1,
+        total_days = total_days + excluded.total_days,
+        max_days = MAX(max_days, excluded.max_days),
+        updated_at = datetime('now', 'localtime');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_properties_rent_history_insert
+AFTER INSERT ON properties
+BEGIN
+    INSERT INTO rent_history (property_id, rent, management_fee)
+    VALUES (NEW.id, NEW.rent, NEW.management_fee);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_properties_rent_history_update
+AFTER UPDATE OF rent, management_fee ON properties
+WHEN OLD.rent IS NOT NEW.rent OR OLD.management_fee IS NOT NEW.management_fee
+BEGIN
+    INSERT INTO rent_history (property_id, rent, management_fee, prev_rent, prev_management_fee)
+    VALUES (NEW.id, NEW.rent, NEW.management_fee, OLD.rent, OLD.management_fee);
+END;
 """
 
 
+TRIGGERS_SQL = _build_change_triggers_sql()
+
+
 def init_db(db_path: str | Path) -> sqlite3.Connection:
     """データベースを初期化し、接続を返す"""
     db_path = Path(db_path)
@@ -177,6 +405,7 @@ def init_db(db_path: str | Path) -> sqlite3.Connection:
 
     conn = sqlite3.connect(str(db_path))
     conn.row_factory = sqlite3.Row
+    register_functions(conn)
 
     # WALモード有効化 (並行読み取り性能向上)
     conn.execute("PRAGMA journal_mode=WAL")
@@ -184,14 +413,32 @@ def init_db(db_path: str | Path) -> sqlite3.Connection:
     conn.execute("PRAGMA busy_timeout=5000")
 
     conn.executescript(SCHEMA_SQL)
+    _migrate(conn)
+    conn.executescript(MIGRATED_INDEX_SQL)
+    conn.executescript(TRIGGERS_SQL)
     conn.commit()
     return conn
 
 
+def _migrate(conn: sqlite3.Connection) -> None:
+    """既存DBに不足しているカラムを追加"""
+    for table, columns in MIGRATION_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, col_type, backfill_sql in columns:
+            if name in existing:
+                continue
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+            if backfill_sql:
+                conn.execute(backfill_sql)
+    conn.execute(NOTIFICATION_BACKFILL_SQL, (NOTIFICATION_CONSUMER,))
+    conn.commit()
+
+
 def get_connection(db_path: str | Path) -> sqlite3.Connection:
     """DB接続を取得 (既存DB前提)"""
     conn = sqlite3.connect(str(db_path))
     conn.row_factory = sqlite3.Row
+    register_functions(conn)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA busy_timeout=5000")
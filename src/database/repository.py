@@ -3,6 +3,7 @@
 import json
 import sqlite3
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
 # propertiesテーブルの許可カラム名（SQLインジェクション防止）
@@ -19,9 +20,28 @@ ALLOWED_PROPERTY_COLUMNS = {
     "has_fiber", "has_bath_toilet_separate", "has_flooring", "has_pet_ok",
     "lease_type", "guarantor_required", "brokerage_fee_months", "move_in_date",
     "estimated_rent", "affordability_score", "estimated_at",
-    "scraped_at", "updated_at", "is_active", "notified",
+    "scraped_at", "updated_at", "is_active", "notified", "content_hash",
 }
 
+# 詳細ページから補完するカラム (一覧にない/不完全な項目、詳細取得時は更新のみ行う)
+DETAIL_COLUMNS = {
+    "latitude", "longitude",
+    "has_aircon", "has_auto_lock", "has_delivery_box", "has_bath_dryer",
+    "has_reheating", "has_washstand", "has_indoor_laundry", "has_internet",
+    "has_fiber", "has_bath_toilet_separate", "has_flooring", "has_pet_ok",
+    "lease_type", "guarantor_required", "brokerage_fee_months", "move_in_date",
+    "parking_available", "parking_fee",
+}
+
+# 詳細取得の優先度 (小さいほど先): 新規 → 一覧の内容が変化 → 主要項目が欠けたまま古い
+DETAIL_PRIORITY_NEW = 0
+DETAIL_PRIORITY_CHANGED = 1
+DETAIL_PRIORITY_STALE = 2
+
+# 集計クエリでグループ化・ヒストグラム化できるカラム
+STAT_GROUP_COLUMNS = {"municipality", "floor_plan", "structure", "property_type", "source"}
+HISTOGRAM_COLUMNS = {"rent", "area_sqm", "affordability_score", "building_age"}
+
 # 設備カラムの許可キー
 VALID_EQUIPMENT_KEYS = {
     "aircon", "auto_lock", "delivery_box", "bath_dryer", "reheating",
@@ -30,44 +50,82 @@ VALID_EQUIPMENT_KEYS = {
 }
 
 
+# 掲載終了後に再検出された物件は新しい掲載期間として数える
+# (掲載日数に掲載終了中の期間を含めない。終了までの期間は listing_duration_stats に集計済み)
+_REACTIVATED_FIRST_SEEN = (
+    "first_seen_at = CASE WHEN is_active = 0 THEN datetime('now', 'localtime') "
+    "ELSE first_seen_at END"
+)
+
+
+@lru_cache(maxsize=256)
+def _upsert_sql(columns: tuple[str, ...]) -> str:
+    """カラムの組ごとの upsert 文 (同じサイトのアイテムはほぼ同じ組になる)"""
+    update_cols = ", ".join(
+        f"{c} = excluded.{c}" for c in columns if c not in ("source", "source_id", "scraped_at")
+    )
+    placeholders = ", ".join(f":{c}" for c in columns)
+    return f"""
+        INSERT INTO properties ({", ".join(columns)}, first_seen_at, last_seen_at)
+        VALUES ({placeholders},
+                datetime('now', 'localtime'), datetime('now', 'localtime'))
+        ON CONFLICT(source, source_id) DO UPDATE SET
+            {update_cols},
+            {_REACTIVATED_FIRST_SEEN},
+            updated_at = datetime('now', 'localtime'),
+            last_seen_at = datetime('now', 'localtime'),
+            delisted_at = NULL,
+            is_active = 1
+    """
+
+
 class PropertyRepository:
     """物件データのリポジトリ"""
 
     def __init__(self, conn: sqlite3.Connection):
         self.conn = conn
 
-    def upsert_property(self, data: dict[str, Any]) -> int:
-        """物件データをupsert (存在すれば更新、なければ挿入)"""
-        columns = [k for k in data.keys() if k != "id" and k in ALLOWED_PROPERTY_COLUMNS]
-        placeholders = ", ".join(f":{c}" for c in columns)
-        col_names = ", ".join(columns)
-
-        update_cols = ", ".join(
-            f"{c} = excluded.{c}"
-            for c in columns
-            if c not in ("source", "source_id", "scraped_at")
-        )
+    def upsert_property(self, data: dict[str, Any], commit: bool = True) -> int:
+        """物件データをupsert (存在すれば更新、なければ挿入)
 
-        sql = f"""
-            INSERT INTO properties ({col_names})
-            VALUES ({placeholders})
-            ON CONFLICT(source, source_id) DO UPDATE SET
-                {update_cols},
-                updated_at = datetime('now', 'localtime'),
-                is_active = 1
+        賃料・管理費が変わった場合はトリガーで rent_history に記録される。
+        commit=False の場合は呼び出し側のトランザクションにまとめる。
         """
+        columns = tuple(k for k in data.keys() if k != "id" and k in ALLOWED_PROPERTY_COLUMNS)
+        sql = _upsert_sql(columns)
         cursor = self.conn.execute(sql, data)
-        self.conn.commit()
+        if commit:
+            self.conn.commit()
         return cursor.lastrowid
 
     def upsert_many(self, items: list[dict[str, Any]]) -> int:
-        """複数物件データを一括upsert"""
+        """複数物件データを1トランザクションで一括upsert (賃料履歴も同一トランザクション)"""
         count = 0
-        for item in items:
-            self.upsert_property(item)
-            count += 1
+        try:
+            for item in items:
+                self.upsert_property(item, commit=False)
+                count += 1
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
         return count
 
+    def upsert_each(self, items: list[dict[str, Any]]) -> list[tuple[dict, sqlite3.Error]]:
+        """1件ずつコミットしてupsertし、失敗した (物件データ, 例外) を返す
+
+        upsert_many が失敗したバッチの再試行用。1件の不正データでバッチ全体を失わない。
+        """
+        failed = []
+        for item in items:
+            try:
+                self.upsert_property(item, commit=False)
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                failed.append((item, e))
+        return failed
+
     def search(
         self,
         municipality_codes: list[str] | None = None,
@@ -212,6 +270,32 @@ class PropertyRepository:
         ).fetchone()
         return dict(row) if row else None
 
+    def touch_seen(self, pairs: list[tuple[str, str]]) -> int:
+        """内容が変わっていない物件の last_seen_at だけを更新 ([(source, source_id), ...])"""
+        try:
+            cursor = self.conn.executemany(
+                f"""UPDATE properties
+                   SET {_REACTIVATED_FIRST_SEEN}, last_seen_at = datetime('now', 'localtime'),
+                       delisted_at = NULL, is_active = 1
+                   WHERE source = ? AND source_id = ?""",
+                pairs,
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return cursor.rowcount
+
+    def count_active_by_municipality(self, source: str) -> dict[str, int]:
+        """掲載中の物件数を市町村コード別に返す (リクエスト計画の見積もり用)"""
+        rows = self.conn.execute(
+            """SELECT municipality_code, COUNT(*) AS n FROM properties
+               WHERE source = ? AND is_active = 1 AND municipality_code IS NOT NULL
+               GROUP BY municipality_code""",
+            (source,),
+        ).fetchall()
+        return {row["municipality_code"]: row["n"] for row in rows}
+
     def mark_inactive(self, source: str, source_ids: list[str]) -> int:
         """指定されたsource_id以外を非アクティブにする (掲載終了検出)"""
         if not source_ids:
@@ -219,13 +303,240 @@ class PropertyRepository:
         placeholders = ", ".join("?" for _ in source_ids)
         cursor = self.conn.execute(
             f"""UPDATE properties
-                SET is_active = 0, updated_at = datetime('now', 'localtime')
+                SET is_active = 0,
+                    updated_at = datetime('now', 'localtime'),
+                    delisted_at = datetime('now', 'localtime')
                 WHERE source = ? AND source_id NOT IN ({placeholders}) AND is_active = 1""",
             [source] + source_ids,
         )
         self.conn.commit()
         return cursor.rowcount
 
+    def get_detail_candidates(
+        self, sources: list[str], limit: int, retry_days: int = 14, failure_retry_days: int = 3
+    ) -> list[dict]:
+        """詳細ページを取得すべき掲載中物件を優先度順に返す
+
+        - 新規 (未取得): 初回検出が新しい順
+        - 変更 (前回取得時から content_hash が変化)
+        - 座標・契約形態が欠けたままで、前回取得から retry_days 日以上経過: 取得が古い順
+
+        取得に失敗した物件 (404・タイムアウト等) は、最後の失敗から
+        failure_retry_days × 連続失敗回数 の日数が経つまで対象外にする。
+        """
+        if not sources or limit <= 0:
+            return []
+        placeholders = ", ".join("?" for _ in sources)
+        rows = self.conn.execute(
+            f"""SELECT id, source, source_id, source_url, content_hash, detail_fetched_at,
+                       CASE WHEN detail_fetched_at IS NULL THEN {DETAIL_PRIORITY_NEW}
+                            WHEN content_hash IS NOT detail_content_hash
+                                THEN {DETAIL_PRIORITY_CHANGED}
+                            ELSE {DETAIL_PRIORITY_STALE} END AS detail_priority
+                FROM properties
+                WHERE is_active = 1 AND source_url IS NOT NULL AND source IN ({placeholders})
+                  AND (detail_failed_at IS NULL
+                       OR detail_failed_at < datetime('now', 'localtime',
+                                                      printf('-%d days', ? * detail_fail_count)))
+                  AND (detail_fetched_at IS NULL
+                       OR content_hash IS NOT detail_content_hash
+                       OR ((latitude IS NULL OR lease_type IS NULL)
+                           AND detail_fetched_at < datetime('now', 'localtime', ?)))
+                ORDER BY detail_priority,
+                         CASE WHEN detail_fetched_at IS NULL THEN first_seen_at END DESC,
+                         detail_fetched_at
+                LIMIT ?""",
+            [*sources, int(failure_retry_days), f"-{int(retry_days)} days", limit],
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def update_details(self, items: list[dict[str, Any]]) -> int:
+        """詳細ページの取得結果を反映 (既存物件の更新のみ、取得できた項目だけ上書き)"""
+        count = 0
+        try:
+            for item in items:
+                columns = [c for c in item if c in DETAIL_COLUMNS and item[c] is not None]
+                sets = "".join(f"{c} = :{c}, " for c in columns)
+                cursor = self.conn.execute(
+                    f"""UPDATE properties
+                        SET {sets}updated_at = datetime('now', 'localtime'),
+                            detail_fetched_at = datetime('now', 'localtime'),
+                            detail_content_hash = :content_hash,
+                            detail_failed_at = NULL,
+                            detail_fail_count = 0
+                        WHERE source = :source AND source_id = :source_id""",
+                    {"content_hash": None, **item},
+                )
+                count += cursor.rowcount
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return count
+
+    def record_detail_failures(self, pairs: list[tuple[str, str]]) -> int:
+        """詳細ページの取得失敗を記録 ([(source, source_id), ...])"""
+        try:
+            cursor = self.conn.executemany(
+                """UPDATE properties
+                   SET detail_failed_at = datetime('now', 'localtime'),
+                       detail_fail_count = COALESCE(detail_fail_count, 0) + 1
+                   WHERE source = ? AND source_id = ?""",
+                pairs,
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return cursor.rowcount
+
+    def get_rent_summary(self, bargain_threshold: float = 0.85) -> dict:
+        """掲載中物件の件数・平均/中央値賃料・お得物件数を集計"""
+        row = self.conn.execute(
+            """SELECT COUNT(*) AS total,
+                      AVG(rent) AS avg_rent,
+                      median(rent) AS median_rent,
+                      SUM(affordability_score <= ?) AS bargain_count
+               FROM properties WHERE is_active = 1""",
+            (bargain_threshold,),
+        ).fetchone()
+        return dict(row)
+
+    def get_rent_stats_by(self, group_by: str, min_count: int = 1) -> list[dict]:
+        """グループ別の賃料統計 (件数・平均・四分位・最小/最大) をSQL側で集計"""
+        if group_by not in STAT_GROUP_COLUMNS:
+            raise ValueError(f"集計できないカラムです: {group_by}")
+        sql = f"""
+            SELECT {group_by},
+                   COUNT(rent) AS count,
+                   AVG(rent) AS avg_rent,
+                   MIN(rent) AS min_rent,
+                   percentile(rent, 25) AS q1_rent,
+                   median(rent) AS median_rent,
+                   percentile(rent, 75) AS q3_rent,
+                   MAX(rent) AS max_rent,
+                   AVG(area_sqm) AS avg_area
+            FROM properties
+            WHERE is_active = 1 AND {group_by} IS NOT NULL
+            GROUP BY {group_by}
+            HAVING COUNT(rent) >= ?
+        """
+        rows = self.conn.execute(sql, (min_count,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_histogram(
+        self, column: str, bins: int = 50, lo: float | None = None, hi: float | None = None
+    ) -> dict:
+        """掲載中物件の指定カラムのヒストグラムをSQL側で集計"""
+        if column not in HISTOGRAM_COLUMNS:
+            raise ValueError(f"ヒストグラム化できないカラムです: {column}")
+        where = f"is_active = 1 AND {column} IS NOT NULL"
+        if lo is None or hi is None:
+            bounds = self.conn.execute(
+                f"SELECT MIN({column}) AS lo, MAX({column}) AS hi FROM properties WHERE {where}"
+            ).fetchone()
+            if bounds["lo"] is None:
+                return {"lo": None, "hi": None, "counts": []}
+            lo = bounds["lo"] if lo is None else lo
+            hi = bounds["hi"] if hi is None else hi
+        row = self.conn.execute(
+            f"SELECT histogram({column}, ?, ?, ?) AS counts FROM properties WHERE {where}",
+            (lo, hi, bins),
+        ).fetchone()
+        counts = json.loads(row["counts"]) if row["counts"] else []
+        return {"lo": lo, "hi": hi, "counts": counts}
+
+    def get_top_bargains(self, limit: int = 10) -> list[dict]:
+        """割安度スコアの低い順に掲載中物件を取得"""
+        rows = self.conn.execute(
+            """SELECT * FROM properties
+               WHERE is_active = 1 AND affordability_score > 0
+               ORDER BY affordability_score ASC LIMIT ?""",
+            (limit,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_listing_duration_stats(self, group_by: str = "municipality") -> list[dict]:
+        """掲載終了物件の掲載日数ロールアップを市町村または間取り単位で取得"""
+        if group_by not in ("municipality", "floor_plan"):
+            group_by = "municipality"
+        sql = f"""
+            SELECT {group_by},
+                   SUM(delisted_count) AS delisted_count,
+                   SUM(total_days) / SUM(delisted_count) AS avg_days,
+                   MAX(max_days) AS max_days
+            FROM listing_duration_stats
+            WHERE {group_by} != ''
+            GROUP BY {group_by}
+            HAVING SUM(delisted_count) > 0
+            ORDER BY avg_days
+        """
+        rows = self.conn.execute(sql).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_active_listing_ages(self, group_by: str = "municipality") -> list[dict]:
+        """掲載中物件の現在の掲載日数を市町村または間取り単位で集計"""
+        if group_by not in ("municipality", "floor_plan"):
+            group_by = "municipality"
+        sql = f"""
+            SELECT {group_by},
+                   COUNT(*) AS active_count,
+                   AVG(julianday('now', 'localtime') - julianday(first_seen_at)) AS avg_days
+            FROM properties
+            WHERE is_active = 1 AND first_seen_at IS NOT NULL AND {group_by} IS NOT NULL
+            GROUP BY {group_by}
+            ORDER BY avg_days
+        """
+        rows = self.conn.execute(sql).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_rent_history(self, property_id: int) -> list[dict]:
+        """物件の賃料変更履歴を古い順に取得"""
+        rows = self.conn.execute(
+            "SELECT * FROM rent_history WHERE property_id = ? ORDER BY id",
+            (property_id,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_latest_rent_changes(self, property_ids: list[int] | None = None) -> list[dict]:
+        """物件ごとの最新の賃料変更を取得 (初回掲載のみの物件は除く)"""
+        conditions = ["rh.prev_rent IS NOT NULL"]
+        params: list = []
+        if property_ids:
+            conditions.append(f"rh.property_id IN ({', '.join('?' for _ in property_ids)})")
+            params.extend(property_ids)
+        sql = f"""
+            SELECT rh.* FROM rent_history rh
+            JOIN (
+                SELECT property_id, MAX(id) AS latest_id FROM rent_history GROUP BY property_id
+            ) latest ON latest.latest_id = rh.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY rh.changed_at DESC
+        """
+        rows = self.conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_price_drops(self, days: int = 7, limit: int = 100) -> list[dict]:
+        """直近N日以内に値下げされた掲載中物件を値下げ額の大きい順に取得"""
+        sql = """
+            SELECT p.*, rh.prev_rent, rh.rent AS new_rent,
+                   rh.prev_rent - rh.rent AS rent_drop,
+                   rh.changed_at AS rent_changed_at
+            FROM rent_history rh
+            JOIN properties p ON p.id = rh.property_id
+            WHERE rh.changed_at >= datetime('now', 'localtime', ?)
+                AND rh.prev_rent IS NOT NULL
+                AND rh.rent < rh.prev_rent
+                AND p.is_active = 1
+                AND rh.id = (
+                    SELECT MAX(id) FROM rent_history WHERE property_id = rh.property_id
+                )
+            ORDER BY rent_drop DESC
+            LIMIT ?
+        """
+        rows = self.conn.execute(sql, (f"-{int(days)} days", limit)).fetchall()
+        return [dict(row) for row in rows]
+
     def get_unnotified(self, search_id: int | None = None) -> list[dict]:
         """未通知の物件を取得"""
         sql = "SELECT * FROM properties WHERE is_active = 1 AND notified = 0 ORDER BY scraped_at DESC"
@@ -398,3 +709,290 @@ class LandPriceRepository:
         sql = f"SELECT AVG(price_per_sqm) as avg_price FROM land_prices WHERE {where}"
         row = self.conn.execute(sql, params).fetchone()
         return row["avg_price"] if row and row["avg_price"] else None
+
+
+class CrawlRunRepository:
+    """クロール実行履歴 (crawl_runs) のリポジトリ"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def start_run(
+        self, spider: str, crawl_mode: str | None = None, resumed_from: int | None = None
+    ) -> int:
+        cursor = self.conn.execute(
+            "INSERT INTO crawl_runs (spider, crawl_mode, resumed_from) VALUES (?, ?, ?)",
+            (spider, crawl_mode, resumed_from),
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def abandon_running(self, spider: str) -> int:
+        """終了記録のない実行 (プロセス強制終了・再起動) を中断扱いにする"""
+        cursor = self.conn.execute(
+            """UPDATE crawl_runs
+               SET status = 'interrupted', finish_reason = 'abandoned'
+               WHERE spider = ? AND status = 'running'""",
+            (spider,),
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def find_resumable(
+        self, spider: str, crawl_mode: str | None, max_age_hours: float
+    ) -> int | None:
+        """直近の実行が中断していれば、再開の起点となる実行idを返す
+
+        同じクロールモードで max_age_hours 以内に開始したものに限る。
+        """
+        row = self.conn.execute(
+            """SELECT id, status, crawl_mode, resumed_from,
+                      started_at >= datetime('now', 'localtime', ?) AS recent
+               FROM crawl_runs WHERE spider = ? ORDER BY id DESC LIMIT 1""",
+            (f"-{float(max_age_hours)} hours", spider),
+        ).fetchone()
+        if row is None or row["status"] != "interrupted" or not row["recent"]:
+            return None
+        if row["crawl_mode"] != crawl_mode:
+            return None
+        return row["resumed_from"] or row["id"]
+
+    def finish_run(self, run_id: int, status: str, finish_reason: str, item_count: int) -> None:
+        self.conn.execute(
+            """UPDATE crawl_runs
+               SET status = ?, finish_reason = ?, item_count = ?,
+                   finished_at = datetime('now', 'localtime')
+               WHERE id = ?""",
+            (status, finish_reason, item_count, run_id),
+        )
+        self.conn.commit()
+
+    def record_metrics(
+        self, run_id: int, summary: dict[str, Any], metrics: dict[str, float]
+    ) -> None:
+        """実行の集計値 (crawl_runs) と詳細メトリクス (crawl_metrics) を保存"""
+        self.conn.execute(
+            """UPDATE crawl_runs
+               SET request_count = :request_count, response_bytes = :response_bytes,
+                   elapsed_seconds = :elapsed_seconds, items_per_sec = :items_per_sec
+               WHERE id = :run_id""",
+            {**summary, "run_id": run_id},
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO crawl_metrics (run_id, name, value) VALUES (?, ?, ?)",
+            [(run_id, name, value) for name, value in metrics.items()],
+        )
+        self.conn.commit()
+
+    def get_metrics_history(
+        self, names: tuple[str, ...] = (), days: int = 90, spider: str | None = None
+    ) -> list[dict]:
+        """実行ごとの集計値と指定メトリクスを時系列で返す (推移グラフ用)"""
+        conditions = [
+            "r.started_at >= datetime('now', 'localtime', ?)",
+            "r.elapsed_seconds IS NOT NULL",
+        ]
+        params: list = [f"-{int(days)} days"]
+        if spider:
+            conditions.append("r.spider = ?")
+            params.append(spider)
+        rows = self.conn.execute(
+            f"""SELECT r.id, r.spider, r.status, r.started_at, r.item_count, r.request_count,
+                       r.response_bytes, r.elapsed_seconds, r.items_per_sec
+                FROM crawl_runs r WHERE {' AND '.join(conditions)}
+                ORDER BY r.started_at""",
+            params,
+        ).fetchall()
+        history = [dict(row) for row in rows]
+        if names and history:
+            ids = [row["id"] for row in history]
+            metrics: dict[int, dict] = {}
+            for row in self.conn.execute(
+                f"""SELECT run_id, name, value FROM crawl_metrics
+                    WHERE run_id IN ({', '.join('?' for _ in ids)})
+                      AND name IN ({', '.join('?' for _ in names)})""",
+                [*ids, *names],
+            ):
+                metrics.setdefault(row["run_id"], {})[row["name"]] = row["value"]
+            for row in history:
+                for name in names:
+                    row[name] = metrics.get(row["id"], {}).get(name)
+        return history
+
+    def get_metrics(self, run_id: int) -> dict[str, float]:
+        rows = self.conn.execute(
+            "SELECT name, value FROM crawl_metrics WHERE run_id = ? ORDER BY name", (run_id,)
+        ).fetchall()
+        return {row["name"]: row["value"] for row in rows}
+
+    def get_recent_runs(self, spider: str | None = None, limit: int = 20) -> list[dict]:
+        conditions = []
+        params: list = []
+        if spider:
+            conditions.append("spider = ?")
+            params.append(spider)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        rows = self.conn.execute(
+            f"SELECT * FROM crawl_runs {where} ORDER BY id DESC LIMIT ?", params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+class CrawlCheckpointRepository:
+    """クロール再開用のフロンティア (crawl_frontier) と確認済み物件 (crawl_seen)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def complete(
+        self,
+        run_id: int,
+        fingerprints: list[str],
+        new_requests: list[tuple[str, bytes]],
+        seen: list[tuple[str, str]],
+    ) -> None:
+        """ページの処理完了をまとめて記録 (後続リクエスト・確認済み物件と同一トランザクション)"""
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO crawl_frontier (run_id, fingerprint, request) "
+                "VALUES (?, ?, ?)",
+                [(run_id, fp, blob) for fp, blob in new_requests],
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO crawl_seen (run_id, source, source_id) VALUES (?, ?, ?)",
+                [(run_id, source, source_id) for source, source_id in seen],
+            )
+            self.conn.executemany(
+                "UPDATE crawl_frontier SET done = 1 WHERE run_id = ? AND fingerprint = ?",
+                [(run_id, fp) for fp in fingerprints],
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+    def pending_requests(self, run_id: int) -> list[bytes]:
+        rows = self.conn.execute(
+            "SELECT request FROM crawl_frontier WHERE run_id = ? AND done = 0", (run_id,)
+        ).fetchall()
+        return [row["request"] for row in rows]
+
+    def progress(self, run_id: int) -> dict:
+        row = self.conn.execute(
+            """SELECT COUNT(*) AS total, COALESCE(SUM(done), 0) AS done
+               FROM crawl_frontier WHERE run_id = ?""",
+            (run_id,),
+        ).fetchone()
+        return {"total": row["total"], "done": row["done"]}
+
+    def seen_ids(self, run_id: int) -> dict[str, list[str]]:
+        result: dict[str, list[str]] = {}
+        for row in self.conn.execute(
+            "SELECT source, source_id FROM crawl_seen WHERE run_id = ?", (run_id,)
+        ):
+            result.setdefault(row["source"], []).append(row["source_id"])
+        return result
+
+    def clear(self, spider: str, keep_run_id: int | None = None) -> None:
+        """spider のチェックポイントを削除 (keep_run_id の分は残す)"""
+        for table in ("crawl_frontier", "crawl_seen"):
+            self.conn.execute(
+                f"""DELETE FROM {table} WHERE run_id IN (
+                        SELECT id FROM crawl_runs WHERE spider = ? AND id IS NOT ?)""",
+                (spider, keep_run_id),
+            )
+        self.conn.commit()
+
+
+class ChangeLogRepository:
+    """物件変更ログ (property_changes) の購読・コンパクション"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def get_position(self, consumer: str) -> int:
+        """購読者の処理済みseqを取得 (未登録なら0)"""
+        row = self.conn.execute(
+            "SELECT last_seq FROM change_consumers WHERE name = ?", (consumer,)
+        ).fetchone()
+        return row["last_seq"] if row else 0
+
+    def get_latest_seq(self) -> int:
+        row = self.conn.execute("SELECT MAX(seq) AS seq FROM property_changes").fetchone()
+        return row["seq"] or 0
+
+    def register(self, consumer: str, from_latest: bool = False) -> int:
+        """購読者を登録 (from_latest=Trueなら既存ログを読み飛ばす)"""
+        start = self.get_latest_seq() if from_latest else 0
+        self.conn.execute(
+            "INSERT OR IGNORE INTO change_consumers (name, last_seq) VALUES (?, ?)",
+            (consumer, start),
+        )
+        self.conn.commit()
+        return self.get_position(consumer)
+
+    def fetch_changes(
+        self,
+        consumer: str,
+        change_types: tuple[str, ...] | None = None,
+        limit: int = 1000,
+        upto: int | None = None,
+    ) -> list[dict]:
+        """購読者の処理済み位置より後の変更を取得"""
+        conditions = ["seq > ?"]
+        params: list = [self.get_position(consumer)]
+        if upto is not None:
+            conditions.append("seq <= ?")
+            params.append(upto)
+        if change_types:
+            conditions.append(f"change_type IN ({', '.join('?' for _ in change_types)})")
+            params.extend(change_types)
+        params.append(limit)
+        sql = f"""
+            SELECT seq, property_id, change_type, changed_at FROM property_changes
+            WHERE {' AND '.join(conditions)}
+            ORDER BY seq LIMIT ?
+        """
+        rows = self.conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def fetch_changed_properties(
+        self,
+        consumer: str,
+        change_types: tuple[str, ...] | None = None,
+        limit: int = 1000,
+    ) -> tuple[list[dict], int]:
+        """変更のあった物件を重複なしで取得し、(物件リスト, 次にadvanceすべきseq) を返す"""
+        horizon = self.get_latest_seq()
+        changes = self.fetch_changes(consumer, change_types, limit, upto=horizon)
+        # 上限に達しなければ horizon までの対象外の変更も読み終えたとみなす
+        next_seq = changes[-1]["seq"] if len(changes) >= limit else horizon
+        if not changes:
+            return [], next_seq
+        property_ids = list(dict.fromkeys(c["property_id"] for c in changes))
+        placeholders = ", ".join("?" for _ in property_ids)
+        rows = self.conn.execute(
+            f"SELECT * FROM properties WHERE id IN ({placeholders})", property_ids
+        ).fetchall()
+        return [dict(row) for row in rows], next_seq
+
+    def advance(self, consumer: str, seq: int) -> None:
+        """購読者の処理済み位置を進める (後退はしない)"""
+        self.conn.execute(
+            """INSERT INTO change_consumers (name, last_seq) VALUES (?, ?)
+               ON CONFLICT(name) DO UPDATE SET
+                   last_seq = MAX(last_seq, excluded.last_seq),
+                   updated_at = datetime('now', 'localtime')""",
+            (consumer, seq),
+        )
+        self.conn.commit()
+
+    def compact(self) -> int:
+        """全購読者が処理済みのログを削除"""
+        row = self.conn.execute("SELECT MIN(last_seq) AS seq FROM change_consumers").fetchone()
+        if not row or row["seq"] is None:
+            return 0
+        cursor = self.conn.execute("DELETE FROM property_changes WHERE seq <= ?", (row["seq"],))
+        self.conn.commit()
+        return cursor.rowcount
@@ -8,8 +8,12 @@ from pathlib import Path
 import requests
 import yaml
 
-from src.database.models import init_db
-from src.database.repository import PropertyRepository, SavedSearchRepository
+from src.database.models import NOTIFICATION_CONSUMER, init_db
+from src.database.repository import (
+    ChangeLogRepository,
+    PropertyRepository,
+    SavedSearchRepository,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +21,8 @@ LINE_PUSH_API = "https://api.line.me/v2/bot/message/push"
 LINE_MULTICAST_API = "https://api.line.me/v2/bot/message/multicast"
 # Messaging API: 1メッセージあたり最大5000文字
 LINE_MESSAGE_MAX_CHARS = 5000
+# 変更ログ (property_changes) の1回の最大処理件数 (購読者名は NOTIFICATION_CONSUMER)
+NOTIFICATION_BATCH_LIMIT = 5000
 
 
 def _get_token() -> str:
@@ -125,11 +131,16 @@ def check_and_notify(config_path: str = "./config/settings.yaml"):
 
     prop_repo = PropertyRepository(conn)
     search_repo = SavedSearchRepository(conn)
+    change_log = ChangeLogRepository(conn)
 
-    # 未通知物件を取得
-    unnotified = prop_repo.get_unnotified()
+    # 前回処理以降に新規掲載された物件のみ取得 (変更ログの差分)
+    changed, next_seq = change_log.fetch_changed_properties(
+        NOTIFICATION_CONSUMER, ("insert",), limit=NOTIFICATION_BATCH_LIMIT
+    )
+    unnotified = [p for p in changed if p["is_active"] and not p["notified"]]
     if not unnotified:
         logger.info("新着物件なし")
+        _finish_consumer(change_log, next_seq)
         conn.close()
         return
 
@@ -141,6 +152,7 @@ def check_and_notify(config_path: str = "./config/settings.yaml"):
         logger.info("保存済み検索条件なし。全未通知物件を通知済みにマーク。")
         all_ids = [p["id"] for p in unnotified]
         prop_repo.mark_notified(all_ids)
+        _finish_consumer(change_log, next_seq)
         conn.close()
         return
 
@@ -157,9 +169,10 @@ def check_and_notify(config_path: str = "./config/settings.yaml"):
                 if _matches_conditions(prop, conds):
                     matched_props.add(prop["id"])
 
+    sent = True
     if matched_props:
         matched_list = [p for p in unnotified if p["id"] in matched_props]
-        _send_batch(matched_list, prop_repo)
+        sent = _send_batch(matched_list, prop_repo)
 
     # 全未通知物件を通知済みにマーク（未マッチ物件の蓄積を防止）
     all_ids = [p["id"] for p in unnotified if p["id"] not in matched_props]
@@ -167,9 +180,22 @@ def check_and_notify(config_path: str = "./config/settings.yaml"):
         prop_repo.mark_notified(all_ids)
         logger.info(f"未マッチ {len(all_ids)}件を通知済みにマーク")
 
+    # 送信に失敗したら処理済み位置を進めず、次回同じ変更から再送する
+    if sent:
+        _finish_consumer(change_log, next_seq)
+    else:
+        logger.warning("通知の送信に失敗したため変更ログの処理済み位置を据え置きます")
     conn.close()
 
 
+def _finish_consumer(change_log: ChangeLogRepository, seq: int) -> None:
+    """処理済み位置を進め、全購読者が処理済みのログを削除"""
+    change_log.advance(NOTIFICATION_CONSUMER, seq)
+    removed = change_log.compact()
+    if removed:
+        logger.info(f"変更ログ {removed}件をコンパクション")
+
+
 def _matches_conditions(prop: dict, conditions: dict) -> bool:
     """物件が検索条件に合致するかチェック（検索ページと同じフィルタ）"""
     rent = prop.get("rent", 0)
@@ -234,10 +260,10 @@ def _matches_conditions(prop: dict, conditions: dict) -> bool:
     return True
 
 
-def _send_batch(properties: list[dict], repo: PropertyRepository):
-    """物件一覧をバッチ通知"""
+def _send_batch(properties: list[dict], repo: PropertyRepository) -> bool:
+    """物件一覧をバッチ通知し、全メッセージを送信できたかを返す"""
     if not properties:
-        return
+        return True
 
     header = f"📋 沖縄賃貸ファインダー 新着通知\n本日の新着: {len(properties)}件\n{'─' * 20}"
     messages = [header]
@@ -253,18 +279,20 @@ def _send_batch(properties: list[dict], repo: PropertyRepository):
         for prop in properties:
             msg = format_property_notification(prop)
             if len(current) + len(msg) > LINE_MESSAGE_MAX_CHARS - 100:
-                send_line_message(current)
+                if not send_line_message(current):
+                    return False
                 current = ""
             current += msg + "\n\n"
-        if current.strip():
-            send_line_message(current)
-    else:
-        send_line_message(full_message)
+        if current.strip() and not send_line_message(current):
+            return False
+    elif not send_line_message(full_message):
+        return False
 
-    # 通知済みフラグ
+    # 通知済みフラグ (送信できた場合のみ)
     prop_ids = [p["id"] for p in properties]
     repo.mark_notified(prop_ids)
     logger.info(f"{len(prop_ids)}件の物件を通知済みにしました")
+    return True
 
 
 if __name__ == "__main__":
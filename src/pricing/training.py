@@ -8,12 +8,19 @@ import pandas as pd
 import yaml
 
 from src.database.models import get_connection
-from src.database.repository import LandPriceRepository, PropertyRepository
+from src.database.repository import (
+    ChangeLogRepository,
+    LandPriceRepository,
+    PropertyRepository,
+)
 from src.pricing.estimator import RentEstimator
 from src.pricing.land_price import fetch_and_store_land_prices
 
 logger = logging.getLogger(__name__)
 
+# 変更ログ (property_changes) の購読者名
+ESTIMATION_CONSUMER = "estimation"
+
 
 def run_training_pipeline(config_path: str = "./config/settings.yaml"):
     """モデル学習パイプライン全体を実行"""
@@ -71,8 +78,10 @@ def run_training_pipeline(config_path: str = "./config/settings.yaml"):
     )
     conn.commit()
 
-    # 5. 全物件の推定賃料を更新
+    # 5. 全物件の推定賃料を更新 (新モデルで全件再推定するため変更ログは末尾まで処理済み扱い)
     logger.info("全物件の推定賃料を更新中...")
+    change_log = ChangeLogRepository(conn)
+    horizon = change_log.get_latest_seq()
     all_properties = prop_repo.search(limit=10000)
     if all_properties:
         all_df = pd.DataFrame(all_properties)
@@ -84,12 +93,65 @@ def run_training_pipeline(config_path: str = "./config/settings.yaml"):
             score = float(row.get("affordability_score", 1.0))
             if est_rent > 0:
                 prop_repo.update_estimation(prop_id, est_rent, score)
+    change_log.advance(ESTIMATION_CONSUMER, horizon)
 
     conn.close()
     logger.info(f"学習完了 - R²: {results['random_forest']['r2']:.3f}")
     return results
 
 
+def update_changed_estimations(config_path: str = "./config/settings.yaml") -> int:
+    """前回以降に追加・変更された物件のみ、既存モデルで推定賃料を更新"""
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    conn = get_connection(config["database"]["path"])
+    prop_repo = PropertyRepository(conn)
+    change_log = ChangeLogRepository(conn)
+
+    changed, next_seq = change_log.fetch_changed_properties(
+        ESTIMATION_CONSUMER, ("insert", "update", "reactivate"), limit=10000
+    )
+    targets = [p for p in changed if p["is_active"] and p["rent"] is not None]
+    if not targets:
+        logger.info("推定対象の変更物件なし")
+        change_log.advance(ESTIMATION_CONSUMER, next_seq)
+        conn.close()
+        return 0
+
+    estimator = RentEstimator(model_dir=config.get("pricing", {}).get("model_dir", "./data/models"))
+    try:
+        estimator.load_model()
+    except FileNotFoundError:
+        # 学習済みモデルがなければ全件学習 (全物件を再推定し購読位置も末尾まで進める)
+        conn.close()
+        logger.info("学習済みモデルなし。全件学習を実行します")
+        run_training_pipeline(config_path)
+        return len(targets)
+    land_rows = conn.execute("SELECT * FROM land_prices").fetchall()
+    land_price_df = pd.DataFrame([dict(r) for r in land_rows]) if land_rows else None
+
+    predictions = estimator.predict(pd.DataFrame(targets), land_price_df)
+    updated = 0
+    for idx, row in predictions.iterrows():
+        est_rent = int(row.get("estimated_rent", 0))
+        if est_rent > 0:
+            prop_repo.update_estimation(
+                targets[idx]["id"], est_rent, float(row.get("affordability_score", 1.0))
+            )
+            updated += 1
+
+    change_log.advance(ESTIMATION_CONSUMER, next_seq)
+    change_log.compact()
+    conn.close()
+    logger.info(f"変更物件の推定賃料を更新: {updated}件")
+    return updated
+
+
 if __name__ == "__main__":
+    import sys
     logging.basicConfig(level=logging.INFO)
-    run_training_pipeline()
+    if len(sys.argv) > 1 and sys.argv[1] == "--incremental":
+        update_changed_estimations()
+    else:
+        run_training_pipeline()
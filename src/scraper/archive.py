@@ -0,0 +1,192 @@
+"""取得済みページのローカルアーカイブ
+
+レスポンス本文を内容アドレス (SHA-256) で圧縮保存し、URLごとの最新版をインデックスDBに記録する。
+- 次回クロール時は ETag / Last-Modified による条件付きGETで再検証 (304ならアーカイブから復元)
+- サイトのマークアップ変更時は reparse でネットワークなしに再パースできる
+
+圧縮は zstandard があれば zstd、なければ gzip を使う。
+
+    data/raw_archive/
+        index.db
+        objects/ab/abcdef....zst
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 未インストール環境では gzip にフォールバック
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODEC_ZSTD = "zst"
+CODEC_GZIP = "gz"
+
+INDEX_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    spider TEXT NOT NULL,
+    callback TEXT,
+    cb_kwargs TEXT,                   -- JSON
+    status INTEGER NOT NULL,
+    headers TEXT,                     -- JSON {name: [values]}
+    etag TEXT,
+    last_modified TEXT,
+    body_sha256 TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    body_bytes INTEGER,
+    fetched_at TEXT NOT NULL,
+    revalidated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pages_spider ON pages(spider, fetched_at);
+"""
+
+
+def default_codec() -> str:
+    return CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd圧縮のアーカイブを読むには zstandard が必要です")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class RawPageArchive:
+    """内容アドレス方式の生ページアーカイブ"""
+
+    def __init__(self, root: str | Path, codec: str | None = None):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.codec = codec or default_codec()
+        self.conn = sqlite3.connect(str(self.root / "index.db"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(INDEX_SCHEMA_SQL)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _object_path(self, sha256: str, codec: str) -> Path:
+        return self.objects_dir / sha256[:2] / f"{sha256}.{codec}"
+
+    def put_body(self, body: bytes) -> tuple[str, str, bool]:
+        """本文を保存し (sha256, codec, 新規保存したか) を返す。同一内容は再保存しない"""
+        sha256 = hashlib.sha256(body).hexdigest()
+        for codec in (self.codec, CODEC_ZSTD, CODEC_GZIP):
+            if self._object_path(sha256, codec).exists():
+                return sha256, codec, False
+        path = self._object_path(sha256, self.codec)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(compress(body, self.codec))
+        tmp.replace(path)
+        return sha256, self.codec, True
+
+    def get_body(self, sha256: str, codec: str) -> bytes:
+        return decompress(self._object_path(sha256, codec).read_bytes(), codec)
+
+    def store(
+        self,
+        spider: str,
+        url: str,
+        status: int,
+        headers: dict[str, list[str]],
+        body: bytes,
+        callback: str | None = None,
+        cb_kwargs: dict | None = None,
+    ) -> bool:
+        """レスポンスを保存してインデックスを更新。本文が新規なら True"""
+        sha256, codec, is_new = self.put_body(body)
+        lowered = {k.lower(): v for k, v in headers.items()}
+        etag = (lowered.get("etag") or [None])[0]
+        last_modified = (lowered.get("last-modified") or [None])[0]
+        self.conn.execute(
+            """
+            INSERT INTO pages (url, spider, callback, cb_kwargs, status, headers,
+                               etag, last_modified, body_sha256, codec, body_bytes, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                spider = excluded.spider, callback = excluded.callback,
+                cb_kwargs = excluded.cb_kwargs, status = excluded.status,
+                headers = excluded.headers, etag = excluded.etag,
+                last_modified = excluded.last_modified, body_sha256 = excluded.body_sha256,
+                codec = excluded.codec, body_bytes = excluded.body_bytes,
+                fetched_at = excluded.fetched_at, revalidated_at = NULL
+            """,
+            (
+                url, spider, callback, json.dumps(cb_kwargs or {}, ensure_ascii=False),
+                status, json.dumps(headers, ensure_ascii=False), etag, last_modified,
+                sha256, codec, len(body), datetime.now().isoformat(),
+            ),
+        )
+        self.conn.commit()
+        return is_new
+
+    def lookup(self, url: str) -> sqlite3.Row | None:
+        return self.conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+
+    def mark_revalidated(self, url: str):
+        self.conn.execute(
+            "UPDATE pages SET revalidated_at = ? WHERE url = ?",
+            (datetime.now().isoformat(), url),
+        )
+        self.conn.commit()
+
+    def iter_pages(self, spider: str, since: str | None = None, limit: int | None = None):
+        """spider のアーカイブ済みページを取得日時順に返す"""
+        query = "SELECT * FROM pages WHERE spider = ?"
+        params: list = [spider]
+        if since:
+            query += " AND fetched_at >= ?"
+            params.append(since)
+        query += " ORDER BY fetched_at"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        yield from self.conn.execute(query, params).fetchall()
+
+
+def headers_to_dict(headers) -> dict[str, list[str]]:
+    """Scrapy Headers を JSON 保存可能な dict に変換"""
+    return {
+        k.decode("latin-1"): [v.decode("latin-1") for v in values]
+        for k, values in headers.items()
+    }
+
+
+def response_from_archive(entry: sqlite3.Row, body: bytes, request=None):
+    """アーカイブのエントリからレスポンスを復元 (HTML/JSON に応じたクラスを選択)"""
+    headers = Headers(json.loads(entry["headers"] or "{}"))
+    # 本文は展開済みで保存しているため圧縮関連ヘッダは除く
+    for name in ("Content-Encoding", "Content-Length", "Transfer-Encoding"):
+        headers.pop(name, None)
+    cls = responsetypes.from_args(headers=headers, url=entry["url"], body=body)
+    return cls(
+        url=entry["url"],
+        status=entry["status"],
+        headers=headers,
+        body=body,
+        request=request,
+        flags=["archived"],
+    )
@@ -0,0 +1,182 @@
+"""クロールのチェックポイントと再開
+
+systemd のタイムアウトや再起動でクロールが中断しても、次回の実行が
+最後に処理を終えたページの続きから再開できるよう、実行ごとに以下をDBに残す。
+
+- crawl_frontier: スケジュールしたリクエストと、コールバック処理済みかどうか
+- crawl_seen: 一覧で確認した (source, source_id)。再開をまたいで掲載終了検出に使う
+  (賃料のない物件はパイプラインで保存されないため、従来どおり確認済みに含めない)
+
+ページごとの「処理済み」「後続リクエスト (次ページ)」「確認済み物件」はメモリに溜め、
+CRAWL_CHECKPOINT_BATCH_PAGES ページごとに1トランザクションで記録する
+(リアクタースレッドでページごとに commit しない)。中断時に未記録だった分は
+再開時にもう一度取得される。再開時は未処理のリクエストだけを開始リクエストとして投入する。
+リダイレクト先が重複除外で捨てられた場合は、元のリクエストを処理済みにする。
+実行の開始・終了と再開判定は CrawlRunRecorder (src.scraper.extensions) が行う。
+"""
+
+import logging
+import pickle
+
+from scrapy import Request, signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.request import request_from_dict
+
+from src.database.models import init_db
+from src.database.repository import CrawlCheckpointRepository
+from src.scraper.pipelines import load_db_path
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_META = "checkpoint_fingerprint"
+
+
+class CrawlCheckpointMiddleware:
+    """スパイダーの入出力からフロンティアと確認済み物件を記録するスパイダーミドルウェア"""
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.conn = None
+        self.repo: CrawlCheckpointRepository | None = None
+        self.batch_pages = crawler.settings.getint("CRAWL_CHECKPOINT_BATCH_PAGES", 20)
+        self.run_id: int | None = None
+        self.done: list[str] = []
+        self.new_requests: list[tuple[str, bytes]] = []
+        self.seen: list[tuple[str, str]] = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("CRAWL_CHECKPOINT_ENABLED", True):
+            raise NotConfigured
+        mw = cls(crawler)
+        # 掲載終了検出 (CrawlRunRecorder の spider_closed) より前に書き出すため idle でも flush する
+        crawler.signals.connect(mw.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(mw.request_dropped, signal=signals.request_dropped)
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def _run_id(self, spider) -> int | None:
+        """チェックポイントの記録先 (再開時は最初の実行のid)"""
+        if getattr(spider, "is_replay", False):
+            return None
+        run_id = getattr(spider, "crawl_root_run_id", None)
+        if run_id is not None and self.repo is None:
+            self.conn = init_db(load_db_path(self.crawler.settings))
+            self.repo = CrawlCheckpointRepository(self.conn)
+        return run_id
+
+    def _serialize(self, requests: list, spider) -> list[tuple[str, bytes]]:
+        rows = []
+        for request in requests:
+            try:
+                blob = pickle.dumps(
+                    request.to_dict(spider=spider), protocol=pickle.HIGHEST_PROTOCOL
+                )
+            except (ValueError, TypeError, pickle.PicklingError):
+                continue  # スパイダーのメソッド以外のコールバック等は記録しない
+            rows.append((request.meta[FINGERPRINT_META], blob))
+        return rows
+
+    def _fingerprint(self, request) -> str:
+        return self.crawler.request_fingerprinter.fingerprint(request).hex()
+
+    def _tag(self, request) -> None:
+        """記録する行のフィンガープリントを meta に残す (リダイレクト後も元の行を完了できる)"""
+        request.meta[FINGERPRINT_META] = self._fingerprint(request)
+
+    async def process_start(self, start):
+        spider = self.crawler.spider
+        run_id = self._run_id(spider)
+        if run_id is not None and getattr(spider, "crawl_resuming", False):
+            pending = self.repo.pending_requests(run_id)
+            if pending:
+                progress = self.repo.progress(run_id)
+                logger.info(
+                    f"チェックポイントから再開: run_id={run_id} "
+                    f"処理済み {progress['done']}/{progress['total']}ページ, "
+                    f"未処理 {len(pending)}件"
+                )
+                self.stats.set_value("checkpoint/resumed_requests", len(pending))
+                for blob in pending:
+                    yield request_from_dict(pickle.loads(blob), spider=spider)
+                return
+            logger.info(f"run_id={run_id} に未処理のリクエストがないため最初から実行")
+
+        async for request in start:
+            if run_id is not None and isinstance(request, Request):
+                self._tag(request)
+                self.new_requests.extend(self._serialize([request], spider))
+            yield request
+
+    def process_spider_output(self, response, result, spider=None):
+        spider = spider or self.crawler.spider
+        run_id = self._run_id(spider)
+        if run_id is None:
+            yield from result
+            return
+        requests, seen = [], []
+        for output in result:
+            self._collect(output, requests, seen)
+            yield output
+        self._complete(run_id, response, requests, seen, spider)
+
+    async def process_spider_output_async(self, response, result, spider=None):
+        spider = spider or self.crawler.spider
+        run_id = self._run_id(spider)
+        requests, seen = [], []
+        async for output in result:
+            if run_id is not None:
+                self._collect(output, requests, seen)
+            yield output
+        if run_id is not None:
+            self._complete(run_id, response, requests, seen, spider)
+
+    def _collect(self, output, requests: list, seen: list):
+        if isinstance(output, Request):
+            self._tag(output)
+            requests.append(output)
+        elif hasattr(output, "get"):
+            source, source_id = output.get("source"), output.get("source_id")
+            if source and source_id and output.get("rent") is not None:
+                seen.append((source, source_id))
+
+    def _complete(self, run_id: int, response, requests: list, seen: list, spider):
+        request = response.request
+        if request is None:
+            return
+        self.run_id = run_id
+        self.done.append(request.meta.get(FINGERPRINT_META) or self._fingerprint(request))
+        self.new_requests.extend(self._serialize(requests, spider))
+        self.seen.extend(seen)
+        self.stats.inc_value("checkpoint/pages_done")
+        if len(self.done) >= self.batch_pages:
+            self.flush()
+
+    def request_dropped(self, request, spider):
+        """重複除外で捨てられたリダイレクト先 → 元のリクエストは処理済み (行き先は取得済み)"""
+        fingerprint = request.meta.get(FINGERPRINT_META)
+        if fingerprint is None or self._run_id(spider) is None:
+            return
+        if fingerprint != self._fingerprint(request):
+            self.run_id = spider.crawl_root_run_id
+            self.done.append(fingerprint)
+            self.stats.inc_value("checkpoint/dropped_done")
+
+    def flush(self):
+        """溜めたページの完了・後続リクエスト・確認済み物件を1トランザクションで記録"""
+        if self.repo is None or not (self.done or self.new_requests or self.seen):
+            return
+        run_id = self.run_id if self.run_id is not None else self.crawler.spider.crawl_root_run_id
+        self.repo.complete(run_id, self.done, self.new_requests, self.seen)
+        self.done, self.new_requests, self.seen = [], [], []
+
+    def spider_idle(self, spider):
+        self.flush()
+
+    def spider_closed(self, spider):
+        if self.conn:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+            self.repo = None
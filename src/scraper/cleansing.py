@@ -0,0 +1,164 @@
+"""物件データのクレンジング関数とフィールド定義
+
+正規表現はモジュール読み込み時にコンパイルし、全角数字・記号や単位の除去は
+str.translate の変換テーブルで1パスで行う。一覧ページの表記 (「1ヶ月」「5.5万円」等) は
+種類が限られるため、文字列からの変換結果は LRU キャッシュする。
+DataCleansingPipeline は FIELD_PARSERS の定義に従って各フィールドを変換する。
+
+旧実装 (DataCleansingPipeline._parse_* の str.replace) より受け付ける表記が広い:
+「ケ月」、全角数字・記号 (「２ヶ月」「６２，０００円」「３０ｍ２」)、
+長音記号「ー」(「-」と同じくなし扱い)。
+"""
+
+import re
+from functools import lru_cache
+
+# 全角数字・記号 → 半角
+_FULLWIDTH = str.maketrans("０１２３４５６７８９．，－ー／", "0123456789.,--/")
+
+# 金額: 全角→半角 + 桁区切り・通貨記号の除去
+_PRICE_TABLE = str.maketrans({
+    **{k: v for k, v in _FULLWIDTH.items()},
+    ord(","): None, ord("，"): None, ord("円"): None, ord("¥"): None, ord("￥"): None,
+})
+_PRICE_MAN_RE = re.compile(r"([\d.]+)\s*万")
+_LEADING_INT_RE = re.compile(r"(\d+)")
+
+# 月数: 「1ヶ月」「1ヵ月」「1カ月」「1ケ月」
+_MONTHS_RE = re.compile(r"[ヶヵカケ]月")
+_MONTHS_NONE = frozenset(("なし", "無", "-", "0"))
+
+# 面積: 単位・桁区切り・「約」の除去
+_AREA_TABLE = str.maketrans({
+    **{k: v for k, v in _FULLWIDTH.items()},
+    ord("㎡"): None, ord(","): None, ord("，"): None, ord("約"): None,
+})
+_AREA_UNIT_RE = re.compile(r"[mｍ][²2]")
+
+# 分数: 「10分」「10min」
+_MINUTES_RE = re.compile(r"分|min")
+
+_ROOM_COUNT_RE = re.compile(r"(\d+)")
+_MUNICIPALITY_RE = re.compile(r"(?:沖縄県)?(\S+?[市町村])")
+
+# 専有面積として妥当な範囲 (一般的な賃貸は5〜300㎡)
+AREA_MIN = 5
+AREA_MAX = 300
+
+
+_CACHE_SIZE = 4096
+
+
+def parse_price(value) -> int | None:
+    """「5.5万円」「50,000円」→ 円単位の整数"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    return _price_from_str(str(value))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _price_from_str(value: str) -> int | None:
+    s = value.translate(_PRICE_TABLE).strip()
+    m = _PRICE_MAN_RE.match(s)
+    if m:
+        return int(float(m.group(1)) * 10000)
+    m = _LEADING_INT_RE.match(s)
+    if m:
+        return int(m.group(1))
+    return None
+
+
+def parse_months(value) -> float:
+    """「1ヶ月」→ 1.0 (なし・不明は 0.0)"""
+    if value is None or value == "" or value == "-":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _months_from_str(str(value))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _months_from_str(value: str) -> float:
+    s = _MONTHS_RE.sub("", value.translate(_FULLWIDTH)).strip()
+    if s in _MONTHS_NONE:
+        return 0.0
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+
+def parse_area(value) -> float | None:
+    """「約25.5㎡」→ 25.5 (範囲外は None)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _area_from_str(str(value))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _area_from_str(value: str) -> float | None:
+    s = _AREA_UNIT_RE.sub("", value.translate(_AREA_TABLE)).strip()
+    try:
+        v = float(s)
+    except ValueError:
+        return None
+    if v < AREA_MIN or v > AREA_MAX:
+        return None
+    return v
+
+
+def parse_minutes(value) -> int | None:
+    """「10分」→ 10"""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    return _minutes_from_str(str(value))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _minutes_from_str(value: str) -> int | None:
+    s = _MINUTES_RE.sub("", value.translate(_FULLWIDTH)).strip()
+    try:
+        return int(s)
+    except ValueError:
+        return None
+
+
+def extract_room_count(floor_plan: str) -> int:
+    m = _ROOM_COUNT_RE.match(floor_plan)
+    return int(m.group(1)) if m else 1
+
+
+def extract_municipality(address: str) -> str | None:
+    """住所文字列から沖縄県内の市町村名を抽出 (「沖縄県那覇市xxx」→「那覇市」)"""
+    m = _MUNICIPALITY_RE.search(address)
+    return m.group(1) if m else None
+
+
+def _management_fee(value) -> int:
+    return parse_price(value) or 0
+
+
+# 常に変換するフィールド (未取得の場合も変換結果 (None/0) を設定する)
+FIELD_PARSERS = (
+    ("rent", parse_price),
+    ("management_fee", _management_fee),
+    ("deposit_months", parse_months),
+    ("key_money_months", parse_months),
+    ("area_sqm", parse_area),
+    ("station_walk_minutes", parse_minutes),
+)
+
+# 設備フラグ (取得済みのものだけ 0/1 に正規化)
+EQUIPMENT_FIELDS = (
+    "has_aircon", "has_auto_lock", "has_delivery_box", "has_bath_dryer",
+    "has_reheating", "has_washstand", "has_indoor_laundry", "has_internet",
+    "has_fiber", "has_bath_toilet_separate", "has_flooring", "has_pet_ok",
+)
+
+PARKING_NONE = frozenset(("なし", "無", ""))
@@ -0,0 +1,123 @@
+"""Scrapy拡張 - クロール実行の記録"""
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from src.database.models import init_db
+from src.database.repository import (
+    CrawlCheckpointRepository,
+    CrawlRunRepository,
+    PropertyRepository,
+)
+from src.scraper.incremental import IncrementalCrawlMixin
+from src.scraper.pipelines import load_db_path
+
+
+class CrawlRunRecorder:
+    """クロール実行 (crawl_runs) の開始・終了を記録
+
+    物件ごとの last_seen_at は SQLitePipeline の upsert で更新されるため、
+    crawl_runs の開始時刻と組み合わせて掲載ライフサイクルを追跡できる。
+
+    直近の実行が中断していれば (CRAWL_RESUME_MAX_AGE_HOURS 以内・同じクロールモード)、
+    そのチェックポイントから再開する (src.scraper.checkpoint)。
+    掲載終了検出 (mark_inactive) は全件クロールが正常終了した実行でのみ、
+    再開前の分も含めた確認済み物件 (crawl_seen) を使って行う。
+    CRAWL_CHECKPOINT_ENABLED が無効なら再開はせず、この実行で保存した物件を確認済みとする。
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.conn = None
+        self.repo = None
+        self.run_id = None
+        self.root_run_id = None
+        self.item_count = 0
+        self.checkpoint_enabled = crawler.settings.getbool("CRAWL_CHECKPOINT_ENABLED", True)
+        # チェックポイント無効時の確認済み物件 (source → source_id のリスト)
+        self.seen: dict[str, list[str]] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("CRAWL_RUNS_ENABLED", True):
+            raise NotConfigured
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    def spider_opened(self, spider):
+        settings = self.crawler.settings
+        self.conn = init_db(load_db_path(settings))
+        self.repo = CrawlRunRepository(self.conn)
+        crawl_mode = spider.get_crawl_mode() if isinstance(spider, IncrementalCrawlMixin) else None
+
+        # 前回の実行が終了を記録せずに止まっていれば中断扱い
+        self.repo.abandon_running(spider.name)
+        resumed_from = None
+        resumable = (
+            self.checkpoint_enabled
+            and settings.getbool("CRAWL_RESUME_ENABLED", True)
+            and not getattr(spider, "is_replay", False)
+        )
+        if resumable:
+            resumed_from = self.repo.find_resumable(
+                spider.name, crawl_mode, settings.getfloat("CRAWL_RESUME_MAX_AGE_HOURS", 20)
+            )
+        self.run_id = self.repo.start_run(spider.name, crawl_mode, resumed_from)
+        self.root_run_id = resumed_from or self.run_id
+        # 再開しない古いチェックポイントは破棄
+        CrawlCheckpointRepository(self.conn).clear(spider.name, keep_run_id=self.root_run_id)
+
+        spider.crawl_run_id = self.run_id
+        spider.crawl_root_run_id = self.root_run_id
+        spider.crawl_resuming = resumed_from is not None
+        if resumed_from:
+            self.crawler.stats.set_value("checkpoint/resumed_from", resumed_from)
+        spider.logger.info(
+            f"クロール実行開始: run_id={self.run_id}"
+            + (f" (run_id={resumed_from} から再開)" if resumed_from else "")
+        )
+
+    def item_scraped(self, item, spider):
+        self.item_count += 1
+        if self.checkpoint_enabled:
+            return
+        # 賃料のない物件は保存されないため、crawl_seen と同様に確認済みに含めない
+        source, source_id = item.get("source"), item.get("source_id")
+        if source and source_id and item.get("rent") is not None:
+            self.seen.setdefault(source, []).append(source_id)
+
+    def spider_closed(self, spider, reason):
+        if not self.repo:
+            return
+        status = "completed" if reason == "finished" else "interrupted"
+        self.repo.finish_run(self.run_id, status, reason, self.item_count)
+        spider.logger.info(
+            f"クロール実行終了: run_id={self.run_id} status={status} items={self.item_count}"
+        )
+        if status == "completed":
+            self._mark_inactive(spider)
+            CrawlCheckpointRepository(self.conn).clear(spider.name)
+        self.conn.close()
+
+    def _mark_inactive(self, spider):
+        """今回の実行で確認できなかった物件を非アクティブにする (掲載終了検出)
+
+        差分クロールは一覧を途中で打ち切るため、全件クロール時のみ実行 (再パース時も行わない)
+        """
+        if not isinstance(spider, IncrementalCrawlMixin):
+            return
+        if spider.is_incremental or spider.is_replay:
+            spider.logger.info("差分クロール/再パースのため掲載終了検出をスキップ")
+            return
+        if self.checkpoint_enabled:
+            seen = CrawlCheckpointRepository(self.conn).seen_ids(self.root_run_id)
+        else:
+            seen = self.seen
+        properties = PropertyRepository(self.conn)
+        for source, source_ids in seen.items():
+            count = properties.mark_inactive(source, source_ids)
+            if count:
+                spider.logger.info(f"掲載終了検出: {source} で {count}件を非アクティブ化")
@@ -0,0 +1,294 @@
+"""SUUMO / HOME'S 一覧ページの高速パーサ
+
+スパイダーの parsel セレクタ実装 (_parse_list_selectors) と同じ抽出結果を返す。
+CSSセレクタはモジュール読み込み時に parsel と同じ変換で XPath にし、
+lxml.etree.XPath としてコンパイルしておく。パース済みの lxml ツリー
+(response.selector.root) を物件ブロックごとに1回ずつ辿り、Selector オブジェクトを
+生成せずに文字列を取り出す。
+
+設定 FAST_PARSERS_ENABLED = False で従来のセレクタ実装に戻せる。
+"""
+
+import re
+
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
+
+from src.scraper.items import RentalPropertyItem
+
+_translator = HTMLTranslator()
+
+
+def _css(query: str) -> etree.XPath:
+    """CSSセレクタを parsel と同じ規則で XPath に変換してコンパイル"""
+    return etree.XPath(_translator.css_to_xpath(query), smart_strings=False)
+
+
+def _first(xpath: etree.XPath, node, default: str = "") -> str:
+    result = xpath(node)
+    return str(result[0]) if result else default
+
+
+def _all(xpath: etree.XPath, nodes) -> list:
+    """SelectorList.css と同様に複数ノードの結果を連結"""
+    return [r for node in nodes for r in xpath(node)]
+
+
+def fast_parsers_enabled(spider) -> bool:
+    settings = getattr(spider, "settings", None)
+    if settings is None:
+        return True
+    return settings.getbool("FAST_PARSERS_ENABLED", True)
+
+
+# --- SUUMO ---
+_SUUMO_CASSETTE = _css("div.cassetteitem")
+_SUUMO_TITLE = _css("div.cassetteitem_content-title::text")
+_SUUMO_LABEL = _css("div.cassetteitem_content-label span::text")
+_SUUMO_ADDRESS = _css("li.cassetteitem_detail-col1::text")
+_SUUMO_TRANSPORT = _css("li.cassetteitem_detail-col2 div.cassetteitem_detail-text::text")
+_SUUMO_COL3 = _css("li.cassetteitem_detail-col3 div::text")
+_SUUMO_ROWS = _css("table.cassetteitem_other tbody tr.js-cassette_link")
+_SUUMO_TD = _css("td")
+_SUUMO_TEXT = _css("::text")
+_SUUMO_RENT = _css("span.cassetteitem_price--rent span.cassetteitem_other-emphasis::text")
+_SUUMO_RENT_FALLBACK = _css("span.cassetteitem_price--rent ::text")
+_SUUMO_ADMIN = _css("span.cassetteitem_price--administration::text")
+_SUUMO_DEPOSIT = _css("span.cassetteitem_price--deposit::text")
+_SUUMO_GRATUITY = _css("span.cassetteitem_price--gratuity::text")
+_SUUMO_MADORI = _css("span.cassetteitem_madori::text")
+_SUUMO_MENSEKI = _css("span.cassetteitem_menseki ::text")
+_SUUMO_DETAIL = _css("a.js-cassette_link_href::attr(href)")
+_SUUMO_DETAIL_FALLBACK = _css("a[href*='/chintai/jnc_']::attr(href)")
+_SUUMO_NEXT = _css("p.pagination-parts a:contains('次へ')::attr(href)")
+_SUUMO_JNC_RE = re.compile(r"jnc_(\w+)")
+
+
+def parse_suumo_list(spider, response) -> tuple[list[RentalPropertyItem], str | None]:
+    """SuumoSpider._parse_list_selectors と同じ結果を返す高速版"""
+    root = response.selector.root
+    page_items = []
+
+    for cassette in _SUUMO_CASSETTE(root):
+        building_name = _first(_SUUMO_TITLE, cassette).strip()
+        property_type = _first(_SUUMO_LABEL, cassette).strip()
+        address = _first(_SUUMO_ADDRESS, cassette).strip()
+
+        transport_text = ""
+        for t in _SUUMO_TRANSPORT(cassette):
+            t = t.strip()
+            if t:
+                transport_text = t
+                break
+
+        col3_divs = _SUUMO_COL3(cassette)
+        building_age_text = col3_divs[0].strip() if len(col3_divs) > 0 else ""
+        total_floors_text = col3_divs[1].strip() if len(col3_divs) > 1 else ""
+
+        # 建物単位の値は部屋ごとに同じなので1回だけ計算
+        building_year = (
+            spider._parse_building_year(building_age_text) if building_age_text else None
+        )
+        total_floors = spider._parse_total_floors(total_floors_text)
+        transport = spider._parse_transport(transport_text) if transport_text else None
+
+        for row in _SUUMO_ROWS(cassette):
+            item = RentalPropertyItem()
+            item["source"] = "suumo"
+            item["name"] = building_name
+            item["property_type"] = property_type
+            item["address"] = address
+            if building_age_text:
+                item["building_year"] = building_year
+            if total_floors:
+                item["total_floors"] = total_floors
+            if transport:
+                station, minutes, t_type = transport
+                item["nearest_station"] = station
+                item["station_walk_minutes"] = minutes
+                item["transport_type"] = t_type
+
+            tds = _SUUMO_TD(row)
+
+            floor_text = _first(_SUUMO_TEXT, tds[2]).strip() if len(tds) > 2 else ""
+            if floor_text:
+                item["floor_number"], _ = spider._parse_floors(floor_text)
+
+            if len(tds) > 3:
+                td = tds[3]
+                item["rent"] = _first(_SUUMO_RENT, td).strip()
+                if not item["rent"]:
+                    item["rent"] = _first(_SUUMO_RENT_FALLBACK, td).strip()
+                item["management_fee"] = _first(_SUUMO_ADMIN, td).strip()
+
+            if len(tds) > 4:
+                item["deposit_months"] = _first(_SUUMO_DEPOSIT, tds[4]).strip()
+                item["key_money_months"] = _first(_SUUMO_GRATUITY, tds[4]).strip()
+
+            if len(tds) > 5:
+                item["floor_plan"] = _first(_SUUMO_MADORI, tds[5]).strip()
+                item["area_sqm"] = "".join(_SUUMO_MENSEKI(tds[5])).strip()
+
+            detail_link = _first(_SUUMO_DETAIL, row, None)
+            if not detail_link:
+                detail_link = _first(_SUUMO_DETAIL_FALLBACK, row, None)
+
+            if detail_link:
+                item["source_url"] = response.urljoin(detail_link)
+                m = _SUUMO_JNC_RE.search(detail_link)
+                item["source_id"] = m.group(1) if m else detail_link.rstrip("/").split("/")[-1]
+            else:
+                item["source_id"] = f"suumo_{building_name}_{floor_text}".replace(" ", "")
+                item["source_url"] = response.url
+
+            page_items.append(item)
+
+    return page_items, _first(_SUUMO_NEXT, root, None)
+
+
+# --- HOME'S ---
+_HOMES_BUILDING = _css("div.mod-mergeBuilding--rent--photo")
+_HOMES_NAME = _css("span.bukkenName::text")
+_HOMES_TYPE = _css("span.bType::text")
+_HOMES_SPEC_ROWS = _css("div.bukkenSpec table tr")
+_HOMES_TH = _css("th::text")
+_HOMES_TD = _css("td::text")
+_HOMES_STATION = _css("span.prg-stationText::text")
+_HOMES_ROOMS = _css("table.unitSummary tbody.prg-roomList tr.prg-room.prg-roomInfo")
+_HOMES_ROOMS_FALLBACK = _css("tr.prg-room[data-href]")
+_HOMES_KAISUU = _css("li.roomKaisuu::text")
+_HOMES_PRICE = _css("td.price")
+_HOMES_NUM = _css("span.num::text")
+_HOMES_LABEL = _css("span[id^='label-'] ::text")
+_HOMES_TEXT = _css("::text")
+_HOMES_LAYOUT = _css("td.layout")
+_HOMES_DETAIL = _css("td.detail a.prg-detailAnchor::attr(href)")
+_HOMES_KEYWORDS_ROW = etree.XPath(
+    "following-sibling::tr[contains(@class,'prg-relatedKeywordsRow')][1]", smart_strings=False
+)
+_HOMES_KEYWORDS = _css("li.relatedKeyword span::text")
+_HOMES_NEXT = _css("div.mod-listPaging li.nextPage a::attr(href)")
+_HOMES_FLOORS_RE = re.compile(r"(\d+)階建")
+_HOMES_FLOOR_RE = re.compile(r"(\d+)階")
+_HOMES_MGMT_RE = re.compile(r"/\s*([\d,]+円|-)")
+_HOMES_DEPOSIT_RE = re.compile(r"([^\s/]+)/([^\s/]+)/([^\s/]+)/([^\s/]+)\s*$")
+_HOMES_SPLIT_RE = re.compile(r"\s+")
+_HOMES_ROOM_ID_RE = re.compile(r"/room/([^/]+)/")
+_HOMES_B_ID_RE = re.compile(r"b-(\d+)")
+
+
+def parse_homes_list(spider, response) -> tuple[list[RentalPropertyItem], str | None]:
+    """HomesSpider._parse_list_selectors と同じ結果を返す高速版"""
+    root = response.selector.root
+    page_items = []
+
+    for building in _HOMES_BUILDING(root):
+        building_name = _first(_HOMES_NAME, building).strip()
+        building_type = _first(_HOMES_TYPE, building).strip()
+
+        address = ""
+        age_text = ""
+        for row in _HOMES_SPEC_ROWS(building):
+            th_text = _first(_HOMES_TH, row).strip()
+            td_text = _first(_HOMES_TD, row).strip()
+            if "所在地" in th_text:
+                address = td_text
+            elif "築年数" in th_text or "階数" in th_text:
+                age_text = td_text
+
+        primary_transport = ""
+        for t in _HOMES_STATION(building):
+            t = t.strip()
+            if t:
+                primary_transport = t
+                break
+
+        building_year = None
+        total_floors = None
+        if age_text:
+            building_year = spider._parse_building_age(age_text)
+            m = _HOMES_FLOORS_RE.search(age_text)
+            if m:
+                total_floors = int(m.group(1))
+
+        transport = spider._parse_transport(primary_transport) if primary_transport else None
+
+        room_rows = _HOMES_ROOMS(building) or _HOMES_ROOMS_FALLBACK(building)
+
+        for room_row in room_rows:
+            item = RentalPropertyItem()
+            item["source"] = "homes"
+            item["name"] = building_name
+            item["property_type"] = building_type
+            item["address"] = address
+            if building_year:
+                item["building_year"] = building_year
+            if total_floors:
+                item["total_floors"] = total_floors
+            if transport:
+                station, minutes, t_type = transport
+                item["nearest_station"] = station
+                item["station_walk_minutes"] = minutes
+                item["transport_type"] = t_type
+
+            floor_text = _first(_HOMES_KAISUU, room_row)
+            if floor_text:
+                m = _HOMES_FLOOR_RE.search(floor_text)
+                if m:
+                    item["floor_number"] = int(m.group(1))
+
+            price_cells = _HOMES_PRICE(room_row)
+            if price_cells:
+                rent_num = next(iter(_all(_HOMES_NUM, price_cells)), "")
+                if rent_num:
+                    item["rent"] = f"{rent_num.strip()}万円"
+
+                full_price_text = "".join(_all(_HOMES_LABEL, price_cells))
+                mgmt_match = _HOMES_MGMT_RE.search(full_price_text)
+                if mgmt_match:
+                    item["management_fee"] = mgmt_match.group(1).strip()
+
+                all_text = " ".join(_all(_HOMES_TEXT, price_cells)).strip()
+                deposit_match = _HOMES_DEPOSIT_RE.search(all_text)
+                if deposit_match:
+                    deposit = deposit_match.group(1)
+                    key_money = deposit_match.group(2)
+                    if deposit and deposit != "無" and deposit != "-":
+                        item["deposit_months"] = deposit
+                    if key_money and key_money != "無" and key_money != "-":
+                        item["key_money_months"] = key_money
+
+            layout_cells = _HOMES_LAYOUT(room_row)
+            if layout_cells:
+                layout_full = " ".join(
+                    t.strip() for t in _all(_HOMES_TEXT, layout_cells) if t.strip()
+                )
+                parts = _HOMES_SPLIT_RE.split(layout_full, maxsplit=1)
+                if parts:
+                    item["floor_plan"] = parts[0]
+                if len(parts) > 1:
+                    item["area_sqm"] = parts[1]
+
+            detail_href = _first(_HOMES_DETAIL, room_row, None)
+            if not detail_href:
+                detail_href = room_row.get("data-href", "")
+            if detail_href:
+                item["source_url"] = response.urljoin(detail_href)
+                m = _HOMES_ROOM_ID_RE.search(detail_href)
+                if m:
+                    item["source_id"] = m.group(1)
+                else:
+                    m = _HOMES_B_ID_RE.search(detail_href)
+                    item["source_id"] = m.group(1) if m else detail_href.rstrip("/").split("/")[-1]
+            else:
+                item["source_id"] = f"homes_{building_name}_{floor_text}"
+                item["source_url"] = response.url
+
+            keywords_rows = _HOMES_KEYWORDS_ROW(room_row)
+            if keywords_rows:
+                keywords = _all(_HOMES_KEYWORDS, keywords_rows)
+                spider._parse_equipment(item, " ".join(kw.strip() for kw in keywords))
+
+            page_items.append(item)
+
+    return page_items, _first(_HOMES_NEXT, root, None)
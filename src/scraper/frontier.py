@@ -0,0 +1,370 @@
+"""SQLiteを使った共有クロールフロンティア (複数プロセスでの分散クロール)
+
+同じスパイダーを複数のプロセスで起動し、1つのフロンティア (data/frontier.db) から
+リクエストを取り合って処理する。Scrapy のスケジューラとして差し込む。
+
+    python -m src.scraper.runner --spider suumo --workers 3
+    scrapy crawl suumo -s SCHEDULER=src.scraper.frontier.SharedFrontierScheduler \
+        -s FRONTIER_CRAWL_ID=suumo-20261019 -s FRONTIER_WORKERS=3 -s FRONTIER_WORKER_INDEX=0
+
+- リース: 取り出したリクエストは FRONTIER_LEASE_SECONDS 秒のリースを付けて貸し出す。
+  ワーカーが異常終了してリースが切れたリクエストは他のワーカーが引き取る
+  (試行回数が FRONTIER_MAX_ATTEMPTS に達したものは諦める)。
+- 礼儀: ドメインごとの次回リクエスト可能時刻をフロンティアに持ち、貸し出し時に
+  全プロセス共通で間隔を空ける (間隔は scraping_targets.yaml の rate と
+  そのプロセスの現在のダウンロード間隔の長い方)。
+- シャード: スパイダーの frontier_shard(request) (例: SUUMO の市区町村コード) の
+  ハッシュで担当ワーカーを決め、自分の担当分を優先して取り出す。担当分がなければ
+  他のシャードも処理する (止まったワーカーの担当分が残らないように)。
+- 重複除外: (crawl_id, リクエストのフィンガープリント) で全プロセス共通に行う。
+  dont_filter でも再投入するのはフロンティアから取り出したリクエストのリトライだけで、
+  各ワーカーの開始リクエスト (うちなーらいふの件数確認等) は1回しか処理しない。
+- 完了: コールバックの出力を処理し終えた時点で処理済みにする (FrontierCompletionMiddleware)。
+  途中で異常終了したワーカーのページは、リース切れ後に他のワーカーが取り直す。
+
+フロンティアは crawl_id (既定: スパイダー名と日付) ごとに分かれる。同じ crawl_id で
+起動し直すと未完了のリクエストから続きを処理する。
+ローカルの SQLite ファイルを共有するため、同一ホスト上のプロセス間でのみ使う
+(複数ホストで使う場合は SharedFrontier と同じメソッドを持つネットワーク越しの実装に差し替える)。
+"""
+
+import logging
+import pickle
+import sqlite3
+import time
+import zlib
+from datetime import date
+from pathlib import Path
+
+from scrapy.core.scheduler import BaseScheduler
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.misc import load_object
+from scrapy.utils.request import request_from_dict
+
+from src.scraper.middlewares import load_rate_policies
+from src.scraper.pipelines import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+STATE_QUEUED = "queued"
+STATE_LEASED = "leased"
+STATE_DONE = "done"
+
+FRONTIER_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS frontier (
+    id INTEGER PRIMARY KEY,
+    crawl_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    shard TEXT,
+    shard_bucket INTEGER,               -- crc32(shard)、担当ワーカー = shard_bucket % ワーカー数
+    priority INTEGER NOT NULL DEFAULT 0,
+    request BLOB NOT NULL,              -- pickle(Request.to_dict())
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    enqueued_at REAL NOT NULL,
+    done_at REAL,
+    UNIQUE (crawl_id, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS idx_frontier_state ON frontier(crawl_id, state, priority);
+
+CREATE TABLE IF NOT EXISTS frontier_domains (
+    domain TEXT PRIMARY KEY,
+    next_at REAL NOT NULL,              -- この時刻まで次のリクエストを貸し出さない
+    interval REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def default_crawl_id(spider_name: str) -> str:
+    return f"{spider_name}-{date.today():%Y%m%d}"
+
+
+def shard_bucket(shard: str | None) -> int | None:
+    return zlib.crc32(shard.encode("utf-8")) if shard else None
+
+
+class SharedFrontier:
+    """複数プロセスで共有するフロンティア (1プロセスにつき1接続)"""
+
+    def __init__(self, db_path: str | Path, crawl_id: str, owner: str,
+                 lease_seconds: float = 300, max_attempts: int = 5):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.crawl_id = crawl_id
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # 貸し出しは BEGIN IMMEDIATE で直列化するため自動トランザクションは使わない
+        self.conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(FRONTIER_SCHEMA_SQL)
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, fingerprint: str, domain: str, request_blob: bytes, priority: int = 0,
+                shard: str | None = None, requeue: bool = False) -> bool:
+        """追加できれば True。既にあれば False (requeue=True なら再投入して True)"""
+        cursor = self.conn.execute(
+            """INSERT INTO frontier (crawl_id, fingerprint, domain, shard, shard_bucket,
+                                     priority, request, enqueued_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (crawl_id, fingerprint) DO NOTHING""",
+            (self.crawl_id, fingerprint, domain, shard, shard_bucket(shard),
+             priority, request_blob, time.time()),
+        )
+        if cursor.rowcount:
+            return True
+        if not requeue:
+            return False
+        # dont_filter のリクエスト (リトライ等) は処理済み・貸し出し中でも再投入する
+        self.conn.execute(
+            """UPDATE frontier SET state = ?, request = ?, priority = ?,
+                      lease_owner = NULL, lease_expires_at = NULL, done_at = NULL
+               WHERE crawl_id = ? AND fingerprint = ?""",
+            (STATE_QUEUED, request_blob, priority, self.crawl_id, fingerprint),
+        )
+        return True
+
+    def lease(self, workers: int = 1, worker_index: int = 0,
+              interval_for=None) -> tuple[int, bytes, bool] | None:
+        """次のリクエストを貸し出す → (id, request, 期限切れリースの引き取りか)
+
+        礼儀の間隔が空いていないドメインのリクエストは対象外。
+        interval_for(domain) で貸し出し後に空ける秒数を決める。
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                """SELECT f.id, f.request, f.domain, f.state FROM frontier f
+                   LEFT JOIN frontier_domains d ON d.domain = f.domain
+                   WHERE f.crawl_id = :crawl_id AND f.attempts < :max_attempts
+                     AND (f.state = 'queued' OR (f.state = 'leased' AND f.lease_expires_at < :now))
+                     AND COALESCE(d.next_at, 0) <= :now
+                   ORDER BY (f.shard_bucket % :workers = :index) DESC, f.priority DESC, f.id
+                   LIMIT 1""",
+                {"crawl_id": self.crawl_id, "max_attempts": self.max_attempts, "now": now,
+                 "workers": max(workers, 1), "index": worker_index},
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                """UPDATE frontier SET state = ?, attempts = attempts + 1,
+                          lease_owner = ?, lease_expires_at = ?
+                   WHERE id = ?""",
+                (STATE_LEASED, self.owner, now + self.lease_seconds, row["id"]),
+            )
+            interval = interval_for(row["domain"]) if interval_for else 0.0
+            self.conn.execute(
+                """INSERT INTO frontier_domains (domain, next_at, interval) VALUES (?, ?, ?)
+                   ON CONFLICT (domain) DO UPDATE SET next_at = excluded.next_at,
+                                                      interval = excluded.interval""",
+                (row["domain"], now + interval, interval),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row["id"], row["request"], row["state"] == STATE_LEASED
+
+    def complete(self, frontier_id: int, unless_fingerprint: str | None = None) -> None:
+        """自分が貸し出し中のリクエストを処理済みにする
+
+        unless_fingerprint と同じフィンガープリントの行 (リトライで再投入したもの) は除く。
+        """
+        self.conn.execute(
+            "UPDATE frontier SET state = ?, done_at = ?, lease_expires_at = NULL "
+            "WHERE id = ? AND state = ? AND lease_owner = ? AND fingerprint IS NOT ?",
+            (STATE_DONE, time.time(), frontier_id, STATE_LEASED, self.owner, unless_fingerprint),
+        )
+
+    def has_pending(self) -> bool:
+        """未処理 (他のワーカーが貸し出し中を含む) のリクエストがあるか
+
+        貸し出し中のページからも次のページが追加されうるため、それが終わるまで待つ。
+        """
+        return self.conn.execute(
+            """SELECT 1 FROM frontier WHERE crawl_id = ? AND attempts < ?
+                 AND state IN ('queued', 'leased') LIMIT 1""",
+            (self.crawl_id, self.max_attempts),
+        ).fetchone() is not None
+
+    def counts(self) -> dict[str, int]:
+        rows = self.conn.execute(
+            "SELECT state, COUNT(*) AS n FROM frontier WHERE crawl_id = ? GROUP BY state",
+            (self.crawl_id,),
+        ).fetchall()
+        return {row["state"]: row["n"] for row in rows}
+
+    def purge(self, keep_days: int = 7) -> int:
+        """古い crawl_id の行を削除"""
+        cursor = self.conn.execute(
+            "DELETE FROM frontier WHERE enqueued_at < ?", (time.time() - keep_days * 86400,)
+        )
+        return cursor.rowcount
+
+
+class SharedFrontierScheduler(BaseScheduler):
+    """SharedFrontier を使う Scrapy スケジューラ
+
+    リトライは dont_filter 付きで再投入されるため、同じ行が未処理に戻る。
+    リダイレクト先は別の行として追加し、元の行はその時点で処理済みにする。
+    礼儀の間隔待ちで貸し出せないときは None を返し、エンジンのハートビート (5秒) や
+    他のダウンロード完了時に再度取り出しを試みる。
+    """
+
+    def __init__(self, crawler, frontier: SharedFrontier, workers: int, worker_index: int):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.frontier = frontier
+        self.workers = workers
+        self.worker_index = worker_index
+        self.spider = None
+        self.policies = load_rate_policies()
+        self.fallback_interval = crawler.settings.getfloat("DOWNLOAD_DELAY", 0)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        spidercls = crawler.spidercls
+        workers = settings.getint("FRONTIER_WORKERS", 1)
+        worker_index = settings.getint("FRONTIER_WORKER_INDEX", 0)
+        crawl_id = settings.get("FRONTIER_CRAWL_ID") or default_crawl_id(spidercls.name)
+        frontier = SharedFrontier(
+            PROJECT_ROOT / settings.get("FRONTIER_DB_PATH", "data/frontier.db"),
+            crawl_id,
+            owner=f"{crawl_id}#{worker_index}",
+            lease_seconds=settings.getfloat("FRONTIER_LEASE_SECONDS", 300),
+            max_attempts=settings.getint("FRONTIER_MAX_ATTEMPTS", 5),
+        )
+        return cls(crawler, frontier, workers, worker_index)
+
+    def open(self, spider):
+        self.spider = spider
+        logger.info(
+            f"共有フロンティア: crawl_id={self.frontier.crawl_id} "
+            f"ワーカー {self.worker_index + 1}/{self.workers}, 状態 {self.frontier.counts()}"
+        )
+
+    def close(self, reason):
+        counts = self.frontier.counts()
+        for state, n in counts.items():
+            self.stats.set_value(f"frontier/{state}", n)
+        logger.info(f"共有フロンティア終了 ({reason}): {counts}")
+        self.frontier.close()
+
+    def __len__(self) -> int:
+        return self.frontier.counts().get(STATE_QUEUED, 0)
+
+    def has_pending_requests(self) -> bool:
+        return self.frontier.has_pending()
+
+    def enqueue_request(self, request) -> bool:
+        try:
+            blob = pickle.dumps(
+                request.to_dict(spider=self.spider), protocol=pickle.HIGHEST_PROTOCOL
+            )
+        except (ValueError, TypeError, pickle.PicklingError):
+            logger.warning(f"フロンティアに保存できないリクエストを破棄: {request}")
+            self.stats.inc_value("frontier/unserializable")
+            return False
+        shard_fn = getattr(self.spider, "frontier_shard", None)
+        shard = request.meta.get("frontier_shard") or (shard_fn(request) if shard_fn else None)
+        fingerprint = self.crawler.request_fingerprinter.fingerprint(request).hex()
+        # フロンティアから取り出したリクエストから作られた (リトライ・リダイレクト) か
+        origin = request.meta.get("frontier_id")
+        added = self.frontier.enqueue(
+            fingerprint,
+            urlparse_cached(request).hostname or "",
+            blob,
+            priority=request.priority,
+            shard=shard,
+            requeue=request.dont_filter and origin is not None,
+        )
+        if origin is not None:
+            # リダイレクト: 続きは新しい行で処理するため元の行は処理済み (リトライは同じ行)
+            self.frontier.complete(origin, unless_fingerprint=fingerprint)
+        self.stats.inc_value("frontier/enqueued" if added else "frontier/duplicates")
+        return added
+
+    def next_request(self):
+        leased = self.frontier.lease(self.workers, self.worker_index, self._interval)
+        if leased is None:
+            return None
+        frontier_id, blob, reclaimed = leased
+        request = request_from_dict(pickle.loads(blob), spider=self.spider)
+        request.meta["frontier_id"] = frontier_id
+        self.stats.inc_value("frontier/leased")
+        if reclaimed:
+            self.stats.inc_value("frontier/reclaimed")
+            logger.info(f"期限切れのリースを引き取り: {request.url}")
+        return request
+
+    def complete(self, request) -> None:
+        frontier_id = request.meta.get("frontier_id")
+        if frontier_id is not None:
+            self.frontier.complete(frontier_id)
+
+    def _interval(self, domain: str) -> float:
+        """ドメインの礼儀の間隔 (rate 設定とこのプロセスの現在のダウンロード間隔の長い方)"""
+        policy = next(
+            (p for d, p in self.policies.items() if domain == d or domain.endswith("." + d)),
+            self.policies.get("*"),
+        )
+        interval = self.fallback_interval
+        if policy and policy.get("requests_per_minute"):
+            interval = max(interval, 60.0 / float(policy["requests_per_minute"]))
+        slot = self.crawler.engine.downloader.slots.get(domain)
+        if slot is not None:
+            interval = max(interval, slot.delay)
+        return interval
+
+
+class FrontierCompletionMiddleware:
+    """共有フロンティアのリクエストを処理し終えた時点で処理済みにする
+
+    スパイダーミドルウェアとして、コールバック (またはエラー処理) の出力を最後まで
+    渡し終えてから完了にする。ダウンロード前に完了にすると、コールバック中に
+    異常終了したページの後続リクエストが失われる。
+    ダウンローダーミドルウェアとしては、リトライ (550) を使い切った後の例外
+    (タイムアウト・robots.txt での除外等) で完了にする。errback のない失敗は
+    スパイダーミドルウェアを通らず、リース切れまで他のワーカーを待たせるため。
+    SharedFrontierScheduler 以外のスケジューラでは無効。
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        # BaseScheduler の issubclass はメソッドの有無だけを見るため、継承関係で判定する
+        scheduler_cls = load_object(crawler.settings["SCHEDULER"])
+        if SharedFrontierScheduler not in scheduler_cls.__mro__:
+            raise NotConfigured
+        return cls(crawler)
+
+    def _complete(self, request) -> None:
+        if request is not None:
+            self.crawler.engine.scheduler.complete(request)
+
+    def process_spider_output(self, response, result, spider=None):
+        yield from result
+        self._complete(response.request)
+
+    async def process_spider_output_async(self, response, result, spider=None):
+        async for output in result:
+            yield output
+        self._complete(response.request)
+
+    def process_spider_exception(self, response, exception, spider=None):
+        self._complete(response.request)
+
+    def process_exception(self, request, exception, spider=None):
+        self._complete(request)
@@ -0,0 +1,215 @@
+"""差分クロール (incremental mode) の共通処理
+
+日次クロールは新着順に一覧ページを取得し、ページ内の物件がすべて
+既知 (source, source_id) かつ内容ハッシュが前回と同一になった時点で
+ページ送りを打ち切る。掲載終了検出 (mark_inactive) は全件クロール時のみ行う。
+
+    scrapy crawl suumo -a crawl_mode=incremental
+    scrapy crawl suumo -a crawl_mode=full
+"""
+
+import hashlib
+import json
+import re
+from array import array
+from bisect import bisect_left
+from datetime import date
+from pathlib import Path
+
+import scrapy
+import yaml
+
+from src.database.models import init_db
+from src.scraper.pipelines import load_db_path
+
+CRAWL_MODE_FULL = "full"
+CRAWL_MODE_INCREMENTAL = "incremental"
+CRAWL_MODES = (CRAWL_MODE_FULL, CRAWL_MODE_INCREMENTAL)
+
+TARGETS_PATH = Path(__file__).parent.parent.parent / "config" / "scraping_targets.yaml"
+
+_TOTAL_COUNT_RE = re.compile(r"([\d,]+)\s*件")
+
+# ハッシュ対象外のフィールド
+_FINGERPRINT_EXCLUDE = {"content_hash"}
+
+
+def item_fingerprint(item) -> str:
+    """スパイダーが抽出した生データの内容ハッシュ (クレンジング前の値で計算)"""
+    payload = sorted(
+        (k, str(v)) for k, v in item.items()
+        if v is not None and k not in _FINGERPRINT_EXCLUDE
+    )
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_total_count(texts) -> int | None:
+    """「該当物件 1,234件」のようなテキストから件数を取り出す"""
+    m = _TOTAL_COUNT_RE.search("".join(texts))
+    return int(m.group(1).replace(",", "")) if m else None
+
+
+def resolve_crawl_mode(today: date | None = None, config_path: Path = TARGETS_PATH) -> str:
+    """設定ファイルと曜日から今日のクロールモードを決定"""
+    if not config_path.exists():
+        return CRAWL_MODE_FULL
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    mode_cfg = config.get("crawl_mode", {})
+    default = mode_cfg.get("default", CRAWL_MODE_FULL)
+    full_weekday = mode_cfg.get("full_crawl_weekday")
+    today = today or date.today()
+    if full_weekday is not None and today.weekday() == int(full_weekday):
+        return CRAWL_MODE_FULL
+    return default if default in CRAWL_MODES else CRAWL_MODE_FULL
+
+
+def _seen_key(source_id: str, content_hash: str) -> int:
+    digest = hashlib.blake2b(f"{source_id}\0{content_hash}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SeenFilter:
+    """既知物件の (source_id, content_hash) の集合
+
+    文字列の辞書ではなく 64bit ハッシュのソート済み配列 (1件8バイト) で持ち、
+    数十万件でもメモリを数MBに抑える。誤判定は 64bit ハッシュの衝突時のみ。
+    """
+
+    def __init__(self, pairs=()):
+        self._keys = array("Q", sorted(_seen_key(sid, h) for sid, h in pairs))
+
+    @classmethod
+    def from_db(cls, conn, source: str) -> "SeenFilter":
+        """properties に保存済みの内容ハッシュから作成"""
+        rows = conn.execute(
+            "SELECT source_id, content_hash FROM properties "
+            "WHERE source = ? AND content_hash IS NOT NULL",
+            (source,),
+        )
+        return cls((row[0], row[1]) for row in rows)
+
+    def __contains__(self, pair) -> bool:
+        source_id, content_hash = pair
+        if not source_id or not content_hash:
+            return False
+        key = _seen_key(source_id, content_hash)
+        i = bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def nbytes(self) -> int:
+        return self._keys.itemsize * len(self._keys)
+
+
+class StartRequestsMixin:
+    """Scrapy 2.13+ の開始リクエスト (async start) を各スパイダーの start_requests から作る"""
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+
+class IncrementalCrawlMixin(StartRequestsMixin):
+    """差分クロール対応スパイダーのMixin
+
+    サイトが新着順ソートに対応している場合のみ newest_first_params を定義する。
+    未対応サイトでは差分モードでもページ送りは打ち切らない (掲載終了検出のみ省略)。
+    現在対応しているのは SUUMO (po1=09) のみ。グーホーム・HOME'S は一覧URLで指定できる
+    新着順を確認できておらず、うちなーらいふの検索APIにはソート指定がない。
+    これらは差分モードでも全ページを取得し、DuplicateFilterPipeline の未変更判定で
+    書き込みだけを省く。
+    """
+
+    # 新着順ソート用のクエリパラメータ (未対応サイトは空)
+    newest_first_params: dict[str, str] = {}
+
+    crawl_mode: str | None = None
+    # アーカイブからの再パース時は True (掲載終了検出を行わない)
+    is_replay = False
+    _known_filter: SeenFilter | None = None
+
+    async def start(self):
+        if self.is_incremental and not self.newest_first_params:
+            self.logger.info("差分クロール: 新着順ソート未対応のサイトのため全ページを取得")
+        async for request in super().start():
+            yield request
+
+    @property
+    def is_incremental(self) -> bool:
+        return self.get_crawl_mode() == CRAWL_MODE_INCREMENTAL
+
+    def get_crawl_mode(self) -> str:
+        if self.crawl_mode not in CRAWL_MODES:
+            configured = getattr(self, "settings", None) and self.settings.get("CRAWL_MODE")
+            self.crawl_mode = configured if configured in CRAWL_MODES else resolve_crawl_mode()
+        return self.crawl_mode
+
+    def apply_sort_params(self, url: str) -> str:
+        """差分モードかつ対応サイトなら新着順ソートのパラメータを付与"""
+        if not (self.is_incremental and self.newest_first_params):
+            return url
+        query = "&".join(f"{k}={v}" for k, v in self.newest_first_params.items())
+        return f"{url}{'&' if '?' in url else '?'}{query}"
+
+    def load_known_filter(self) -> SeenFilter:
+        """既知物件の (source_id, content_hash) をDBから読み込む
+
+        ページ送りの打ち切り判定と DuplicateFilterPipeline の未変更判定で共有する。
+        """
+        if self._known_filter is None:
+            conn = init_db(load_db_path(getattr(self, "settings", None)))
+            try:
+                self._known_filter = SeenFilter.from_db(conn, self.name)
+            finally:
+                conn.close()
+            self.logger.info(
+                f"既知物件 {len(self._known_filter):,}件を読み込み "
+                f"({self._known_filter.nbytes / 1024:,.0f} KiB)"
+            )
+        return self._known_filter
+
+    def should_follow_next_page(self, page_items: list) -> bool:
+        """ページ内が既知かつ未変更の物件のみなら False (ページ送り打ち切り)"""
+        if not (self.is_incremental and self.newest_first_params) or not page_items:
+            return True
+        known = self.load_known_filter()
+        for item in page_items:
+            if (item.get("source_id"), item.get("content_hash")) not in known:
+                return True
+        self.logger.info("差分クロール: 既知物件のみのページに到達したためページ送りを終了")
+        if getattr(self, "crawler", None):
+            self.crawler.stats.inc_value("incremental/pagination_stopped")
+        return False
+
+    def paginate(self, response, page_items: list, next_page: str | None, current_page: int,
+                 last_page: int | None, page_url, callback):
+        """一覧ページのページ送り
+
+        1ページ目で最終ページがわかれば 2〜最終ページを一括で投入し、同時接続数の範囲で
+        並行に取得する。わからなければ従来どおり次ページリンクをたどる。
+        投入した最後のページだけは次ページリンクもたどる (件数が途中で増えた場合の取りこぼし防止)。
+        新着順の打ち切りを使う差分クロールでは一括投入しない。
+        """
+        if response.meta.get("page_fanned_out"):
+            return
+        settings = getattr(self, "settings", None)
+        enabled = settings.getbool("PAGE_FANOUT_ENABLED", True) if settings else True
+        if (enabled and current_page == 1 and last_page and last_page > 1
+                and not (self.is_incremental and self.newest_first_params)):
+            max_pages = settings.getint("PAGE_FANOUT_MAX_PAGES", 200) if settings else 200
+            end = min(last_page, max_pages)
+            for page in range(2, end + 1):
+                yield scrapy.Request(
+                    page_url(page), callback=callback, meta={"page_fanned_out": page < end}
+                )
+            if getattr(self, "crawler", None):
+                self.crawler.stats.inc_value("pagination/fanned_out_pages", end - 1)
+            self.logger.debug(f"{response.url}: 2〜{end}ページを一括投入 (最終ページ {last_page})")
+            return
+        if next_page and self.should_follow_next_page(page_items):
+            yield response.follow(next_page, callback=callback)
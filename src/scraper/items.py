@@ -1,53 +1,170 @@
 """Scrapy Items定義 - 全サイト共通の物件データ構造"""
 
+from dataclasses import dataclass, fields
+
 import scrapy
 
 
-class RentalPropertyItem(scrapy.Item):
-    """賃貸物件アイテム"""
+class _SlottedItem:
+    """slots付きdataclassに scrapy.Item と同じ辞書風の操作を与える基底クラス
+
+    Scrapy (itemadapter) からは dataclass のアイテムとして扱われる。
+    値が None のフィールドは未設定とみなす (keys / in / dict(item) に現れない)。
+    scrapy.Item と違い「明示的に None を代入した」と「未設定」は区別しないため、
+    クレンジングの設備フラグ正規化 (None → 0) は scrapy.Item のアイテムにだけ効き、
+    このクラスでは None のまま (DBには書かない = 既存値を維持) になる。
+    存在しないフィールドへの代入は scrapy.Item と同様に KeyError。
+    """
+
+    __slots__ = ()
+    _field_names: tuple[str, ...] = ()
+    _field_set: frozenset[str] = frozenset()
+
+    def __getitem__(self, key: str):
+        if key not in self._field_set:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in self._field_set:
+            raise KeyError(f"{type(self).__name__} does not support field: {key}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str):
+        self[key] = None
+
+    def get(self, key: str, default=None):
+        if key not in self._field_set:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __contains__(self, key) -> bool:
+        return key in self._field_set and getattr(self, key) is not None
+
+    def keys(self) -> list[str]:
+        return [name for name in self._field_names if getattr(self, name) is not None]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def items(self) -> list[tuple[str, object]]:
+        return [
+            (name, value)
+            for name in self._field_names
+            if (value := getattr(self, name)) is not None
+        ]
+
+    def to_row(self) -> dict:
+        """upsert のパラメータ (値が None 以外のフィールド) をスロットから直接作る"""
+        return {
+            name: value
+            for name in self._field_names
+            if (value := getattr(self, name)) is not None
+        }
+
+
+def _finalize(cls):
+    cls._field_names = tuple(f.name for f in fields(cls))
+    cls._field_set = frozenset(cls._field_names)
+    return cls
+
+
+@_finalize
+@dataclass(slots=True, eq=True, repr=True)
+class RentalPropertyItem(_SlottedItem):
+    """賃貸物件アイテム
+
+    スパイダーが抽出した文字列 (例: 賃料 "5.5万円") を DataCleansingPipeline が
+    数値に変換するため、数値項目は str と数値の両方を取りうる。
+    """
 
     # ソース情報
-    source = scrapy.Field()
-    source_id = scrapy.Field()
-    source_url = scrapy.Field()
+    source: str | None = None
+    source_id: str | None = None
+    source_url: str | None = None
 
     # 基本情報
-    name = scrapy.Field()
-    address = scrapy.Field()
-    municipality = scrapy.Field()
-    municipality_code = scrapy.Field()
-    latitude = scrapy.Field()
-    longitude = scrapy.Field()
+    name: str | None = None
+    address: str | None = None
+    municipality: str | None = None
+    municipality_code: str | None = None
+    latitude: float | None = None
+    longitude: float | None = None
 
     # 賃料
-    rent = scrapy.Field()
-    management_fee = scrapy.Field()
-    deposit_months = scrapy.Field()
-    key_money_months = scrapy.Field()
-    security_deposit = scrapy.Field()
+    rent: str | int | None = None
+    management_fee: str | int | None = None
+    deposit_months: str | float | None = None
+    key_money_months: str | float | None = None
+    security_deposit: str | int | None = None
 
     # スペック
-    property_type = scrapy.Field()
-    structure = scrapy.Field()
-    floor_plan = scrapy.Field()
-    room_count = scrapy.Field()
-    area_sqm = scrapy.Field()
-    building_year = scrapy.Field()
-    building_age = scrapy.Field()
-    floor_number = scrapy.Field()
-    total_floors = scrapy.Field()
+    property_type: str | None = None
+    structure: str | None = None
+    floor_plan: str | None = None
+    room_count: int | None = None
+    area_sqm: str | float | None = None
+    building_year: str | int | None = None
+    building_age: int | None = None
+    floor_number: str | int | None = None
+    total_floors: str | int | None = None
 
     # 交通
-    nearest_station = scrapy.Field()
-    station_walk_minutes = scrapy.Field()
-    transport_type = scrapy.Field()
+    nearest_station: str | None = None
+    station_walk_minutes: str | int | None = None
+    transport_type: str | None = None
 
     # 駐車場
+    parking_available: str | int | None = None
+    parking_fee: str | int | None = None
+    parking_spaces: int | None = None
+
+    # 設備
+    has_aircon: str | int | None = None
+    has_auto_lock: str | int | None = None
+    has_delivery_box: str | int | None = None
+    has_bath_dryer: str | int | None = None
+    has_reheating: str | int | None = None
+    has_washstand: str | int | None = None
+    has_indoor_laundry: str | int | None = None
+    has_internet: str | int | None = None
+    has_fiber: str | int | None = None
+    has_bath_toilet_separate: str | int | None = None
+    has_flooring: str | int | None = None
+    has_pet_ok: str | int | None = None
+
+    # 契約
+    lease_type: str | None = None
+    guarantor_required: str | None = None
+    brokerage_fee_months: str | float | None = None
+    move_in_date: str | None = None
+
+    # 差分クロール用の内容ハッシュ
+    content_hash: str | None = None
+    # 前回保存時から内容が変わっていない (DuplicateFilterPipeline が設定、DBには保存しない)
+    unchanged: bool | None = None
+
+
+class PropertyDetailItem(scrapy.Item):
+    """詳細ページから補完する物件情報 (既存物件の更新のみ)"""
+
+    source = scrapy.Field()
+    source_id = scrapy.Field()
+    # 詳細取得時点の一覧の content_hash (次回の変更検出に使う)
+    content_hash = scrapy.Field()
+    # 取得失敗 (HTTPステータスまたは例外名)。設定されていれば失敗として記録するだけ
+    fetch_failed = scrapy.Field()
+
+    latitude = scrapy.Field()
+    longitude = scrapy.Field()
+
     parking_available = scrapy.Field()
     parking_fee = scrapy.Field()
-    parking_spaces = scrapy.Field()
 
-    # 設備
     has_aircon = scrapy.Field()
     has_auto_lock = scrapy.Field()
     has_delivery_box = scrapy.Field()
@@ -61,7 +178,6 @@ class RentalPropertyItem(scrapy.Item):
     has_flooring = scrapy.Field()
     has_pet_ok = scrapy.Field()
 
-    # 契約
     lease_type = scrapy.Field()
     guarantor_required = scrapy.Field()
     brokerage_fee_months = scrapy.Field()
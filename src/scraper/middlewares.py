@@ -1,8 +1,22 @@
 """Scrapyミドルウェア - リクエスト制御"""
 
+import json
+import logging
 import random
+from collections import deque
+from pathlib import Path
+from urllib.parse import urlparse
 
+import yaml
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.httpobj import urlparse_cached
+
+from src.scraper.archive import RawPageArchive, headers_to_dict, response_from_archive
+from src.scraper.incremental import TARGETS_PATH
+from src.scraper.pipelines import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
 
 
 class RandomUserAgentMiddleware:
@@ -34,3 +48,295 @@ class PoliteRequestMiddleware:
         request.headers.setdefault("Accept", "text/html,application/xhtml+xml")
         request.headers.setdefault("Accept-Language", "ja,en;q=0.9")
         return None
+
+
+class RawArchiveMiddleware:
+    """取得ページをアーカイブし、次回以降は条件付きGETで再検証する
+
+    304 Not Modified はアーカイブの本文から 200 レスポンスを復元して返すため、
+    スパイダー側は通常どおりパースできる。
+    """
+
+    def __init__(self, archive_dir: Path, revalidate: bool, stats):
+        self.archive_dir = archive_dir
+        self.revalidate = revalidate
+        self.stats = stats
+        self.archive: RawPageArchive | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("RAW_ARCHIVE_ENABLED"):
+            raise NotConfigured
+        archive_dir = Path(crawler.settings.get("RAW_ARCHIVE_DIR", "data/raw_archive"))
+        if not archive_dir.is_absolute():
+            archive_dir = PROJECT_ROOT / archive_dir
+        revalidate = crawler.settings.getbool("RAW_ARCHIVE_REVALIDATE", True)
+        mw = cls(archive_dir, revalidate, crawler.stats)
+        crawler.signals.connect(mw.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def spider_opened(self, spider):
+        self.archive = RawPageArchive(self.archive_dir)
+        spider.logger.info(f"RawArchiveMiddleware: {self.archive_dir} ({self.archive.codec})")
+
+    def spider_closed(self, spider):
+        if self.archive:
+            self.archive.close()
+            self.archive = None
+
+    @staticmethod
+    def _archivable(request) -> bool:
+        return (
+            request.method == "GET"
+            and not request.meta.get("dont_archive")
+            and not request.meta.get("dont_obey_robotstxt")  # robots.txt 取得
+        )
+
+    def process_request(self, request, spider):
+        if not (self.archive and self.revalidate and self._archivable(request)):
+            return None
+        entry = self.archive.lookup(request.url)
+        if entry is None:
+            return None
+        if entry["etag"]:
+            request.headers.setdefault("If-None-Match", entry["etag"])
+        if entry["last_modified"]:
+            request.headers.setdefault("If-Modified-Since", entry["last_modified"])
+        return None
+
+    def process_response(self, request, response, spider):
+        if not (self.archive and self._archivable(request)):
+            return response
+
+        if response.status == 304:
+            entry = self.archive.lookup(request.url)
+            if entry is None:
+                return response
+            self.archive.mark_revalidated(request.url)
+            self.stats.inc_value("archive/not_modified")
+            body = self.archive.get_body(entry["body_sha256"], entry["codec"])
+            return response_from_archive(entry, body, request=request)
+
+        if response.status == 200:
+            callback = request.callback.__name__ if callable(request.callback) else "parse"
+            try:
+                cb_kwargs = json.loads(json.dumps(request.cb_kwargs))
+            except (TypeError, ValueError):
+                cb_kwargs = {}
+            is_new = self.archive.store(
+                spider.name, request.url, response.status,
+                headers_to_dict(response.headers), response.body,
+                callback=callback, cb_kwargs=cb_kwargs,
+            )
+            self.stats.inc_value("archive/stored" if is_new else "archive/unchanged_body")
+            self.stats.inc_value("archive/raw_bytes", len(response.body))
+        return response
+
+
+def _retry_after_seconds(response) -> float | None:
+    value = response.headers.get(b"Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value.decode("latin-1").strip())
+    except ValueError:
+        return None  # HTTP日付形式は扱わない
+
+
+class DomainRateController:
+    """1ドメイン分の遅延制御
+
+    - 下限: requests_per_minute から決まる間隔 (これより速くはしない)
+    - 429/5xx・タイムアウト: 遅延を倍に (Retry-After があればそれ以上)
+    - 直近 window 件のエラー率が max_error_rate を超えた時点で1回だけ倍にし、
+      下回るまでは正常応答でも縮めない (超えている間ずっと倍にすると max_delay に張り付く)
+    - 正常時: 応答時間のEWMA × latency_factor を目標に、遅い場合は半分ずつ近づけ、
+      速い場合は decay ずつゆっくり縮める
+    """
+
+    MIN_SAMPLES = 5
+
+    def __init__(
+        self,
+        domain: str,
+        requests_per_minute: float,
+        max_error_rate: float = 0.05,
+        max_delay: float = 60.0,
+        latency_factor: float = 2.0,
+        window: int = 20,
+        decay: float = 0.9,
+    ):
+        self.domain = domain
+        self.min_delay = 60.0 / requests_per_minute
+        self.max_delay = max(max_delay, self.min_delay)
+        self.max_error_rate = max_error_rate
+        self.latency_factor = latency_factor
+        self.decay = decay
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.latency: float | None = None
+        self.delay: float | None = None
+        self.responses = 0
+        self.errors = 0
+        self.over_error_rate = False
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def observe(
+        self, delay: float, latency: float | None, error: bool, retry_after: float | None = None
+    ) -> tuple[float, str]:
+        """応答1件を反映し、(新しい遅延, 判断理由) を返す"""
+        self.responses += 1
+        self.outcomes.append(error)
+        if latency is not None:
+            self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+
+        over = len(self.outcomes) >= self.MIN_SAMPLES and self.error_rate > self.max_error_rate
+        crossed, self.over_error_rate = over and not self.over_error_rate, over
+
+        if error:
+            self.errors += 1
+            new_delay, reason = delay * 2, "error"
+            if retry_after:
+                new_delay, reason = max(new_delay, retry_after), "retry-after"
+        elif crossed:
+            new_delay, reason = delay * 2, "error_rate"
+        elif over:
+            new_delay, reason = delay, "error_rate_hold"
+        else:
+            target = (self.latency or 0.0) * self.latency_factor
+            if target > delay:
+                new_delay, reason = (delay + target) / 2, "latency"
+            else:
+                new_delay, reason = max(target, delay * self.decay), "healthy"
+        self.delay = min(max(new_delay, self.min_delay), self.max_delay)
+        return self.delay, reason
+
+
+class AdaptiveRateMiddleware:
+    """応答時間と 429/5xx の発生率からドメインごとのダウンロード間隔を調整する
+
+    scraping_targets.yaml の各ターゲットの rate (requests_per_minute, max_error_rate 等) を
+    礼儀の上限として守りつつ、サイトが速いときは間隔を詰め、遅い・エラーが出るときは広げる。
+    AutoThrottle と同じくダウンローダのスロットの delay を書き換えるため、併用しない。
+    RANDOMIZE_DOWNLOAD_DELAY (スロットの jitter) 有効時は実際の間隔が delay の
+    (1 - jitter) 倍まで縮むため、スロットの delay は min_delay / (1 - jitter) 以上にして
+    requests_per_minute を間隔ごとの上限として守る。
+    """
+
+    ERROR_STATUSES = {429, 500, 502, 503, 504}
+    # 前回ログ出力時からこの割合以上変化したら判断をログに残す
+    LOG_CHANGE_RATIO = 0.1
+
+    def __init__(self, crawler, policies: dict[str, dict]):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.policies = policies
+        self.controllers: dict[str, DomainRateController | None] = {}
+        self.logged_delay: dict[str, float] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("ADAPTIVE_RATE_ENABLED"):
+            raise NotConfigured
+        mw = cls(crawler, load_rate_policies())
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def _controller(self, host: str) -> DomainRateController | None:
+        if host not in self.controllers:
+            matches = (
+                p for domain, p in self.policies.items()
+                if host == domain or host.endswith("." + domain)
+            )
+            policy = next(matches, self.policies.get("*"))
+            self.controllers[host] = DomainRateController(host, **policy) if policy else None
+        return self.controllers[host]
+
+    def _slot(self, request):
+        engine = getattr(self.crawler, "engine", None)
+        if engine is None or engine.downloader is None:
+            return None
+        return engine.downloader.slots.get(request.meta.get("download_slot"))
+
+    def process_response(self, request, response, spider):
+        self._observe(
+            request,
+            error=response.status in self.ERROR_STATUSES,
+            status=response.status,
+            retry_after=_retry_after_seconds(response),
+        )
+        return response
+
+    def process_exception(self, request, exception, spider):
+        self._observe(request, error=True, status=type(exception).__name__)
+        return None
+
+    def _observe(self, request, error: bool, status, retry_after: float | None = None):
+        host = urlparse_cached(request).hostname or ""
+        controller = self._controller(host)
+        slot = self._slot(request)
+        if controller is None or slot is None:
+            return
+        old_delay = controller.delay if controller.delay is not None else slot.delay
+        new_delay, reason = controller.observe(
+            old_delay, request.meta.get("download_latency"), error, retry_after
+        )
+        slot.delay = self._slot_delay(slot, new_delay, controller.min_delay)
+
+        self.stats.set_value(f"adaptive_rate/{host}/delay", round(new_delay, 2))
+        if error:
+            self.stats.inc_value(f"adaptive_rate/{host}/errors")
+        last = self.logged_delay.get(host, old_delay)
+        if error or abs(new_delay - last) >= last * self.LOG_CHANGE_RATIO:
+            self.logged_delay[host] = new_delay
+            self.stats.inc_value("adaptive_rate/adjustments")
+            logger.info(
+                f"rate {host}: delay {old_delay:.2f}s → {new_delay:.2f}s "
+                f"({reason}, status={status}, latency={controller.latency or 0:.2f}s, "
+                f"error_rate={controller.error_rate:.0%}, "
+                f"上限 {60 / controller.min_delay:.0f} req/min)"
+            )
+
+    @staticmethod
+    def _slot_delay(slot, delay: float, min_delay: float) -> float:
+        """ランダム化で縮んでも min_delay を下回らないスロットの delay"""
+        jitter = getattr(slot, "jitter", 0.0) or 0.0
+        if jitter >= 1:
+            # ±100% 以上だと間隔が0まで縮むため、RANDOMIZE_DOWNLOAD_DELAY と同じ ±50% に抑える
+            slot.jitter = jitter = 0.5
+        return max(delay, min_delay / (1 - jitter))
+
+    def spider_closed(self, spider):
+        for host, controller in self.controllers.items():
+            if controller is None or not controller.responses:
+                continue
+            logger.info(
+                f"rate {host}: {controller.responses}件 (エラー{controller.errors}件), "
+                f"最終 delay {controller.delay:.2f}s, "
+                f"latency EWMA {controller.latency or 0:.2f}s"
+            )
+
+
+def load_rate_policies(config_path: Path = TARGETS_PATH) -> dict[str, dict]:
+    """scraping_targets.yaml から ドメイン → rate 設定 を作る ("*" は既定値)
+
+    rate のキーは DomainRateController の引数 (requests_per_minute は必須)。
+    """
+    if not config_path.exists():
+        return {}
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    default = (config.get("scraping_policy") or {}).get("rate") or {}
+    policies = {"*": default} if default else {}
+    for target in (config.get("targets") or {}).values():
+        host = urlparse(target.get("base_url", "")).hostname
+        if not host:
+            continue
+        policy = {**default, **(target.get("rate") or {})}
+        if policy:
+            # 「www.」付きのホストにも一致させる
+            policies[host.removeprefix("www.")] = policy
+    return policies
@@ -0,0 +1,131 @@
+"""一覧ページのパースをプロセスプールで行う (オプトイン)
+
+SUUMO / HOME'S の一覧パース (lxml のツリー構築と高速パーサによる抽出、内容ハッシュ計算) は
+CPUを使い、その間リアクタースレッドが止まる。PARSE_POOL_ENABLED = True のとき、
+レスポンス本文を別プロセスに渡して抽出し、結果を物件データの dict として Deferred で受け取る。
+リアクタースレッドに残るのは本文の受け渡しとアイテムの組み立てのみ。
+
+    scrapy crawl suumo -s PARSE_POOL_ENABLED=True -s PARSE_POOL_WORKERS=1
+
+ワーカーは高速パーサ (fast_parsers) を使うため、FAST_PARSERS_ENABLED = False のときは使わない。
+ワーカープロセスは最初のページで起動し (spawn)、spider_closed で終了する。
+
+Stats:
+- parse_pool/pages, parse_pool/items: プールでパースしたページ数・件数
+- parse_pool/worker_seconds: ワーカー内のパース時間の合計
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+
+from scrapy import signals
+from scrapy.http import HtmlResponse
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.misc import load_object
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+from src.scraper.fast_parsers import fast_parsers_enabled, parse_homes_list, parse_suumo_list
+from src.scraper.incremental import item_fingerprint
+from src.scraper.items import RentalPropertyItem
+from src.scraper.telemetry import PARSE_POOL_TIMING_META
+
+logger = logging.getLogger(__name__)
+
+# スパイダー名 → (スパイダークラス, 高速パーサ)。パーサが使う _parse_* はクラスの静的メソッド
+PARSERS = {
+    "suumo": ("src.scraper.spiders.suumo.SuumoSpider", parse_suumo_list),
+    "homes": ("src.scraper.spiders.homes.HomesSpider", parse_homes_list),
+}
+
+
+def parse_page(
+    site: str, url: str, body: bytes, encoding: str
+) -> tuple[list[dict], str | None, float]:
+    """ワーカープロセスで一覧ページをパースし (物件データの dict, 次ページ, パース秒数) を返す"""
+    started = time.perf_counter()
+    spider_path, parser = PARSERS[site]
+    response = HtmlResponse(url, body=body, encoding=encoding)
+    page_items, next_page = parser(load_object(spider_path), response)
+    rows = []
+    for item in page_items:
+        item["content_hash"] = item_fingerprint(item)
+        rows.append(item.to_row())
+    return rows, next_page, time.perf_counter() - started
+
+
+def pool_size(settings) -> int:
+    """PARSE_POOL_WORKERS (0 ならCPU数 - 1、最低1)"""
+    workers = settings.getint("PARSE_POOL_WORKERS", 1)
+    if workers <= 0:
+        workers = (os.cpu_count() or 2) - 1
+    return max(workers, 1)
+
+
+class ParsePool:
+    """一覧パース用のプロセスプール"""
+
+    def __init__(self, workers: int = 1, stats=None):
+        self.workers = workers
+        self.stats = stats
+        # リアクター・書き込みスレッドを持つプロセスを fork しないよう spawn で起動する
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+
+    def submit_future(self, site: str, response) -> Future:
+        return self.executor.submit(
+            parse_page, site, response.url, response.body, response.encoding
+        )
+
+    def submit(self, site: str, response) -> defer.Deferred:
+        """パース結果 (rows, next_page, 秒数) を返す Deferred (リアクタースレッドで発火)"""
+        from twisted.internet import reactor
+
+        d = defer.Deferred()
+
+        def _done(future: Future):
+            try:
+                result = future.result()
+            except BaseException as e:
+                reactor.callFromThread(d.errback, Failure(e))
+            else:
+                reactor.callFromThread(d.callback, result)
+
+        self.submit_future(site, response).add_done_callback(_done)
+        return d
+
+    async def parse_list(self, spider, response, output):
+        """プールでパースしたアイテムを output(response, page_items, next_page) に渡して出力する"""
+        started = time.perf_counter()
+        parsed = self.submit(spider.name, response)
+        rows, next_page, seconds = await maybe_deferred_to_future(parsed)
+        # ParseTimingMiddleware はこの待ち時間の代わりにワーカー内のパース時間を数える
+        response.meta[PARSE_POOL_TIMING_META] = (time.perf_counter() - started, seconds)
+        page_items = [RentalPropertyItem(**row) for row in rows]
+        if self.stats is not None:
+            self.stats.inc_value("parse_pool/pages")
+            self.stats.inc_value("parse_pool/items", len(page_items))
+            self.stats.inc_value("parse_pool/worker_seconds", seconds)
+        for result in output(response, page_items, next_page):
+            yield result
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_parse_pool(spider) -> ParsePool | None:
+    """スパイダーのパース用プール (無効・非対応サイトなら None)。初回呼び出しで起動する"""
+    settings = getattr(spider, "settings", None)
+    crawler = getattr(spider, "crawler", None)
+    if settings is None or crawler is None or spider.name not in PARSERS:
+        return None
+    if not settings.getbool("PARSE_POOL_ENABLED", False) or not fast_parsers_enabled(spider):
+        return None
+    pool = spider.__dict__.get("_parse_pool")
+    if pool is None:
+        pool = spider._parse_pool = ParsePool(pool_size(settings), crawler.stats)
+        crawler.signals.connect(pool.close, signal=signals.spider_closed)
+        logger.info(f"{spider.name}: 一覧パースをプロセスプール ({pool.workers}プロセス) で実行")
+    return pool
@@ -1,7 +1,9 @@
 """Scrapyパイプライン - データクレンジング・正規化・DB保存"""
 
-import re
+import logging
+import queue
 import sqlite3
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -9,10 +11,39 @@ import yaml
 
 from src.database.models import get_connection, init_db
 from src.database.repository import PropertyRepository
+from src.scraper.cleansing import (
+    EQUIPMENT_FIELDS,
+    FIELD_PARSERS,
+    PARKING_NONE,
+    extract_municipality,
+    extract_room_count,
+    parse_area,
+    parse_minutes,
+    parse_months,
+    parse_price,
+)
+from src.scraper.sqlite_writer import SQLiteWriter
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+logger = logging.getLogger(__name__)
+
+
+def load_db_path(settings=None) -> Path:
+    """DBパスを取得 (Scrapy設定 DATABASE_PATH があれば優先、なければ config/settings.yaml)"""
+    if settings is not None and settings.get("DATABASE_PATH"):
+        return Path(settings.get("DATABASE_PATH"))
+    with open(PROJECT_ROOT / "config" / "settings.yaml", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    return PROJECT_ROOT / config["database"]["path"]
 
 
 class DataCleansingPipeline:
-    """データクレンジング・正規化パイプライン"""
+    """データクレンジング・正規化パイプライン
+
+    変換内容は src.scraper.cleansing の FIELD_PARSERS / EQUIPMENT_FIELDS で定義する。
+    process_batch は再パースや一括インポートから複数件をまとめて処理する。
+    """
 
     # 間取り正規化マッピング
     FLOOR_PLAN_MAP = {
@@ -41,8 +72,15 @@ class DataCleansingPipeline:
     # 市町村名→コードマッピング (沖縄県)
     MUNICIPALITY_MAP = {}
 
+    def __init__(self):
+        self.current_year = datetime.now().year
+
     def open_spider(self, spider):
-        config_path = Path(__file__).parent.parent.parent / "config" / "search_conditions.yaml"
+        self._load_municipality_map()
+        self.current_year = datetime.now().year
+
+    def _load_municipality_map(self):
+        config_path = PROJECT_ROOT / "config" / "search_conditions.yaml"
         if config_path.exists():
             with open(config_path, encoding="utf-8") as f:
                 config = yaml.safe_load(f)
@@ -51,16 +89,21 @@ class DataCleansingPipeline:
                     self.MUNICIPALITY_MAP[city["name"]] = city["code"]
 
     def process_item(self, item, spider):
-        # 賃料の正規化
-        item["rent"] = self._parse_price(item.get("rent"))
-        item["management_fee"] = self._parse_price(item.get("management_fee")) or 0
+        if item.get("unchanged"):
+            return item
+        return self._clean(item)
 
-        # 敷金・礼金の正規化 (「1ヶ月」→ 1.0)
-        item["deposit_months"] = self._parse_months(item.get("deposit_months"))
-        item["key_money_months"] = self._parse_months(item.get("key_money_months"))
+    def process_batch(self, items: list, spider=None) -> list:
+        """複数件をまとめてクレンジング (Item / dict どちらも可)"""
+        if not self.MUNICIPALITY_MAP:
+            self._load_municipality_map()
+        self.current_year = datetime.now().year
+        return [self._clean(item) for item in items]
 
-        # 面積の正規化 (「25.5㎡」→ 25.5)
-        item["area_sqm"] = self._parse_float(item.get("area_sqm"))
+    def _clean(self, item):
+        # 賃料・敷金礼金・面積・徒歩分数など (定義順に変換)
+        for field, parser in FIELD_PARSERS:
+            item[field] = parser(item.get(field))
 
         # 間取り正規化
         fp = item.get("floor_plan", "")
@@ -69,7 +112,7 @@ class DataCleansingPipeline:
 
         # 部屋数の抽出
         if item.get("floor_plan"):
-            item["room_count"] = self._extract_room_count(item["floor_plan"])
+            item["room_count"] = extract_room_count(item["floor_plan"])
 
         # 構造正規化
         structure = item.get("structure", "")
@@ -78,156 +121,375 @@ class DataCleansingPipeline:
 
         # 築年数計算
         if item.get("building_year"):
-            current_year = datetime.now().year
-            item["building_age"] = current_year - int(item["building_year"])
+            item["building_age"] = self.current_year - int(item["building_year"])
 
         # 市町村コードの付与
         if item.get("municipality") and not item.get("municipality_code"):
-            muni = item["municipality"]
-            item["municipality_code"] = self.MUNICIPALITY_MAP.get(muni)
+            item["municipality_code"] = self.MUNICIPALITY_MAP.get(item["municipality"])
 
         # 住所から市町村を抽出
         if not item.get("municipality") and item.get("address"):
-            item["municipality"] = self._extract_municipality(item["address"])
+            item["municipality"] = extract_municipality(item["address"])
             if item["municipality"]:
                 item["municipality_code"] = self.MUNICIPALITY_MAP.get(item["municipality"])
 
         # 駐車場フラグ
         parking = item.get("parking_available")
         if isinstance(parking, str):
-            item["parking_available"] = 1 if parking not in ("なし", "無", "") else 0
+            item["parking_available"] = 0 if parking in PARKING_NONE else 1
 
-        # 設備フラグのブール正規化
-        for key in list(item.keys()):
-            if key.startswith("has_"):
-                val = item.get(key)
+        # 設備フラグのブール正規化 (取得済みのフィールドのみ)
+        # RentalPropertyItem は None を未設定とみなすため、None → 0 は scrapy.Item のみ
+        for key in EQUIPMENT_FIELDS:
+            if key in item:
+                val = item[key]
                 if isinstance(val, str):
                     item[key] = 1 if val else 0
                 elif val is None:
                     item[key] = 0
 
-        # 徒歩分数
-        item["station_walk_minutes"] = self._parse_int(item.get("station_walk_minutes"))
-
         return item
 
-    @staticmethod
-    def _parse_price(value) -> int | None:
-        if value is None:
-            return None
-        if isinstance(value, (int, float)):
-            return int(value)
-        s = str(value).replace(",", "").replace("円", "").replace("¥", "").strip()
-        # 「5.5万」「5.5万円」形式
-        m = re.match(r"([\d.]+)\s*万", s)
-        if m:
-            return int(float(m.group(1)) * 10000)
-        # 純粋な数値
-        m = re.match(r"(\d+)", s)
-        if m:
-            return int(m.group(1))
-        return None
-
-    @staticmethod
-    def _parse_months(value) -> float:
-        if value is None or value == "" or value == "-":
-            return 0.0
-        if isinstance(value, (int, float)):
-            return float(value)
-        s = str(value).replace("ヶ月", "").replace("ヵ月", "").replace("カ月", "").strip()
-        if s in ("なし", "無", "-", "0"):
-            return 0.0
-        try:
-            return float(s)
-        except ValueError:
-            return 0.0
+    _parse_price = staticmethod(parse_price)
+    _parse_months = staticmethod(parse_months)
+    _parse_float = staticmethod(parse_area)
+    _parse_int = staticmethod(parse_minutes)
+    _extract_room_count = staticmethod(extract_room_count)
+    _extract_municipality = staticmethod(extract_municipality)
 
-    @staticmethod
-    def _parse_float(value) -> float | None:
-        if value is None:
-            return None
-        if isinstance(value, (int, float)):
-            return float(value)
-        s = str(value).replace("㎡", "").replace("m²", "").replace("m2", "").replace(",", "").replace("約", "").strip()
-        try:
-            v = float(s)
-            # 専有面積として異常な値を除外 (一般的な賃貸は5〜300㎡)
-            if v < 5 or v > 300:
-                return None
-            return v
-        except ValueError:
-            return None
 
-    @staticmethod
-    def _parse_int(value) -> int | None:
-        if value is None:
-            return None
-        if isinstance(value, int):
-            return value
-        s = str(value).replace("分", "").replace("min", "").strip()
+class SQLitePipeline:
+    """SQLiteへの保存パイプライン
+
+    クローラ経由で生成され SQLITE_WRITER_ENABLED が有効な場合は、書き込みを
+    SQLiteWriter スレッドに任せてリアクタースレッドをブロックしない。
+    キューが満杯のときは空きができるまで Deferred でアイテムの処理を待たせる。
+    引数なしで生成した場合 (再パース・ベンチマーク) は同期的に書き込む。
+    """
+
+    # upsertをまとめて1トランザクションで書き込む件数 (賃料履歴も同一トランザクション)
+    BATCH_SIZE = 100
+    # キュー満杯時に再投入を試みる間隔 (秒)
+    BACKOFF_SECONDS = 0.05
+    # 内容が変わっていない物件の last_seen_at 更新をまとめる件数
+    TOUCH_BATCH_SIZE = 1000
+
+    def __init__(self, use_writer: bool = False, queue_size: int = 1000,
+                 flush_interval: float = 2.0, stats=None):
+        self.conn = None
+        self.repo = None
+        self.writer: SQLiteWriter | None = None
+        self.use_writer = use_writer
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self.stats = stats
+        self.enqueue_seconds = 0.0
+        self.write_seconds = 0.0
+        self.queue_full_count = 0
+        self.max_queue_depth = 0
+        self.pending: list[dict] = []
+        self.touched: list[tuple[str, str]] = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        pipeline = cls(
+            use_writer=settings.getbool("SQLITE_WRITER_ENABLED", True),
+            queue_size=settings.getint("SQLITE_WRITER_QUEUE_SIZE", 1000),
+            flush_interval=settings.getfloat("SQLITE_WRITER_FLUSH_INTERVAL", 2.0),
+            stats=crawler.stats,
+        )
+        pipeline.BATCH_SIZE = settings.getint("SQLITE_WRITER_BATCH_SIZE", cls.BATCH_SIZE)
+        return pipeline
+
+    def open_spider(self, spider):
+        db_path = load_db_path(getattr(spider, "settings", None))
+        # スキーマ初期化・マイグレーションはこのスレッドの接続で行う
+        self.conn = init_db(db_path)
+        self.repo = PropertyRepository(self.conn)
+        if self.use_writer:
+            self.writer = SQLiteWriter(
+                db_path,
+                batch_size=self.BATCH_SIZE,
+                queue_size=self.queue_size,
+                flush_interval=self.flush_interval,
+            )
+            self.writer.start()
+
+    def close_spider(self, spider):
+        # 掲載終了検出は実行の正常終了を確認してから CrawlRunRecorder が行う
+        self._flush_touched()
+        if self.writer:
+            items, touched = self.writer.close()
+            if items or touched:
+                self._write_leftover(items, touched)
+            self._record_writer_stats(spider)
+            self.write_seconds = self.writer.write_seconds
+        elif self.repo:
+            self._flush()
+        if self.stats is not None:
+            self.stats.set_value("db/write_seconds", round(self.write_seconds, 3))
+        if self.conn:
+            self.conn.close()
+
+    def process_item(self, item, spider):
+        if item.get("unchanged"):
+            return self._touch(item, backpressure=True)
+        data = self._prepare(item, spider)
+        if data is None:
+            return item
+        if self.writer is None:
+            self._append(data)
+            return item
+        started = time.perf_counter()
         try:
-            return int(s)
-        except ValueError:
+            self.writer.put_nowait(data)
+        except queue.Full:
+            # 背圧: 書き込みが追いつくまでこのアイテムの完了を遅らせる
+            self.queue_full_count += 1
+            return self._enqueue_later(
+                item,
+                put_nowait=lambda: self.writer.put_nowait(data),
+                write_here=lambda: self.repo.upsert_property(data),
+            )
+        finally:
+            self.enqueue_seconds += time.perf_counter() - started
+        self.max_queue_depth = max(self.max_queue_depth, self.writer.queue.qsize())
+        return item
+
+    def process_batch(self, items: list, spider=None) -> list:
+        """複数件をまとめて保存 (同期、再パース・一括取り込み用)"""
+        for item in items:
+            if item.get("unchanged"):
+                self._touch(item)
+                continue
+            data = self._prepare(item, spider)
+            if data is None:
+                continue
+            if self.writer is None:
+                self._append(data)
+            else:
+                self.writer.put(data)
+        return items
+
+    def _prepare(self, item, spider) -> dict | None:
+        to_row = getattr(item, "to_row", None)
+        data = to_row() if to_row else {k: v for k, v in dict(item).items() if v is not None}
+        if "rent" not in data or data["rent"] is None:
+            log = spider.logger if spider is not None else logger
+            log.warning(f"賃料なしのためスキップ: {data.get('source_url', 'unknown')}")
+            if self.stats is not None:
+                self.stats.inc_value(f"pipeline_dropped/{type(self).__name__}")
             return None
+        return data
 
-    @staticmethod
-    def _extract_room_count(floor_plan: str) -> int:
-        m = re.match(r"(\d+)", floor_plan)
-        return int(m.group(1)) if m else 1
+    def _touch(self, item, backpressure: bool = False):
+        self.touched.append((item["source"], item["source_id"]))
+        if len(self.touched) >= self.TOUCH_BATCH_SIZE:
+            return self._flush_touched(item if backpressure else None)
+        return item
 
-    @staticmethod
-    def _extract_municipality(address: str) -> str | None:
-        """住所文字列から沖縄県内の市町村名を抽出"""
-        # 「沖縄県那覇市xxx」→「那覇市」
-        m = re.search(r"(?:沖縄県)?(\S+?[市町村])", address)
-        return m.group(1) if m else None
+    def _flush_touched(self, item=None):
+        """last_seen_at 更新をまとめて書き込みスレッドへ渡す
 
+        item を渡した場合 (リアクタースレッド) はブロックせず、キューが満杯なら
+        Deferred で item の完了を遅らせる。渡さない場合は空きができるまで待つ。
+        """
+        if not self.touched:
+            return item
+        pairs, self.touched = self.touched, []
+        if self.stats is not None:
+            self.stats.inc_value("seen_filter/touched", len(pairs))
+        if self.writer is None or not self.writer.is_alive():
+            self._touch_here(pairs)
+        elif item is None:
+            self.writer.put_touch(pairs)
+        else:
+            try:
+                self.writer.put_touch_nowait(pairs)
+            except queue.Full:
+                self.queue_full_count += 1
+                return self._enqueue_later(
+                    item,
+                    put_nowait=lambda: self.writer.put_touch_nowait(pairs),
+                    write_here=lambda: self._touch_here(pairs),
+                )
+        return item
 
-class SQLitePipeline:
-    """SQLiteへの保存パイプライン"""
+    def _touch_here(self, pairs: list[tuple[str, str]]):
+        started = time.perf_counter()
+        self.repo.touch_seen(pairs)
+        self.write_seconds += time.perf_counter() - started
+
+    def _append(self, data: dict):
+        self.pending.append(data)
+        if len(self.pending) >= self.BATCH_SIZE:
+            self._flush()
+
+    def _enqueue_later(self, item, put_nowait, write_here):
+        """キューに空きができるまで BACKOFF_SECONDS 間隔で put_nowait を再試行する"""
+        from twisted.internet import reactor, task
+
+        def retry():
+            if not self.writer.is_alive():
+                # 書き込みスレッドが異常終了した場合はこのスレッドで書き込む
+                write_here()
+                return item
+            try:
+                put_nowait()
+            except queue.Full:
+                return task.deferLater(reactor, self.BACKOFF_SECONDS, retry)
+            return item
 
-    def __init__(self):
+        return task.deferLater(reactor, self.BACKOFF_SECONDS, retry)
+
+    def _write_leftover(self, items: list[dict], touched: list[tuple[str, str]]):
+        """異常終了した書き込みスレッドのキューに残った分をこのスレッドで書き込む"""
+        lost = len(self.repo.upsert_each(items))
+        if touched:
+            try:
+                self._touch_here(touched)
+            except sqlite3.Error as e:
+                logger.error(f"SQLite last_seen_at 更新失敗 ({len(touched)}件): {e}")
+                lost += len(touched)
+        logger.warning(
+            f"書き込みスレッドの未書き込み分を再書き込み: 物件 {len(items)}件, "
+            f"last_seen_at 更新 {len(touched)}件 (失敗 {lost}件)"
+        )
+        if self.stats is not None:
+            self.stats.set_value("sqlite_writer/recovered", len(items) + len(touched) - lost)
+            self.stats.set_value("sqlite_writer/lost", lost)
+
+    def _record_writer_stats(self, spider):
+        w = self.writer
+        logger.info(
+            f"SQLite書き込みスレッド: {w.items_written}件/{w.batches}バッチ, "
+            f"書き込み {w.write_seconds:.2f}秒 "
+            f"(リアクター側のキュー投入 {self.enqueue_seconds:.3f}秒), "
+            f"キュー満杯 {self.queue_full_count}回"
+        )
+        if self.stats is None:
+            return
+        for key, value in (
+            ("items", w.items_written),
+            ("touched", w.items_touched),
+            ("batches", w.batches),
+            ("errors", w.errors),
+            ("write_seconds", round(w.write_seconds, 3)),
+            ("max_batch_seconds", round(w.max_batch_seconds, 3)),
+            ("enqueue_seconds", round(self.enqueue_seconds, 3)),
+            # 同期書き込みならリアクターが止まっていた時間との差
+            ("reactor_seconds_saved", round(w.write_seconds - self.enqueue_seconds, 3)),
+            ("queue_full", self.queue_full_count),
+            ("max_queue_depth", self.max_queue_depth),
+        ):
+            self.stats.set_value(f"sqlite_writer/{key}", value)
+
+    def _flush(self):
+        if not self.pending:
+            return
+        started = time.perf_counter()
+        try:
+            self.repo.upsert_many(self.pending)
+        except sqlite3.Error as e:
+            # バッチ全体がロールバックされたので1件ずつ再試行し、失敗した行だけを捨てる
+            logger.warning(f"SQLite一括書き込み失敗 ({len(self.pending)}件)、1件ずつ再試行: {e}")
+            failed = self.repo.upsert_each(self.pending)
+            for data, error in failed:
+                key = f"{data.get('source')}/{data.get('source_id')}"
+                logger.error(f"SQLite書き込み失敗: {key}: {error}")
+            if failed and self.stats is not None:
+                self.stats.inc_value("db/failed_items", len(failed))
+        self.write_seconds += time.perf_counter() - started
+        self.pending = []
+
+
+class DetailEnrichmentPipeline:
+    """詳細ページの補完結果を既存物件に反映するパイプライン (detail スパイダー用)
+
+    取得件数は1晩あたり数百件程度のため、リアクタースレッドでまとめて書き込む。
+    fetch_failed 付きのアイテムは取得失敗として記録するだけで、項目は更新しない。
+    """
+
+    BATCH_SIZE = 50
+
+    def __init__(self, stats=None):
+        self.stats = stats
         self.conn = None
         self.repo = None
-        self.seen_source_ids: dict[str, list[str]] = {}
+        self.pending: list[dict] = []
+        self.failed: list[tuple[str, str]] = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(stats=crawler.stats)
 
     def open_spider(self, spider):
-        settings_path = Path(__file__).parent.parent.parent / "config" / "settings.yaml"
-        with open(settings_path, encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-        db_path = Path(__file__).parent.parent.parent / config["database"]["path"]
-        self.conn = init_db(db_path)
+        self.conn = init_db(load_db_path(getattr(spider, "settings", None)))
         self.repo = PropertyRepository(self.conn)
 
     def close_spider(self, spider):
-        # 今回取得できなかった物件を非アクティブにする（掲載終了検出）
         if self.repo:
-            for source, source_ids in self.seen_source_ids.items():
-                count = self.repo.mark_inactive(source, source_ids)
-                if count:
-                    spider.logger.info(f"掲載終了検出: {source} で {count}件を非アクティブ化")
+            self._flush()
         if self.conn:
             self.conn.close()
 
     def process_item(self, item, spider):
-        data = {k: v for k, v in dict(item).items() if v is not None}
-        if "rent" not in data or data["rent"] is None:
-            spider.logger.warning(f"賃料なしのためスキップ: {data.get('source_url', 'unknown')}")
+        data = dict(item)
+        if data.get("fetch_failed"):
+            self.failed.append((data["source"], data["source_id"]))
+            if len(self.failed) >= self.BATCH_SIZE:
+                self._flush()
             return item
-        self.repo.upsert_property(data)
-        # 取得したsource_idを記録（掲載終了検出用）
-        source = data.get("source", "")
-        source_id = data.get("source_id", "")
-        if source and source_id:
-            self.seen_source_ids.setdefault(source, []).append(source_id)
+        self.pending.append(data)
+        if self.stats is not None:
+            self.stats.inc_value("detail/enriched")
+            if data.get("latitude") is not None:
+                self.stats.inc_value("detail/coordinates_found")
+        if len(self.pending) >= self.BATCH_SIZE:
+            self._flush()
         return item
 
+    def _flush(self):
+        if self.pending:
+            self.repo.update_details(self.pending)
+            self.pending = []
+        if self.failed:
+            self.repo.record_detail_failures(self.failed)
+            self.failed = []
+
 
 class DuplicateFilterPipeline:
-    """重複物件フィルタ"""
+    """重複物件フィルタ
 
-    def __init__(self):
+    SEEN_FILTER_ENABLED が有効な場合は、前回までに保存した内容ハッシュ
+    (IncrementalCrawlMixin.load_known_filter) と一致する物件に unchanged を付ける。
+    unchanged の物件はクレンジングと upsert を省略し、SQLitePipeline が
+    last_seen_at の更新 (touch) だけを行う。再パース時はパーサ修正を反映するため使わない。
+    """
+
+    def __init__(self, use_seen_filter: bool = False, stats=None):
         self.seen = set()
+        self.use_seen_filter = use_seen_filter
+        self.stats = stats
+        self.known = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            use_seen_filter=crawler.settings.getbool("SEEN_FILTER_ENABLED", True),
+            stats=crawler.stats,
+        )
+
+    def open_spider(self, spider):
+        if (
+            self.use_seen_filter
+            and hasattr(spider, "load_known_filter")
+            and not getattr(spider, "is_replay", False)
+        ):
+            self.known = spider.load_known_filter()
+            if self.stats is not None:
+                self.stats.set_value("seen_filter/known", len(self.known))
 
     def process_item(self, item, spider):
         key = (item.get("source"), item.get("source_id"))
@@ -235,4 +497,9 @@ class DuplicateFilterPipeline:
             from scrapy.exceptions import DropItem
             raise DropItem(f"重複物件: {key}")
         self.seen.add(key)
+        fingerprint = (item.get("source_id"), item.get("content_hash"))
+        if self.known is not None and fingerprint in self.known:
+            item["unchanged"] = True
+            if self.stats is not None:
+                self.stats.inc_value("seen_filter/unchanged")
         return item
@@ -0,0 +1,173 @@
+"""サイトごとのリクエスト計画 (1ページの件数とエリアのまとめ方)
+
+scraping_targets.yaml の各ターゲットの plan で指定する。
+- page_sizes: サイトが受け付ける1ページの件数。最大のものを使う
+  (uchina は API に大きい順に試して決める)
+- result_cap: 1回の検索で取得する件数の上限。複数エリアをまとめて検索できるサイトでは、
+  前回までの市町村別の掲載数から、1回の検索が result_cap * headroom を超えない範囲で
+  市町村をまとめる (掲載数の多い順に空きのある組へ入れる First Fit Decreasing)
+
+効率は1000件あたりのリクエスト数で比べる。実績は CrawlTelemetry が実行ごとに
+requests_per_1000_listings として記録する。
+
+    python -m src.scraper.planner
+"""
+
+import argparse
+import math
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+
+from src.database.models import init_db
+from src.database.repository import CrawlRunRepository, PropertyRepository
+from src.scraper.incremental import TARGETS_PATH
+from src.scraper.pipelines import load_db_path
+
+DEFAULT_HEADROOM = 0.8
+
+
+@lru_cache(maxsize=4)
+def load_plans(config_path: Path = TARGETS_PATH) -> dict[str, dict]:
+    """ターゲット名 → plan 設定"""
+    if not config_path.exists():
+        return {}
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    targets = config.get("targets") or {}
+    return {name: target.get("plan") or {} for name, target in targets.items()}
+
+
+def page_sizes(site: str, default: tuple[int, ...] = ()) -> tuple[int, ...]:
+    """サイトが受け付ける1ページの件数 (大きい順)"""
+    sizes = load_plans().get(site, {}).get("page_sizes")
+    return tuple(sorted(sizes, reverse=True)) if sizes else default
+
+
+def page_size(site: str, default: int | None = None) -> int | None:
+    """サイトの1ページの件数 (page_sizes の最大、未設定なら default)"""
+    sizes = page_sizes(site)
+    return sizes[0] if sizes else default
+
+
+def area_capacity(site: str) -> int | None:
+    """1回の検索にまとめる件数の目安 (result_cap 未設定ならまとめない)"""
+    plan = load_plans().get(site, {})
+    if not plan.get("result_cap"):
+        return None
+    return int(plan["result_cap"] * plan.get("headroom", DEFAULT_HEADROOM))
+
+
+def partition_areas(
+    areas: list[tuple[str, str]], counts: dict[str, int], capacity: int | None, default_count: int
+) -> list[list[tuple[str, str]]]:
+    """エリア [(コード, 名前), ...] を掲載数の合計が capacity 以下の組にまとめる
+
+    掲載数が不明なエリアは default_count 件とみなす。capacity を超えるエリアは単独の組。
+    """
+    if not capacity:
+        return [[area] for area in areas]
+    groups: list[tuple[int, list]] = []
+    for area in sorted(areas, key=lambda a: counts.get(a[0], default_count), reverse=True):
+        n = counts.get(area[0], default_count)
+        for i, (total, members) in enumerate(groups):
+            if total + n <= capacity:
+                groups[i] = (total + n, members + [area])
+                break
+        else:
+            groups.append((n, [area]))
+    return [members for _, members in groups]
+
+
+def unknown_area_count(counts: dict[str, int], size: int) -> int:
+    """掲載数の記録がないエリアの見積もり (過去の記録があれば0件、初回は1ページ分)"""
+    return 0 if counts else size
+
+
+def estimate_requests(group_counts: list[int], size: int) -> int:
+    """各組の件数を size 件ずつ取得するリクエスト数 (0件の組も1回は検索する)"""
+    return sum(max(1, math.ceil(n / size)) for n in group_counts)
+
+
+def requests_per_1000(requests: int, listings: int) -> float | None:
+    return round(requests / listings * 1000, 1) if listings else None
+
+
+def load_area_counts(spider) -> dict[str, int]:
+    """前回までの市町村コード別の掲載数"""
+    conn = init_db(load_db_path(getattr(spider, "settings", None)))
+    try:
+        return PropertyRepository(conn).count_active_by_municipality(spider.name)
+    finally:
+        conn.close()
+
+
+def plan_site(site: str, areas: list[tuple[str, str]], counts: dict[str, int], size: int) -> dict:
+    """エリアのまとめ方とリクエスト数の見積もり (エリアごとに検索する場合との比較)"""
+    groups = partition_areas(areas, counts, area_capacity(site), unknown_area_count(counts, size))
+    per_group = [sum(counts.get(code, 0) for code, _ in group) for group in groups]
+    listings = sum(per_group)
+    requests = estimate_requests(per_group, size)
+    return {
+        "site": site,
+        "page_size": size,
+        "areas": len(areas),
+        "queries": len(groups),
+        "listings": listings,
+        "requests": requests,
+        "requests_per_1000": requests_per_1000(requests, listings),
+        "requests_per_area": estimate_requests([counts.get(code, 0) for code, _ in areas], size),
+    }
+
+
+def report(conn, runs: int = 5) -> list[dict]:
+    """サイトごとの計画と直近の実績 (1000件あたりのリクエスト数)"""
+    from src.scraper.spiders.uchina import OKINAWA_CITY_CODES
+
+    properties = PropertyRepository(conn)
+    history = CrawlRunRepository(conn).get_metrics_history(names=("requests_per_1000_listings",))
+    rows = []
+    for site in load_plans():
+        counts = properties.count_active_by_municipality(site)
+        if site == "uchina":
+            # page_sizes の最大で見積もる (API が切り詰めた場合は実績の方が多くなる)
+            row = plan_site(site, OKINAWA_CITY_CODES, counts, page_size(site))
+        else:
+            # 市町村をまとめられないサイトは全体を1ページの件数で割った下限のみ
+            size = page_size(site)
+            listings = sum(counts.values())
+            requests = math.ceil(listings / size) if size else None
+            row = {"site": site, "page_size": size, "listings": listings, "requests": requests,
+                   "requests_per_1000": requests_per_1000(requests, listings) if requests else None}
+        actual = [r["requests_per_1000_listings"] for r in history
+                  if r["spider"] == site and r["requests_per_1000_listings"] is not None]
+        row["actual_per_1000"] = actual[-runs:]
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="サイトごとのリクエスト計画と効率")
+    parser.add_argument("--runs", type=int, default=5, help="表示する直近の実績数")
+    args = parser.parse_args()
+
+    conn = init_db(load_db_path())
+    try:
+        rows = report(conn, args.runs)
+    finally:
+        conn.close()
+    print(
+        f"{'サイト':8s} {'件/頁':>6s} {'検索':>8s} {'掲載数':>8s} {'見積':>6s} {'/1000件':>8s}  "
+        "実績 (/1000件、古い順)"
+    )
+    for r in rows:
+        queries = f"{r['areas']}→{r['queries']}" if "queries" in r else "-"
+        print(
+            f"{r['site']:8s} {r['page_size'] or '-':>6} {queries:>8s} {r['listings']:8,d} "
+            f"{r['requests'] if r['requests'] is not None else '-':>6} "
+            f"{r['requests_per_1000'] if r['requests_per_1000'] is not None else '-':>8}  "
+            f"{', '.join(str(v) for v in r['actual_per_1000']) or '-'}"
+        )
+        if "requests_per_area" in r:
+            print(f"{'':8s} 市町村ごとに検索した場合: {r['requests_per_area']}リクエスト")
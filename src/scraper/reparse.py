@@ -0,0 +1,145 @@
+"""アーカイブ済みページの再パース
+
+サイトのマークアップ変更でパーサを修正した後、再クロールせずに
+アーカイブ (src.scraper.archive) のページを現在のスパイダーのコールバックと
+アイテムパイプラインに通してDBを更新する。ネットワークアクセスは行わない。
+
+    python -m src.scraper.reparse suumo
+    python -m src.scraper.reparse homes --since 2026-10-01 --dry-run
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+import scrapy
+from scrapy.exceptions import DropItem
+from scrapy.spiderloader import SpiderLoader
+from scrapy.utils.conf import build_component_list
+from scrapy.utils.misc import load_object
+from scrapy.utils.project import get_project_settings
+
+from src.scraper.archive import RawPageArchive, response_from_archive
+from src.scraper.pipelines import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+
+def _load_pipelines(settings, dry_run: bool) -> list:
+    """ITEM_PIPELINES を優先度順にインスタンス化 (dry_run ではDB保存を除く)"""
+    pipelines = []
+    for path in build_component_list(settings.getwithbase("ITEM_PIPELINES")):
+        if dry_run and path.endswith("SQLitePipeline"):
+            continue
+        pipelines.append(load_object(path)())
+    return pipelines
+
+
+def _run_pipelines(pipelines: list, items: list, spider, stats: dict):
+    """1ページ分のアイテムをパイプラインに通す (process_batch があれば一括処理)"""
+    for pipeline in pipelines:
+        if not items:
+            break
+        if hasattr(pipeline, "process_batch"):
+            items = pipeline.process_batch(items, spider)
+            continue
+        passed = []
+        for item in items:
+            try:
+                passed.append(pipeline.process_item(item, spider))
+            except DropItem:
+                stats["dropped"] += 1
+        items = passed
+    stats["items"] += len(items)
+
+
+def reparse(
+    spider_name: str,
+    archive_dir: str | Path | None = None,
+    since: str | None = None,
+    limit: int | None = None,
+    dry_run: bool = False,
+    settings=None,
+) -> dict:
+    """spider_name のアーカイブ済みページを再パースしてパイプラインに流す"""
+    settings = settings or get_project_settings()
+    archive_dir = Path(archive_dir or settings.get("RAW_ARCHIVE_DIR", "data/raw_archive"))
+    if not archive_dir.is_absolute():
+        archive_dir = PROJECT_ROOT / archive_dir
+
+    spidercls = SpiderLoader.from_settings(settings).load(spider_name)
+    spider = spidercls(crawl_mode="full")
+    spider.settings = settings
+    spider.is_replay = True
+
+    pipelines = _load_pipelines(settings, dry_run)
+    for pipeline in pipelines:
+        if hasattr(pipeline, "open_spider"):
+            pipeline.open_spider(spider)
+
+    stats = {"pages": 0, "items": 0, "dropped": 0, "skipped_requests": 0, "errors": 0}
+    archive = RawPageArchive(archive_dir)
+    started = time.monotonic()
+    try:
+        for entry in archive.iter_pages(spider_name, since=since, limit=limit):
+            callback = getattr(spider, entry["callback"] or "parse", None)
+            if callback is None:
+                logger.warning(
+                    f"コールバックが見つかりません: {entry['callback']} ({entry['url']})"
+                )
+                stats["errors"] += 1
+                continue
+            cb_kwargs = json.loads(entry["cb_kwargs"] or "{}")
+            request = scrapy.Request(entry["url"], callback=callback, cb_kwargs=cb_kwargs)
+            body = archive.get_body(entry["body_sha256"], entry["codec"])
+            response = response_from_archive(entry, body, request=request)
+            stats["pages"] += 1
+
+            try:
+                items = []
+                for result in callback(response, **cb_kwargs) or ():
+                    # ページ送り等の後続リクエストはアーカイブ側で別ページとして処理される
+                    if isinstance(result, scrapy.Request):
+                        stats["skipped_requests"] += 1
+                        continue
+                    items.append(result)
+                _run_pipelines(pipelines, items, spider, stats)
+            except Exception as e:
+                logger.error(f"再パース失敗: {entry['url']}: {e}")
+                stats["errors"] += 1
+    finally:
+        archive.close()
+        for pipeline in pipelines:
+            if hasattr(pipeline, "close_spider"):
+                pipeline.close_spider(spider)
+
+    elapsed = time.monotonic() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["pages_per_sec"] = round(stats["pages"] / elapsed, 1) if elapsed else None
+    logger.info(
+        f"再パース完了: {spider_name} {stats['pages']}ページ → {stats['items']}件 "
+        f"(除外{stats['dropped']}件, エラー{stats['errors']}件, {elapsed:.1f}秒)"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="アーカイブ済みページの再パース")
+    parser.add_argument("spider", help="スパイダー名 (goohome / uchina / suumo / homes)")
+    parser.add_argument("--since", help="この日時以降に取得したページのみ (ISO形式)")
+    parser.add_argument("--limit", type=int, help="最大ページ数")
+    parser.add_argument("--archive-dir", help="アーカイブディレクトリ")
+    parser.add_argument("--dry-run", action="store_true", help="DBに保存しない")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = reparse(
+        args.spider,
+        archive_dir=args.archive_dir,
+        since=args.since,
+        limit=args.limit,
+        dry_run=args.dry_run,
+    )
+    print(json.dumps(result, ensure_ascii=False))
@@ -0,0 +1,192 @@
+"""複数スパイダーの並行実行
+
+scraping_targets.yaml で有効なサイトを1つの CrawlerProcess で同時に実行する。
+サイトごとにドメインが異なるため、各クローラは自分のダウンローダで
+DOWNLOAD_DELAY / CONCURRENT_REQUESTS_PER_DOMAIN を守ったまま並行に動く。
+
+    python -m src.scraper.runner
+    python -m src.scraper.runner --spider suumo --spider homes --mode full
+
+--workers N を指定すると、スパイダーごとに N 個のプロセスを起動し、共有フロンティア
+(src.scraper.frontier) からリクエストを取り合って処理する。
+    python -m src.scraper.runner --spider suumo --workers 3
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+from scrapy.crawler import CrawlerProcess
+from scrapy.spiderloader import SpiderLoader
+from scrapy.utils.project import get_project_settings
+
+from src.scraper.frontier import default_crawl_id
+from src.scraper.incremental import CRAWL_MODES, TARGETS_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def load_targets(config_path: Path = TARGETS_PATH) -> dict[str, dict]:
+    """有効なターゲットを priority 順で返す"""
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    targets = {
+        name: cfg for name, cfg in config.get("targets", {}).items()
+        if cfg.get("enabled", True)
+    }
+    return dict(sorted(targets.items(), key=lambda kv: kv[1].get("priority", 99)))
+
+
+def _with_target_settings(spidercls, target: dict):
+    """ターゲット設定の delay をスパイダー設定に反映したサブクラスを返す
+
+    スパイダー側の custom_settings とyamlの delay のうち長い方を採用する。
+    """
+    custom = dict(spidercls.custom_settings or {})
+    if target.get("delay") is not None:
+        custom["DOWNLOAD_DELAY"] = max(
+            float(target["delay"]), float(custom.get("DOWNLOAD_DELAY", 0))
+        )
+    return type(spidercls.__name__, (spidercls,), {"custom_settings": custom})
+
+
+def _summarize(crawler) -> dict:
+    stats = crawler.stats.get_stats()
+    spider = crawler.spider
+    start = stats.get("start_time")
+    finish = stats.get("finish_time")
+    return {
+        "spider": spider.name if spider else crawler.spidercls.name,
+        "run_id": getattr(spider, "crawl_run_id", None),
+        "crawl_mode": getattr(spider, "crawl_mode", None),
+        "finish_reason": stats.get("finish_reason"),
+        "items": stats.get("item_scraped_count", 0),
+        "dropped": stats.get("item_dropped_count", 0),
+        "requests": stats.get("downloader/request_count", 0),
+        "responses": stats.get("downloader/response_count", 0),
+        "not_modified": stats.get("archive/not_modified", 0),
+        "errors": stats.get("log_count/ERROR", 0),
+        "download_delay": crawler.settings.getfloat("DOWNLOAD_DELAY"),
+        "elapsed_seconds": round((finish - start).total_seconds(), 1) if start and finish else None,
+    }
+
+
+def run_all(spiders: list[str] | None = None, mode: str | None = None) -> dict:
+    """対象スパイダーを並行実行し、実行結果のサマリを返す"""
+    settings = get_project_settings()
+    loader = SpiderLoader.from_settings(settings)
+    targets = load_targets()
+    names = spiders or list(targets)
+
+    process = CrawlerProcess(settings)
+    crawlers = []
+    for name in names:
+        spidercls = _with_target_settings(loader.load(name), targets.get(name, {}))
+        crawler = process.create_crawler(spidercls)
+        kwargs = {"crawl_mode": mode} if mode else {}
+        process.crawl(crawler, **kwargs)
+        crawlers.append(crawler)
+
+    started = datetime.now()
+    logger.info(f"並行クロール開始: {', '.join(names)}")
+    process.start()
+
+    results = [_summarize(crawler) for crawler in crawlers]
+    summary = {
+        "started_at": started.isoformat(timespec="seconds"),
+        "elapsed_seconds": round((datetime.now() - started).total_seconds(), 1),
+        "items": sum(r["items"] for r in results),
+        "requests": sum(r["requests"] for r in results),
+        "all_finished": all(r["finish_reason"] == "finished" for r in results),
+        "spiders": results,
+    }
+    return summary
+
+
+def run_workers(spiders: list[str] | None, workers: int, mode: str | None = None) -> dict:
+    """スパイダーごとに workers 個のプロセスを起動し、共有フロンティアで分担させる
+
+    フロンティア自体が中断・再開できるため、各ワーカーのチェックポイントは無効にする
+    (そのため掲載終了検出は行われない)。
+    """
+    settings = get_project_settings()
+    loader = SpiderLoader.from_settings(settings)
+    targets = load_targets()
+    names = spiders or list(targets)
+
+    started = datetime.now()
+    procs = {}
+    for name in names:
+        spidercls = _with_target_settings(loader.load(name), targets.get(name, {}))
+        crawl_id = default_crawl_id(name)
+        for index in range(workers):
+            cmd = [
+                sys.executable, "-m", "scrapy", "crawl", name,
+                "-s", "SCHEDULER=src.scraper.frontier.SharedFrontierScheduler",
+                "-s", f"FRONTIER_CRAWL_ID={crawl_id}",
+                "-s", f"FRONTIER_WORKERS={workers}",
+                "-s", f"FRONTIER_WORKER_INDEX={index}",
+                "-s", "CRAWL_CHECKPOINT_ENABLED=False",
+                "-s", "CRAWL_RESUME_ENABLED=False",
+            ]
+            delay = spidercls.custom_settings.get("DOWNLOAD_DELAY")
+            if delay is not None:
+                cmd += ["-s", f"DOWNLOAD_DELAY={delay}"]
+            if mode:
+                cmd += ["-a", f"crawl_mode={mode}"]
+            procs[(name, index)] = subprocess.Popen(cmd)
+    logger.info(f"分散クロール開始: {', '.join(names)} x {workers}ワーカー")
+
+    exit_codes = {key: proc.wait() for key, proc in procs.items()}
+    return {
+        "started_at": started.isoformat(timespec="seconds"),
+        "elapsed_seconds": round((datetime.now() - started).total_seconds(), 1),
+        "workers": workers,
+        "all_finished": all(code == 0 for code in exit_codes.values()),
+        "exit_codes": {f"{name}#{index}": code for (name, index), code in exit_codes.items()},
+    }
+
+
+def print_summary(summary: dict):
+    print(f"\n=== クロール結果 ({summary['elapsed_seconds']}秒) ===")
+    for r in summary["spiders"]:
+        print(
+            f"{r['spider']:8s} {r['finish_reason'] or '-':10s} "
+            f"{r['items']:6,d}件 リクエスト{r['requests']:5,d} "
+            f"(304: {r['not_modified']}, エラー{r['errors']}) "
+            f"delay={r['download_delay']}s {r['elapsed_seconds']}秒"
+        )
+    print(f"合計: {summary['items']:,}件 / リクエスト{summary['requests']:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="スパイダー並行実行")
+    parser.add_argument(
+        "--spider", action="append", help="対象スパイダー (複数指定可、既定は有効な全ターゲット)"
+    )
+    parser.add_argument("--mode", choices=CRAWL_MODES, help="クロールモード (既定は曜日設定に従う)")
+    parser.add_argument("--summary-json", help="サマリJSONの保存先")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="スパイダーごとのプロセス数 (2以上で共有フロンティアを使う)",
+    )
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        summary = run_workers(args.spider, args.workers, args.mode)
+        print(f"\n=== 分散クロール結果 ({summary['elapsed_seconds']}秒) ===")
+        for worker, code in summary["exit_codes"].items():
+            print(f"{worker:10s} 終了コード {code}")
+    else:
+        summary = run_all(args.spider, args.mode)
+        print_summary(summary)
+    if args.summary_json:
+        Path(args.summary_json).write_text(
+            json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+    sys.exit(0 if summary["all_finished"] else 1)
@@ -13,8 +13,12 @@ CONCURRENT_REQUESTS_PER_DOMAIN = 1
 DOWNLOAD_DELAY = 4
 RANDOMIZE_DOWNLOAD_DELAY = True
 
-# AutoThrottle (サーバー負荷に応じた自動調整)
-AUTOTHROTTLE_ENABLED = True
+# 応答時間・エラー率に応じたドメインごとの間隔調整 (scraping_targets.yaml の rate)
+# AutoThrottle と同じスロットの delay を操作するため、有効時は AutoThrottle を使わない
+ADAPTIVE_RATE_ENABLED = True
+
+# AutoThrottle (サーバー負荷に応じた自動調整、ADAPTIVE_RATE_ENABLED=False 時の代替)
+AUTOTHROTTLE_ENABLED = False
 AUTOTHROTTLE_START_DELAY = 3
 AUTOTHROTTLE_MAX_DELAY = 10
 AUTOTHROTTLE_TARGET_CONCURRENCY = 0.5
@@ -27,8 +31,29 @@ RETRY_HTTP_CODES = [500, 502, 503, 504, 408, 429]
 DOWNLOADER_MIDDLEWARES = {
     "src.scraper.middlewares.RandomUserAgentMiddleware": 400,
     "src.scraper.middlewares.PoliteRequestMiddleware": 500,
+    # HttpCompressionMiddleware (590) より内側で展開後の本文を保存する
+    "src.scraper.middlewares.RawArchiveMiddleware": 580,
+    # リトライ (550) よりダウンローダー側にあり、すべての試行
+    # (リトライ前の 429/5xx と応答時間) を観測する
+    # (560 は組み込みミドルウェアが使っていない番号)
+    "src.scraper.middlewares.AdaptiveRateMiddleware": 560,
+    # リトライ (550) を使い切った後の例外だけを受けて共有フロンティアの行を処理済みにする
+    "src.scraper.frontier.FrontierCompletionMiddleware": 540,
 }
 
+# SUUMO / HOME'S 一覧の高速パーサ (False で parsel セレクタ実装)
+FAST_PARSERS_ENABLED = True
+
+# SUUMO / HOME'S 一覧のパースを別プロセスで行う (リアクタースレッドはダウンロード・保存に専念)
+# PARSE_POOL_WORKERS = 0 で CPU数 - 1
+PARSE_POOL_ENABLED = False
+PARSE_POOL_WORKERS = 1
+
+# 生ページアーカイブ (再パース・条件付きGET用)
+RAW_ARCHIVE_ENABLED = True
+RAW_ARCHIVE_DIR = "data/raw_archive"
+RAW_ARCHIVE_REVALIDATE = True
+
 # パイプライン
 ITEM_PIPELINES = {
     "src.scraper.pipelines.DuplicateFilterPipeline": 100,
@@ -36,6 +61,62 @@ ITEM_PIPELINES = {
     "src.scraper.pipelines.SQLitePipeline": 300,
 }
 
+# SQLite書き込みスレッド (リアクタースレッドでのコミット待ちを避ける)
+SQLITE_WRITER_ENABLED = True
+SQLITE_WRITER_QUEUE_SIZE = 1000
+SQLITE_WRITER_BATCH_SIZE = 100
+SQLITE_WRITER_FLUSH_INTERVAL = 2.0
+
+# 前回保存時と内容ハッシュが同じ物件はクレンジング・upsertを省略し last_seen_at のみ更新
+SEEN_FILTER_ENABLED = True
+
+# 一覧の1ページ目で最終ページがわかれば残りのページを一括投入 (goohome / HOME'S)
+# 新着順で打ち切る差分クロールでは使わない。上限を超える分は次ページリンクをたどる
+PAGE_FANOUT_ENABLED = True
+PAGE_FANOUT_MAX_PAGES = 200
+
+# クロールの中断・再開 (フロンティアと確認済み物件を実行ごとにDBへ記録)
+# 無効にすると再開はしないが、掲載終了検出はその実行で保存した物件をもとに行う
+SPIDER_MIDDLEWARES = {
+    # 共有フロンティア使用時、コールバックの出力を渡し終えたリクエストを処理済みにする
+    "src.scraper.frontier.FrontierCompletionMiddleware": 90,
+    # 最も外側 (オフサイト・深さ制限で除外された後) の出力を記録する
+    "src.scraper.checkpoint.CrawlCheckpointMiddleware": 100,
+    # 最も内側 (コールバックの直後) でパース時間を計測する
+    "src.scraper.telemetry.ParseTimingMiddleware": 950,
+}
+CRAWL_CHECKPOINT_ENABLED = True
+# チェックポイントはこのページ数ごとにまとめて commit する (中断時はこの分まで再取得)
+CRAWL_CHECKPOINT_BATCH_PAGES = 20
+CRAWL_RESUME_ENABLED = True
+# この時間以内に開始して中断した実行のみ再開する (それより古ければ最初から)
+CRAWL_RESUME_MAX_AGE_HOURS = 20
+
+# 共有フロンティア (複数プロセスでのクロール、runner の --workers で使う)
+# SCHEDULER = "src.scraper.frontier.SharedFrontierScheduler" のときのみ有効
+FRONTIER_DB_PATH = "data/frontier.db"
+FRONTIER_CRAWL_ID = None  # 既定: スパイダー名-日付
+FRONTIER_WORKERS = 1
+FRONTIER_WORKER_INDEX = 0
+# この秒数内に処理済みにならなければ他のワーカーが引き取る
+FRONTIER_LEASE_SECONDS = 300
+FRONTIER_MAX_ATTEMPTS = 5
+
+# 拡張
+EXTENSIONS = {
+    "src.scraper.extensions.CrawlRunRecorder": 500,
+    # CrawlRunRecorder が設定した run_id に実行ごとのメトリクスを記録
+    "src.scraper.telemetry.CrawlTelemetry": 510,
+    # リアクター停止の検出 (STALL_MONITOR_ENABLED=True のときのみ)
+    "src.scraper.stall.ReactorStallMonitor": 520,
+}
+CRAWL_TELEMETRY_ENABLED = True
+# イベントループを THRESHOLD 秒以上止めた処理をスタックから特定して stall/* に記録
+STALL_MONITOR_ENABLED = False
+STALL_MONITOR_THRESHOLD = 0.25
+STALL_MONITOR_INTERVAL = 0.05
+STALL_MONITOR_MAX_SAMPLES = 20
+
 # ログ
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s [%(name)s] %(levelname)s: %(message)s"
@@ -0,0 +1,242 @@
+"""物件詳細ページによる情報補完スパイダー
+
+一覧ページには座標・設備の全量・契約条件が載っていないため、詳細ページから補完する。
+毎晩すべての詳細ページを取得すると時間がかかりすぎるので、以下の物件だけを
+優先度順に、1回あたりのリクエスト数上限 (budget) の範囲で取得する。
+
+1. 新規 (詳細未取得) の物件
+2. 前回の詳細取得時から一覧の内容 (content_hash) が変わった物件
+3. 座標・契約形態が欠けたままで、前回取得から retry_days 日以上経過した物件
+
+取得に失敗した物件 (404/410・タイムアウト等) は失敗として記録し、
+failure_retry_days × 連続失敗回数 の日数が経つまで候補から外す
+(失敗し続ける物件が毎晩の上限を使い切らないように)。
+
+設定は scraping_targets.yaml の detail_enrichment。スパイダー引数で上書きできる。
+
+    scrapy crawl detail
+    scrapy crawl detail -a budget=50 -a sources=suumo,homes
+
+詳細ページの構造はサイトごとに異なるため、th/td・dt/dd の見出しと値の組から
+項目名で値を探す。座標は地図用の埋め込みスクリプトや data 属性から抽出する。
+"""
+
+import re
+
+import scrapy
+import yaml
+from scrapy.spidermiddlewares.httperror import HttpError
+
+from src.database.models import init_db
+from src.database.repository import PropertyRepository
+from src.scraper.incremental import TARGETS_PATH, StartRequestsMixin
+from src.scraper.items import PropertyDetailItem
+from src.scraper.pipelines import load_db_path
+from src.scraper.spiders.homes import HomesSpider
+
+# 沖縄県の座標範囲 (抽出した値の妥当性チェック用)
+LAT_RANGE = (24.0, 28.0)
+LNG_RANGE = (122.0, 132.0)
+
+_LAT_RE = re.compile(
+    r"""(?:lat(?:itude)?|ido)["']?\s*[:=]\s*["']?(2[4-7]\.\d{3,})""", re.IGNORECASE
+)
+_LNG_RE = re.compile(
+    r"""(?:lng|lon(?:gitude)?|keido)["']?\s*[:=]\s*["']?(1[23]\d\.\d{3,})""", re.IGNORECASE
+)
+# Google マップのリンク等 (…q=26.2125,127.6792 / center=26.21,127.67)
+_LATLNG_PAIR_RE = re.compile(r"(2[4-7]\.\d{3,})\s*,\s*(1[23]\d\.\d{3,})")
+_MONTHS_RE = re.compile(r"([\d.]+)\s*[ヶヵカケ]月")
+_PRICE_RE = re.compile(r"([\d,.]+)\s*(万)?円")
+
+DEFAULT_BUDGET = 300
+DEFAULT_RETRY_DAYS = 14
+DEFAULT_FAILURE_RETRY_DAYS = 3
+DEFAULT_SOURCES = ("suumo", "homes", "goohome")
+
+
+def load_detail_config(config_path=TARGETS_PATH) -> dict:
+    """scraping_targets.yaml の detail_enrichment 設定"""
+    if not config_path.exists():
+        return {}
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    return config.get("detail_enrichment", {}) or {}
+
+
+class DetailSpider(StartRequestsMixin, scrapy.Spider):
+    """一覧を巡回しないため IncrementalCrawlMixin (クロールモード・掲載終了検出) は使わない"""
+
+    name = "detail"
+    custom_settings = {
+        "DOWNLOAD_DELAY": 5,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 0.3,
+        "ITEM_PIPELINES": {"src.scraper.pipelines.DetailEnrichmentPipeline": 300},
+    }
+
+    def __init__(
+        self, budget=None, sources=None, retry_days=None, failure_retry_days=None, *args, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        config = load_detail_config()
+        self.budget = int(budget if budget is not None else config.get("budget", DEFAULT_BUDGET))
+        self.retry_days = int(
+            retry_days if retry_days is not None else config.get("retry_days", DEFAULT_RETRY_DAYS)
+        )
+        self.failure_retry_days = int(
+            failure_retry_days
+            if failure_retry_days is not None
+            else config.get("failure_retry_days", DEFAULT_FAILURE_RETRY_DAYS)
+        )
+        if isinstance(sources, str):
+            sources = [s.strip() for s in sources.split(",") if s.strip()]
+        self.sources = list(sources or config.get("sources", DEFAULT_SOURCES))
+
+    def load_candidates(self) -> list[dict]:
+        conn = init_db(load_db_path(getattr(self, "settings", None)))
+        try:
+            return PropertyRepository(conn).get_detail_candidates(
+                self.sources, self.budget, self.retry_days, self.failure_retry_days
+            )
+        finally:
+            conn.close()
+
+    def start_requests(self):
+        candidates = self.load_candidates()
+        stats = self.crawler.stats if hasattr(self, "crawler") else None
+        self.logger.info(
+            f"詳細ページ取得: {len(candidates)}件 "
+            f"(上限{self.budget}件, 対象 {', '.join(self.sources)})"
+        )
+        for rank, row in enumerate(candidates):
+            if stats:
+                stats.inc_value("detail/queued")
+                stats.inc_value(f"detail/queued_priority_{row['detail_priority']}")
+            # 候補は優先度順に並んでいるため、順位をそのままリクエスト優先度にする
+            yield scrapy.Request(
+                row["source_url"],
+                callback=self.parse_detail,
+                errback=self.detail_failed,
+                priority=-rank,
+                cb_kwargs={
+                    "source": row["source"],
+                    "source_id": row["source_id"],
+                    "content_hash": row["content_hash"],
+                },
+            )
+
+    def parse_detail(self, response, source: str, source_id: str, content_hash: str | None = None):
+        """詳細ページから座標・設備・契約条件を抽出"""
+        item = PropertyDetailItem(source=source, source_id=source_id, content_hash=content_hash)
+
+        lat, lng = self._extract_coordinates(response)
+        if lat is not None:
+            item["latitude"] = lat
+            item["longitude"] = lng
+
+        fields = self._label_values(response)
+
+        equipment = " ".join(v for k, v in fields.items() if "設備" in k or "特徴" in k)
+        if equipment:
+            HomesSpider._parse_equipment(item, equipment)
+
+        for label, value in fields.items():
+            if "契約" in label and ("期間" in label or "形態" in label or "区分" in label):
+                if "定期" in value:
+                    item["lease_type"] = "fixed"
+                elif "普通" in value:
+                    item["lease_type"] = "ordinary"
+            elif "保証" in label and "金" not in label:
+                item["guarantor_required"] = self._parse_guarantor(value)
+            elif "仲介手数料" in label:
+                m = _MONTHS_RE.search(value)
+                if m:
+                    item["brokerage_fee_months"] = float(m.group(1))
+            elif "入居" in label:
+                item["move_in_date"] = value
+            elif label.startswith("駐車場"):
+                parking = self._parse_parking(value)
+                if parking:
+                    item["parking_available"], item["parking_fee"] = parking
+
+        yield item
+
+    def detail_failed(self, failure):
+        """取得失敗を記録するアイテムを返す (404/410 は掲載終了の可能性が高い)"""
+        kwargs = failure.request.cb_kwargs
+        if failure.check(HttpError):
+            status = failure.value.response.status
+            reason = str(status)
+            if status in (404, 410):
+                self.crawler.stats.inc_value("detail/gone")
+        else:
+            reason = failure.type.__name__
+        self.crawler.stats.inc_value(f"detail/failed/{reason}")
+        self.logger.info(f"詳細ページ取得失敗 ({reason}): {failure.request.url}")
+        yield PropertyDetailItem(
+            source=kwargs["source"], source_id=kwargs["source_id"], fetch_failed=reason
+        )
+
+    @staticmethod
+    def _label_values(response) -> dict[str, str]:
+        """th/td, dt/dd の見出しと値の組を抽出 (同じ見出しは先勝ち)"""
+        fields: dict[str, str] = {}
+        for label_tag, value_tag in (("th", "td"), ("dt", "dd")):
+            for label in response.xpath(f"//{label_tag}"):
+                key = " ".join(label.xpath(".//text()").getall()).strip()
+                value_node = label.xpath(f"following-sibling::{value_tag}[1]")
+                if not key or not value_node:
+                    continue
+                texts = (t.strip() for t in value_node.xpath(".//text()").getall())
+                value = " ".join(t for t in texts if t)
+                fields.setdefault(key, value)
+        return fields
+
+    @staticmethod
+    def _extract_coordinates(response) -> tuple[float | None, float | None]:
+        candidates = []
+        attrs = response.xpath("//*[@data-lat and (@data-lng or @data-lon)]")
+        if attrs:
+            node = attrs[0]
+            lng = node.attrib.get("data-lng") or node.attrib.get("data-lon")
+            candidates.append((node.attrib.get("data-lat"), lng))
+        text = response.text
+        lat_m, lng_m = _LAT_RE.search(text), _LNG_RE.search(text)
+        if lat_m and lng_m:
+            candidates.append((lat_m.group(1), lng_m.group(1)))
+        pair = _LATLNG_PAIR_RE.search(text)
+        if pair:
+            candidates.append(pair.groups())
+        for lat, lng in candidates:
+            try:
+                lat, lng = float(lat), float(lng)
+            except (TypeError, ValueError):
+                continue
+            if LAT_RANGE[0] <= lat <= LAT_RANGE[1] and LNG_RANGE[0] <= lng <= LNG_RANGE[1]:
+                return lat, lng
+        return None, None
+
+    @staticmethod
+    def _parse_guarantor(text: str) -> str:
+        """保証人・保証会社の記載 → required / available / none"""
+        if "不要" in text or "なし" in text:
+            return "none"
+        if "必須" in text or "要" in text:
+            return "required"
+        return "available"
+
+    @staticmethod
+    def _parse_parking(text: str) -> tuple[int, int | None] | None:
+        """「敷地内 5,000円/月」「空無」→ (駐車場有無, 料金)"""
+        if not text:
+            return None
+        if ("無" in text and "無料" not in text) or "なし" in text:
+            return 0, None
+        fee = None
+        m = _PRICE_RE.search(text)
+        if m:
+            value = float(m.group(1).replace(",", ""))
+            fee = int(value * 10000) if m.group(2) else int(value)
+        elif "込" in text or "無料" in text:
+            fee = 0
+        return 1, fee
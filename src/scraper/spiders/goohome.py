@@ -16,13 +16,18 @@
 - 画像リンク: div.imgbox a[href] → 詳細ページ
 - ページネーション: div.insp_page-n ul > li > a
   URL: ?page={page}-{items_per_page}
+- 該当件数: div.insp_result-num ("該当物件 1,234件")
+  1ページ目で件数から最終ページを求め、残りのページを一括で投入する
 """
 
 import re
 
 import scrapy
+from w3lib.url import add_or_replace_parameter
 
+from src.scraper.incremental import IncrementalCrawlMixin, item_fingerprint, parse_total_count
 from src.scraper.items import RentalPropertyItem
+from src.scraper.planner import page_size
 
 # グーホームの沖縄主要エリア (URL用)
 GOOHOME_AREAS = [
@@ -35,22 +40,27 @@ GOOHOME_AREAS = [
 ]
 
 
-class GoohomeSpider(scrapy.Spider):
+class GoohomeSpider(IncrementalCrawlMixin, scrapy.Spider):
     name = "goohome"
     allowed_domains = ["goohome.jp"]
     custom_settings = {
         "DOWNLOAD_DELAY": 3,
+        # 一括投入したページを応答待ちの間に次々送れるよう2本まで (間隔の制御は変わらない)
+        "CONCURRENT_REQUESTS": 2,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 2,
     }
 
     def start_requests(self):
-        """各市町村の物件一覧ページにアクセス (部屋単位表示)"""
+        """各市町村の物件一覧ページにアクセス (部屋単位表示、件数は plan.page_sizes の最大)"""
+        size = page_size(self.name, 20)
         for area in GOOHOME_AREAS:
-            url = f"https://goohome.jp/chintai/mansion/{area}/?page=1-20"
+            url = f"https://goohome.jp/chintai/mansion/{area}/?page=1-{size}"
             yield scrapy.Request(url=url, callback=self.parse_list)
 
     def parse_list(self, response):
         """物件一覧ページをパース"""
         cards = response.css("section.insp_caset")
+        page_items = []
 
         for card in cards:
             item = RentalPropertyItem()
@@ -159,6 +169,8 @@ class GoohomeSpider(scrapy.Spider):
             if comment:
                 item["name"] = comment.strip()[:100]
 
+            item["content_hash"] = item_fingerprint(item)
+            page_items.append(item)
             yield item
 
         # ページネーション: div.insp_page-n 内の次ページリンク
@@ -173,8 +185,26 @@ class GoohomeSpider(scrapy.Spider):
                 "ul.insp_prev-next li.next a::attr(href)"
             ).get()
 
-        if next_page:
-            yield response.follow(next_page, callback=self.parse_list)
+        current_page, per_page = self._page_params(current_url)
+        total = parse_total_count(response.css("div.insp_result-num ::text").getall())
+
+        def page_url(page: int) -> str:
+            return add_or_replace_parameter(current_url, "page", f"{page}-{per_page}")
+
+        yield from self.paginate(
+            response, page_items, next_page, current_page,
+            last_page=-(-total // per_page) if total and per_page else None,
+            page_url=page_url,
+            callback=self.parse_list,
+        )
+
+    @staticmethod
+    def _page_params(url: str) -> tuple[int, int | None]:
+        """URLの ?page={page}-{items_per_page} → (page, items_per_page)"""
+        m = re.search(r"page=(\d+)-(\d+)", url)
+        if not m:
+            return 1, None
+        return int(m.group(1)), int(m.group(2))
 
     @staticmethod
     def _parse_sikirei(text: str) -> tuple[str | None, str | None]:
@@ -18,22 +18,30 @@
   - 設備タグ: tr.prg-relatedKeywordsRow li.relatedKeyword
 - ページネーション: div.mod-listPaging li.nextPage a
   URL: ?page={N}
+  1ページ目でページ番号リンクの最大値を最終ページとし、残りのページを一括で投入する
 """
 
 import re
 from datetime import datetime
 
 import scrapy
+from w3lib.url import add_or_replace_parameter, url_query_parameter
 
+from src.scraper.fast_parsers import fast_parsers_enabled, parse_homes_list
+from src.scraper.incremental import IncrementalCrawlMixin, item_fingerprint
 from src.scraper.items import RentalPropertyItem
+from src.scraper.parse_pool import get_parse_pool
 
 
-class HomesSpider(scrapy.Spider):
+class HomesSpider(IncrementalCrawlMixin, scrapy.Spider):
     name = "homes"
     allowed_domains = ["www.homes.co.jp"]
     custom_settings = {
         "DOWNLOAD_DELAY": 5,
         "AUTOTHROTTLE_TARGET_CONCURRENCY": 0.3,
+        # 一括投入したページを応答待ちの間に次々送れるよう2本まで (間隔の制御は変わらない)
+        "CONCURRENT_REQUESTS": 2,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 2,
     }
 
     def start_requests(self):
@@ -43,9 +51,48 @@ class HomesSpider(scrapy.Spider):
         )
 
     def parse_list(self, response):
-        """物件一覧ページをパース"""
+        """物件一覧ページをパース (PARSE_POOL_ENABLED ならプロセスプールで)"""
+        pool = get_parse_pool(self)
+        if pool is not None:
+            return pool.parse_list(self, response, self._list_output)
+        return self._parse_list_inline(response)
+
+    def _parse_list_inline(self, response):
+        if fast_parsers_enabled(self):
+            page_items, next_page = parse_homes_list(self, response)
+        else:
+            page_items, next_page = self._parse_list_selectors(response)
+        for item in page_items:
+            item["content_hash"] = item_fingerprint(item)
+        yield from self._list_output(response, page_items, next_page)
+
+    def _list_output(self, response, page_items, next_page):
+        """パース済みの一覧 (内容ハッシュ付き) からアイテムとページ送りを出力"""
+        yield from page_items
+
+        current_page = int(url_query_parameter(response.url, "page") or 1)
+        yield from self.paginate(
+            response, page_items, next_page, current_page,
+            last_page=self._last_page(response) if current_page == 1 else None,
+            page_url=lambda page: add_or_replace_parameter(response.url, "page", str(page)),
+            callback=self.parse_list,
+        )
+
+    @staticmethod
+    def _last_page(response) -> int | None:
+        """ページ番号リンク (?page=N) の最大値 (次ページリンクのみなら最終ページは不明)"""
+        pages = [
+            int(m.group(1))
+            for href in response.css("div.mod-listPaging li:not(.nextPage) a::attr(href)").getall()
+            if (m := re.search(r"[?&]page=(\d+)", href))
+        ]
+        return max(pages) if pages else None
+
+    def _parse_list_selectors(self, response) -> tuple[list[RentalPropertyItem], str | None]:
+        """parsel セレクタによる一覧パース (fast_parsers の基準実装)"""
         # 通常の建物カード
         buildings = response.css("div.mod-mergeBuilding--rent--photo")
+        page_items = []
 
         for building in buildings:
             # --- 建物単位の情報 ---
@@ -200,14 +247,13 @@ class HomesSpider(scrapy.Spider):
                     equip_text = " ".join(kw.strip() for kw in keywords)
                     self._parse_equipment(item, equip_text)
 
-                yield item
+                page_items.append(item)
 
         # ページネーション
         next_page = response.css(
             "div.mod-listPaging li.nextPage a::attr(href)"
         ).get()
-        if next_page:
-            yield response.follow(next_page, callback=self.parse_list)
+        return page_items, next_page
 
     @staticmethod
     def _parse_building_age(text: str) -> int | None:
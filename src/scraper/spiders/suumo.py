@@ -21,7 +21,11 @@ from datetime import datetime
 
 import scrapy
 
+from src.scraper.fast_parsers import fast_parsers_enabled, parse_suumo_list
+from src.scraper.incremental import IncrementalCrawlMixin, item_fingerprint
 from src.scraper.items import RentalPropertyItem
+from src.scraper.parse_pool import get_parse_pool
+from src.scraper.planner import page_size
 
 # 沖縄県の主要市町村エリアコード (SUUMO URL用)
 OKINAWA_AREA_CODES = [
@@ -32,25 +36,60 @@ OKINAWA_AREA_CODES = [
     "motobu", "onna", "ginoza",
     "miyakojima", "ishigaki",
 ]
+_AREA_RE = re.compile(r"/sc_(\w+)/")
 
 
-class SuumoSpider(scrapy.Spider):
+class SuumoSpider(IncrementalCrawlMixin, scrapy.Spider):
     name = "suumo"
     allowed_domains = ["suumo.jp"]
     custom_settings = {
         "DOWNLOAD_DELAY": 5,
         "AUTOTHROTTLE_TARGET_CONCURRENCY": 0.3,
     }
+    # 並び順: 新着順 (差分クロール時のみ付与)
+    newest_first_params = {"po1": "09"}
 
     def start_requests(self):
-        """各市町村の一覧ページに直接アクセス"""
+        """各市町村の一覧ページに直接アクセス (表示件数は plan.page_sizes の最大)"""
+        size = page_size(self.name)
         for area_code in OKINAWA_AREA_CODES:
             url = f"https://suumo.jp/chintai/okinawa/sc_{area_code}/"
+            if size:
+                url += f"?pc={size}"
+            url = self.apply_sort_params(url)
             yield scrapy.Request(url=url, callback=self.parse_list)
 
+    def frontier_shard(self, request) -> str | None:
+        """共有フロンティアのシャード (市町村エリアコード)"""
+        m = _AREA_RE.search(request.url)
+        return m.group(1) if m else None
+
     def parse_list(self, response):
-        """物件一覧ページをパース"""
+        """物件一覧ページをパース (PARSE_POOL_ENABLED ならプロセスプールで)"""
+        pool = get_parse_pool(self)
+        if pool is not None:
+            return pool.parse_list(self, response, self._list_output)
+        return self._parse_list_inline(response)
+
+    def _parse_list_inline(self, response):
+        if fast_parsers_enabled(self):
+            page_items, next_page = parse_suumo_list(self, response)
+        else:
+            page_items, next_page = self._parse_list_selectors(response)
+        for item in page_items:
+            item["content_hash"] = item_fingerprint(item)
+        yield from self._list_output(response, page_items, next_page)
+
+    def _list_output(self, response, page_items, next_page):
+        """パース済みの一覧 (内容ハッシュ付き) からアイテムと次ページを出力"""
+        yield from page_items
+        if next_page and self.should_follow_next_page(page_items):
+            yield response.follow(next_page, callback=self.parse_list)
+
+    def _parse_list_selectors(self, response) -> tuple[list[RentalPropertyItem], str | None]:
+        """parsel セレクタによる一覧パース (fast_parsers の基準実装)"""
         cassettes = response.css("div.cassetteitem")
+        page_items = []
 
         for cassette in cassettes:
             # --- 建物単位の情報 ---
@@ -165,12 +204,11 @@ class SuumoSpider(scrapy.Spider):
                     item["source_id"] = f"suumo_{building_name}_{floor_text}".replace(" ", "")
                     item["source_url"] = response.url
 
-                yield item
+                page_items.append(item)
 
         # ページネーション: 「次へ」リンク
         next_page = response.css("p.pagination-parts a:contains('次へ')::attr(href)").get()
-        if next_page:
-            yield response.follow(next_page, callback=self.parse_list)
+        return page_items, next_page
 
     @staticmethod
     def _parse_building_year(text: str) -> int | None:
@@ -32,11 +32,34 @@ SPAサイトのため、内部JSON API経由でデータ取得 (2026年2月確
 """
 
 import json
+import math
 import re
 
 import scrapy
 
+from src.scraper.incremental import IncrementalCrawlMixin, item_fingerprint
 from src.scraper.items import RentalPropertyItem
+from src.scraper.planner import (
+    area_capacity,
+    load_area_counts,
+    load_plans,
+    page_sizes,
+    partition_areas,
+    unknown_area_count,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未インストール環境では標準の json にフォールバック
+    orjson = None
+
+API_URL = "https://www.e-uchina.net/api/search"
+REFERER = "https://www.e-uchina.net/jukyo/"
+
+# 1ページの件数は scraping_targets.yaml の plan.page_sizes を大きい順に試し、
+# APIが受け付けた値 (レスポンスの per_page) を全市町村で使う
+PER_PAGE_CANDIDATES = page_sizes("uchina", (500, 200, 100, 50))
+DEFAULT_PER_PAGE = 50
 
 # 沖縄県の主要市町村 JISコード
 OKINAWA_CITY_CODES = [
@@ -60,57 +83,205 @@ OKINAWA_CITY_CODES = [
 ]
 
 
-class UchinaSpider(scrapy.Spider):
+def loads_json(body: bytes):
+    """レスポンスのバイト列をそのままデコード (orjson があれば使用)
+
+    response.text を経由しないため、本文全体の str コピーを作らない。
+    デコード失敗時はどちらの実装でも ValueError (JSONDecodeError) を送出する。
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class UchinaSpider(IncrementalCrawlMixin, scrapy.Spider):
+    """市町村ごとの検索APIを並行して取得する
+
+    1. 最初の市町村で1ページの件数を PER_PAGE_CANDIDATES の大きい順に試す
+       (エラーなら次の候補、上限で切り詰められればレスポンスの per_page を採用)
+    2. 決まった件数で残りの市町村の1ページ目を一括で投入。掲載数の少ない市町村は
+       src.scraper.planner で city[0], city[1], ... の1回の検索にまとめる
+       (まとめた検索の件数が plan.result_cap を超えたら市町村ごとに取り直す)
+    3. 1ページ目の last_page から2ページ目以降を一括で投入 (next_page_url を順にたどらない)
+
+    同時接続数は custom_settings で上限を設け、リクエスト間隔は DOWNLOAD_DELAY と
+    AdaptiveRateMiddleware (scraping_targets.yaml の rate) が従来どおり守る。
+    """
+
     name = "uchina"
     allowed_domains = ["e-uchina.net"]
+    api_url = API_URL
     custom_settings = {
         "DOWNLOAD_DELAY": 2,
+        # 応答待ちの間に次のリクエストを送れるよう2本まで (間隔の制御は変わらない)
+        "CONCURRENT_REQUESTS": 2,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 2,
         "DEFAULT_REQUEST_HEADERS": {
             "Accept": "application/json",
             "X-Requested-With": "XMLHttpRequest",
         },
     }
 
-    def start_requests(self):
-        """各市町村のAPI検索エンドポイントにリクエスト (perPage=50で効率化)"""
-        for city_code, city_name in OKINAWA_CITY_CODES:
-            url = (
-                f"https://www.e-uchina.net/api/search"
-                f"?searchType=jukyo&city[0]={city_code}&perPage=50"
-            )
-            yield scrapy.Request(
-                url=url,
-                callback=self.parse_api,
-                cb_kwargs={"city_code": city_code, "city_name": city_name},
-                headers={"Referer": "https://www.e-uchina.net/jukyo/"},
-            )
+    # 前回までの市町村コード別の掲載数 (未読み込みなら None)
+    _area_counts: dict[str, int] | None = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests_saved = 0
 
-    def parse_api(self, response, city_code: str, city_name: str):
+    def start_requests(self):
+        """最初の市町村で1ページの件数を決める (残りは parse_api で投入)"""
+        yield self._probe_request(0)
+
+    def _api_request(self, city_code: str, city_name: str, page: int, per_page: int, **kwargs):
+        """検索APIのリクエスト (city_code がカンマ区切りなら複数市町村をまとめて検索)"""
+        cities = "&".join(f"city[{i}]={code}" for i, code in enumerate(city_code.split(",")))
+        url = f"{self.api_url}?searchType=jukyo&{cities}&perPage={per_page}"
+        if page > 1:
+            url += f"&page={page}"
+        return scrapy.Request(
+            url=url,
+            callback=self.parse_api,
+            cb_kwargs={
+                "city_code": city_code,
+                "city_name": city_name,
+                "page": page,
+                "per_page": per_page,
+            },
+            headers={"Referer": REFERER},
+            **kwargs,
+        )
+
+    def frontier_shard(self, request) -> str | None:
+        """共有フロンティアのシャード (市町村コード)"""
+        return request.cb_kwargs.get("city_code")
+
+    def _probe_request(self, index: int):
+        city_code, city_name = OKINAWA_CITY_CODES[0]
+        return self._api_request(
+            city_code, city_name, 1, PER_PAGE_CANDIDATES[index],
+            errback=self.probe_failed,
+            meta={"uchina_probe": index},
+            dont_filter=True,
+        )
+
+    def probe_failed(self, failure):
+        """件数候補がエラーになったら次に小さい候補で再試行"""
+        index = failure.request.meta["uchina_probe"]
+        self.logger.info(
+            f"perPage={PER_PAGE_CANDIDATES[index]} は受け付けられませんでした: {failure.value!r}"
+        )
+        yield from self._next_probe(index)
+
+    def _next_probe(self, index: int):
+        if index + 1 < len(PER_PAGE_CANDIDATES):
+            yield self._probe_request(index + 1)
+            return
+        # 候補がすべて失敗した場合も既定の件数で全市町村を取得する
+        yield from self._fan_out_cities(DEFAULT_PER_PAGE, include_first=True)
+
+    def _fan_out_cities(self, per_page: int, include_first: bool = False):
+        cities = OKINAWA_CITY_CODES if include_first else OKINAWA_CITY_CODES[1:]
+        if self._area_counts is None:
+            self._area_counts = load_area_counts(self)
+        groups = partition_areas(
+            cities, self._area_counts, area_capacity(UchinaSpider.name),
+            unknown_area_count(self._area_counts, per_page),
+        )
+        self.logger.info(
+            f"1ページ {per_page}件で {len(cities)}市町村を {len(groups)}回の検索で取得"
+        )
+        if getattr(self, "crawler", None):
+            self.crawler.stats.set_value("uchina/per_page", per_page)
+            self.crawler.stats.set_value("uchina/area_queries", len(groups) + (not include_first))
+        for group in groups:
+            yield self._group_request(group, per_page)
+
+    def _group_request(self, group: list[tuple[str, str]], per_page: int):
+        return self._api_request(
+            ",".join(code for code, _ in group), "・".join(name for _, name in group), 1, per_page
+        )
+
+    def parse_api(
+        self,
+        response,
+        city_code: str,
+        city_name: str,
+        page: int = 1,
+        per_page: int = DEFAULT_PER_PAGE,
+    ):
         """APIレスポンス(JSON)をパース"""
+        probe = response.meta.get("uchina_probe")
         try:
-            data = json.loads(response.text)
-        except json.JSONDecodeError:
+            data = loads_json(response.body)
+        except ValueError:
             self.logger.error(f"JSON parse failed for city_code={city_code}")
+            if probe is not None:
+                yield from self._next_probe(probe)
             return
 
         bukkens = data.get("data", {}).get("bukkens", {})
         records = bukkens.get("data", [])
+        # 上限で切り詰められた場合は実際に返された件数で以降のページを計算する
+        per_page = min(per_page, int(bukkens.get("per_page") or per_page))
+        if probe is not None:
+            yield from self._fan_out_cities(per_page)
 
+        page_items = []
         for rec in records:
             item = self._build_item(rec)
             if item:
+                item["content_hash"] = item_fingerprint(item)
+                page_items.append(item)
                 yield item
 
-        # ページネーション
-        next_url = bukkens.get("next_page_url")
-        if next_url:
+        if not self.should_follow_next_page(page_items):
+            return
+        if page == 1 and "," in city_code and self._over_cap(bukkens.get("total")):
+            # まとめた検索が上限を超えた → 市町村ごとに取り直す (このページの物件は保存済み)
+            self.logger.info(f"{city_name}: {bukkens.get('total')}件のため市町村ごとに取得")
+            if getattr(self, "crawler", None):
+                self.crawler.stats.inc_value("uchina/groups_split")
+            for code, name in zip(city_code.split(","), city_name.split("・")):
+                yield self._group_request([(code, name)], per_page)
+            return
+        last_page = bukkens.get("last_page")
+        if last_page:
+            if page == 1:
+                self._count_saved(bukkens.get("total"), per_page)
+                for n in range(2, int(last_page) + 1):
+                    yield self._api_request(city_code, city_name, n, per_page)
+        elif bukkens.get("next_page_url"):
+            # last_page を返さない場合は従来どおり次ページを順にたどる
             yield scrapy.Request(
-                url=next_url,
+                url=bukkens["next_page_url"],
                 callback=self.parse_api,
-                cb_kwargs={"city_code": city_code, "city_name": city_name},
-                headers={"Referer": "https://www.e-uchina.net/jukyo/"},
+                cb_kwargs={
+                    "city_code": city_code,
+                    "city_name": city_name,
+                    "page": page + 1,
+                    "per_page": per_page,
+                },
+                headers={"Referer": REFERER},
             )
 
+    def _over_cap(self, total) -> bool:
+        plan = load_plans().get(UchinaSpider.name, {})
+        return bool(total and plan.get("result_cap") and int(total) > plan["result_cap"])
+
+    def _count_saved(self, total, per_page: int):
+        """perPage=50 の場合と比べて削減できたリクエスト数"""
+        if not total or per_page <= DEFAULT_PER_PAGE:
+            return
+        saved = math.ceil(int(total) / DEFAULT_PER_PAGE) - math.ceil(int(total) / per_page)
+        self.requests_saved += saved
+        if getattr(self, "crawler", None):
+            self.crawler.stats.inc_value("uchina/requests_saved", saved)
+
+    def closed(self, reason):
+        if self.requests_saved:
+            self.logger.info(f"perPage=50 と比べて {self.requests_saved}リクエスト削減")
+
     def _build_item(self, rec: dict) -> RentalPropertyItem | None:
         """APIレコードからRentalPropertyItemを生成"""
         item = RentalPropertyItem()
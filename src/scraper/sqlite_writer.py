@@ -0,0 +1,167 @@
+"""SQLite書き込み専用スレッド
+
+アイテムパイプラインから受け取った物件データを有界キューに積み、専用スレッドが
+まとめて upsert・コミットする。ディスク同期を伴う書き込みをリアクタースレッドから
+外すことで、書き込み中もダウンロードとパースが止まらない。
+
+SQLite接続はスレッドをまたいで使えないため、接続は書き込みスレッド内で開く。
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.database.models import get_connection
+from src.database.repository import PropertyRepository
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+_TOUCH = object()
+
+
+class SQLiteWriter(threading.Thread):
+    """物件データを一括upsertする書き込みスレッド
+
+    batch_size 件たまるか flush_interval 秒経過した時点で1トランザクションでコミットする。
+    キューが満杯のとき put() は空きができるまでブロックする (呼び出し側で背圧をかける)。
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        batch_size: int = 100,
+        queue_size: int = 1000,
+        flush_interval: float = 2.0,
+    ):
+        super().__init__(name="sqlite-writer", daemon=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        # 統計 (書き込みスレッドのみが更新する)
+        self.items_written = 0
+        self.items_touched = 0
+        self.batches = 0
+        self.errors = 0
+        self.write_seconds = 0.0
+        self.max_batch_seconds = 0.0
+        # キューから取り出し済みで未書き込みの物件データ
+        self._pending: list[dict] = []
+
+    def put(self, data: dict, timeout: float | None = None):
+        self.queue.put(data, timeout=timeout)
+
+    def put_touch(self, pairs: list[tuple[str, str]], timeout: float | None = None):
+        """内容が変わっていない物件の last_seen_at 更新 (PropertyRepository.touch_seen)"""
+        self.queue.put((_TOUCH, pairs), timeout=timeout)
+
+    def put_touch_nowait(self, pairs: list[tuple[str, str]]):
+        """put_touch の非ブロック版 (キューが満杯なら queue.Full を送出)"""
+        self.queue.put_nowait((_TOUCH, pairs))
+
+    def put_nowait(self, data: dict):
+        """キューが満杯なら queue.Full を送出"""
+        self.queue.put_nowait(data)
+
+    def close(self, timeout: float | None = 60.0) -> tuple[list[dict], list[tuple[str, str]]]:
+        """キューに残った分を書き込んでからスレッドを終了する
+
+        スレッドが異常終了していた場合は、書き込まれずにキューに残った
+        (物件データ, touch の (source, source_id)) を返す (呼び出し側で書き込む)。
+        """
+        if self.is_alive():
+            try:
+                self.queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                logger.error(f"SQLite書き込みスレッドのキューが {timeout}秒以内に空きませんでした")
+            self.join(timeout)
+        if self.is_alive():
+            logger.error(
+                f"SQLite書き込みスレッドが {timeout}秒以内に終了しませんでした "
+                f"(キュー残り {self.queue.qsize()}件)"
+            )
+            return [], []
+        items, touched = list(self._pending), []
+        while True:
+            try:
+                data = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(data, tuple) and data[0] is _TOUCH:
+                touched.extend(data[1])
+            elif data is not _STOP:
+                items.append(data)
+        if items or touched:
+            logger.error(
+                f"SQLite書き込みスレッドが異常終了したため未書き込み: "
+                f"物件 {len(items)}件, last_seen_at 更新 {len(touched)}件"
+            )
+        return items, touched
+
+    def run(self):
+        try:
+            conn = get_connection(self.db_path)
+        except sqlite3.Error as e:
+            logger.error(f"SQLite書き込みスレッドがDBに接続できません: {e}")
+            return
+        repo = PropertyRepository(conn)
+        deadline = time.monotonic() + self.flush_interval
+        try:
+            while True:
+                try:
+                    data = self.queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+                except queue.Empty:
+                    data = None
+                if data is _STOP:
+                    break
+                if isinstance(data, tuple) and data[0] is _TOUCH:
+                    self._touch(repo, data[1])
+                elif data is not None:
+                    self._pending.append(data)
+                if len(self._pending) >= self.batch_size or (
+                    self._pending and time.monotonic() >= deadline
+                ):
+                    self._write(repo, self._pending)
+                    self._pending = []
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.flush_interval
+            self._write(repo, self._pending)
+            self._pending = []
+        except Exception:
+            # 取り出し済みで未書き込みの分は _pending に残り、close() が返す
+            logger.exception("SQLite書き込みスレッドが異常終了しました")
+        finally:
+            conn.close()
+
+    def _touch(self, repo: PropertyRepository, pairs: list[tuple[str, str]]):
+        started = time.perf_counter()
+        try:
+            self.items_touched += repo.touch_seen(pairs)
+        except sqlite3.Error as e:
+            self.errors += len(pairs)
+            logger.error(f"SQLite last_seen_at 更新失敗 ({len(pairs)}件): {e}")
+        self.write_seconds += time.perf_counter() - started
+
+    def _write(self, repo: PropertyRepository, batch: list[dict]):
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            self.items_written += repo.upsert_many(batch)
+        except sqlite3.Error as e:
+            # バッチ全体がロールバックされたので1件ずつ再試行し、失敗した行だけを捨てる
+            logger.warning(f"SQLite一括書き込み失敗 ({len(batch)}件)、1件ずつ再試行: {e}")
+            failed = repo.upsert_each(batch)
+            for data, error in failed:
+                key = f"{data.get('source')}/{data.get('source_id')}"
+                logger.error(f"SQLite書き込み失敗: {key}: {error}")
+            self.errors += len(failed)
+            self.items_written += len(batch) - len(failed)
+        self.batches += 1
+        elapsed = time.perf_counter() - started
+        self.write_seconds += elapsed
+        self.max_batch_seconds = max(self.max_batch_seconds, elapsed)
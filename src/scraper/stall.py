@@ -0,0 +1,250 @@
+"""リアクター停止の検出 (オプトイン)
+
+コールバックやパイプライン内の同期処理 (正規表現のクレンジング、SQLite のコミット、
+open_spider での YAML 読み込み など) は、その間 TWISTED_REACTOR のイベントループを止める。
+LagMonitor はループ上の定期処理の遅れ (ラグ) を測り、STALL_MONITOR_THRESHOLD 秒を
+超えて止まっている間は別スレッドからリアクタースレッドのスタックを採取して、
+止めている処理 (スパイダーのコールバック・パイプライン・ミドルウェアのメソッド) を特定する。
+
+    scrapy crawl suumo -s STALL_MONITOR_ENABLED=True
+
+Stats (CrawlTelemetry により crawl_metrics にも記録される):
+- stall/count, stall/seconds, stall/max_seconds: 閾値を超えた停止の回数・合計・最大
+- stall/lag_max: 閾値未満も含めた最大ラグ
+- stall/stage/<クラス.メソッド>, stall/stage_seconds/<クラス.メソッド>: 処理ごとの停止回数・秒数
+停止ごとのスタックは STALL_MONITOR_MAX_SAMPLES 件まで WARNING でログに出す。
+
+1つの CrawlerProcess で複数のスパイダーを動かすときもリアクターは1つなので、ラグの計測と
+監視スレッドはプロセスに1組だけ動かし (最初に生成された拡張の閾値・間隔を使う)、停止は
+スタックから特定したクローラの Stats にだけ記録する。特定できなかった停止は
+stall/unattributed として全クローラに数える (stall/count には含めない)。
+"""
+
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from pathlib import Path
+
+import scrapy
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+from src.scraper.pipelines import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+_COMPONENT_SUFFIXES = ("Pipeline", "Middleware", "Extension")
+_THIS_FILE = str(Path(__file__).resolve())
+
+
+def _component(frame) -> str | None:
+    """フレームがスパイダー・パイプライン等のメソッドなら 'クラス.メソッド'"""
+    owner = frame.f_locals.get("self")
+    if owner is None:
+        return None
+    cls = type(owner)
+    if isinstance(owner, scrapy.Spider) or cls.__name__.endswith(_COMPONENT_SUFFIXES):
+        return f"{cls.__name__}.{frame.f_code.co_name}"
+    return None
+
+
+def attribute_stall(frame) -> tuple[str, str | None]:
+    """停止中のスタックから (処理名, プロジェクト内の最も内側の行) を求める
+
+    処理名は最も内側のスパイダー・パイプライン・ミドルウェア・拡張のメソッド
+    (コールバックを包む Scrapy のミドルウェアではなくコールバック自身)。
+    見つからなければプロジェクト内で最も内側の関数、それもなければ "unknown"。
+    """
+    stage = hotspot = None
+    root = str(PROJECT_ROOT)
+    while frame is not None and stage is None:
+        filename = frame.f_code.co_filename
+        if hotspot is None and filename.startswith(root) and filename != _THIS_FILE:
+            hotspot = f"{Path(filename).relative_to(root)}:{frame.f_lineno} {frame.f_code.co_name}"
+        stage = _component(frame)
+        frame = frame.f_back
+    return stage or (hotspot.rsplit(" ", 1)[1] if hotspot else "unknown"), hotspot
+
+
+def owner_crawler(frame, crawlers):
+    """停止中のスタックから、止めている処理が属するクローラを探す (なければ None)
+
+    内側のフレームから順に self・spider の crawler 属性を見る (スパイダー・
+    ミドルウェア・パイプラインの引数、なければクローラごとの Scraper 等)。
+    """
+    while frame is not None:
+        for name in ("self", "spider"):
+            crawler = getattr(frame.f_locals.get(name), "crawler", None)
+            if crawler is not None and any(crawler is c for c in crawlers):
+                return crawler
+        frame = frame.f_back
+    return None
+
+
+class LagMonitor:
+    """プロセスに1つのラグ計測 (リアクター上の LoopingCall) と監視スレッド
+
+    LoopingCall が interval 秒ごとに最終実行時刻を更新し、監視スレッドがそれが
+    threshold 秒以上更新されないことを検出したらスタックを採取する。
+    停止が終わって LoopingCall が動いた時点のラグを停止時間として、
+    スタックから特定したクローラの ReactorStallMonitor に記録させる。
+    """
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.05):
+        self.threshold = threshold
+        self.interval = interval
+        self.monitors: list[ReactorStallMonitor] = []
+        self.lock = threading.Lock()
+        self.pending: tuple[str, str | None, str, object] | None = None
+        self.last_beat = time.monotonic()
+        self.reactor_thread: int | None = None
+        self.loop = None
+        self.stopped = threading.Event()
+        self.watcher = None
+
+    def register(self, monitor: "ReactorStallMonitor"):
+        self.monitors.append(monitor)
+        if self.loop is None:
+            self.start()
+
+    def unregister(self, monitor: "ReactorStallMonitor") -> bool:
+        """監視をやめる。最後のクローラなら計測も止めて True"""
+        if monitor in self.monitors:
+            self.monitors.remove(monitor)
+        if self.monitors:
+            return False
+        self.stopped.set()
+        if self.loop is not None and self.loop.running:
+            self.loop.stop()
+        return True
+
+    def start(self):
+        """リアクタースレッド (クローラを生成したスレッド) で監視を始める"""
+        from twisted.internet import reactor
+
+        self.reactor_thread = threading.get_ident()
+        self.loop = task.LoopingCall(self.beat)
+        self.loop.start(self.interval, now=False)
+        reactor.callWhenRunning(self._reset)
+        self.watcher = threading.Thread(target=self._watch, name="stall-monitor", daemon=True)
+        self.watcher.start()
+
+    def _reset(self):
+        self.last_beat = time.monotonic()
+        with self.lock:
+            self.pending = None
+
+    def beat(self):
+        """リアクタースレッドで interval 秒ごとに呼ばれる"""
+        now = time.monotonic()
+        lag = max(now - self.last_beat - self.interval, 0.0)
+        self.last_beat = now
+        for monitor in self.monitors:
+            monitor.stats.max_value("stall/lag_max", round(lag, 4))
+        with self.lock:
+            pending, self.pending = self.pending, None
+        if lag < self.threshold:
+            return
+        stage, hotspot, stack, crawler = pending or ("unknown", None, "", None)
+        owners = [m for m in self.monitors if m.crawler is crawler]
+        if not owners and len(self.monitors) == 1:
+            owners = self.monitors
+        if owners:
+            owners[0].record(lag, stage, hotspot, stack)
+            return
+        for monitor in self.monitors:
+            monitor.stats.inc_value("stall/unattributed")
+        logger.warning(f"リアクター停止 {lag:.3f}秒 (スパイダー不明): {stage} ({hotspot or '-'})")
+
+    def _watch(self):
+        while not self.stopped.wait(self.interval / 2):
+            self.check()
+
+    def check(self):
+        """監視スレッド: 閾値を超えて止まっていればスタックを採取 (停止ごとに1回)"""
+        if time.monotonic() - self.last_beat - self.interval < self.threshold:
+            return
+        with self.lock:
+            if self.pending is not None:
+                return
+        frame = sys._current_frames().get(self.reactor_thread)
+        if frame is None:
+            return
+        stage, hotspot = attribute_stall(frame)
+        crawler = owner_crawler(frame, [m.crawler for m in self.monitors])
+        stack = "".join(traceback.format_stack(frame, limit=15))
+        del frame
+        with self.lock:
+            self.pending = (stage, hotspot, stack, crawler)
+
+
+_lag_monitor: LagMonitor | None = None
+
+
+def shared_lag_monitor(threshold: float, interval: float) -> LagMonitor:
+    """プロセスで共有する LagMonitor (なければ作る)"""
+    global _lag_monitor
+    if _lag_monitor is None:
+        _lag_monitor = LagMonitor(threshold, interval)
+    return _lag_monitor
+
+
+class ReactorStallMonitor:
+    """閾値を超えたリアクター停止の原因を、クローラごとの Stats に記録する拡張
+
+    ラグの計測とスタックの採取はプロセス共通の LagMonitor が行う。
+    パイプラインの open_spider も対象にするため、監視は spider_opened より前
+    (拡張の生成時) に始め、リアクター起動前の待ちを数えないよう起動時に基準時刻を取り直す。
+    """
+
+    def __init__(self, crawler, max_samples: int = 20):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.max_samples = max_samples
+        self.samples = 0
+        self.stage_seconds: Counter[str] = Counter()
+        self.lag_monitor: LagMonitor | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("STALL_MONITOR_ENABLED", False):
+            raise NotConfigured
+        ext = cls(crawler, max_samples=settings.getint("STALL_MONITOR_MAX_SAMPLES", 20))
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        ext.lag_monitor = shared_lag_monitor(
+            settings.getfloat("STALL_MONITOR_THRESHOLD", 0.25),
+            settings.getfloat("STALL_MONITOR_INTERVAL", 0.05),
+        )
+        ext.lag_monitor.register(ext)
+        return ext
+
+    def spider_closed(self, spider, reason):
+        global _lag_monitor
+        if self.lag_monitor is not None and self.lag_monitor.unregister(self):
+            if _lag_monitor is self.lag_monitor:
+                _lag_monitor = None
+        if self.stage_seconds:
+            top = ", ".join(
+                f"{stage} {seconds:.2f}秒" for stage, seconds in self.stage_seconds.most_common(5)
+            )
+            logger.info(
+                f"リアクター停止 {self.stats.get_value('stall/count', 0)}回 "
+                f"合計 {self.stats.get_value('stall/seconds', 0):.2f}秒: {top}"
+            )
+
+    def record(self, lag: float, stage: str, hotspot: str | None, stack: str):
+        """このクローラが原因の停止を記録 (リアクタースレッドで呼ばれる)"""
+        self.stats.inc_value("stall/count")
+        self.stats.inc_value("stall/seconds", round(lag, 4))
+        self.stats.max_value("stall/max_seconds", round(lag, 4))
+        self.stats.inc_value(f"stall/stage/{stage}")
+        self.stats.inc_value(f"stall/stage_seconds/{stage}", round(lag, 4))
+        self.stage_seconds[stage] += lag
+        if self.samples < self.max_samples:
+            self.samples += 1
+            logger.warning(f"リアクター停止 {lag:.3f}秒: {stage} ({hotspot or '-'})\n{stack}")
@@ -0,0 +1,205 @@
+"""クロール実行ごとのテレメトリ
+
+実行 (crawl_runs) ごとに以下を記録し、管理ページで推移を確認できるようにする。
+
+- crawl_runs: リクエスト数・受信バイト数・実行時間・アイテム/秒
+- crawl_metrics: 応答時間のパーセンタイル、ステータス別件数、パイプライン別の除外件数、
+  ページあたりのパース時間、DB書き込み時間 など
+
+ParseTimingMiddleware (スパイダーミドルウェア) がコールバック内の処理時間を、
+CrawlTelemetry (拡張) がそれ以外をシグナルとStatsから集計する。
+実行idは CrawlRunRecorder (src.scraper.extensions) が spider.crawl_run_id に設定したものを使う。
+"""
+
+import logging
+import math
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from src.database.models import init_db
+from src.database.repository import CrawlRunRepository
+from src.scraper.pipelines import load_db_path
+
+logger = logging.getLogger(__name__)
+
+LATENCY_PERCENTILES = (50, 90, 99)
+# ParsePool がコールバック内で待った秒数とワーカー内のパース秒数 (リクエストの meta)
+PARSE_POOL_TIMING_META = "parse_pool_timing"
+# crawl_metrics にそのまま記録する Stats キーの接頭辞
+RECORDED_STAT_PREFIXES = (
+    "archive/", "checkpoint/", "incremental/", "seen_filter/", "sqlite_writer/",
+    "pagination/", "uchina/", "stall/", "parse_pool/",
+)
+
+
+def percentile(sorted_values: list[float], p: float) -> float | None:
+    """ソート済みの値の p パーセンタイル (最近傍順位法)"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _dropping_pipeline(exception) -> str:
+    """DropItem を送出したパイプラインのクラス名 (トレースバックから特定)"""
+    name = "unknown"
+    tb = exception.__traceback__
+    while tb is not None:
+        owner = tb.tb_frame.f_locals.get("self")
+        if owner is not None and type(owner).__name__.endswith("Pipeline"):
+            name = type(owner).__name__
+        tb = tb.tb_next
+    return name
+
+
+class ParseTimingMiddleware:
+    """スパイダーのコールバックがページのパースに使った時間を計測する
+
+    コールバックの出力を1件ずつ取り出す間の時間だけを数えるため、
+    後段のミドルウェア・パイプラインの処理時間は含まない。
+    プロセスプールでパースしたページは、プールの待ち時間 (キュー待ち・受け渡し) を除き、
+    代わりにワーカー内のパース時間を数える (インラインのパースと比べられるように)。
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("CRAWL_TELEMETRY_ENABLED", True):
+            raise NotConfigured
+        return cls(crawler.stats)
+
+    def process_spider_output(self, response, result, spider=None):
+        elapsed = 0.0
+        iterator = iter(result)
+        while True:
+            started = time.perf_counter()
+            try:
+                output = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - started
+            yield output
+        self._record(elapsed, response)
+
+    async def process_spider_output_async(self, response, result, spider=None):
+        elapsed = 0.0
+        iterator = result.__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                output = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - started
+            yield output
+        self._record(elapsed, response)
+
+    def _record(self, elapsed: float, response=None):
+        request = getattr(response, "request", None)
+        if request is not None and PARSE_POOL_TIMING_META in request.meta:
+            waited, worker_seconds = request.meta.pop(PARSE_POOL_TIMING_META)
+            elapsed = max(elapsed - waited, 0.0) + worker_seconds
+        self.stats.inc_value("telemetry/parsed_pages")
+        self.stats.inc_value("telemetry/parse_seconds", elapsed)
+        self.stats.max_value("telemetry/parse_seconds_max", elapsed)
+
+
+class CrawlTelemetry:
+    """実行ごとのメトリクスを crawl_runs / crawl_metrics に保存する拡張"""
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.latencies: list[float] = []
+        self.started = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("CRAWL_TELEMETRY_ENABLED", True):
+            raise NotConfigured
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.item_dropped, signal=signals.item_dropped)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.started = time.monotonic()
+
+    def response_received(self, response, request, spider):
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.latencies.append(latency)
+
+    def item_dropped(self, item, response, exception, spider):
+        self.stats.inc_value(f"pipeline_dropped/{_dropping_pipeline(exception)}")
+
+    def collect(self) -> tuple[dict, dict[str, float]]:
+        """(crawl_runs の集計値, crawl_metrics) を返す"""
+        stats = self.stats.get_stats()
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        items = stats.get("item_scraped_count", 0)
+        summary = {
+            "request_count": stats.get("downloader/request_count", 0),
+            "response_bytes": stats.get("downloader/response_bytes", 0),
+            "elapsed_seconds": round(elapsed, 2),
+            "items_per_sec": round(items / elapsed, 3) if elapsed else None,
+        }
+
+        metrics: dict[str, float] = {
+            "items": items,
+            "responses": stats.get("downloader/response_count", 0),
+            "retries": stats.get("retry/count", 0),
+        }
+        if items:
+            # クロール効率 (src.scraper.planner のリクエスト計画の実績)
+            metrics["requests_per_1000_listings"] = round(
+                summary["request_count"] / items * 1000, 1
+            )
+        latencies = sorted(self.latencies)
+        for p in LATENCY_PERCENTILES:
+            value = percentile(latencies, p)
+            if value is not None:
+                metrics[f"latency_p{p}"] = round(value, 4)
+        if latencies:
+            metrics["latency_max"] = round(latencies[-1], 4)
+
+        pages = stats.get("telemetry/parsed_pages", 0)
+        if pages:
+            metrics["parsed_pages"] = pages
+            metrics["parse_ms_per_page"] = round(stats["telemetry/parse_seconds"] / pages * 1000, 3)
+            metrics["parse_ms_max"] = round(stats.get("telemetry/parse_seconds_max", 0) * 1000, 3)
+        if "db/write_seconds" in stats:
+            metrics["db_write_seconds"] = stats["db/write_seconds"]
+
+        for key, value in stats.items():
+            if key.startswith("downloader/response_status_count/"):
+                metrics[f"status_{key.rsplit('/', 1)[1]}"] = value
+            elif key.startswith("pipeline_dropped/"):
+                metrics[f"dropped/{key.split('/', 1)[1]}"] = value
+            elif key.startswith(RECORDED_STAT_PREFIXES):
+                metrics[key] = value
+        return summary, metrics
+
+    def spider_closed(self, spider, reason):
+        run_id = getattr(spider, "crawl_run_id", None)
+        if run_id is None:
+            return
+        summary, metrics = self.collect()
+        conn = init_db(load_db_path(self.crawler.settings))
+        try:
+            CrawlRunRepository(conn).record_metrics(run_id, summary, metrics)
+        finally:
+            conn.close()
+        logger.info(
+            f"テレメトリ: run_id={run_id} {summary['request_count']}リクエスト "
+            f"{summary['response_bytes'] / 1024 / 1024:.1f}MiB {summary['items_per_sec']} items/s "
+            f"latency p50={metrics.get('latency_p50')} p90={metrics.get('latency_p90')}"
+        )
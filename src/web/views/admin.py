@@ -5,12 +5,15 @@ import subprocess
 import sys
 from pathlib import Path
 
-logger = logging.getLogger(__name__)
-
+import pandas as pd
+import plotly.express as px
 import streamlit as st
 import yaml
 
 from src.database.models import init_db
+from src.database.repository import CrawlRunRepository
+
+logger = logging.getLogger(__name__)
 
 
 def get_db():
@@ -53,6 +56,11 @@ def render_admin_page():
 
     st.divider()
 
+    # --- クロール実績 ---
+    _render_crawl_telemetry(conn)
+
+    st.divider()
+
     # --- スクレイパー実行 ---
     st.subheader("スクレイパー実行")
 
@@ -68,10 +76,9 @@ def render_admin_page():
             with st.spinner("スクレイピング中..."):
                 project_dir = str(Path(__file__).parent.parent.parent.parent)
                 if spider_name == "全サイト":
-                    for name in ["goohome", "uchina", "suumo", "homes"]:
-                        _run_spider(project_dir, name)
+                    _run_spiders(project_dir, ["goohome", "uchina", "suumo", "homes"])
                 else:
-                    _run_spider(project_dir, spider_name)
+                    _run_spiders(project_dir, [spider_name])
             st.success("スクレイピング完了")
             st.rerun()
 
@@ -122,19 +129,81 @@ def render_admin_page():
     conn.close()
 
 
-def _run_spider(project_dir: str, spider_name: str):
-    """Spiderを実行"""
+def _render_crawl_telemetry(conn):
+    """実行ごとのスループット・応答時間の推移 (src.scraper.telemetry が記録)"""
+    st.subheader("クロール実績")
+
+    history = CrawlRunRepository(conn).get_metrics_history(
+        names=(
+            "latency_p50", "latency_p90", "parse_ms_per_page", "retries",
+            "requests_per_1000_listings",
+        ),
+        days=90,
+    )
+    if not history:
+        st.info("テレメトリの記録された実行なし")
+        return
+    df = pd.DataFrame(history)
+    df["started_at"] = pd.to_datetime(df["started_at"])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.line(
+            df, x="started_at", y="items_per_sec", color="spider", markers=True,
+            title="スループット (件/秒)",
+            labels={"started_at": "開始日時", "items_per_sec": "件/秒"},
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = px.line(
+            df, x="started_at", y="latency_p90", color="spider", markers=True,
+            title="応答時間 p90 (秒)", labels={"started_at": "開始日時", "latency_p90": "秒"},
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    # リクエスト計画 (src.scraper.planner) の効果: 少ないほど効率が良い
+    fig = px.line(
+        df, x="started_at", y="requests_per_1000_listings", color="spider", markers=True,
+        title="1000件あたりのリクエスト数",
+        labels={"started_at": "開始日時", "requests_per_1000_listings": "リクエスト/1000件"},
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    recent = df.sort_values("started_at", ascending=False).head(20).copy()
+    recent["MiB"] = (recent["response_bytes"].fillna(0) / 1024 / 1024).round(1)
+    st.dataframe(
+        recent[[
+            "started_at", "spider", "status", "item_count", "request_count", "MiB",
+            "elapsed_seconds", "items_per_sec", "latency_p50", "latency_p90",
+            "parse_ms_per_page", "retries", "requests_per_1000_listings",
+        ]].rename(columns={
+            "started_at": "開始", "spider": "サイト", "status": "状態", "item_count": "件数",
+            "request_count": "リクエスト", "elapsed_seconds": "所要秒", "items_per_sec": "件/秒",
+            "parse_ms_per_page": "パースms/頁", "retries": "リトライ",
+            "requests_per_1000_listings": "リクエスト/1000件",
+        }),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+def _run_spiders(project_dir: str, spider_names: list[str]):
+    """Spiderを並行実行 (src.scraper.runner)"""
+    label = ", ".join(spider_names)
+    command = [sys.executable, "-m", "src.scraper.runner"]
+    for name in spider_names:
+        command += ["--spider", name]
     try:
         result = subprocess.run(
-            [sys.executable, "-m", "scrapy", "crawl", spider_name],
+            command,
             cwd=project_dir,
             capture_output=True,
             text=True,
-            timeout=600,
+            timeout=600 * len(spider_names),
         )
         if result.returncode != 0:
-            st.warning(f"{spider_name}: {result.stderr[:500]}")
+            st.warning(f"{label}: {result.stderr[-500:]}")
     except subprocess.TimeoutExpired:
-        st.warning(f"{spider_name}: タイムアウト (10分)")
+        st.warning(f"{label}: タイムアウト ({10 * len(spider_names)}分)")
     except Exception as e:
-        st.warning(f"{spider_name}: {e}")
+        st.warning(f"{label}: {e}")
@@ -11,6 +11,9 @@ import yaml
 from src.database.models import get_connection, init_db
 from src.database.repository import LandPriceRepository, PropertyRepository
 
+# 散布図用に取得する物件数の上限 (他のグラフは集計済みの行のみ取得)
+SCATTER_SAMPLE_LIMIT = 1000
+
 
 def get_db():
     settings_path = Path(__file__).parent.parent.parent.parent / "config" / "settings.yaml"
@@ -27,65 +30,67 @@ def render_analysis_page():
     repo = PropertyRepository(conn)
     land_repo = LandPriceRepository(conn)
 
-    # 全物件データ取得
-    all_props = repo.search(limit=5000, sort_by="rent", sort_order="ASC")
-    if not all_props:
+    # 集計はSQLite側 (median/percentile/histogram 集計関数) で行い、集計結果のみ取得
+    summary = repo.get_rent_summary()
+    if not summary["total"]:
         st.info("物件データがありません。スクレイピングを実行してください。")
         conn.close()
         return
 
-    df = pd.DataFrame(all_props)
-
     # --- サマリメトリクス ---
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("総物件数", f"{len(df):,}")
+        st.metric("総物件数", f"{summary['total']:,}")
     with col2:
-        st.metric("平均賃料", f"{df['rent'].mean():,.0f}円")
+        st.metric("平均賃料", f"{summary['avg_rent']:,.0f}円")
     with col3:
-        st.metric("中央値賃料", f"{df['rent'].median():,.0f}円")
+        st.metric("中央値賃料", f"{summary['median_rent']:,.0f}円")
     with col4:
-        bargains = df[df["affordability_score"].notna() & (df["affordability_score"] <= 0.85)]
-        st.metric("お得物件数", f"{len(bargains)}")
+        st.metric("お得物件数", f"{summary['bargain_count'] or 0}")
 
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "市町村別相場", "賃料分布", "割安度分析", "モデル性能"
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        "市町村別相場", "賃料分布", "割安度分析", "掲載期間", "モデル性能"
     ])
 
     with tab1:
-        _render_municipality_chart(df)
+        _render_municipality_chart(repo)
 
     with tab2:
-        _render_rent_distribution(df)
+        _render_rent_distribution(repo, summary)
 
     with tab3:
-        _render_affordability_analysis(df)
+        _render_affordability_analysis(repo)
 
     with tab4:
+        _render_listing_duration(repo)
+
+    with tab5:
         _render_model_performance(conn)
 
     conn.close()
 
 
-def _render_municipality_chart(df: pd.DataFrame):
-    """市町村別の賃料相場チャート"""
-    st.subheader("市町村別 平均賃料")
+def _histogram_frame(hist: dict) -> pd.DataFrame:
+    """get_histogram の結果をビン中心と件数のDataFrameに変換"""
+    counts = hist["counts"]
+    if not counts:
+        return pd.DataFrame(columns=["bin_center", "count"])
+    width = (hist["hi"] - hist["lo"]) / len(counts)
+    return pd.DataFrame({
+        "bin_center": [hist["lo"] + width * (i + 0.5) for i in range(len(counts))],
+        "count": counts,
+    })
 
-    if "municipality" not in df.columns or df["municipality"].isna().all():
-        st.info("市町村データがありません")
-        return
 
-    muni_stats = df.groupby("municipality").agg(
-        avg_rent=("rent", "mean"),
-        median_rent=("rent", "median"),
-        count=("rent", "count"),
-        avg_area=("area_sqm", "mean"),
-    ).reset_index()
-    muni_stats = muni_stats[muni_stats["count"] >= 3].sort_values("avg_rent", ascending=True)
+def _render_municipality_chart(repo: PropertyRepository):
+    """市町村別の賃料相場チャート"""
+    st.subheader("市町村別 平均賃料")
 
+    muni_stats = pd.DataFrame(repo.get_rent_stats_by("municipality", min_count=3))
     if muni_stats.empty:
         st.info("十分なデータがある市町村がありません")
         return
+    muni_stats = muni_stats.sort_values("avg_rent", ascending=True)
 
     fig = px.bar(
         muni_stats,
@@ -118,39 +123,53 @@ def _render_municipality_chart(df: pd.DataFrame):
     st.plotly_chart(fig2, use_container_width=True)
 
 
-def _render_rent_distribution(df: pd.DataFrame):
+def _render_rent_distribution(repo: PropertyRepository, summary: dict):
     """賃料分布"""
     st.subheader("賃料分布")
 
-    fig = px.histogram(
-        df,
-        x="rent",
-        nbins=50,
+    hist_df = _histogram_frame(repo.get_histogram("rent", bins=50))
+    fig = px.bar(
+        hist_df,
+        x="bin_center",
+        y="count",
         title="賃料ヒストグラム",
-        labels={"rent": "賃料 (円)", "count": "物件数"},
+        labels={"bin_center": "賃料 (円)", "count": "物件数"},
         color_discrete_sequence=["#1f77b4"],
     )
-    fig.add_vline(x=df["rent"].median(), line_dash="dash", line_color="red",
-                  annotation_text=f"中央値: {df['rent'].median():,.0f}円")
+    fig.update_layout(bargap=0)
+    fig.add_vline(x=summary["median_rent"], line_dash="dash", line_color="red",
+                  annotation_text=f"中央値: {summary['median_rent']:,.0f}円")
     st.plotly_chart(fig, use_container_width=True)
 
-    # 間取り別
-    if "floor_plan" in df.columns:
+    # 間取り別 (四分位はSQL側で集計済み)
+    plan_stats = repo.get_rent_stats_by("floor_plan")
+    if plan_stats:
         st.subheader("間取り別 賃料")
-        fig2 = px.box(
-            df[df["floor_plan"].notna()],
-            x="floor_plan",
-            y="rent",
+        fig2 = go.Figure()
+        for stat in sorted(plan_stats, key=lambda s: s["floor_plan"]):
+            fig2.add_trace(go.Box(
+                name=stat["floor_plan"],
+                q1=[stat["q1_rent"]],
+                median=[stat["median_rent"]],
+                q3=[stat["q3_rent"]],
+                lowerfence=[stat["min_rent"]],
+                upperfence=[stat["max_rent"]],
+                mean=[stat["avg_rent"]],
+            ))
+        fig2.update_layout(
             title="間取り別 賃料分布",
-            labels={"floor_plan": "間取り", "rent": "賃料 (円)"},
-            color="floor_plan",
+            xaxis_title="間取り",
+            yaxis_title="賃料 (円)",
+            showlegend=False,
         )
         st.plotly_chart(fig2, use_container_width=True)
 
-    # 築年数 vs 賃料
-    if "building_age" in df.columns:
-        st.subheader("築年数 × 賃料")
-        valid = df[df["building_age"].notna() & df["area_sqm"].notna()]
+    # 築年数 vs 賃料 (散布図は個別の点が必要なため上限件数のみ取得)
+    st.subheader("築年数 × 賃料")
+    sample = pd.DataFrame(repo.search(limit=SCATTER_SAMPLE_LIMIT, sort_by="scraped_at",
+                                      sort_order="DESC"))
+    if not sample.empty:
+        valid = sample[sample["building_age"].notna() & sample["area_sqm"].notna()]
         if not valid.empty:
             fig3 = px.scatter(
                 valid,
@@ -158,7 +177,7 @@ def _render_rent_distribution(df: pd.DataFrame):
                 y="rent",
                 size="area_sqm",
                 color="structure",
-                title="築年数と賃料の関係",
+                title=f"築年数と賃料の関係 (新着{SCATTER_SAMPLE_LIMIT:,}件まで)",
                 labels={
                     "building_age": "築年数", "rent": "賃料 (円)",
                     "area_sqm": "面積 (㎡)", "structure": "構造"
@@ -168,44 +187,95 @@ def _render_rent_distribution(df: pd.DataFrame):
             st.plotly_chart(fig3, use_container_width=True)
 
 
-def _render_affordability_analysis(df: pd.DataFrame):
+def _render_affordability_analysis(repo: PropertyRepository):
     """割安度分析"""
     st.subheader("割安度分析")
 
-    scored = df[df["affordability_score"].notna() & (df["affordability_score"] > 0)]
-    if scored.empty:
+    hist = repo.get_histogram("affordability_score", bins=40)
+    if not hist["counts"]:
         st.info("価格推定モデルを実行して割安度スコアを算出してください。")
         return
 
     # 割安度ヒストグラム
-    fig = px.histogram(
-        scored,
-        x="affordability_score",
-        nbins=40,
+    fig = px.bar(
+        _histogram_frame(hist),
+        x="bin_center",
+        y="count",
         title="割安度スコア分布 (1.0未満 = お得, 1.0以上 = 割高)",
-        labels={"affordability_score": "割安度スコア", "count": "物件数"},
+        labels={"bin_center": "割安度スコア", "count": "物件数"},
         color_discrete_sequence=["#2ecc71"],
     )
+    fig.update_layout(bargap=0)
     fig.add_vline(x=1.0, line_dash="dash", line_color="red", annotation_text="適正価格")
     fig.add_vline(x=0.85, line_dash="dot", line_color="green", annotation_text="お得ライン")
     st.plotly_chart(fig, use_container_width=True)
 
     # お得物件ランキング
     st.subheader("🏆 お得物件 TOP10")
-    bargains = scored.nsmallest(10, "affordability_score")
-    for _, prop in bargains.iterrows():
-        score = prop["affordability_score"]
-        est = prop.get("estimated_rent", 0)
+    for prop in repo.get_top_bargains(10):
+        est = prop.get("estimated_rent") or 0
         actual = prop["rent"]
         savings = est - actual if est else 0
         st.markdown(
-            f"**{prop.get('name', '不明')}** — "
+            f"**{prop.get('name') or '不明'}** — "
             f"💰 {actual:,.0f}円 (推定: {est:,.0f}円, **{savings:+,.0f}円お得**) "
-            f"| {prop.get('floor_plan', '')} | {prop.get('area_sqm', '')}㎡ "
-            f"| 📍 {prop.get('municipality', '')}"
+            f"| {prop.get('floor_plan') or ''} | {prop.get('area_sqm') or ''}㎡ "
+            f"| 📍 {prop.get('municipality') or ''}"
         )
 
 
+def _render_listing_duration(repo: PropertyRepository):
+    """掲載期間 (掲載開始〜掲載終了までの日数) の分析"""
+    st.subheader("掲載期間")
+    st.caption("掲載終了した物件の平均掲載日数 (短いほど早く決まる人気エリア・間取り)")
+
+    labels = {"municipality": "市町村", "floor_plan": "間取り"}
+    col1, col2 = st.columns(2)
+    for col, group_by in zip((col1, col2), ("municipality", "floor_plan")):
+        with col:
+            stats = repo.get_listing_duration_stats(group_by)
+            if not stats:
+                st.info(f"{labels[group_by]}別の掲載終了データがまだありません")
+                continue
+            stats_df = pd.DataFrame(stats)
+            fig = px.bar(
+                stats_df,
+                x="avg_days",
+                y=group_by,
+                orientation="h",
+                title=f"{labels[group_by]}別 平均掲載日数",
+                labels={
+                    "avg_days": "平均掲載日数", group_by: labels[group_by],
+                    "delisted_count": "掲載終了件数",
+                },
+                hover_data=["delisted_count", "max_days"],
+                color="avg_days",
+                color_continuous_scale="Greens_r",
+            )
+            fig.update_layout(height=max(400, len(stats_df) * 30))
+            st.plotly_chart(fig, use_container_width=True)
+
+    # 掲載中物件の現在の掲載日数
+    ages = repo.get_active_listing_ages("municipality")
+    if ages:
+        st.subheader("掲載中物件の現在の掲載日数")
+        ages_df = pd.DataFrame(ages)
+        ages_df = ages_df[ages_df["active_count"] >= 3]
+        if not ages_df.empty:
+            fig = px.bar(
+                ages_df,
+                x="avg_days",
+                y="municipality",
+                orientation="h",
+                title="市町村別 掲載中物件の平均経過日数 (3件以上のエリアのみ)",
+                labels={"avg_days": "平均経過日数", "municipality": "市町村",
+                        "active_count": "掲載中件数"},
+                hover_data=["active_count"],
+            )
+            fig.update_layout(height=max(400, len(ages_df) * 30))
+            st.plotly_chart(fig, use_container_width=True)
+
+
 def _render_model_performance(conn):
     """モデル性能表示"""
     st.subheader("モデル性能")
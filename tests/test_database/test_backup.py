@@ -0,0 +1,73 @@
+"""オンラインバックアップ テスト"""
+
+import gzip
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.database import backup
+from src.database.backup import backup_database, rotate_snapshots, verify_snapshot
+from src.database.models import init_db
+from src.database.repository import PropertyRepository
+
+
+def _make_db(tmp_dir: Path, rows: int = 50) -> Path:
+    db_path = tmp_dir / "rental.db"
+    conn = init_db(db_path)
+    repo = PropertyRepository(conn)
+    for i in range(rows):
+        repo.upsert_property({"source": "test", "source_id": f"b{i}", "rent": 40000 + i})
+    conn.close()
+    return db_path
+
+
+def test_backup_creates_verified_snapshot():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        db_path = _make_db(tmp_dir)
+
+        result = backup_database(db_path, tmp_dir / "backups", pages_per_step=1, step_sleep=0)
+
+        snapshot = Path(result["snapshot"])
+        assert snapshot.exists()
+        assert result["integrity"] == "ok"
+        assert result["steps"] >= 1
+        assert result["duration_seconds"] >= 0
+        assert verify_snapshot(snapshot)
+
+        restored = tmp_dir / "restored.db"
+        with gzip.open(snapshot, "rb") as f:
+            restored.write_bytes(f.read())
+        conn = sqlite3.connect(restored)
+        assert conn.execute("SELECT COUNT(*) FROM properties").fetchone()[0] == 50
+        conn.close()
+
+
+def test_failed_backup_leaves_no_partial_file(monkeypatch):
+    def _fail(partial_path, snapshot_path):
+        snapshot_path.write_bytes(b"truncated")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(backup, "_compress", _fail)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        db_path = _make_db(tmp_dir)
+
+        with pytest.raises(OSError):
+            backup_database(db_path, tmp_dir / "backups", step_sleep=0)
+
+        assert list((tmp_dir / "backups").iterdir()) == []
+
+
+def test_rotate_snapshots_keeps_latest():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        for ts in ("20260101_000000", "20260102_000000", "20260103_000000"):
+            (tmp_dir / f"rental_{ts}.db.gz").write_bytes(b"")
+
+        removed = rotate_snapshots(tmp_dir, "rental", keep=2)
+
+        assert removed == ["rental_20260101_000000.db.gz"]
+        assert len(list(tmp_dir.glob("rental_*.db.gz"))) == 2
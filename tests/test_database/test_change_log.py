@@ -0,0 +1,148 @@
+"""変更ログ (CDC) テスト"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.database.models import NOTIFICATION_CONSUMER, init_db
+from src.database.repository import (
+    ChangeLogRepository,
+    PropertyRepository,
+    SavedSearchRepository,
+)
+
+
+@pytest.fixture
+def db_conn():
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
+        db_path = f.name
+    conn = init_db(db_path)
+    yield conn
+    conn.close()
+    Path(db_path).unlink(missing_ok=True)
+
+
+def _change_types(conn) -> list[str]:
+    rows = conn.execute("SELECT change_type FROM property_changes ORDER BY seq").fetchall()
+    return [r[0] for r in rows]
+
+
+def test_triggers_record_insert_update_and_inactivation(db_conn):
+    repo = PropertyRepository(db_conn)
+    repo.upsert_property({"source": "test", "source_id": "c1", "rent": 50000})
+    # 追跡対象カラムに変化がない再upsertは記録しない
+    repo.upsert_property({"source": "test", "source_id": "c1", "rent": 50000})
+    repo.upsert_property({"source": "test", "source_id": "c1", "rent": 48000})
+    repo.mark_inactive("test", ["other"])
+    repo.upsert_property({"source": "test", "source_id": "c1", "rent": 48000})
+
+    assert _change_types(db_conn) == ["insert", "update", "inactivate", "reactivate"]
+
+
+def test_estimation_and_notification_do_not_log(db_conn):
+    repo = PropertyRepository(db_conn)
+    repo.upsert_property({"source": "test", "source_id": "c2", "rent": 50000})
+    prop_id = repo.search()[0]["id"]
+
+    repo.update_estimation(prop_id, 52000, 0.96)
+    repo.mark_notified([prop_id])
+
+    assert _change_types(db_conn) == ["insert"]
+
+
+def test_consumers_track_positions_and_compact(db_conn):
+    repo = PropertyRepository(db_conn)
+    log = ChangeLogRepository(db_conn)
+    log.register("a")
+    log.register("b")
+    for i in range(3):
+        repo.upsert_property({"source": "test", "source_id": f"d{i}", "rent": 40000 + i})
+
+    props, seq_a = log.fetch_changed_properties("a", ("insert",))
+    assert len(props) == 3
+    log.advance("a", seq_a)
+    assert log.fetch_changed_properties("a", ("insert",))[0] == []
+
+    # bが未処理のため削除されない
+    assert log.compact() == 0
+
+    _, seq_b = log.fetch_changed_properties("b", ("insert",), limit=2)
+    log.advance("b", seq_b)
+    assert log.compact() == 2
+    assert len(log.fetch_changes("b")) == 1
+
+
+def test_migration_backfills_unnotified_properties():
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
+        db_path = f.name
+    try:
+        conn = init_db(db_path)
+        repo = PropertyRepository(conn)
+        for i in range(3):
+            repo.upsert_property({"source": "test", "source_id": f"b{i}", "rent": 40000 + i})
+        props = {p["source_id"]: p["id"] for p in repo.search()}
+        repo.mark_notified([props["b0"]])
+        # 変更ログ導入前のDB (トリガーの記録なし) を再現
+        conn.execute("DELETE FROM property_changes")
+        conn.commit()
+        conn.close()
+
+        conn = init_db(db_path)
+        rows = conn.execute("SELECT property_id, change_type FROM property_changes").fetchall()
+        assert sorted(tuple(r) for r in rows) == [(props["b1"], "insert"), (props["b2"], "insert")]
+        conn.close()
+
+        # 再初期化しても重複しない
+        conn = init_db(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM property_changes").fetchone()[0] == 2
+        conn.close()
+    finally:
+        Path(db_path).unlink(missing_ok=True)
+
+
+def test_failed_notification_keeps_consumer_position(tmp_path, monkeypatch):
+    from src.notification import line_notify
+
+    db_path = tmp_path / "notify.db"
+    config_path = tmp_path / "settings.yaml"
+    config_path.write_text(f"database:\n  path: {db_path}\n", encoding="utf-8")
+    conn = init_db(db_path)
+    PropertyRepository(conn).upsert_property({"source": "test", "source_id": "n1", "rent": 50000})
+    searches = SavedSearchRepository(conn)
+    searches.update_notify_enabled(searches.save("全件", {}), True)
+    conn.close()
+
+    monkeypatch.setattr(line_notify, "send_line_message", lambda message: False)
+    line_notify.check_and_notify(str(config_path))
+    conn = init_db(db_path)
+    assert ChangeLogRepository(conn).get_position(NOTIFICATION_CONSUMER) == 0
+    assert conn.execute("SELECT notified FROM properties").fetchone()[0] == 0
+    conn.close()
+
+    monkeypatch.setattr(line_notify, "send_line_message", lambda message: True)
+    line_notify.check_and_notify(str(config_path))
+    conn = init_db(db_path)
+    assert ChangeLogRepository(conn).get_position(NOTIFICATION_CONSUMER) > 0
+    assert conn.execute("SELECT notified FROM properties").fetchone()[0] == 1
+    conn.close()
+
+
+def test_incremental_estimation_without_model_trains_fully(tmp_path, monkeypatch):
+    pytest.importorskip("sklearn")
+    from src.pricing import training
+
+    db_path = tmp_path / "estimation.db"
+    config_path = tmp_path / "settings.yaml"
+    config_path.write_text(
+        f"database:\n  path: {db_path}\npricing:\n  model_dir: {tmp_path / 'models'}\n",
+        encoding="utf-8",
+    )
+    conn = init_db(db_path)
+    PropertyRepository(conn).upsert_property({"source": "test", "source_id": "e1", "rent": 50000})
+    conn.close()
+
+    calls = []
+    monkeypatch.setattr(training, "run_training_pipeline", calls.append)
+    assert training.update_changed_estimations(str(config_path)) == 1
+    assert calls == [str(config_path)]
@@ -0,0 +1,44 @@
+"""SQLite カスタム集計関数テスト"""
+
+import json
+import sqlite3
+
+import pytest
+
+from src.database.functions import register_functions
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    register_functions(conn)
+    conn.execute("CREATE TABLE t (grp TEXT, v REAL)")
+    conn.executemany(
+        "INSERT INTO t VALUES (?, ?)",
+        [("a", 1), ("a", 2), ("a", 3), ("a", 4), ("b", 10), ("b", None), ("b", 30)],
+    )
+    yield conn
+    conn.close()
+
+
+def test_median_group_by(conn):
+    rows = conn.execute("SELECT grp, median(v) FROM t GROUP BY grp ORDER BY grp").fetchall()
+    assert rows == [("a", 2.5), ("b", 20.0)]
+
+
+def test_percentile_linear_interpolation(conn):
+    row = conn.execute(
+        "SELECT percentile(v, 25), percentile(v, 75), percentile(v, 100) FROM t WHERE grp = 'a'"
+    ).fetchone()
+    assert row == (1.75, 3.25, 4.0)
+
+
+def test_histogram_counts(conn):
+    row = conn.execute("SELECT histogram(v, 0, 40, 4) FROM t").fetchone()
+    # 1,2,3,4 → bin0 / 10 → bin1 / 30 → bin3
+    assert json.loads(row[0]) == [4, 1, 0, 1]
+
+
+def test_empty_group_returns_null(conn):
+    row = conn.execute("SELECT median(v), histogram(v, 0, 1, 2) FROM t WHERE grp = 'z'").fetchone()
+    assert row == (None, None)
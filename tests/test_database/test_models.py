@@ -4,7 +4,7 @@ import sqlite3
 import tempfile
 from pathlib import Path
 
-from src.database.models import init_db, get_connection
+from src.database.models import SCHEMA_SQL, init_db
 
 
 def test_init_db_creates_tables():
@@ -40,3 +40,26 @@ def test_wal_mode_enabled():
 
     conn.close()
     Path(db_path).unlink(missing_ok=True)
+
+
+def test_init_db_migrates_existing_properties_table():
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
+        db_path = f.name
+
+    # ライフサイクルカラム追加前のスキーマを再現
+    old_schema = "\n".join(
+        line for line in SCHEMA_SQL.splitlines()
+        if not line.strip().startswith(("first_seen_at", "last_seen_at", "delisted_at"))
+    )
+    conn = sqlite3.connect(db_path)
+    conn.executescript(old_schema)
+    conn.execute("INSERT INTO properties (source, source_id, rent) VALUES ('test', 'm1', 1)")
+    conn.commit()
+    conn.close()
+
+    conn = init_db(db_path)
+    row = conn.execute("SELECT first_seen_at, scraped_at FROM properties").fetchone()
+    assert row["first_seen_at"] == row["scraped_at"]
+
+    conn.close()
+    Path(db_path).unlink(missing_ok=True)
@@ -1,5 +1,6 @@
 """リポジトリ CRUD テスト"""
 
+import sqlite3
 import tempfile
 from pathlib import Path
 
@@ -112,3 +113,127 @@ def test_saved_search(db_conn):
 
     repo.delete(search_id)
     assert len(repo.get_all()) == 0
+
+
+def test_upsert_each_skips_only_bad_rows(prop_repo):
+    items = [
+        {"source": "test", "source_id": "e1", "rent": 50000},
+        {"source": "test", "source_id": "e2", "rent": 60000, "name": ["不正な値"]},
+        {"source": "test", "source_id": "e3", "rent": 70000},
+    ]
+    with pytest.raises(sqlite3.Error):
+        prop_repo.upsert_many(items)
+    assert prop_repo.search() == []
+
+    failed = prop_repo.upsert_each(items)
+    assert [item["source_id"] for item, _ in failed] == ["e2"]
+    assert sorted(p["source_id"] for p in prop_repo.search()) == ["e1", "e3"]
+
+
+def test_rent_history_records_only_changes(prop_repo):
+    prop_repo.upsert_many([
+        {"source": "test", "source_id": "h1", "rent": 50000, "management_fee": 3000},
+        {"source": "test", "source_id": "h2", "rent": 60000, "management_fee": 0},
+    ])
+    prop_repo.upsert_many([
+        {"source": "test", "source_id": "h1", "rent": 50000, "management_fee": 3000},
+        {"source": "test", "source_id": "h2", "rent": 55000, "management_fee": 0},
+    ])
+    h1 = prop_repo.search(rent_max=50000)[0]
+    h2 = prop_repo.search(rent_min=55000)[0]
+
+    assert len(prop_repo.get_rent_history(h1["id"])) == 1
+    history = prop_repo.get_rent_history(h2["id"])
+    assert [(h["prev_rent"], h["rent"]) for h in history] == [(None, 60000), (60000, 55000)]
+
+    latest = prop_repo.get_latest_rent_changes()
+    assert [c["property_id"] for c in latest] == [h2["id"]]
+
+    drops = prop_repo.get_price_drops(days=7)
+    assert len(drops) == 1
+    assert drops[0]["source_id"] == "h2"
+    assert drops[0]["rent_drop"] == 5000
+
+
+def test_price_drop_excludes_later_increase(prop_repo):
+    for rent in (60000, 55000, 58000):
+        prop_repo.upsert_property({"source": "test", "source_id": "h3", "rent": rent})
+    assert prop_repo.get_price_drops(days=7) == []
+
+
+def test_listing_lifecycle_and_duration_rollup(prop_repo, db_conn):
+    prop_repo.upsert_property({
+        "source": "test", "source_id": "l1", "rent": 50000,
+        "municipality": "那覇市", "floor_plan": "1LDK",
+    })
+    prop_repo.upsert_property({
+        "source": "test", "source_id": "l2", "rent": 60000,
+        "municipality": "那覇市", "floor_plan": "2LDK",
+    })
+    db_conn.execute(
+        "UPDATE properties SET first_seen_at = datetime('now', 'localtime', '-10 days')"
+    )
+    db_conn.commit()
+
+    prop_repo.mark_inactive("test", ["l2"])
+
+    delisted = prop_repo.search(rent_max=50000)
+    assert delisted == []
+    row = db_conn.execute(
+        "SELECT delisted_at, last_seen_at FROM properties WHERE source_id = 'l1'"
+    ).fetchone()
+    assert row["delisted_at"] is not None
+    assert row["last_seen_at"] is not None
+
+    stats = prop_repo.get_listing_duration_stats("municipality")
+    assert len(stats) == 1
+    assert stats[0]["delisted_count"] == 1
+    assert round(stats[0]["avg_days"]) == 10
+
+    ages = prop_repo.get_active_listing_ages("floor_plan")
+    assert [a["floor_plan"] for a in ages] == ["2LDK"]
+
+
+def test_reactivation_starts_new_listing_period(prop_repo, db_conn):
+    for source_id in ("r1", "r2"):
+        prop_repo.upsert_property({"source": "test", "source_id": source_id, "rent": 50000})
+    db_conn.execute(
+        "UPDATE properties SET first_seen_at = datetime('now', 'localtime', '-30 days')"
+    )
+    db_conn.commit()
+    prop_repo.mark_inactive("test", ["other"])
+
+    # 再掲載 (upsert / 内容未変更の touch) で掲載開始日時を再検出日時にする
+    prop_repo.upsert_property({"source": "test", "source_id": "r1", "rent": 50000})
+    prop_repo.touch_seen([("test", "r2")])
+    rows = db_conn.execute(
+        "SELECT julianday('now', 'localtime') - julianday(first_seen_at) FROM properties"
+    ).fetchall()
+    assert all(r[0] < 1 for r in rows)
+
+    # 掲載中の物件の再検出では変えない
+    db_conn.execute("UPDATE properties SET first_seen_at = '2026-01-01 00:00:00'")
+    db_conn.commit()
+    prop_repo.upsert_property({"source": "test", "source_id": "r1", "rent": 48000})
+    prop_repo.touch_seen([("test", "r2")])
+    rows = db_conn.execute("SELECT first_seen_at FROM properties").fetchall()
+    assert [r[0] for r in rows] == ["2026-01-01 00:00:00"] * 2
+
+
+def test_rent_stats_aggregated_in_sqlite(prop_repo):
+    for i, rent in enumerate([40000, 50000, 60000, 90000]):
+        prop_repo.upsert_property({
+            "source": "test", "source_id": f"s{i}", "rent": rent,
+            "municipality": "那覇市", "floor_plan": "1K" if i < 2 else "2LDK",
+        })
+
+    summary = prop_repo.get_rent_summary()
+    assert summary["total"] == 4
+    assert summary["median_rent"] == 55000
+
+    stats = {s["floor_plan"]: s for s in prop_repo.get_rent_stats_by("floor_plan")}
+    assert stats["1K"]["median_rent"] == 45000
+    assert stats["2LDK"]["max_rent"] == 90000
+
+    hist = prop_repo.get_histogram("rent", bins=5)
+    assert sum(hist["counts"]) == 4
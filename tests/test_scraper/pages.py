@@ -0,0 +1,27 @@
+"""テスト用の一覧ページ (tests/test_scraper/fixtures/*.html)
+
+各サイトの一覧ページを保存したもので、パーサの同等性テストとページ送りのテストに使う。
+物件ブロックの構造は実ページと同じで、件数だけを数件に減らし、欠損値・新築・
+メゾネット・詳細リンクなしといった境界ケースを入れてある。
+"""
+
+from pathlib import Path
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+PAGE_URLS = {
+    "suumo": "https://suumo.jp/chintai/okinawa/sc_naha/",
+    "homes": "https://www.homes.co.jp/chintai/okinawa/list/",
+    "goohome": "https://goohome.jp/chintai/mansion/naha/?page=1-20",
+}
+
+
+def list_page(site: str, url: str | None = None, body: str | None = None) -> HtmlResponse:
+    """fixtures/{site}_list.html の一覧ページ (body を渡すと差し替えたHTMLで作る)"""
+    if body is None:
+        body = (FIXTURES_DIR / f"{site}_list.html").read_text(encoding="utf-8")
+    url = url or PAGE_URLS[site]
+    return HtmlResponse(url, body=body.encode("utf-8"), encoding="utf-8", request=Request(url))
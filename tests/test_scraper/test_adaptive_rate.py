@@ -0,0 +1,100 @@
+"""ドメイン別の間隔調整テスト"""
+
+from types import SimpleNamespace
+
+from scrapy import Request
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+
+from src.scraper.middlewares import (
+    AdaptiveRateMiddleware,
+    DomainRateController,
+    load_rate_policies,
+)
+
+URL = "https://suumo.jp/chintai/okinawa/sc_naha/"
+
+
+def test_never_faster_than_budget():
+    controller = DomainRateController("suumo.jp", requests_per_minute=15)
+    delay = 5.0
+    for _ in range(50):
+        delay, reason = controller.observe(delay, latency=0.1, error=False)
+    assert delay == 4.0
+    assert reason == "healthy"
+
+
+def test_backoff_on_errors_and_retry_after():
+    controller = DomainRateController("suumo.jp", requests_per_minute=15, max_delay=60)
+    delay, reason = controller.observe(4.0, latency=0.5, error=True)
+    assert (delay, reason) == (8.0, "error")
+    delay, reason = controller.observe(delay, latency=0.5, error=True, retry_after=30)
+    assert (delay, reason) == (30.0, "retry-after")
+    delay, _ = controller.observe(delay, latency=0.5, error=True, retry_after=120)
+    assert delay == 60.0
+
+
+def test_error_rate_backs_off_once_per_crossing():
+    controller = DomainRateController("suumo.jp", requests_per_minute=15, max_error_rate=0.1)
+    delay = 4.0
+    for error in (True, False, False, False):
+        delay, _ = controller.observe(delay, latency=0.2, error=error)
+    # 5件目でエラー率 20% > 10% になった時点で1回だけ広げ、その後は維持する
+    delay_before = delay
+    delay, reason = controller.observe(delay, latency=0.2, error=False)
+    assert (delay, reason) == (delay_before * 2, "error_rate")
+    delay, reason = controller.observe(delay, latency=0.2, error=False)
+    assert (delay, reason) == (delay_before * 2, "error_rate_hold")
+
+
+def test_single_error_does_not_pin_max_delay():
+    # 出荷設定 (SUUMO: 15 req/min, max_error_rate 0.03, max_delay 60, window 20)
+    policy = load_rate_policies()["suumo.jp"]
+    controller = DomainRateController("suumo.jp", **policy)
+    delay = controller.min_delay
+    for _ in range(10):
+        delay, _ = controller.observe(delay, latency=0.2, error=False)
+    delay, _ = controller.observe(delay, latency=0.5, error=True)
+    delays = []
+    for _ in range(40):
+        delay, _ = controller.observe(delay, latency=0.2, error=False)
+        delays.append(delay)
+    assert max(delays) == controller.min_delay * 2
+    assert delays[-1] == controller.min_delay
+
+
+def test_slow_responses_widen_delay():
+    controller = DomainRateController("suumo.jp", requests_per_minute=15, latency_factor=2.0)
+    delay, reason = controller.observe(4.0, latency=6.0, error=False)
+    assert reason == "latency"
+    assert delay == (4.0 + 12.0) / 2
+
+
+def test_middleware_adjusts_slot():
+    crawler = get_crawler(settings_dict={"ADAPTIVE_RATE_ENABLED": True})
+    mw = AdaptiveRateMiddleware(crawler, {"suumo.jp": {"requests_per_minute": 15}})
+    slot = SimpleNamespace(delay=5.0)
+    mw._slot = lambda request: slot
+
+    request = Request(URL, meta={"download_latency": 0.3, "download_slot": "suumo.jp"})
+    mw.process_response(request, Response(URL, status=503, headers={"Retry-After": "20"}), None)
+    assert slot.delay == 20.0
+    assert crawler.stats.get_value("adaptive_rate/suumo.jp/errors") == 1
+
+    # 設定のないドメインは調整しない
+    other = Request("https://example.com/", meta={"download_latency": 0.3})
+    mw.process_response(other, Response("https://example.com/", status=503), None)
+    assert slot.delay == 20.0
+
+
+def test_randomized_delay_never_below_budget():
+    crawler = get_crawler(settings_dict={"ADAPTIVE_RATE_ENABLED": True})
+    mw = AdaptiveRateMiddleware(crawler, {"suumo.jp": {"requests_per_minute": 15}})
+    slot = SimpleNamespace(delay=4.0, jitter=0.5)
+    mw._slot = lambda request: slot
+
+    request = Request(URL, meta={"download_latency": 0.1, "download_slot": "suumo.jp"})
+    for _ in range(20):
+        mw.process_response(request, Response(URL, status=200), None)
+    # 間隔は delay の0.5〜1.5倍になるため、最短でも 60/15 = 4秒を守る
+    assert slot.delay * (1 - slot.jitter) == 4.0
@@ -0,0 +1,90 @@
+"""生ページアーカイブ・再パーステスト"""
+
+import tempfile
+from pathlib import Path
+
+from scrapy import Request
+from scrapy.http import HtmlResponse, Response
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.test import get_crawler
+
+from src.database.models import init_db
+from src.scraper.archive import RawPageArchive
+from src.scraper.middlewares import RawArchiveMiddleware
+from src.scraper.reparse import reparse
+from src.scraper.spiders.suumo import SuumoSpider
+from tests.test_scraper.test_incremental import LIST_HTML
+
+URL = "https://suumo.jp/chintai/okinawa/sc_naha/"
+
+
+def _middleware(archive_dir):
+    spider = SuumoSpider()
+    stats = MemoryStatsCollector(get_crawler())
+    mw = RawArchiveMiddleware(Path(archive_dir), revalidate=True, stats=stats)
+    mw.spider_opened(spider)
+    return mw, spider
+
+
+def test_archive_deduplicates_bodies():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = RawPageArchive(tmp)
+        assert archive.store("suumo", URL, 200, {}, b"<html>a</html>") is True
+        assert archive.store("suumo", URL + "?page=2", 200, {}, b"<html>a</html>") is False
+        entry = archive.lookup(URL)
+        assert archive.get_body(entry["body_sha256"], entry["codec"]) == b"<html>a</html>"
+        assert len(list(Path(tmp, "objects").rglob(f"*.{archive.codec}"))) == 1
+        archive.close()
+
+
+def test_middleware_revalidates_and_restores_304():
+    with tempfile.TemporaryDirectory() as tmp:
+        mw, spider = _middleware(tmp)
+        request = Request(URL, callback=spider.parse_list)
+        response = HtmlResponse(
+            URL, body=LIST_HTML.encode("utf-8"), encoding="utf-8",
+            headers={"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"},
+            request=request,
+        )
+        assert mw.process_response(request, response, spider) is response
+
+        request2 = Request(URL, callback=spider.parse_list)
+        mw.process_request(request2, spider)
+        assert request2.headers.get("If-None-Match") == b'"v1"'
+
+        not_modified = Response(URL, status=304, request=request2)
+        restored = mw.process_response(request2, not_modified, spider)
+        assert restored.status == 200
+        assert isinstance(restored, HtmlResponse)
+        assert "テストマンション" in restored.text
+        assert mw.stats.get_value("archive/not_modified") == 1
+        mw.spider_closed(spider)
+
+
+def test_reparse_replays_archive_into_db():
+    with tempfile.TemporaryDirectory() as tmp:
+        mw, spider = _middleware(Path(tmp) / "archive")
+        request = Request(URL, callback=spider.parse_list)
+        response = HtmlResponse(
+            URL, body=LIST_HTML.encode("utf-8"), encoding="utf-8",
+            headers={"Content-Type": "text/html; charset=utf-8"}, request=request,
+        )
+        mw.process_response(request, response, spider)
+        mw.spider_closed(spider)
+
+        settings = Settings()
+        settings.setmodule("src.scraper.settings")
+        settings.set("DATABASE_PATH", str(Path(tmp) / "test.db"))
+        result = reparse("suumo", archive_dir=Path(tmp) / "archive", settings=settings)
+
+        assert result["pages"] == 1
+        assert result["items"] == 1
+        assert result["skipped_requests"] == 1
+        conn = init_db(Path(tmp) / "test.db")
+        row = conn.execute(
+            "SELECT rent, floor_plan FROM properties WHERE source_id = '000111'"
+        ).fetchone()
+        assert row["rent"] == 65000
+        assert row["floor_plan"] == "1LDK"
+        conn.close()
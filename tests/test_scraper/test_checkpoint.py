@@ -0,0 +1,177 @@
+"""クロールの中断・再開テスト"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from src.database.models import init_db
+from src.database.repository import PropertyRepository
+from src.scraper.checkpoint import CrawlCheckpointMiddleware
+from src.scraper.extensions import CrawlRunRecorder
+from src.scraper.spiders.suumo import SuumoSpider
+
+BASE = "https://suumo.jp/chintai/okinawa/"
+
+
+def _open(db_path: Path, **settings):
+    crawler = get_crawler(SuumoSpider, settings_dict={"DATABASE_PATH": str(db_path), **settings})
+    spider = crawler._create_spider(crawl_mode="full")
+    crawler.spider = spider
+    ext = CrawlRunRecorder(crawler)
+    ext.spider_opened(spider)
+    return crawler, spider, ext, CrawlCheckpointMiddleware(crawler)
+
+
+def _start(mw, spider, urls: list[str]) -> list[str]:
+    async def start():
+        for url in urls:
+            yield Request(url, callback=spider.parse_list)
+
+    async def collect():
+        return [r.url async for r in mw.process_start(start())]
+
+    return asyncio.run(collect())
+
+
+def _page(mw, spider, url: str, source_ids: list[str], next_url: str | None = None):
+    """1ページ分のコールバック出力をミドルウェアに通す"""
+    request = Request(url, callback=spider.parse_list)
+    response = HtmlResponse(url, body=b"<html></html>", request=request)
+    result = [{"source": "suumo", "source_id": sid, "rent": 50000} for sid in source_ids]
+    if next_url:
+        result.append(Request(next_url, callback=spider.parse_list))
+    return list(mw.process_spider_output(response, iter(result), spider))
+
+
+def test_resume_continues_and_inactivates_only_on_completion():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        conn = init_db(db_path)
+        PropertyRepository(conn).upsert_many([
+            {"source": "suumo", "source_id": sid, "rent": 50000} for sid in ("a", "b", "c")
+        ])
+
+        # 1回目: 1ページ目だけ処理して中断
+        crawler, spider, ext, mw = _open(db_path)
+        assert _start(mw, spider, [BASE + "sc_naha/", BASE + "sc_urasoe/"]) == [
+            BASE + "sc_naha/", BASE + "sc_urasoe/",
+        ]
+        _page(mw, spider, BASE + "sc_naha/", ["a"], next_url=BASE + "sc_naha/?page=2")
+        ext.spider_closed(spider, "shutdown")
+        mw.spider_closed(spider)
+        inactive = conn.execute("SELECT COUNT(*) FROM properties WHERE is_active = 0")
+        assert inactive.fetchone()[0] == 0
+
+        # 2回目: 未処理のページ (浦添・那覇2ページ目) から再開
+        crawler, spider, ext, mw = _open(db_path)
+        assert spider.crawl_resuming
+        assert spider.crawl_root_run_id == 1
+        resumed = _start(mw, spider, [BASE + "sc_naha/", BASE + "sc_urasoe/"])
+        assert sorted(resumed) == [BASE + "sc_naha/?page=2", BASE + "sc_urasoe/"]
+        _page(mw, spider, BASE + "sc_naha/?page=2", ["b"])
+        _page(mw, spider, BASE + "sc_urasoe/", [])
+        mw.spider_idle(spider)
+        ext.spider_closed(spider, "finished")
+        mw.spider_closed(spider)
+
+        # 中断前に確認した a も含めて掲載中、c のみ掲載終了
+        rows = dict(conn.execute("SELECT source_id, is_active FROM properties").fetchall())
+        assert rows == {"a": 1, "b": 1, "c": 0}
+        runs = conn.execute("SELECT status, resumed_from FROM crawl_runs ORDER BY id").fetchall()
+        assert [tuple(r) for r in runs] == [("interrupted", None), ("completed", 1)]
+        assert conn.execute("SELECT COUNT(*) FROM crawl_frontier").fetchone()[0] == 0
+        conn.close()
+
+
+def test_completed_run_starts_fresh():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        crawler, spider, ext, mw = _open(db_path)
+        _start(mw, spider, [BASE + "sc_naha/"])
+        _page(mw, spider, BASE + "sc_naha/", [])
+        mw.spider_idle(spider)
+        ext.spider_closed(spider, "finished")
+
+        crawler, spider, ext, mw = _open(db_path)
+        assert not spider.crawl_resuming
+        assert _start(mw, spider, [BASE + "sc_naha/"]) == [BASE + "sc_naha/"]
+        ext.spider_closed(spider, "finished")
+
+
+def test_pages_are_committed_in_batches():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        conn = init_db(db_path)
+        crawler, spider, ext, mw = _open(db_path)
+        mw.batch_pages = 2
+        _start(mw, spider, [BASE + "sc_naha/", BASE + "sc_urasoe/"])
+
+        def done() -> int:
+            return conn.execute("SELECT COUNT(*) FROM crawl_frontier WHERE done = 1").fetchone()[0]
+
+        _page(mw, spider, BASE + "sc_naha/", ["a"])
+        assert done() == 0
+        _page(mw, spider, BASE + "sc_urasoe/", ["b"])
+        assert done() == 2
+        ext.spider_closed(spider, "shutdown")
+        mw.spider_closed(spider)
+        conn.close()
+
+
+def test_dropped_redirect_completes_original_and_rentless_items_are_not_seen():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        conn = init_db(db_path)
+        crawler, spider, ext, mw = _open(db_path)
+        _start(mw, spider, [BASE + "sc_naha/"])
+        request = Request(BASE + "sc_naha/", callback=spider.parse_list)
+        response = HtmlResponse(BASE + "sc_naha/", body=b"", request=request)
+        requests = [
+            output
+            for output in mw.process_spider_output(
+                response,
+                iter([
+                    {"source": "suumo", "source_id": "a", "rent": None},
+                    Request(BASE + "sc_naha/?page=2", callback=spider.parse_list),
+                ]),
+                spider,
+            )
+            if isinstance(output, Request)
+        ]
+        # 2ページ目のリダイレクト先が取得済みのページと重複して捨てられた
+        redirected = requests[0].replace(url=BASE + "sc_naha/")
+        mw.request_dropped(redirected, spider)
+        mw.spider_idle(spider)
+
+        assert conn.execute("SELECT COUNT(*) FROM crawl_frontier WHERE done = 0").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM crawl_seen").fetchone()[0] == 0
+        ext.spider_closed(spider, "shutdown")
+        mw.spider_closed(spider)
+        conn.close()
+
+
+def test_checkpoint_disabled_still_inactivates_unseen_listings():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        conn = init_db(db_path)
+        PropertyRepository(conn).upsert_many([
+            {"source": "suumo", "source_id": sid, "rent": 50000} for sid in ("a", "b")
+        ])
+
+        # 中断した実行があっても再開しない
+        crawler, spider, ext, _ = _open(db_path, CRAWL_CHECKPOINT_ENABLED=False)
+        ext.spider_closed(spider, "shutdown")
+        crawler, spider, ext, _ = _open(db_path, CRAWL_CHECKPOINT_ENABLED=False)
+        assert not spider.crawl_resuming
+
+        ext.item_scraped({"source": "suumo", "source_id": "a", "rent": 50000}, spider)
+        ext.item_scraped({"source": "suumo", "source_id": "b", "rent": None}, spider)
+        ext.spider_closed(spider, "finished")
+
+        rows = dict(conn.execute("SELECT source_id, is_active FROM properties").fetchall())
+        assert rows == {"a": 1, "b": 0}
+        conn.close()
@@ -0,0 +1,166 @@
+"""詳細ページ補完テスト"""
+
+import tempfile
+from pathlib import Path
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+from scrapy.spidermiddlewares.httperror import HttpError
+from scrapy.utils.test import get_crawler
+from twisted.python.failure import Failure
+
+from src.database.models import init_db
+from src.database.repository import PropertyRepository
+from src.scraper.pipelines import DetailEnrichmentPipeline
+from src.scraper.spiders.detail import DetailSpider
+
+DETAIL_HTML = """
+<html><body>
+<div id="map" data-lat="26.2125" data-lng="127.6792"></div>
+<table>
+  <tr><th>設備・条件</th><td>エアコン付 オートロック バス・トイレ別 室内洗濯機置場</td></tr>
+  <tr><th>契約期間</th><td>定期借家 2年</td></tr>
+  <tr><th>保証会社</th><td>利用必須</td></tr>
+  <tr><th>仲介手数料</th><td>賃料の1ヶ月分</td></tr>
+  <tr><th>入居</th><td>即入居可</td></tr>
+  <tr><th>駐車場</th><td>敷地内 5,000円/月</td></tr>
+</table>
+</body></html>
+"""
+
+
+def _property(i: int, **overrides) -> dict:
+    data = {
+        "source": "suumo",
+        "source_id": f"{i:06d}",
+        "source_url": f"https://suumo.jp/chintai/jnc_{i:06d}/",
+        "rent": 60000,
+        "content_hash": f"hash{i}",
+    }
+    data.update(overrides)
+    return data
+
+
+def test_detail_candidates_priority():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = init_db(Path(tmp) / "test.db")
+        repo = PropertyRepository(conn)
+        repo.upsert_many([_property(i) for i in range(4)])
+        # 1: 取得済み・変化なし・項目充足 → 対象外
+        # 2: 取得済みだが一覧の内容が変化 → 変更
+        # 3: 座標なしのまま30日経過 → 再取得
+        repo.update_details([
+            {"source": "suumo", "source_id": "000001", "content_hash": "hash1",
+             "latitude": 26.2, "longitude": 127.6, "lease_type": "ordinary"},
+            {"source": "suumo", "source_id": "000002", "content_hash": "old"},
+            {"source": "suumo", "source_id": "000003", "content_hash": "hash3"},
+        ])
+        conn.execute(
+            "UPDATE properties SET detail_fetched_at = datetime('now', '-30 days') "
+            "WHERE source_id = '000003'"
+        )
+        conn.commit()
+
+        candidates = repo.get_detail_candidates(["suumo"], limit=10, retry_days=14)
+        assert [c["source_id"] for c in candidates] == ["000000", "000002", "000003"]
+        assert [c["detail_priority"] for c in candidates] == [0, 1, 2]
+        assert len(repo.get_detail_candidates(["suumo"], limit=2)) == 2
+        assert repo.get_detail_candidates(["homes"], limit=10) == []
+        conn.close()
+
+
+def test_parse_detail():
+    spider = DetailSpider(budget=10)
+    response = HtmlResponse(
+        url="https://suumo.jp/chintai/jnc_000001/",
+        body=DETAIL_HTML.encode("utf-8"),
+        encoding="utf-8",
+    )
+    item = next(spider.parse_detail(response, source="suumo", source_id="000001", content_hash="h"))
+    assert item["latitude"] == 26.2125
+    assert item["longitude"] == 127.6792
+    assert item["has_aircon"] == 1
+    assert item["has_auto_lock"] == 1
+    assert item["has_bath_toilet_separate"] == 1
+    assert item["has_pet_ok"] == 0
+    assert item["lease_type"] == "fixed"
+    assert item["guarantor_required"] == "required"
+    assert item["brokerage_fee_months"] == 1.0
+    assert item["move_in_date"] == "即入居可"
+    assert item["parking_available"] == 1
+    assert item["parking_fee"] == 5000
+
+
+def test_enrichment_pipeline_updates_only():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        conn = init_db(db_path)
+        PropertyRepository(conn).upsert_many([_property(1)])
+
+        spider = DetailSpider(budget=10)
+        spider.settings = Settings({"DATABASE_PATH": str(db_path)})
+        pipeline = DetailEnrichmentPipeline()
+        pipeline.open_spider(spider)
+        pipeline.process_item(
+            {"source": "suumo", "source_id": "000001", "content_hash": "hash1", "latitude": 26.3,
+             "longitude": 127.8, "lease_type": None},
+            spider,
+        )
+        # 未登録の物件は追加しない
+        pipeline.process_item({"source": "suumo", "source_id": "999999", "latitude": 26.3}, spider)
+        pipeline.close_spider(spider)
+
+        rows = conn.execute("SELECT * FROM properties").fetchall()
+        assert len(rows) == 1
+        assert rows[0]["latitude"] == 26.3
+        assert rows[0]["detail_fetched_at"] is not None
+        assert rows[0]["detail_content_hash"] == "hash1"
+        assert rows[0]["rent"] == 60000
+        conn.close()
+
+
+def test_failed_detail_is_skipped_until_retry_interval():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        conn = init_db(db_path)
+        repo = PropertyRepository(conn)
+        repo.upsert_many([_property(0), _property(1)])
+
+        crawler = get_crawler(DetailSpider, {"DATABASE_PATH": str(db_path)})
+        spider = DetailSpider.from_crawler(crawler)
+        request = Request(
+            "https://suumo.jp/chintai/jnc_000000/",
+            cb_kwargs={"source": "suumo", "source_id": "000000", "content_hash": "hash0"},
+        )
+        response = HtmlResponse(url=request.url, status=404, body=b"", request=request)
+        failure = Failure(HttpError(response))
+        failure.request = request
+        (item,) = spider.detail_failed(failure)
+        assert item["fetch_failed"] == "404"
+        assert spider.crawler.stats.get_value("detail/gone") == 1
+
+        pipeline = DetailEnrichmentPipeline()
+        pipeline.open_spider(spider)
+        pipeline.process_item(item, spider)
+        pipeline.close_spider(spider)
+
+        candidates = repo.get_detail_candidates(["suumo"], limit=10, failure_retry_days=3)
+        assert [c["source_id"] for c in candidates] == ["000001"]
+        # 連続失敗回数に比例して間隔を空ける (1回目の失敗は3日)
+        conn.execute(
+            "UPDATE properties SET detail_failed_at = datetime('now', 'localtime', '-4 days')"
+            " WHERE source_id = '000000'"
+        )
+        conn.commit()
+        candidates = repo.get_detail_candidates(["suumo"], limit=10, failure_retry_days=3)
+        assert [c["source_id"] for c in candidates] == ["000000", "000001"]
+
+        # 取得に成功したら失敗の記録を消す
+        repo.update_details([{"source": "suumo", "source_id": "000000", "content_hash": "hash0"}])
+        row = conn.execute(
+            "SELECT detail_failed_at, detail_fail_count FROM properties WHERE source_id = '000000'"
+        ).fetchone()
+        assert row["detail_failed_at"] is None
+        assert row["detail_fail_count"] == 0
+        conn.close()
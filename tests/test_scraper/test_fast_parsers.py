@@ -0,0 +1,51 @@
+"""高速パーサの同等性テスト (parsel セレクタ実装と item 単位で一致すること)"""
+
+from scrapy.http import HtmlResponse
+
+from src.scraper.fast_parsers import parse_homes_list, parse_suumo_list
+from src.scraper.spiders.homes import HomesSpider
+from src.scraper.spiders.suumo import SuumoSpider
+from tests.test_scraper.pages import list_page
+from tests.test_scraper.test_incremental import LIST_HTML
+
+HOMES_EDGE_HTML = """
+<div class="mod-mergeBuilding--rent--photo">
+  <span class="bukkenName">エッジ荘</span>
+  <div class="bukkenSpec"><table><tr><th>所在地</th><td>沖縄県那覇市泊1</td></tr></table></div>
+  <table><tr class="prg-room" data-href="/chintai/b-12345/">
+    <td class="price"><span class="num">5.2</span>万円</td>
+  </tr></table>
+  <table><tr class="prg-room" data-href="">
+    <td class="layout">1K</td>
+  </tr></table>
+</div>
+"""
+
+
+def _assert_same(spider, fast_fn, response):
+    expected_items, expected_next = spider._parse_list_selectors(response)
+    fast_items, fast_next = fast_fn(spider, response.replace())
+    assert [dict(i) for i in fast_items] == [dict(i) for i in expected_items]
+    assert fast_next == expected_next
+    return fast_items
+
+
+def test_suumo_fast_parser_matches_selectors():
+    spider = SuumoSpider(crawl_mode="full")
+    items = _assert_same(spider, parse_suumo_list, list_page("suumo"))
+    assert len(items) == 6
+    response = HtmlResponse("https://suumo.jp/x/", body=LIST_HTML.encode("utf-8"), encoding="utf-8")
+    _assert_same(spider, parse_suumo_list, response)
+
+
+def test_homes_fast_parser_matches_selectors():
+    spider = HomesSpider(crawl_mode="full")
+    items = _assert_same(spider, parse_homes_list, list_page("homes"))
+    assert len(items) == 4
+    response = HtmlResponse(
+        "https://www.homes.co.jp/chintai/okinawa/list/",
+        body=HOMES_EDGE_HTML.encode("utf-8"),
+        encoding="utf-8",
+    )
+    items = _assert_same(spider, parse_homes_list, response)
+    assert [i["source_id"] for i in items] == ["12345", "homes_エッジ荘_"]
@@ -0,0 +1,176 @@
+"""共有クロールフロンティアのテスト"""
+
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from scrapy import Request
+from scrapy.exceptions import NotConfigured
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from src.scraper.frontier import (
+    FrontierCompletionMiddleware,
+    SharedFrontier,
+    SharedFrontierScheduler,
+    shard_bucket,
+)
+from src.scraper.spiders.suumo import SuumoSpider
+
+
+def _frontier(db_path: Path, owner: str, **kwargs) -> SharedFrontier:
+    return SharedFrontier(db_path, "suumo-test", owner, **kwargs)
+
+
+def test_lease_dedupe_and_complete():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "frontier.db"
+        a, b = _frontier(db_path, "a"), _frontier(db_path, "b")
+        assert a.enqueue("fp1", "suumo.jp", b"r1")
+        assert not b.enqueue("fp1", "suumo.jp", b"r1")
+        assert b.enqueue("fp2", "example.com", b"r2", priority=1)
+
+        # 優先度順に、別々のワーカーへ1件ずつ貸し出す
+        assert a.lease()[1] == b"r2"
+        assert b.lease()[1] == b"r1"
+        assert a.lease() is None
+        assert a.has_pending()
+
+        a.complete(1)  # b が貸し出し中のものは a からは完了にできない
+        assert a.counts() == {"leased": 2}
+        b.complete(1)
+        a.complete(2)
+        assert not a.has_pending()
+        assert a.counts() == {"done": 2}
+
+        # dont_filter のリクエストは処理済みでも再投入
+        assert a.enqueue("fp1", "suumo.jp", b"r1", requeue=True)
+        assert a.counts() == {"done": 1, "queued": 1}
+
+
+def test_expired_lease_is_reclaimed():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "frontier.db"
+        crashed = _frontier(db_path, "crashed", lease_seconds=-1, max_attempts=2)
+        other = _frontier(db_path, "other", max_attempts=2)
+        crashed.enqueue("fp1", "suumo.jp", b"r1")
+        assert crashed.lease()[2] is False
+        assert other.lease() == (1, b"r1", True)
+
+        # 試行回数の上限に達したら諦める
+        other.conn.execute("UPDATE frontier SET lease_expires_at = 0")
+        assert crashed.lease() is None
+        assert not crashed.has_pending()
+
+
+def test_domain_interval_is_shared():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "frontier.db"
+        a, b = _frontier(db_path, "a"), _frontier(db_path, "b")
+        for i in range(3):
+            a.enqueue(f"suumo{i}", "suumo.jp", b"suumo")
+        a.enqueue("other", "example.com", b"other")
+
+        assert a.lease(interval_for=lambda domain: 60)[1] == b"suumo"
+        # suumo.jp は間隔が空くまで他のワーカーにも貸し出さない
+        assert b.lease()[1] == b"other"
+        assert b.lease() is None
+        b.conn.execute("UPDATE frontier_domains SET next_at = ?", (time.time() - 1,))
+        assert b.lease()[1] == b"suumo"
+
+
+def test_own_shard_is_preferred():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "frontier.db"
+        frontier = _frontier(db_path, "w")
+        shards = ["naha", "urasoe", "ginowan", "nago"]
+        for shard in shards:
+            frontier.enqueue(shard, f"{shard}.example", shard.encode(), shard=shard)
+        mine = [s for s in shards if shard_bucket(s) % 2 == 1]
+        leased = [frontier.lease(workers=2, worker_index=1)[1].decode() for _ in shards]
+        assert leased[:len(mine)] == mine
+        assert sorted(leased) == sorted(shards)
+
+
+def _scheduler(tmp: str, spider_cls=SuumoSpider):
+    crawler = get_crawler(spider_cls, settings_dict={
+        "FRONTIER_DB_PATH": str(Path(tmp) / "frontier.db"),
+        "FRONTIER_CRAWL_ID": "suumo-test",
+        "SCHEDULER": "src.scraper.frontier.SharedFrontierScheduler",
+    })
+    spider = crawler._create_spider(crawl_mode="full")
+    # 現在のダウンロード間隔 (AdaptiveRateMiddleware が調整) の方が長ければそちらを使う
+    crawler.engine = SimpleNamespace(downloader=SimpleNamespace(
+        slots={"suumo.jp": SimpleNamespace(delay=30.0)}
+    ))
+    scheduler = SharedFrontierScheduler.from_crawler(crawler)
+    crawler.engine.scheduler = scheduler
+    scheduler.open(spider)
+    return crawler, spider, scheduler
+
+
+def test_scheduler_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        crawler, spider, scheduler = _scheduler(tmp)
+
+        url = "https://suumo.jp/chintai/okinawa/sc_naha/"
+        assert scheduler.enqueue_request(Request(url, callback=spider.parse_list))
+        assert not scheduler.enqueue_request(Request(url, callback=spider.parse_list))
+        assert scheduler.frontier.conn.execute("SELECT shard FROM frontier").fetchone()[0] == "naha"
+
+        request = scheduler.next_request()
+        assert request.url == url
+        assert request.callback == spider.parse_list
+        interval = scheduler.frontier.conn.execute(
+            "SELECT interval FROM frontier_domains WHERE domain = 'suumo.jp'"
+        ).fetchone()[0]
+        assert interval == 30.0
+
+        # コールバックの出力を渡し終えるまでは処理済みにしない
+        mw = FrontierCompletionMiddleware.from_crawler(crawler)
+        response = HtmlResponse(url, body=b"", request=request)
+        output = mw.process_spider_output(response, iter([Request(url + "?page=2")]), spider)
+        next(output)
+        assert scheduler.frontier.counts() == {"leased": 1}
+        list(output)
+        assert scheduler.frontier.counts() == {"done": 1}
+        scheduler.close("finished")
+        assert crawler.stats.get_value("frontier/done") == 1
+
+
+def test_retry_requeues_but_start_requests_and_redirects_do_not():
+    with tempfile.TemporaryDirectory() as tmp:
+        crawler, spider, scheduler = _scheduler(tmp)
+        url = "https://suumo.jp/chintai/okinawa/sc_naha/"
+        # 別のワーカーの開始リクエスト (dont_filter) は1回だけ
+        assert scheduler.enqueue_request(Request(url, dont_filter=True))
+        assert not scheduler.enqueue_request(Request(url, dont_filter=True))
+
+        # リトライは同じ行を未処理に戻す
+        request = scheduler.next_request()
+        assert scheduler.enqueue_request(request.replace(dont_filter=True))
+        assert scheduler.frontier.counts() == {"queued": 1}
+
+        # リダイレクト先は新しい行で処理し、元の行は処理済み
+        scheduler.frontier.conn.execute("UPDATE frontier_domains SET next_at = 0")
+        request = scheduler.next_request()
+        assert scheduler.enqueue_request(request.replace(url=url + "?redirected=1"))
+        assert scheduler.frontier.counts() == {"done": 1, "queued": 1}
+
+        # リトライを使い切った例外でも処理済みにする
+        mw = FrontierCompletionMiddleware.from_crawler(crawler)
+        scheduler.frontier.conn.execute("UPDATE frontier_domains SET next_at = 0")
+        request = scheduler.next_request()
+        mw.process_exception(request, TimeoutError(), spider)
+        assert scheduler.frontier.counts() == {"done": 2}
+        scheduler.close("finished")
+
+
+def test_completion_middleware_requires_shared_frontier_scheduler():
+    crawler = get_crawler(SuumoSpider, settings_dict={
+        "SCHEDULER": "scrapy.core.scheduler.Scheduler",
+    })
+    with pytest.raises(NotConfigured):
+        FrontierCompletionMiddleware.from_crawler(crawler)
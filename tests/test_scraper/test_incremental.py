@@ -0,0 +1,132 @@
+"""差分クロールテスト"""
+
+import re
+from datetime import date
+
+import scrapy
+from scrapy.http import HtmlResponse
+
+from src.scraper.incremental import SeenFilter, item_fingerprint, resolve_crawl_mode
+from src.scraper.spiders.goohome import GoohomeSpider
+from src.scraper.spiders.homes import HomesSpider
+from src.scraper.spiders.suumo import SuumoSpider
+from src.scraper.spiders.uchina import UchinaSpider
+from tests.test_scraper.pages import list_page
+
+LIST_HTML = """
+<div class="cassetteitem">
+  <div class="cassetteitem_content-title">テストマンション</div>
+  <li class="cassetteitem_detail-col1">沖縄県那覇市安里1</li>
+  <table class="cassetteitem_other"><tbody>
+    <tr class="js-cassette_link">
+      <td></td><td></td><td>3階</td>
+      <td><span class="cassetteitem_price--rent">6.5万円</span></td>
+      <td></td><td><span class="cassetteitem_madori">1LDK</span></td>
+      <td></td><td></td>
+      <td><a class="js-cassette_link_href" href="/chintai/jnc_000111/">詳細</a></td>
+    </tr>
+  </tbody></table>
+</div>
+<p class="pagination-parts"><a href="/chintai/okinawa/sc_naha/?po1=09&page=2">次へ</a></p>
+"""
+
+
+def _parse(spider):
+    response = HtmlResponse(
+        url="https://suumo.jp/chintai/okinawa/sc_naha/?po1=09",
+        body=LIST_HTML.encode("utf-8"),
+        encoding="utf-8",
+    )
+    results = list(spider.parse_list(response))
+    items = [r for r in results if not isinstance(r, scrapy.Request)]
+    requests = [r for r in results if isinstance(r, scrapy.Request)]
+    return items, requests
+
+
+def test_item_fingerprint_ignores_hash_and_none():
+    a = {"source_id": "1", "rent": "6.5万円", "name": None}
+    b = {"source_id": "1", "rent": "6.5万円", "content_hash": "x"}
+    assert item_fingerprint(a) == item_fingerprint(b)
+    assert item_fingerprint(a) != item_fingerprint({"source_id": "1", "rent": "6.6万円"})
+
+
+def test_incremental_stops_at_known_page():
+    spider = SuumoSpider(crawl_mode="incremental")
+    spider._known_filter = SeenFilter()
+    items, _ = _parse(spider)
+    spider._known_filter = SeenFilter((i["source_id"], i["content_hash"]) for i in items)
+
+    _, requests = _parse(spider)
+    assert requests == []
+
+
+def test_incremental_follows_when_content_changed():
+    spider = SuumoSpider(crawl_mode="incremental")
+    spider._known_filter = SeenFilter([("000111", "stale")])
+    _, requests = _parse(spider)
+    assert len(requests) == 1
+
+
+def test_incremental_without_newest_first_follows_known_pages():
+    # 新着順ソートに対応しないサイト (グーホーム・HOME'S・うちなーらいふ) は打ち切らない
+    spider = SuumoSpider(crawl_mode="incremental")
+    spider.newest_first_params = {}
+    spider._known_filter = SeenFilter()
+    items, _ = _parse(spider)
+    spider._known_filter = SeenFilter((i["source_id"], i["content_hash"]) for i in items)
+    _, requests = _parse(spider)
+    assert len(requests) == 1
+    for spider_cls in (GoohomeSpider, HomesSpider, UchinaSpider):
+        assert not spider_cls.newest_first_params
+
+
+def test_full_mode_always_follows():
+    spider = SuumoSpider(crawl_mode="full")
+    items, _ = _parse(spider)
+    spider._known_filter = SeenFilter((i["source_id"], i["content_hash"]) for i in items)
+    _, requests = _parse(spider)
+    assert len(requests) == 1
+    assert spider.apply_sort_params("https://suumo.jp/a/") == "https://suumo.jp/a/"
+
+
+def test_resolve_crawl_mode_weekday(tmp_path):
+    config = tmp_path / "targets.yaml"
+    config.write_text(
+        "crawl_mode:\n  default: incremental\n  full_crawl_weekday: 6\n", encoding="utf-8"
+    )
+    assert resolve_crawl_mode(date(2026, 10, 18), config) == "full"  # 日曜
+    assert resolve_crawl_mode(date(2026, 10, 19), config) == "incremental"
+
+
+def _requests(spider, response):
+    return [r for r in spider.parse_list(response) if isinstance(r, scrapy.Request)]
+
+
+def test_goohome_fans_out_pages_from_total_count():
+    spider = GoohomeSpider(crawl_mode="full")
+    requests = _requests(spider, list_page("goohome"))
+    # 1,005件 / 20件 = 51ページ
+    assert [r.url.split("page=")[1] for r in requests] == [f"{p}-20" for p in range(2, 52)]
+    assert all(r.meta["page_fanned_out"] for r in requests[:-1])
+    assert not requests[-1].meta["page_fanned_out"]
+
+    # 一括投入したページは次ページリンクをたどらない、最後のページはたどる
+    page = list_page("goohome", "https://goohome.jp/chintai/mansion/naha/?page=2-20")
+    assert _requests(spider, page.replace(request=requests[0])) == []
+    assert len(_requests(spider, page.replace(request=requests[-1]))) == 1
+
+
+def test_homes_fans_out_from_page_links_and_falls_back():
+    spider = HomesSpider(crawl_mode="full")
+    page = list_page("homes")
+    requests = _requests(spider, page)
+    assert [r.url for r in requests] == [
+        f"https://www.homes.co.jp/chintai/okinawa/list/?page={p}" for p in range(2, 13)
+    ]
+
+    # 次ページリンクのみ → 従来どおりリンクをたどる
+    body = re.sub(r'<li><a href="/chintai/okinawa/list/\?page=\d+">\d+</a></li>', "",
+                  page.text)
+    [next_request] = _requests(spider, list_page("homes", body=body))
+    assert next_request.url.endswith("?page=2")
+    assert "page_fanned_out" not in next_request.meta
@@ -0,0 +1,36 @@
+"""アイテム型のテスト"""
+
+import pytest
+from itemadapter import ItemAdapter, is_item
+
+from src.scraper.items import RentalPropertyItem
+
+
+def test_rental_item_behaves_like_scrapy_item():
+    item = RentalPropertyItem()
+    item["source"] = "suumo"
+    item["rent"] = "5.5万円"
+
+    assert is_item(item)
+    assert ItemAdapter(item)["rent"] == "5.5万円"
+    assert dict(item) == {"source": "suumo", "rent": "5.5万円"}
+    assert "rent" in item and "name" not in item
+    assert item.get("name") is None and item.get("name", "-") == "-"
+    with pytest.raises(KeyError):
+        item["unknown"] = 1
+    with pytest.raises(KeyError):
+        item["unknown"]
+
+
+def test_to_row_skips_unset_fields():
+    item = RentalPropertyItem(source="uchina", source_id="r-1", rent=50000, latitude=None)
+    assert item.to_row() == {"source": "uchina", "source_id": "r-1", "rent": 50000}
+    assert list(item.to_row()) == ["source", "source_id", "rent"]
+
+
+def test_explicit_none_is_unset():
+    # scrapy.Item と違い、None の代入は未設定と同じ (クレンジングでも 0 にならない)
+    item = RentalPropertyItem(source="suumo", has_aircon=1)
+    item["has_aircon"] = None
+    assert "has_aircon" not in item
+    assert "has_aircon" not in item.to_row()
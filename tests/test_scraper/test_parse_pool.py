@@ -0,0 +1,50 @@
+"""プロセスプールでの一覧パースのテスト"""
+
+from scrapy.utils.test import get_crawler
+
+from src.scraper.items import RentalPropertyItem
+from src.scraper.parse_pool import ParsePool, get_parse_pool, parse_page
+from src.scraper.spiders.goohome import GoohomeSpider
+from src.scraper.spiders.homes import HomesSpider
+from src.scraper.spiders.suumo import SuumoSpider
+from tests.test_scraper.pages import list_page
+
+
+def _inline_rows(spider, response):
+    return [
+        dict(r) for r in spider._parse_list_inline(response) if isinstance(r, RentalPropertyItem)
+    ]
+
+
+def test_parse_page_matches_inline():
+    for spider in (SuumoSpider(crawl_mode="full"), HomesSpider(crawl_mode="full")):
+        response = list_page(spider.name)
+        rows, next_page, seconds = parse_page(
+            spider.name, response.url, response.body, response.encoding
+        )
+        assert rows and rows == _inline_rows(spider, response.replace())
+        assert all(row["content_hash"] for row in rows)
+        assert seconds > 0
+
+
+def test_pool_parses_in_worker_process():
+    response = list_page("suumo")
+    pool = ParsePool(workers=1)
+    try:
+        rows, next_page, _ = pool.submit_future("suumo", response).result(timeout=60)
+    finally:
+        pool.close()
+    assert rows == _inline_rows(SuumoSpider(crawl_mode="full"), response.replace())
+
+
+def test_pool_only_when_enabled_for_supported_spiders():
+    crawler = get_crawler(SuumoSpider)
+    assert get_parse_pool(SuumoSpider.from_crawler(crawler, crawl_mode="full")) is None
+
+    crawler = get_crawler(GoohomeSpider, settings_dict={"PARSE_POOL_ENABLED": True})
+    assert get_parse_pool(GoohomeSpider.from_crawler(crawler, crawl_mode="full")) is None
+
+    crawler = get_crawler(
+        SuumoSpider, settings_dict={"PARSE_POOL_ENABLED": True, "FAST_PARSERS_ENABLED": False}
+    )
+    assert get_parse_pool(SuumoSpider.from_crawler(crawler, crawl_mode="full")) is None
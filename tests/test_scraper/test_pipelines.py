@@ -1,5 +1,7 @@
 """パイプラインテスト"""
 
+import sqlite3
+
 from src.scraper.pipelines import DataCleansingPipeline
 
 
@@ -51,3 +53,135 @@ def test_extract_municipality():
     assert pipeline._extract_municipality("那覇市牧志") == "那覇市"
     assert pipeline._extract_municipality("沖縄県中城村") == "中城村"
     assert pipeline._extract_municipality("北谷町") == "北谷町"
+
+
+def test_parse_fullwidth():
+    pipeline = DataCleansingPipeline()
+    assert pipeline._parse_price("５．５万円") == 55000
+    assert pipeline._parse_price("￥６２，０００") == 62000
+    assert pipeline._parse_months("１ヵ月") == 1.0
+    assert pipeline._parse_float("約２５．５㎡") == 25.5
+    assert pipeline._parse_int("１０分") == 10
+
+
+def test_parse_months_ke_notation():
+    # 旧実装は「ケ月」を扱えず 0.0 になっていた
+    pipeline = DataCleansingPipeline()
+    assert pipeline._parse_months("1ケ月") == 1.0
+    assert pipeline._parse_months("2カ月") == 2.0
+
+
+def test_parse_fullwidth_digits():
+    # 旧実装は全角数字を変換せず None / 0.0 になっていた
+    pipeline = DataCleansingPipeline()
+    assert pipeline._parse_price("６２０００円") == 62000
+    assert pipeline._parse_months("２ヶ月") == 2.0
+    assert pipeline._parse_float("３０ｍ２") == 30.0
+    assert pipeline._parse_int("８分") == 8
+
+
+def test_parse_long_vowel_mark_as_dash():
+    # 「ー」(長音記号) は「-」(なし) と同じに扱う
+    pipeline = DataCleansingPipeline()
+    assert pipeline._parse_months("ー") == 0.0
+    assert pipeline._parse_months("－") == 0.0
+    assert pipeline._parse_price("ー") is None
+    assert pipeline._parse_float("ー") is None
+
+
+def test_process_batch():
+    pipeline = DataCleansingPipeline()
+    items = pipeline.process_batch([
+        {"rent": "5.5万円", "deposit_months": "1ヶ月", "area_sqm": "30.5㎡",
+         "station_walk_minutes": "8分", "floor_plan": "2LDK", "address": "沖縄県那覇市首里"},
+        {"rent": "62,000円", "deposit_months": "なし", "floor_plan": "1K"},
+    ])
+    assert items[0]["rent"] == 55000
+    assert items[0]["deposit_months"] == 1.0
+    assert items[0]["area_sqm"] == 30.5
+    assert items[0]["station_walk_minutes"] == 8
+    assert items[0]["room_count"] == 2
+    assert items[1]["rent"] == 62000
+    assert items[1]["management_fee"] == 0
+    assert items[1]["area_sqm"] is None
+
+
+def test_seen_filter_skips_unchanged_items():
+    import tempfile
+    from pathlib import Path
+
+    from scrapy.settings import Settings
+
+    from src.database.models import init_db
+    from src.database.repository import PropertyRepository
+    from src.scraper.pipelines import DuplicateFilterPipeline, SQLitePipeline
+    from src.scraper.spiders.suumo import SuumoSpider
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        conn = init_db(db_path)
+        PropertyRepository(conn).upsert_many([
+            {"source": "suumo", "source_id": "a", "rent": 50000, "content_hash": "h1"},
+            {"source": "suumo", "source_id": "b", "rent": 60000, "content_hash": "h2"},
+        ])
+        conn.execute("UPDATE properties SET last_seen_at = '2026-01-01 00:00:00', is_active = 0")
+        conn.commit()
+
+        spider = SuumoSpider(crawl_mode="full")
+        spider.settings = Settings({"DATABASE_PATH": str(db_path)})
+        pipelines = [
+            DuplicateFilterPipeline(use_seen_filter=True),
+            DataCleansingPipeline(),
+            SQLitePipeline(),
+        ]
+        for pipeline in pipelines:
+            pipeline.open_spider(spider)
+        items = [
+            {"source": "suumo", "source_id": "a", "rent": "5万円", "content_hash": "h1"},
+            {"source": "suumo", "source_id": "b", "rent": "6.5万円", "content_hash": "changed"},
+        ]
+        for item in items:
+            for pipeline in pipelines:
+                item = pipeline.process_item(item, spider)
+        for pipeline in pipelines:
+            if hasattr(pipeline, "close_spider"):
+                pipeline.close_spider(spider)
+
+        # 未変更の物件はクレンジングせず、last_seen_at と掲載状態だけを更新
+        assert items[0]["unchanged"] is True
+        assert items[0]["rent"] == "5万円"
+        assert "unchanged" not in items[1]
+        rows = {
+            r["source_id"]: r
+            for r in conn.execute("SELECT source_id, rent, last_seen_at, is_active FROM properties")
+        }
+        assert rows["a"]["rent"] == 50000
+        assert rows["a"]["is_active"] == 1
+        assert rows["a"]["last_seen_at"] > "2026-01-01 00:00:00"
+        assert rows["b"]["rent"] == 65000
+        conn.close()
+
+
+def test_failed_batch_is_retried_row_by_row():
+    import tempfile
+    from pathlib import Path
+
+    from scrapy.settings import Settings
+
+    from src.scraper.pipelines import SQLitePipeline
+    from src.scraper.spiders.suumo import SuumoSpider
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spider = SuumoSpider(crawl_mode="full")
+        spider.settings = Settings({"DATABASE_PATH": str(Path(tmp) / "test.db")})
+        pipeline = SQLitePipeline(use_writer=False)
+        pipeline.open_spider(spider)
+        for i, name in enumerate(["A", ["不正な値"], "C"]):
+            item = {"source": "suumo", "source_id": str(i), "rent": 50000, "name": name}
+            pipeline.process_item(item, spider)
+        pipeline.close_spider(spider)
+
+        conn = sqlite3.connect(Path(tmp) / "test.db")
+        rows = conn.execute("SELECT source_id FROM properties ORDER BY source_id").fetchall()
+        conn.close()
+        assert rows == [("0",), ("2",)]
@@ -0,0 +1,62 @@
+"""リクエスト計画のテスト"""
+
+import tempfile
+from pathlib import Path
+
+from src.database.models import init_db
+from src.database.repository import CrawlRunRepository, PropertyRepository
+from src.scraper.planner import (
+    estimate_requests,
+    partition_areas,
+    report,
+    requests_per_1000,
+)
+
+AREAS = [
+    ("47201", "那覇市"), ("47208", "浦添市"), ("47301", "国頭村"), ("47302", "大宜味村"),
+    ("47303", "東村"),
+]
+
+
+def test_partition_areas_first_fit_decreasing():
+    counts = {"47201": 700, "47208": 300, "47301": 80, "47302": 20}
+    groups = partition_areas(AREAS, counts, capacity=800, default_count=50)
+    # 掲載数の多い順に空きのある組へ: 東村 (不明 = 50件) は 700 + 80 の組に入らない
+    assert [[code for code, _ in g] for g in groups] == [
+        ["47201", "47301", "47302"],
+        ["47208", "47303"],
+    ]
+    assert partition_areas(AREAS, counts, capacity=None, default_count=50) == [[a] for a in AREAS]
+
+
+def test_estimate_requests():
+    assert estimate_requests([0, 1, 200, 201], 200) == 1 + 1 + 1 + 2
+    assert requests_per_1000(5, 2000) == 2.5
+    assert requests_per_1000(5, 0) is None
+
+
+def test_report_compares_grouped_queries_and_actuals():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = init_db(Path(tmp) / "test.db")
+        repo = PropertyRepository(conn)
+        for i in range(30):
+            code = "47201" if i < 20 else "47301"
+            repo.upsert_property({
+                "source": "uchina", "source_id": f"u{i}", "rent": 50000,
+                "municipality_code": code,
+            })
+        runs = CrawlRunRepository(conn)
+        run_id = runs.start_run("uchina")
+        runs.finish_run(run_id, "finished", "finished", 30)
+        summary = {
+            "request_count": 3, "response_bytes": 0, "elapsed_seconds": 1.0, "items_per_sec": 30.0,
+        }
+        runs.record_metrics(run_id, summary, {"requests_per_1000_listings": 100.0})
+
+        [row] = [r for r in report(conn) if r["site"] == "uchina"]
+        assert row["listings"] == 30
+        # 41市町村を1回の検索にまとめる (市町村ごとなら41回)
+        assert row["queries"] == 1
+        assert row["requests"] == 1
+        assert row["requests_per_area"] == 41
+        assert row["actual_per_1000"] == [100.0]
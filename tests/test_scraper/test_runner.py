@@ -0,0 +1,31 @@
+"""並行ランナーテスト"""
+
+from src.scraper.runner import _with_target_settings, load_targets
+from src.scraper.spiders.suumo import SuumoSpider
+from src.scraper.spiders.uchina import UchinaSpider
+
+
+def test_load_targets_sorted_by_priority(tmp_path):
+    config = tmp_path / "targets.yaml"
+    config.write_text(
+        "targets:\n"
+        "  b: {enabled: true, priority: 2}\n"
+        "  a: {enabled: true, priority: 1}\n"
+        "  c: {enabled: false, priority: 0}\n",
+        encoding="utf-8",
+    )
+    assert list(load_targets(config)) == ["a", "b"]
+
+
+def test_target_delay_never_lowers_spider_delay():
+    # yaml の delay が長ければ採用
+    cls = _with_target_settings(UchinaSpider, {"delay": 4.0})
+    assert cls.name == "uchina"
+    assert cls.custom_settings["DOWNLOAD_DELAY"] == 4.0
+    headers = UchinaSpider.custom_settings["DEFAULT_REQUEST_HEADERS"]
+    assert cls.custom_settings["DEFAULT_REQUEST_HEADERS"] == headers
+
+    # スパイダー側の方が長ければそちらを維持
+    cls = _with_target_settings(SuumoSpider, {"delay": 1.0})
+    assert cls.custom_settings["DOWNLOAD_DELAY"] == 5
+    assert SuumoSpider.custom_settings["DOWNLOAD_DELAY"] == 5
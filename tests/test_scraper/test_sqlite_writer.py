@@ -0,0 +1,148 @@
+"""SQLite書き込みスレッドテスト"""
+
+import tempfile
+from pathlib import Path
+
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from src.database.models import init_db
+from src.scraper.pipelines import SQLitePipeline
+from src.scraper.spiders.suumo import SuumoSpider
+from src.scraper.sqlite_writer import SQLiteWriter
+
+
+def _item(i: int) -> dict:
+    return {
+        "source": "suumo",
+        "source_id": f"{i:06d}",
+        "source_url": f"https://suumo.jp/chintai/jnc_{i:06d}/",
+        "rent": 50000 + i,
+        "floor_plan": "1LDK",
+    }
+
+
+def _spider(db_path: Path):
+    spider = SuumoSpider(crawl_mode="full")
+    settings = Settings()
+    settings.set("DATABASE_PATH", str(db_path))
+    spider.settings = settings
+    spider.is_replay = True
+    return spider
+
+
+def _count(db_path: Path) -> int:
+    conn = init_db(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_writer_drains_on_close():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        crawler = get_crawler(settings_dict={"SQLITE_WRITER_BATCH_SIZE": 7})
+        pipeline = SQLitePipeline.from_crawler(crawler)
+        spider = _spider(db_path)
+        pipeline.open_spider(spider)
+        assert pipeline.writer is not None
+
+        for i in range(50):
+            assert pipeline.process_item(_item(i), spider)["source_id"] == f"{i:06d}"
+        pipeline.close_spider(spider)
+
+        assert _count(db_path) == 50
+        stats = crawler.stats.get_stats()
+        assert stats["sqlite_writer/items"] == 50
+        assert stats["sqlite_writer/batches"] >= 50 // 7
+        assert stats["sqlite_writer/errors"] == 0
+        assert "sqlite_writer/reactor_seconds_saved" in stats
+
+
+def test_sync_mode_process_batch():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        pipeline = SQLitePipeline()
+        spider = _spider(db_path)
+        pipeline.open_spider(spider)
+        assert pipeline.writer is None
+
+        items = [_item(i) for i in range(5)] + [{"source": "suumo", "source_id": "x"}]
+        assert len(pipeline.process_batch(items, spider)) == 6
+        pipeline.close_spider(spider)
+
+        assert _count(db_path) == 5
+
+
+def test_writer_retries_failed_batch_row_by_row():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        init_db(db_path).close()
+        writer = SQLiteWriter(db_path, batch_size=10)
+        writer.start()
+        for i in range(5):
+            writer.put(_item(i) if i != 2 else {**_item(i), "name": ["不正な値"]})
+        assert writer.close() == ([], [])
+
+        assert _count(db_path) == 4
+        assert (writer.items_written, writer.errors) == (4, 1)
+
+
+def test_close_returns_items_left_by_dead_writer():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        crawler = get_crawler(settings_dict={"SQLITE_WRITER_ENABLED": True})
+        pipeline = SQLitePipeline.from_crawler(crawler)
+        spider = _spider(db_path)
+        pipeline.open_spider(spider)
+        pipeline.writer.close()
+        # 接続できずに異常終了した書き込みスレッド
+        pipeline.writer = SQLiteWriter(Path(tmp) / "missing" / "test.db")
+        pipeline.writer.start()
+        pipeline.writer.join()
+
+        for i in range(3):
+            pipeline.process_item(_item(i), spider)
+        pipeline.process_item({**_item(9), "unchanged": True}, spider)
+        pipeline.close_spider(spider)
+
+        assert _count(db_path) == 3
+        stats = crawler.stats.get_stats()
+        assert stats["sqlite_writer/recovered"] == 3
+        assert stats["sqlite_writer/lost"] == 0
+
+
+def test_full_queue_delays_item_until_space(monkeypatch):
+    import twisted.internet
+    from twisted.internet.task import Clock
+
+    clock = Clock()
+    monkeypatch.setattr(twisted.internet, "reactor", clock, raising=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        pipeline = SQLitePipeline()
+        spider = _spider(db_path)
+        pipeline.open_spider(spider)
+        # 起動していない書き込みスレッド (キュー1件) を稼働中とみなす
+        pipeline.writer = SQLiteWriter(db_path, queue_size=1)
+        monkeypatch.setattr(pipeline.writer, "is_alive", lambda: True)
+        pipeline.TOUCH_BATCH_SIZE = 1
+
+        assert pipeline.process_item(_item(0), spider)["source_id"] == "000000"
+        results = []
+        pipeline.process_item(_item(1), spider).addCallback(results.append)
+        pipeline.process_item({**_item(2), "unchanged": True}, spider).addCallback(results.append)
+        assert pipeline.queue_full_count == 2
+
+        clock.advance(SQLitePipeline.BACKOFF_SECONDS)
+        assert results == []
+        # 書き込みスレッドが1件取り出すごとに待っていたアイテムが1件ずつ完了する
+        pipeline.writer.queue.get_nowait()
+        clock.advance(SQLitePipeline.BACKOFF_SECONDS)
+        assert [r["source_id"] for r in results] == ["000001"]
+        pipeline.writer.queue.get_nowait()
+        clock.advance(SQLitePipeline.BACKOFF_SECONDS)
+        assert [r["source_id"] for r in results] == ["000001", "000002"]
+        assert pipeline.writer.queue.get_nowait()[1] == [("suumo", "000002")]
+        pipeline.conn.close()
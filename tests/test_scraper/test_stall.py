@@ -0,0 +1,74 @@
+"""リアクター停止検出のテスト"""
+
+import threading
+import time
+
+import pytest
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.test import get_crawler
+
+from src.scraper.spiders.suumo import SuumoSpider
+from src.scraper.stall import LagMonitor, ReactorStallMonitor
+
+
+class SlowPipeline:
+    def __init__(self, monitor: LagMonitor):
+        self.monitor = monitor
+
+    def process_item(self, item, spider):
+        # 同期処理でリアクタースレッドを止めている間に監視スレッドがスタックを採取
+        watcher = threading.Thread(target=lambda: (time.sleep(0.15), self.monitor.check()))
+        watcher.start()
+        watcher.join()
+        return item
+
+
+def _monitors(n: int) -> tuple[LagMonitor, list[ReactorStallMonitor]]:
+    """計測を始めずに、n 個のクローラの拡張を登録した LagMonitor"""
+    lag_monitor = LagMonitor(threshold=0.1, interval=0.01)
+    lag_monitor.reactor_thread = threading.get_ident()
+    crawlers = [
+        get_crawler(SuumoSpider, settings_dict={"STALL_MONITOR_ENABLED": True}) for _ in range(n)
+    ]
+    for crawler in crawlers:
+        crawler.spider = crawler._create_spider()
+    lag_monitor.monitors = [ReactorStallMonitor(crawler) for crawler in crawlers]
+    return lag_monitor, lag_monitor.monitors
+
+
+def test_records_stalled_stage():
+    lag_monitor, (monitor,) = _monitors(1)
+    crawler = monitor.crawler
+
+    lag_monitor.last_beat = time.monotonic()
+    lag_monitor.beat()
+    assert crawler.stats.get_value("stall/count") is None
+
+    lag_monitor.last_beat = time.monotonic()
+    SlowPipeline(lag_monitor).process_item({}, None)
+    lag_monitor.beat()
+
+    stats = crawler.stats.get_stats()
+    assert stats["stall/count"] == 1
+    assert stats["stall/max_seconds"] >= 0.1
+    assert stats["stall/stage/SlowPipeline.process_item"] == 1
+    assert stats["stall/stage_seconds/SlowPipeline.process_item"] >= 0.1
+    assert monitor.stage_seconds.most_common(1)[0][0] == "SlowPipeline.process_item"
+
+
+def test_stall_is_counted_only_for_the_spider_that_caused_it():
+    lag_monitor, (first, second) = _monitors(2)
+
+    lag_monitor.last_beat = time.monotonic()
+    SlowPipeline(lag_monitor).process_item({}, second.crawler.spider)
+    lag_monitor.beat()
+
+    assert first.crawler.stats.get_value("stall/count") is None
+    assert second.crawler.stats.get_value("stall/count") == 1
+    # ラグ自体はプロセス共通
+    assert first.crawler.stats.get_value("stall/lag_max") >= 0.1
+
+
+def test_disabled_by_default():
+    with pytest.raises(NotConfigured):
+        ReactorStallMonitor.from_crawler(get_crawler(SuumoSpider))
@@ -0,0 +1,101 @@
+"""クロールテレメトリのテスト"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from scrapy import Request
+from scrapy.exceptions import DropItem
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from src.database.models import init_db
+from src.database.repository import CrawlRunRepository
+from src.scraper.extensions import CrawlRunRecorder
+from src.scraper.pipelines import DuplicateFilterPipeline
+from src.scraper.spiders.suumo import SuumoSpider
+from src.scraper.telemetry import (
+    PARSE_POOL_TIMING_META,
+    CrawlTelemetry,
+    ParseTimingMiddleware,
+    percentile,
+)
+
+
+def test_percentile():
+    values = sorted([0.1 * i for i in range(1, 11)])
+    assert percentile([], 50) is None
+    assert percentile(values, 50) == values[4]
+    assert percentile(values, 90) == values[8]
+    assert percentile(values, 99) == values[-1]
+
+
+def test_records_run_metrics():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "test.db"
+        crawler = get_crawler(SuumoSpider, settings_dict={"DATABASE_PATH": str(db_path)})
+        spider = crawler._create_spider(crawl_mode="full")
+        crawler.spider = spider
+        recorder = CrawlRunRecorder(crawler)
+        telemetry = CrawlTelemetry(crawler)
+        timing = ParseTimingMiddleware(crawler.stats)
+        recorder.spider_opened(spider)
+        telemetry.spider_opened(spider)
+
+        url = "https://suumo.jp/chintai/okinawa/sc_naha/"
+        for latency in (0.2, 0.4, 1.5):
+            request = Request(url, meta={"download_latency": latency})
+            response = HtmlResponse(url, body=b"<html></html>", request=request)
+            telemetry.response_received(response, request, spider)
+            outputs = list(timing.process_spider_output(response, iter([{"source_id": "a"}])))
+            assert outputs == [{"source_id": "a"}]
+        crawler.stats.set_value("downloader/request_count", 3)
+        crawler.stats.set_value("downloader/response_bytes", 3 * 1024)
+        crawler.stats.set_value("downloader/response_status_count/200", 3)
+        crawler.stats.set_value("item_scraped_count", 2)
+
+        # 除外したパイプラインをトレースバックから特定
+        pipeline = DuplicateFilterPipeline()
+        item = {"source": "suumo", "source_id": "a", "rent": 50000}
+        pipeline.process_item(item, spider)
+        try:
+            pipeline.process_item(item, spider)
+        except DropItem as e:
+            telemetry.item_dropped(item, None, e, spider)
+
+        recorder.spider_closed(spider, "finished")
+        telemetry.spider_closed(spider, "finished")
+
+        repo = CrawlRunRepository(init_db(db_path))
+        metrics = repo.get_metrics(spider.crawl_run_id)
+        assert metrics["latency_p50"] == 0.4
+        assert metrics["latency_max"] == 1.5
+        assert metrics["status_200"] == 3
+        assert metrics["parsed_pages"] == 3
+        assert metrics["dropped/DuplicateFilterPipeline"] == 1
+
+        [run] = repo.get_metrics_history(names=("latency_p90",))
+        assert run["request_count"] == 3
+        assert run["response_bytes"] == 3 * 1024
+        assert run["elapsed_seconds"] is not None
+        assert run["latency_p90"] == 1.5
+
+
+def test_parse_pool_wait_is_not_parse_time():
+    crawler = get_crawler(SuumoSpider)
+    timing = ParseTimingMiddleware(crawler.stats)
+    url = "https://suumo.jp/chintai/okinawa/sc_naha/"
+    response = HtmlResponse(url, body=b"<html></html>", request=Request(url))
+
+    async def pooled():
+        # ParsePool.parse_list と同じく、プールを待ってから待ち時間とワーカー内の秒数を残す
+        await asyncio.sleep(0.2)
+        response.meta[PARSE_POOL_TIMING_META] = (0.2, 0.01)
+        yield {"source_id": "a"}
+
+    async def consume():
+        return [o async for o in timing.process_spider_output_async(response, pooled())]
+
+    assert asyncio.run(consume()) == [{"source_id": "a"}]
+    assert crawler.stats.get_value("telemetry/parse_seconds") < 0.1
+    assert PARSE_POOL_TIMING_META not in response.meta
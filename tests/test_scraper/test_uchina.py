@@ -0,0 +1,79 @@
+"""うちなーらいふ API スパイダーのテスト"""
+
+import json
+
+import scrapy
+from scrapy.http import TextResponse
+
+from src.scraper.spiders.uchina import OKINAWA_CITY_CODES, PER_PAGE_CANDIDATES, UchinaSpider
+
+
+def _response(request, per_page: int, last_page: int, total: int, records: int = 2) -> TextResponse:
+    payload = {"data": {"bukkens": {
+        "per_page": per_page, "last_page": last_page, "total": total,
+        "data": [{"bukken_hid": f"r-{i}", "price_disp": "5万円"} for i in range(records)],
+    }}}
+    return TextResponse(request.url, body=json.dumps(payload).encode(), request=request)
+
+
+def _parse(spider, request, response):
+    return list(spider.parse_api(response, **request.cb_kwargs))
+
+
+def _spider(area_counts=None) -> UchinaSpider:
+    spider = UchinaSpider(crawl_mode="full")
+    # 前回の掲載数 (既定は全市町村200件 → まとめずに市町村ごと)
+    spider._area_counts = area_counts or {code: 200 for code, _ in OKINAWA_CITY_CODES}
+    return spider
+
+
+def test_probe_uses_accepted_page_size_and_fans_out():
+    spider = _spider()
+    [probe] = list(spider.start_requests())
+    assert f"perPage={PER_PAGE_CANDIDATES[0]}" in probe.url
+
+    # APIが上限200件に切り詰めた場合は200件で残りの市町村と2ページ目以降を投入
+    results = _parse(spider, probe, _response(probe, per_page=200, last_page=3, total=450))
+    requests = [r for r in results if isinstance(r, scrapy.Request)]
+    items = [r for r in results if not isinstance(r, scrapy.Request)]
+    assert len(items) == 2
+    # 200件 x 4市町村 = 800件 (result_cap 1000 x 0.8) まで1回の検索にまとめる
+    assert len(requests) == len(OKINAWA_CITY_CODES[1:]) // 4 + 2
+    assert all("perPage=200" in r.url for r in requests)
+    assert {r.cb_kwargs["page"] for r in requests} == {1, 2, 3}
+    # perPage=50 なら9リクエストのところ3リクエスト
+    assert spider.requests_saved == 6
+
+
+def test_probe_steps_down_on_invalid_json():
+    spider = _spider()
+    [probe] = list(spider.start_requests())
+    broken = TextResponse(probe.url, body=b"<html>error</html>", request=probe)
+    [retry] = _parse(spider, probe, broken)
+    assert f"perPage={PER_PAGE_CANDIDATES[1]}" in retry.url
+    assert retry.meta["uchina_probe"] == 1
+
+
+def test_follows_next_page_without_last_page():
+    spider = _spider()
+    request = spider._api_request("47208", "浦添市", 1, 50)
+    payload = {"data": {"bukkens": {"data": [], "next_page_url": request.url + "&page=2"}}}
+    response = TextResponse(request.url, body=json.dumps(payload).encode(), request=request)
+    [next_request] = _parse(spider, request, response)
+    assert next_request.url.endswith("&page=2")
+    assert next_request.cb_kwargs["page"] == 2
+
+
+def test_small_cities_share_one_query_and_split_over_cap():
+    counts = {code: (800 if code == "47201" else 3) for code, _ in OKINAWA_CITY_CODES}
+    spider = _spider(counts)
+    [group] = list(spider._fan_out_cities(500, include_first=True))[1:]
+    # 那覇市以外の40市町村 (各3件) は1回の検索
+    assert group.url.count("city%5B") == len(OKINAWA_CITY_CODES) - 1
+    assert group.cb_kwargs["city_code"].count(",") == len(OKINAWA_CITY_CODES) - 2
+
+    # 掲載数が急に増えて result_cap を超えたら市町村ごとに取り直す
+    response = _response(group, per_page=500, last_page=3, total=1500)
+    requests = [r for r in _parse(spider, group, response) if isinstance(r, scrapy.Request)]
+    assert len(requests) == len(OKINAWA_CITY_CODES) - 1
+    assert all(r.url.count("city%5B") == 1 for r in requests)